@@ -27,6 +27,7 @@ from app.schemas.anime import (
 )
 from app.services.anilist import fetch_user_animelist_anilist
 from app.services.preference_analyzer import analyze_preferences
+from app.services.taste_vector import clear_taste_vector
 
 router = APIRouter(prefix="/anilist", tags=["AniList"])
 
@@ -220,6 +221,7 @@ async def _run_anilist_import(
             profile.profile_data = profile_data
             profile.anime_count = len(db_entries)
             profile.generated_at = datetime.now(timezone.utc)
+            clear_taste_vector(profile)
         else:
             profile = UserPreferenceProfile(
                 user_id=user_id,
@@ -13,6 +13,7 @@ The job polling pattern is the same as /recommendations so the frontend
 can share the useJobPoller hook for both.
 """
 
+import asyncio
 from datetime import datetime, timezone
 from threading import Lock
 from time import perf_counter
@@ -23,11 +24,12 @@ from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
+from app.api.recommendations import persist_session
 from app.core.exceptions import AppError
 from app.core.logging import logger
 from app.db.session import SessionLocal
 from app.models.anime import AnimeCatalogEntry
-from app.models.recommendation import RecommendationEntry, RecommendationSession
+from app.models.recommendation import RecommendationSession
 from app.models.user import User
 from app.schemas.cauldron import (
     CauldronGenerateRequest,
@@ -40,7 +42,7 @@ from app.schemas.recommendation import (
     RecommendationItem,
     RecommendationJobStatusResponse,
 )
-from app.services.cauldron import generate_cauldron_recommendations
+from app.services.cauldron import agenerate_cauldron_recommendations
 
 router = APIRouter(prefix="/cauldron", tags=["Cauldron"])
 
@@ -316,13 +318,36 @@ def _update_job(job_id: str, **updates) -> None:
 # ═════════════════════════════════════════════════════════
 
 
-def _run_cauldron_job(
+def _persist_cauldron_session(
+    db: Session,
+    user_id: str,
+    seed_mal_ids: list[int],
+    raw_recommendations: list[dict],
+    used_fallback: bool,
+) -> str:
+    """Save the cauldron session and its entries; returns the session id."""
+    session_record = RecommendationSession(
+        user_id=user_id,
+        mode="cauldron",
+        cauldron_seed_ids=seed_mal_ids,
+        custom_query=None,
+        used_fallback=used_fallback,
+        total_count=len(raw_recommendations),
+    )
+    return persist_session(db, session_record, raw_recommendations)
+
+
+async def _run_cauldron_job(
     job_id: str,
     user_id: str,
     seed_mal_ids: list[int],
     num_recommendations: int,
 ) -> None:
-    """Background task that runs cauldron generation and persists results."""
+    """Background task that runs cauldron generation and persists results.
+
+    Runs on the event loop, like ``recommendations._run_generation_job``:
+    database work in short thread hops, embedding and LLM awaited.
+    """
     db = SessionLocal()
     try:
         _update_job(job_id, status="running", progress=10, stage="validating")
@@ -333,7 +358,7 @@ def _run_cauldron_job(
 
         _update_job(job_id, progress=75, stage="generating_recommendations")
 
-        raw_recommendations = generate_cauldron_recommendations(
+        raw_recommendations = await agenerate_cauldron_recommendations(
             seed_mal_ids=seed_mal_ids,
             num_recommendations=num_recommendations,
             db=db,
@@ -344,54 +369,23 @@ def _run_cauldron_job(
 
         used_fallback = any(rec.get("is_fallback", False) for rec in raw_recommendations)
 
-        session_record = RecommendationSession(
-            user_id=user_id,
-            mode="cauldron",
-            cauldron_seed_ids=seed_mal_ids,
-            custom_query=None,
-            used_fallback=used_fallback,
-            total_count=len(raw_recommendations),
+        session_id = await asyncio.to_thread(
+            _persist_cauldron_session, db, user_id, seed_mal_ids, raw_recommendations, used_fallback,
         )
-        db.add(session_record)
-        db.flush()
-
-        for rec in raw_recommendations:
-            entry = RecommendationEntry(
-                session_id=session_record.id,
-                mal_id=rec.get("mal_id", 0),
-                title=rec.get("title", "Unknown"),
-                image_url=rec.get("image_url"),
-                genres=rec.get("genres", ""),
-                themes=rec.get("themes", ""),
-                synopsis=rec.get("synopsis", ""),
-                mal_score=rec.get("mal_score"),
-                year=rec.get("year"),
-                anime_type=rec.get("anime_type"),
-                reasoning=rec.get("reasoning", "No reasoning provided."),
-                confidence=rec.get("confidence", "medium"),
-                similar_to=rec.get("similar_to", []),
-                similarity_score=rec.get("similarity_score", 0.0),
-                preference_score=rec.get("preference_score", 0.0),
-                combined_score=rec.get("combined_score", 0.0),
-                is_fallback=rec.get("is_fallback", False),
-            )
-            db.add(entry)
-
-        db.commit()
 
         _update_job(
             job_id,
             status="succeeded",
             progress=100,
             stage="completed",
-            session_id=session_record.id,
+            session_id=session_id,
             error=None,
         )
 
         logger.info(
             "cauldron_job_succeeded job_id=%s session_id=%s seeds=%s recs=%d",
             job_id,
-            session_record.id,
+            session_id,
             seed_mal_ids,
             len(raw_recommendations),
         )
@@ -412,4 +406,4 @@ def _run_cauldron_job(
         )
         logger.exception("cauldron_job_failed job_id=%s (unhandled): %s", job_id, e)
     finally:
-        db.close()
+        await asyncio.to_thread(db.close)
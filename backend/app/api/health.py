@@ -1,6 +1,14 @@
-"""Health check endpoint."""
+"""Health check endpoints.
+
+• ``/health``       — liveness: the process is up.
+• ``/health/ready`` — readiness: startup warm-up (``warmup.py``) has
+  finished, so the first request won't pay cold-start costs.
+"""
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.warmup import get_warmup_state
 
 router = APIRouter(tags=["health"])
 
@@ -9,3 +17,16 @@ router = APIRouter(tags=["health"])
 async def health_check() -> dict:
     """Return a simple health status to verify the backend is running."""
     return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness_check() -> JSONResponse:
+    """Return 200 once warm-up is done (or disabled), 503 until then."""
+    state = get_warmup_state()
+    return JSONResponse(
+        status_code=200 if state.ready else 503,
+        content={
+            "status": "ready" if state.ready else "warming_up",
+            "warmup": state.to_dict(),
+        },
+    )
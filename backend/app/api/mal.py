@@ -43,6 +43,7 @@ from app.services.mal import (
     parse_mal_animelist_entry,
 )
 from app.services.preference_analyzer import analyze_preferences
+from app.services.taste_vector import clear_taste_vector
 
 router = APIRouter(prefix="/mal", tags=["MAL"])
 
@@ -321,6 +322,7 @@ async def _run_import(
             profile.profile_data = profile_data
             profile.anime_count = len(db_entries)
             profile.generated_at = datetime.now(timezone.utc)
+            clear_taste_vector(profile)
         else:
             profile = UserPreferenceProfile(
                 user_id=user_id,
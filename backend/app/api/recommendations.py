@@ -30,6 +30,10 @@ Endpoint design
 • GET /history — returns past recommendation sessions (lightweight).
   Frontend renders a history sidebar.
 
+• GET /stream — the same generation as POST /generate, streamed as
+  Server-Sent Events: each recommendation is pushed the moment the
+  LLM finishes writing it, then the session is saved.  No job to poll.
+
 • GET /{session_id} — load a specific past session's recommendations.
 
 • POST /feedback — records user feedback AND applies preference tuning.
@@ -39,12 +43,16 @@ Endpoint design
   can show which recs they already rated (survives page reload).
 """
 
+import asyncio
+import json
 from datetime import datetime, timedelta, timezone
 from time import perf_counter
+from typing import AsyncIterator
 from threading import Lock
 from uuid import uuid4
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import distinct, select
 from sqlalchemy.orm import Session
 
@@ -81,7 +89,12 @@ from app.schemas.recommendation import (
     UserFeedbackMapResponse,
 )
 from app.services.preference_analyzer import apply_feedback_adjustments
-from app.services.recommender import GuardrailError, generate_recommendations
+from app.services.recommender import (
+    GuardrailError,
+    agenerate_recommendations,
+    astream_recommendations,
+)
+from app.services.taste_vector import get_taste_vector
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
@@ -123,46 +136,7 @@ def generate_recs(
     - User must have imported their MAL list (preference profile exists)
     """
     # ── Check prerequisites up-front for fast failure ───
-    if body.num_recommendations > settings.RECOMMEND_MAX_ITEMS_PER_REQUEST:
-        raise AppError(
-            code="VALIDATION_ERROR",
-            message=(
-                "Requested recommendation count exceeds configured limit. "
-                f"Maximum is {settings.RECOMMEND_MAX_ITEMS_PER_REQUEST}."
-            ),
-            status_code=422,
-            details={
-                "field": "num_recommendations",
-                "max": settings.RECOMMEND_MAX_ITEMS_PER_REQUEST,
-            },
-        )
-
-    if body.custom_query and len(body.custom_query) > settings.RECOMMEND_MAX_CUSTOM_QUERY_CHARS:
-        raise AppError(
-            code="VALIDATION_ERROR",
-            message="Custom query exceeds maximum length.",
-            status_code=422,
-            details={
-                "field": "custom_query",
-                "max_chars": settings.RECOMMEND_MAX_CUSTOM_QUERY_CHARS,
-            },
-        )
-
-    profile = db.execute(
-        select(UserPreferenceProfile).where(
-            UserPreferenceProfile.user_id == user.id
-        )
-    ).scalar_one_or_none()
-
-    if not profile:
-        raise AppError(
-            code="NOT_FOUND",
-            message=(
-                "No preference profile found. "
-                "Import your MAL list first via POST /api/mal/import."
-            ),
-            status_code=404,
-        )
+    _check_generation_request(db, user.id, body.num_recommendations, body.custom_query)
 
     # ── Queue background generation job ──────────────────
     job_id = str(uuid4())
@@ -230,6 +204,45 @@ def get_generation_status(
     )
 
 
+# ═════════════════════════════════════════════════════════
+# GET /api/recommendations/stream
+# ═════════════════════════════════════════════════════════
+
+
+@router.get("/stream")
+def stream_recs(
+    num_recommendations: int = Query(default=10, ge=1, le=25),
+    custom_query: str | None = Query(default=None, max_length=500),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Generate recommendations, streamed as Server-Sent Events.
+
+    The same pipeline as POST /generate, but instead of a job to
+    poll, the response is a ``text/event-stream``:
+
+    • ``status`` — ``{"stage": ...}`` as the pipeline moves on
+    • ``recommendation`` — one recommendation, sent as soon as the
+      LLM has finished writing it and it validated against the
+      candidates (same shape as the items of GET /)
+    • ``done`` — ``{"session_id", "total", "used_fallback"}`` once the
+      session is saved; GET /{session_id} now returns it
+    • ``error`` — ``{"code", "message"}``; the stream ends
+
+    Prerequisite failures (limits, no profile) are plain error
+    responses, before the stream starts.  A client that disconnects
+    mid-stream abandons the generation; nothing is saved.
+    """
+    _check_generation_request(db, user.id, num_recommendations, custom_query)
+
+    return StreamingResponse(
+        _stream_generation(user.id, num_recommendations, _sanitize_custom_query(custom_query)),
+        media_type="text/event-stream",
+        # No proxy buffering: each event must reach the client as sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ═════════════════════════════════════════════════════════
 # GET /api/recommendations
 # ═════════════════════════════════════════════════════════
@@ -631,90 +644,205 @@ def _sanitize_custom_query(custom_query: str | None) -> str | None:
     return query if query else None
 
 
-def _run_generation_job(
+def _check_generation_request(
+    db: Session,
+    user_id: str,
+    num_recommendations: int,
+    custom_query: str | None,
+) -> None:
+    """Configured request limits and the preference profile — checked
+    before any work is queued or streamed."""
+    if num_recommendations > settings.RECOMMEND_MAX_ITEMS_PER_REQUEST:
+        raise AppError(
+            code="VALIDATION_ERROR",
+            message=(
+                "Requested recommendation count exceeds configured limit. "
+                f"Maximum is {settings.RECOMMEND_MAX_ITEMS_PER_REQUEST}."
+            ),
+            status_code=422,
+            details={
+                "field": "num_recommendations",
+                "max": settings.RECOMMEND_MAX_ITEMS_PER_REQUEST,
+            },
+        )
+
+    if custom_query and len(custom_query) > settings.RECOMMEND_MAX_CUSTOM_QUERY_CHARS:
+        raise AppError(
+            code="VALIDATION_ERROR",
+            message="Custom query exceeds maximum length.",
+            status_code=422,
+            details={
+                "field": "custom_query",
+                "max_chars": settings.RECOMMEND_MAX_CUSTOM_QUERY_CHARS,
+            },
+        )
+
+    profile = db.execute(
+        select(UserPreferenceProfile).where(
+            UserPreferenceProfile.user_id == user_id
+        )
+    ).scalar_one_or_none()
+
+    if not profile:
+        raise AppError(
+            code="NOT_FOUND",
+            message=(
+                "No preference profile found. "
+                "Import your MAL list first via POST /api/mal/import."
+            ),
+            status_code=404,
+        )
+
+
+def _load_generation_inputs(
+    db: Session,
+    job_id: str | None,
+    user_id: str,
+    custom_query: str | None,
+) -> tuple[dict, set[int], list[float] | None]:
+    """The job's database reads: feedback-adjusted profile, exclusions
+    and taste vector (``job_id`` is ``None`` for a stream — no job
+    progress to update)."""
+    profile = db.execute(
+        select(UserPreferenceProfile).where(UserPreferenceProfile.user_id == user_id)
+    ).scalar_one_or_none()
+    if not profile:
+        raise ValueError("No preference profile found. Import your MAL list first.")
+
+    if job_id:
+        _update_job(job_id, progress=25, stage="loading_profile")
+    feedbacks = db.execute(
+        select(RecommendationFeedback).where(RecommendationFeedback.user_id == user_id)
+    ).scalars().all()
+    adjusted_profile = apply_feedback_adjustments(profile.profile_data, feedbacks)
+
+    if job_id:
+        _update_job(job_id, progress=45, stage="retrieving_candidates")
+    watched_mal_ids = _get_watched_mal_ids(user_id, db)
+    feedback_exclude_ids = _get_feedback_exclude_ids(user_id, db)
+    recently_recommended_ids = _get_recently_recommended_ids(user_id, db, days=30)
+    all_exclude_ids = watched_mal_ids | feedback_exclude_ids | recently_recommended_ids
+
+    # Cached on the profile; a failure just means text queries instead
+    taste_vector = None
+    if not custom_query:
+        try:
+            taste_vector = get_taste_vector(db, profile)
+        except Exception as exc:
+            db.rollback()
+            logger.warning("Taste vector unavailable for user %s: %s", user_id, exc)
+    return adjusted_profile, all_exclude_ids, taste_vector
+
+
+def persist_session(
+    db: Session,
+    session_record: RecommendationSession,
+    raw_recommendations: list[dict],
+) -> str:
+    """Save ``session_record`` with one entry per recommendation dict;
+    returns the session id.  Shared with the cauldron job."""
+    db.add(session_record)
+    db.flush()
+
+    for rec in raw_recommendations:
+        entry = RecommendationEntry(
+            session_id=session_record.id,
+            mal_id=rec.get("mal_id", 0),
+            title=rec.get("title", "Unknown"),
+            image_url=rec.get("image_url"),
+            genres=rec.get("genres", ""),
+            themes=rec.get("themes", ""),
+            synopsis=rec.get("synopsis", ""),
+            mal_score=rec.get("mal_score"),
+            year=rec.get("year"),
+            anime_type=rec.get("anime_type"),
+            reasoning=rec.get("reasoning", "No reasoning provided."),
+            confidence=rec.get("confidence", "medium"),
+            similar_to=rec.get("similar_to", []),
+            similarity_score=rec.get("similarity_score", 0.0),
+            preference_score=rec.get("preference_score", 0.0),
+            combined_score=rec.get("combined_score", 0.0),
+            is_fallback=rec.get("is_fallback", False),
+        )
+        db.add(entry)
+
+    db.commit()
+    return session_record.id
+
+
+def _persist_generation(
+    db: Session,
+    user_id: str,
+    custom_query: str | None,
+    raw_recommendations: list[dict],
+    used_fallback: bool,
+) -> str:
+    """Save the session and its entries; returns the session id."""
+    session_record = RecommendationSession(
+        user_id=user_id,
+        custom_query=custom_query,
+        used_fallback=used_fallback,
+        total_count=len(raw_recommendations),
+    )
+    return persist_session(db, session_record, raw_recommendations)
+
+
+async def _run_generation_job(
     job_id: str,
     user_id: str,
     num_recommendations: int,
     custom_query: str | None,
 ) -> None:
-    """Background task that generates and persists recommendation session."""
+    """Background task that generates and persists recommendation session.
+
+    A coroutine, so ``BackgroundTasks`` runs it on the event loop: the
+    database phases are short ``asyncio.to_thread`` hops, and the
+    query embedding and LLM call (3–45 s) are awaited
+    (``agenerate_recommendations``) — concurrent generations don't
+    queue up behind each other on the sync endpoints' threadpool.
+    """
     db = SessionLocal()
     started = perf_counter()
+    retrieval_stats: dict = {}
     increment("recommendation_total")
     try:
         _update_job(job_id, status="running", progress=10, stage="validating")
 
-        profile = db.execute(
-            select(UserPreferenceProfile).where(UserPreferenceProfile.user_id == user_id)
-        ).scalar_one_or_none()
-        if not profile:
-            raise ValueError("No preference profile found. Import your MAL list first.")
-
-        _update_job(job_id, progress=25, stage="loading_profile")
-        feedbacks = db.execute(
-            select(RecommendationFeedback).where(RecommendationFeedback.user_id == user_id)
-        ).scalars().all()
-        adjusted_profile = apply_feedback_adjustments(profile.profile_data, feedbacks)
-
-        _update_job(job_id, progress=45, stage="retrieving_candidates")
-        watched_mal_ids = _get_watched_mal_ids(user_id, db)
-        feedback_exclude_ids = _get_feedback_exclude_ids(user_id, db)
-        recently_recommended_ids = _get_recently_recommended_ids(user_id, db, days=30)
-        all_exclude_ids = watched_mal_ids | feedback_exclude_ids | recently_recommended_ids
+        adjusted_profile, all_exclude_ids, taste_vector = await asyncio.to_thread(
+            _load_generation_inputs, db, job_id, user_id, custom_query,
+        )
 
         _update_job(job_id, progress=75, stage="generating_recommendations")
-        raw_recommendations = generate_recommendations(
+        raw_recommendations = await agenerate_recommendations(
             preference_profile=adjusted_profile,
             watched_mal_ids=all_exclude_ids,
             num_recommendations=num_recommendations,
             custom_query=custom_query,
+            taste_vector=taste_vector,
+            retrieval_stats=retrieval_stats,
             timeout_budget_seconds=settings.RECOMMEND_JOB_TIMEOUT_SECONDS,
             max_input_chars=settings.LLM_MAX_INPUT_CHARS,
             max_estimated_cost_usd=settings.LLM_MAX_ESTIMATED_COST_USD,
         )
 
-        _update_job(job_id, progress=90, stage="persisting")
+        _update_job(
+            job_id,
+            progress=90,
+            stage="persisting",
+            fetch_k=retrieval_stats.get("fetch_k"),
+            retrieval_rounds=retrieval_stats.get("rounds"),
+        )
         used_fallback = any(rec.get("is_fallback", False) for rec in raw_recommendations)
-
-        session_record = RecommendationSession(
-            user_id=user_id,
-            custom_query=custom_query,
-            used_fallback=used_fallback,
-            total_count=len(raw_recommendations),
-        )
-        db.add(session_record)
-        db.flush()
-
-        for rec in raw_recommendations:
-            entry = RecommendationEntry(
-                session_id=session_record.id,
-                mal_id=rec.get("mal_id", 0),
-                title=rec.get("title", "Unknown"),
-                image_url=rec.get("image_url"),
-                genres=rec.get("genres", ""),
-                themes=rec.get("themes", ""),
-                synopsis=rec.get("synopsis", ""),
-                mal_score=rec.get("mal_score"),
-                year=rec.get("year"),
-                anime_type=rec.get("anime_type"),
-                reasoning=rec.get("reasoning", "No reasoning provided."),
-                confidence=rec.get("confidence", "medium"),
-                similar_to=rec.get("similar_to", []),
-                similarity_score=rec.get("similarity_score", 0.0),
-                preference_score=rec.get("preference_score", 0.0),
-                combined_score=rec.get("combined_score", 0.0),
-                is_fallback=rec.get("is_fallback", False),
-            )
-            db.add(entry)
-
-        db.commit()
+        session_id = await asyncio.to_thread(
+            _persist_generation, db, user_id, custom_query, raw_recommendations, used_fallback,
+        )
 
         _update_job(
             job_id,
             status="succeeded",
             progress=100,
             stage="completed",
-            session_id=session_record.id,
+            session_id=session_id,
             error=None,
         )
 
@@ -734,20 +862,25 @@ def _run_generation_job(
                 used_fallback=used_fallback,
                 error_code=None,
                 error=None,
+                fetch_k=retrieval_stats.get("fetch_k"),
+                retrieval_rounds=retrieval_stats.get("rounds"),
             )
         )
 
         logger.info(
-            "recommendation_job_succeeded job_id=%s user_id=%s total=%d fallback=%s session_id=%s duration_ms=%d",
+            "recommendation_job_succeeded job_id=%s user_id=%s total=%d fallback=%s session_id=%s "
+            "duration_ms=%d fetch_k=%s rounds=%s",
             job_id,
             user_id,
             len(raw_recommendations),
             used_fallback,
-            session_record.id,
+            session_id,
             elapsed_ms,
+            retrieval_stats.get("fetch_k"),
+            retrieval_stats.get("rounds"),
         )
     except GuardrailError as e:
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         increment("recommendation_failed")
         _update_job(job_id, status="failed", stage="failed", error=e.message, error_code=e.code)
         record_recent_job(
@@ -760,6 +893,8 @@ def _run_generation_job(
                 used_fallback=False,
                 error_code=e.code,
                 error=e.message,
+                fetch_k=retrieval_stats.get("fetch_k"),
+                retrieval_rounds=retrieval_stats.get("rounds"),
             )
         )
         logger.warning(
@@ -770,7 +905,7 @@ def _run_generation_job(
             e.message,
         )
     except (ValueError, RuntimeError) as e:
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         increment("recommendation_failed")
         _update_job(job_id, status="failed", stage="failed", error=str(e), error_code="UPSTREAM_UNAVAILABLE")
         record_recent_job(
@@ -783,11 +918,13 @@ def _run_generation_job(
                 used_fallback=False,
                 error_code="UPSTREAM_UNAVAILABLE",
                 error=str(e),
+                fetch_k=retrieval_stats.get("fetch_k"),
+                retrieval_rounds=retrieval_stats.get("rounds"),
             )
         )
         logger.warning("recommendation_job_failed job_id=%s user_id=%s error=%s", job_id, user_id, e)
     except Exception as e:  # pragma: no cover - defensive catch
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         increment("recommendation_failed")
         _update_job(
             job_id,
@@ -810,4 +947,144 @@ def _run_generation_job(
         )
         logger.exception("recommendation_job_failed_unexpected job_id=%s user_id=%s error=%s", job_id, user_id, e)
     finally:
+        await asyncio.to_thread(db.close)
+
+
+def _sse(event: str, data: dict) -> str:
+    """One Server-Sent Event (``data`` as a single JSON line)."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_generation(
+    user_id: str,
+    num_recommendations: int,
+    custom_query: str | None,
+) -> AsyncIterator[str]:
+    """Body of GET /stream: the generation job, yielding SSE events.
+
+    Mirrors ``_run_generation_job`` — same inputs, persistence and
+    metrics — with ``astream_recommendations`` in place of the
+    buffered call, and events in place of job status updates.
+    """
+    stream_id = str(uuid4())
+    db = SessionLocal()
+    started = perf_counter()
+    first_ms: int | None = None
+    retrieval_stats: dict = {}
+    recommendations: list[dict] = []
+    increment("recommendation_total")
+    try:
+        yield _sse("status", {"stage": "loading_profile"})
+        adjusted_profile, all_exclude_ids, taste_vector = await asyncio.to_thread(
+            _load_generation_inputs, db, None, user_id, custom_query,
+        )
+
+        yield _sse("status", {"stage": "generating_recommendations"})
+        async for rec in astream_recommendations(
+            preference_profile=adjusted_profile,
+            watched_mal_ids=all_exclude_ids,
+            num_recommendations=num_recommendations,
+            custom_query=custom_query,
+            taste_vector=taste_vector,
+            retrieval_stats=retrieval_stats,
+            timeout_budget_seconds=settings.RECOMMEND_JOB_TIMEOUT_SECONDS,
+            max_input_chars=settings.LLM_MAX_INPUT_CHARS,
+            max_estimated_cost_usd=settings.LLM_MAX_ESTIMATED_COST_USD,
+        ):
+            if first_ms is None:
+                first_ms = int((perf_counter() - started) * 1000)
+            recommendations.append(rec)
+            yield _sse("recommendation", RecommendationItem(**rec).model_dump())
+
+        yield _sse("status", {"stage": "persisting"})
+        used_fallback = any(rec.get("is_fallback", False) for rec in recommendations)
+        session_id = await asyncio.to_thread(
+            _persist_generation, db, user_id, custom_query, recommendations, used_fallback,
+        )
+
+        elapsed_ms = int((perf_counter() - started) * 1000)
+        observe_latency(elapsed_ms)
+        increment("recommendation_success")
+        if used_fallback:
+            increment("recommendation_fallback")
+        record_recent_job(
+            RecommendationJobSnapshot(
+                job_id=stream_id,
+                user_id=user_id,
+                status="succeeded",
+                stage="completed",
+                duration_ms=elapsed_ms,
+                used_fallback=used_fallback,
+                error_code=None,
+                error=None,
+                fetch_k=retrieval_stats.get("fetch_k"),
+                retrieval_rounds=retrieval_stats.get("rounds"),
+            )
+        )
+        logger.info(
+            "recommendation_stream_succeeded stream_id=%s user_id=%s total=%d fallback=%s session_id=%s "
+            "first_ms=%s duration_ms=%d fetch_k=%s rounds=%s",
+            stream_id,
+            user_id,
+            len(recommendations),
+            used_fallback,
+            session_id,
+            first_ms,
+            elapsed_ms,
+            retrieval_stats.get("fetch_k"),
+            retrieval_stats.get("rounds"),
+        )
+        yield _sse(
+            "done",
+            {"session_id": session_id, "total": len(recommendations), "used_fallback": used_fallback},
+        )
+    except GuardrailError as e:
+        await asyncio.to_thread(db.rollback)
+        yield _stream_failed(stream_id, user_id, started, retrieval_stats, e.code, e.message)
+    except (ValueError, RuntimeError) as e:
+        await asyncio.to_thread(db.rollback)
+        yield _stream_failed(stream_id, user_id, started, retrieval_stats, "UPSTREAM_UNAVAILABLE", str(e))
+    except Exception as e:  # pragma: no cover - defensive catch
+        await asyncio.to_thread(db.rollback)
+        logger.exception("recommendation_stream_failed_unexpected stream_id=%s user_id=%s error=%s", stream_id, user_id, e)
+        yield _stream_failed(
+            stream_id, user_id, started, retrieval_stats, "INTERNAL_ERROR", "Internal generation error",
+        )
+    finally:
+        # Not a thread hop: after a client disconnect the stream is
+        # cancelled, and an await here would be cancelled with it
         db.close()
+
+
+def _stream_failed(
+    stream_id: str,
+    user_id: str,
+    started: float,
+    retrieval_stats: dict,
+    code: str,
+    message: str,
+) -> str:
+    """Record a failed stream like a failed job; the ``error`` event."""
+    increment("recommendation_failed")
+    record_recent_job(
+        RecommendationJobSnapshot(
+            job_id=stream_id,
+            user_id=user_id,
+            status="failed",
+            stage="failed",
+            duration_ms=int((perf_counter() - started) * 1000),
+            used_fallback=False,
+            error_code=code,
+            error=message,
+            fetch_k=retrieval_stats.get("fetch_k"),
+            retrieval_rounds=retrieval_stats.get("rounds"),
+        )
+    )
+    logger.warning(
+        "recommendation_stream_failed stream_id=%s user_id=%s code=%s message=%s",
+        stream_id,
+        user_id,
+        code,
+        message,
+    )
+    return _sse("error", {"code": code, "message": message})
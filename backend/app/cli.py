@@ -5,6 +5,20 @@ long-running or infrastructure-level for API endpoints:
 
 • ``ingest-anime`` — Populate the anime knowledge base from Jikan API
   and embed into the vector store.
+• ``reindex`` — Rebuild any vector backend from the vectors stored on
+  the catalog, with zero OpenAI calls, into a new collection version
+  that is switched to atomically (no empty results while it runs).
+• ``collections`` — List, roll back or garbage-collect those versions.
+• ``pgvector-index`` — Create/rebuild/drop the pgvector ANN index and
+  benchmark recall vs latency against exact search.
+• ``lexical-index`` — Build or inspect the BM25 snapshot used for
+  hybrid lexical + vector search.
+• ``neighbors`` — Precompute every anime's nearest neighbours from
+  stored vectors (used by cauldron), or show one title's.
+• ``collab-index`` — Rebuild the item–item collaborative-filtering
+  matrix from every imported list (run periodically).
+• ``franchises`` — Rebuild the franchise clusters used to drop
+  sequels of started shows, or show one anime's franchise.
 
 Usage:
     # From the backend directory:
@@ -13,6 +27,15 @@ Usage:
     uv run python -m app.cli ingest-anime --all --skip-embed # Fetch all, embed later
     uv run python -m app.cli ingest-anime --pages 2 --skip-embed  # DB only, no vectors
     uv run python -m app.cli embed                           # Embed un-embedded entries
+    uv run python -m app.cli reindex --backend numpy         # Rebuild from stored vectors
+    uv run python -m app.cli collections gc                  # Drop old collection versions (cron)
+    uv run python -m app.cli pgvector-index create --method hnsw --m 16
+    uv run python -m app.cli pgvector-index benchmark --values 10,40,100
+    uv run python -m app.cli lexical-index build             # Rebuild the BM25 snapshot
+    uv run python -m app.cli neighbors build                 # Rebuild the neighbour table
+    uv run python -m app.cli neighbors show 1                # Nearest neighbours of one anime
+    uv run python -m app.cli collab-index build              # Rebuild the CF matrix (cron)
+    uv run python -m app.cli franchises build                # Rebuild franchise clusters
     uv run python -m app.cli stats                           # Show catalog stats
 
     # Or via Makefile:
@@ -91,9 +114,122 @@ def main():
     # ── embed command ────────────────────────────────────
     subparsers.add_parser(
         "embed",
-        help="Embed all un-embedded catalog entries into the vector store",
+        help="Embed new or changed catalog entries into the vector store",
     )
 
+    # ── reindex command ──────────────────────────────────
+    reindex_parser = subparsers.add_parser(
+        "reindex",
+        help="Rebuild the vector store from vectors stored in the catalog (no OpenAI calls)",
+    )
+    reindex_parser.add_argument(
+        "--backend",
+        choices=["chroma", "pgvector", "numpy"],
+        default=None,
+        help="Backend to rebuild (default: VECTOR_STORE_BACKEND)",
+    )
+    reindex_parser.add_argument(
+        "--no-switch",
+        action="store_true",
+        help="Build the new collection version but keep serving the current one",
+    )
+    reindex_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Switch even if the new version is much smaller than the active one",
+    )
+
+    # ── collections command ──────────────────────────────
+    collections_parser = subparsers.add_parser(
+        "collections",
+        help="List, activate (roll back) or garbage-collect versioned vector collections",
+    )
+    collections_parser.add_argument("action", choices=["list", "activate", "gc"])
+    collections_parser.add_argument(
+        "name", nargs="?", default=None, help="Collection to activate (e.g. anime_catalog_v7)",
+    )
+    collections_parser.add_argument(
+        "--keep",
+        type=int,
+        default=None,
+        help="Retired versions to keep for rollback (default: VECTOR_COLLECTION_KEEP)",
+    )
+    collections_parser.add_argument(
+        "--dry-run", action="store_true", help="gc: print what would be dropped",
+    )
+
+    # ── pgvector-index command ───────────────────────────
+    index_parser = subparsers.add_parser(
+        "pgvector-index",
+        help="Manage the pgvector HNSW/IVFFlat index and benchmark recall vs latency",
+    )
+    index_parser.add_argument(
+        "action",
+        choices=["status", "create", "rebuild", "drop", "benchmark"],
+    )
+    index_parser.add_argument(
+        "--method",
+        choices=["hnsw", "ivfflat"],
+        default=None,
+        help="Index type (default: PGVECTOR_INDEX_METHOD)",
+    )
+    index_parser.add_argument("--m", type=int, default=None, help="HNSW links per node")
+    index_parser.add_argument(
+        "--ef-construction", type=int, default=None, help="HNSW build-time candidate list size",
+    )
+    index_parser.add_argument("--lists", type=int, default=None, help="IVFFlat list count")
+    index_parser.add_argument(
+        "--maintenance-work-mem",
+        default=None,
+        help="maintenance_work_mem for the build, e.g. 512MB (faster HNSW builds)",
+    )
+    index_parser.add_argument(
+        "--values",
+        default=None,
+        help="Comma-separated ef_search (HNSW) or probes (IVFFlat) values to benchmark",
+    )
+    index_parser.add_argument(
+        "--queries", type=int, default=50, help="Benchmark query count (sampled from the catalog)",
+    )
+    index_parser.add_argument("--k", type=int, default=20, help="Benchmark top-k")
+
+    # ── lexical-index command ────────────────────────────
+    lexical_parser = subparsers.add_parser(
+        "lexical-index",
+        help="Build the BM25 snapshot (LEXICAL_INDEX_PATH) or try a query against it",
+    )
+    lexical_parser.add_argument("action", choices=["build", "query"])
+    lexical_parser.add_argument("text", nargs="?", default=None, help="Query text (for query)")
+    lexical_parser.add_argument("--k", type=int, default=10, help="Hits to show (for query)")
+
+    # ── neighbors command ────────────────────────────────
+    neighbors_parser = subparsers.add_parser(
+        "neighbors",
+        help="Build the item-to-item neighbour table (NEIGHBOR_INDEX_PATH) or show a title's",
+    )
+    neighbors_parser.add_argument("action", choices=["build", "show"])
+    neighbors_parser.add_argument("mal_id", nargs="?", type=int, default=None, help="MAL ID (for show)")
+    neighbors_parser.add_argument("--top-n", type=int, default=None, help="Neighbours kept per anime")
+    neighbors_parser.add_argument("--block-size", type=int, default=None, help="Rows per matmul block")
+    neighbors_parser.add_argument("--k", type=int, default=10, help="Neighbours to show (for show)")
+
+    # ── collab-index command ─────────────────────────────
+    collab_parser = subparsers.add_parser(
+        "collab-index",
+        help="Rebuild the collaborative-filtering matrix (COLLAB_INDEX_PATH) or show a row",
+    )
+    collab_parser.add_argument("action", choices=["build", "show"])
+    collab_parser.add_argument("mal_id", nargs="?", type=int, default=None, help="MAL ID (for show)")
+    collab_parser.add_argument("--k", type=int, default=10, help="Neighbours to show (for show)")
+
+    # ── franchises command ───────────────────────────────
+    franchises_parser = subparsers.add_parser(
+        "franchises",
+        help="Rebuild franchise clusters (FRANCHISE_INDEX_PATH) or show an anime's franchise",
+    )
+    franchises_parser.add_argument("action", choices=["build", "show"])
+    franchises_parser.add_argument("mal_id", nargs="?", type=int, default=None, help="MAL ID (for show)")
+
     # ── seed-demo command ────────────────────────────────
     subparsers.add_parser(
         "seed-demo",
@@ -108,6 +244,20 @@ def main():
         cmd_stats()
     elif args.command == "embed":
         cmd_embed()
+    elif args.command == "reindex":
+        cmd_reindex(args)
+    elif args.command == "collections":
+        cmd_collections(args)
+    elif args.command == "pgvector-index":
+        cmd_pgvector_index(args)
+    elif args.command == "lexical-index":
+        cmd_lexical_index(args)
+    elif args.command == "neighbors":
+        cmd_neighbors(args)
+    elif args.command == "collab-index":
+        cmd_collab_index(args)
+    elif args.command == "franchises":
+        cmd_franchises(args)
     elif args.command == "seed-demo":
         cmd_seed_demo()
     else:
@@ -256,18 +406,31 @@ async def cmd_ingest_anime(args):
 
 
 def _embed_unembedded_entries():
-    """Embed all catalog entries that haven't been embedded yet.
+    """Embed every catalog entry whose stored vector is missing or stale.
 
-    Reads from the AnimeCatalogEntry table, filters for
-    ``is_embedded=False``, and pushes them to the vector store in chunks.
-    Commits progress per chunk so crashes don't lose work.
+    An entry is re-embedded only when the hash of its ``embedding_text``
+    (or the embedding model) differs from what produced its stored
+    vector — see ``embedding_storage.needs_embedding``.  Entries whose
+    text is unchanged but whose metadata moved (member counts, score)
+    get a metadata-only push to the vector store: no OpenAI call.
+
+    Each chunk's vectors are stored on the catalog rows (see
+    ``embedding_storage.py``) so ``reindex`` can rebuild the store
+    later for free.  Commits progress per chunk so crashes don't lose work.
     """
     from sqlalchemy import select
     from app.db.session import SessionLocal
     from app.models.anime import AnimeCatalogEntry
-    from app.services.vector_store import add_anime_to_store
+    from app.services.embedding_storage import needs_embedding
+    from app.services.vector_store import (
+        add_anime_to_store,
+        get_embedding_model_name,
+        update_anime_metadata,
+    )
 
-    # Fetch all unembedded entries then immediately close the session.
+    model = get_embedding_model_name()
+
+    # Fetch candidate entries then immediately close the session.
     # This avoids holding a long-lived DB connection open while OpenAI
     # API calls are in-flight (Neon auto-suspends idle connections).
     db = SessionLocal()
@@ -275,7 +438,6 @@ def _embed_unembedded_entries():
         entries = (
             db.execute(
                 select(AnimeCatalogEntry).where(
-                    AnimeCatalogEntry.is_embedded == False,  # noqa: E712
                     AnimeCatalogEntry.embedding_text.isnot(None),
                 )
             )
@@ -283,64 +445,117 @@ def _embed_unembedded_entries():
             .all()
         )
 
-        if not entries:
-            print("✅ All catalog entries are already embedded!")
-            return
-
         # Convert to plain dicts so ORM objects don't need a live session
-        entry_dicts = [
-            {
-                "mal_id": e.mal_id,
-                "title": e.title,
-                "image_url": e.image_url,
-                "embedding_text": e.embedding_text,
-                "genres": e.genres,
-                "themes": e.themes,
-                "anime_type": e.anime_type,
-                "year": e.year,
-                "mal_score": e.mal_score,
-                "mal_members": e.mal_members,
-            }
-            for e in entries
-        ]
-        mal_ids = [e.mal_id for e in entries]
+        to_embed: list[dict] = []
+        metadata_only: list[dict] = []
+        for e in entries:
+            if needs_embedding(e.embedding_text, e.embedding_text_hash, e.embedding_model, model):
+                to_embed.append(_catalog_entry_to_dict(e))
+            elif e.vector_metadata_stale:
+                metadata_only.append(_catalog_entry_to_dict(e))
+            elif not e.is_embedded:
+                # Text changed and changed back — the stored vector
+                # (and the one in the vector store) is still right.
+                e.is_embedded = True
+        db.commit()
     finally:
         db.close()
 
-    print(f"🧠 Embedding {len(entry_dicts)} anime into vector store...")
+    if metadata_only:
+        print(f"🏷️  Updating metadata for {len(metadata_only)} anime (no re-embedding)...")
+        update_anime_metadata(metadata_only)
+        _clear_metadata_stale([e["mal_id"] for e in metadata_only])
 
-    # Process in chunks. Open a fresh DB session per chunk to commit
-    # progress — avoids stale connections after long OpenAI API calls.
-    chunk_size = 500
-    total_added = 0
-    for i in range(0, len(entry_dicts), chunk_size):
-        chunk_dicts = entry_dicts[i : i + chunk_size]
-        chunk_ids = mal_ids[i : i + chunk_size]
+    if not to_embed:
+        print("✅ All catalog entries are already embedded!")
+        return
 
-        added = add_anime_to_store(chunk_dicts)
-        total_added += added
+    print(f"🧠 Embedding {len(to_embed)} anime into vector store...")
 
-        # Fresh session just for the commit
-        db = SessionLocal()
-        try:
-            chunk_entries = (
-                db.execute(
-                    select(AnimeCatalogEntry).where(
-                        AnimeCatalogEntry.mal_id.in_(chunk_ids)
-                    )
+    def on_batch(batch: list[dict], vectors: list[list[float]]) -> None:
+        # Fresh session per batch — avoids stale connections after
+        # long OpenAI API calls.
+        _store_catalog_vectors(batch, vectors)
+
+    def on_progress(stats) -> None:
+        print(
+            f"   Progress: {stats.documents}/{len(to_embed)} embedded — "
+            f"{stats.docs_per_sec:,.0f} docs/s, {stats.tokens_per_sec:,.0f} tokens/s"
+            + (f", {stats.rate_limited} rate-limit pauses" if stats.rate_limited else "")
+        )
+
+    start = time.time()
+    total_added = add_anime_to_store(
+        to_embed, on_batch=on_batch, on_progress=on_progress,
+    )
+
+    elapsed = time.time() - start
+    print(f"   ✅ Embedded {total_added} anime into vector store in {elapsed:.1f}s")
+
+
+def _clear_metadata_stale(mal_ids: list[int]) -> None:
+    from sqlalchemy import update
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+
+    db = SessionLocal()
+    try:
+        for i in range(0, len(mal_ids), 500):
+            db.execute(
+                update(AnimeCatalogEntry)
+                .where(AnimeCatalogEntry.mal_id.in_(mal_ids[i : i + 500]))
+                .values(vector_metadata_stale=False)
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _store_catalog_vectors(batch: list[dict], vectors: list[list[float]]) -> None:
+    """Persist freshly computed vectors on their catalog rows and mark
+    them embedded."""
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+    from app.services.embedding_storage import embedding_text_hash, pack_vector
+    from app.services.vector_store import get_embedding_model_name
+
+    model = get_embedding_model_name()
+    by_mal_id = {
+        entry["mal_id"]: (entry["embedding_text"], vector)
+        for entry, vector in zip(batch, vectors)
+    }
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.execute(
+                select(AnimeCatalogEntry).where(
+                    AnimeCatalogEntry.mal_id.in_(list(by_mal_id))
                 )
-                .scalars()
-                .all()
             )
-            for entry in chunk_entries:
-                entry.is_embedded = True
-            db.commit()
-        finally:
-            db.close()
+            .scalars()
+            .all()
+        )
+        for row in rows:
+            text, vector = by_mal_id[row.mal_id]
+            row.embedding_vector = pack_vector(vector, settings.EMBEDDING_STORAGE_DTYPE)
+            row.embedding_dim = len(vector)
+            row.embedding_model = model
+            row.embedding_text_hash = embedding_text_hash(text)
+            row.is_embedded = True
+            row.vector_metadata_stale = False
+        db.commit()
+    finally:
+        db.close()
+
 
-        print(f"   Progress: {min(i + chunk_size, len(entry_dicts))}/{len(entry_dicts)} embedded")
+def _catalog_entry_to_dict(e) -> dict:
+    """The catalog fields ``add_anime_to_store`` needs, as a plain dict."""
+    from app.services.vector_store import catalog_entry_metadata
 
-    print(f"   ✅ Embedded {total_added} anime into vector store")
+    return {**catalog_entry_metadata(e), "embedding_text": e.embedding_text}
 
 
 # ═════════════════════════════════════════════════════════
@@ -369,10 +584,17 @@ def cmd_stats():
 
         not_embedded = total - embedded
 
+        stored_vectors = db.execute(
+            select(func.count(AnimeCatalogEntry.id)).where(
+                AnimeCatalogEntry.embedding_dim.isnot(None)
+            )
+        ).scalar() or 0
+
         print("\n📊 Anime Catalog Statistics")
         print(f"   Total entries:     {total}")
         print(f"   Embedded:          {embedded}")
         print(f"   Not yet embedded:  {not_embedded}")
+        print(f"   Stored vectors:    {stored_vectors}")
 
         # Source breakdown
         sources = db.execute(
@@ -390,6 +612,8 @@ def cmd_stats():
     finally:
         db.close()
 
+    _print_batch_report()
+
     # Vector store stats (only if OPENAI_API_KEY is set)
     try:
         from app.services.vector_store import get_store_stats
@@ -405,16 +629,502 @@ def cmd_stats():
     print()
 
 
+def _print_batch_report():
+    """Show how the last embedding run packed its requests."""
+    from app.core.config import settings
+    from app.services.embedding_pipeline import load_batch_report
+
+    report = load_batch_report(settings.EMBEDDING_REPORT_PATH)
+    if not report:
+        return
+
+    docs = report["documents_per_batch"]
+    tokens = report["tokens_per_batch"]
+    print(f"\n📦 Last Embedding Run ({report['finished_at']})")
+    print(f"   Documents:         {report['documents']} in {report['batches']} requests")
+    print(f"   Docs / request:    min {docs['min']}, median {docs['median']}, max {docs['max']}")
+    print(
+        f"   Tokens / request:  min {tokens['min']:,}, median {tokens['median']:,}, "
+        f"max {tokens['max']:,} (budget {report['token_budget']:,}, "
+        f"{report['mean_budget_fill']:.0%} mean fill)"
+    )
+    if not report.get("exact_token_counts", True):
+        print("   Token counts:      estimated (tiktoken unavailable)")
+    print(f"   Truncated inputs:  {report['truncated_count']}", end="")
+    if report["truncated_mal_ids"]:
+        print(f" (mal_ids: {', '.join(map(str, report['truncated_mal_ids'][:10]))}"
+              + (", ..." if report["truncated_count"] > 10 else "") + ")")
+    else:
+        print()
+
+
 # ═════════════════════════════════════════════════════════
 # embed — embed un-embedded entries
 # ═════════════════════════════════════════════════════════
 
 
 def cmd_embed():
-    """Embed all un-embedded catalog entries into the vector store."""
+    """Embed new/changed catalog entries and push metadata-only updates."""
     _embed_unembedded_entries()
 
 
+# ═════════════════════════════════════════════════════════
+# reindex — rebuild the vector store from stored vectors
+# ═════════════════════════════════════════════════════════
+
+
+def cmd_reindex(args):
+    """Rebuild a vector backend from vectors stored on the catalog.
+
+    No OpenAI calls: every vector comes from
+    ``AnimeCatalogEntry.embedding_vector``.  Rows are skipped when they
+    have no stored vector, were embedded with a different model, or
+    their text changed since embedding (hash mismatch) — run ``embed``
+    for those.
+
+    Blue/green: vectors go into a new collection version while the
+    active one keeps serving, then the pointer switches atomically
+    (see ``vector_collections.py``).  The switch is refused if the new
+    version is empty or much smaller than the active one, unless
+    ``--force``.
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import undefer
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+    from app.services.embedding_storage import embedding_text_hash, unpack_vector
+    from app.services.vector_collections import (
+        activate_collection,
+        gc_collections,
+        get_active_collection,
+        start_build,
+    )
+    from app.services.vector_store import (
+        get_embedding_model_name,
+        get_store_stats,
+        get_vector_backend,
+        reset_vector_store,
+        write_anime_vectors,
+    )
+
+    start_time = time.time()
+
+    if args.backend:
+        settings.VECTOR_STORE_BACKEND = args.backend
+        reset_vector_store()
+    backend = get_vector_backend()
+    model = get_embedding_model_name()
+
+    active = get_active_collection(backend)
+    build = start_build(backend)
+    print(f"🔁 Building {backend} collection {build.name} from stored vectors (model={model})...")
+    print(f"   {active} keeps serving searches until the switch")
+
+    written = 0
+    skipped = 0
+    last_mal_id = 0
+    chunk_size = 1000
+
+    while True:
+        # Keyset pagination on mal_id keeps memory flat for any catalog size
+        db = SessionLocal()
+        try:
+            rows = (
+                db.execute(
+                    select(AnimeCatalogEntry)
+                    .options(undefer(AnimeCatalogEntry.embedding_vector))
+                    .where(
+                        AnimeCatalogEntry.mal_id > last_mal_id,
+                        AnimeCatalogEntry.embedding_text.isnot(None),
+                    )
+                    .order_by(AnimeCatalogEntry.mal_id)
+                    .limit(chunk_size)
+                )
+                .scalars()
+                .all()
+            )
+            if not rows:
+                break
+            last_mal_id = rows[-1].mal_id
+
+            entries: list[dict] = []
+            vectors: list[list[float]] = []
+            for row in rows:
+                if (
+                    row.embedding_vector is None
+                    or not row.embedding_dim
+                    or row.embedding_model != model
+                    or row.embedding_text_hash != embedding_text_hash(row.embedding_text)
+                ):
+                    skipped += 1
+                    continue
+                entries.append(_catalog_entry_to_dict(row))
+                vectors.append(unpack_vector(row.embedding_vector, row.embedding_dim).tolist())
+        finally:
+            db.close()
+
+        written += write_anime_vectors(entries, vectors, collection=build.name)
+        print(f"   Progress: {written} written, {skipped} skipped")
+
+    elapsed = time.time() - start_time
+    print(f"   ✅ Built {build.name} with {written} anime in {elapsed:.1f}s (0 embedding calls)")
+    if skipped:
+        print(f"   ⚠️  {skipped} entries have no usable stored vector — run `embed` for those")
+
+    if args.no_switch:
+        print(f"   Not switching — activate later with `collections activate {build.name}`")
+        return
+
+    active_count = get_store_stats()["total_documents"]
+    min_count = int(active_count * settings.VECTOR_COLLECTION_MIN_RATIO)
+    if written == 0 or (written < min_count and not args.force):
+        print(
+            f"   ❌ Not switching: {build.name} has {written} documents, "
+            f"{active} has {active_count} (minimum {max(min_count, 1)}). "
+            "Use --force to switch anyway."
+        )
+        sys.exit(1)
+
+    activate_collection(backend, build.name, document_count=written)
+    print(f"   🔀 Switched searches: {active} → {build.name}")
+
+    dropped = gc_collections(backend)
+    if dropped:
+        print(f"   🧹 Garbage-collected: {', '.join(dropped)}")
+
+
+# ═════════════════════════════════════════════════════════
+# collections — versioned vector collections
+# ═════════════════════════════════════════════════════════
+
+
+def cmd_collections(args):
+    """List, activate or garbage-collect vector collection versions.
+
+    ``gc`` is meant to run on a schedule (cron); ``activate`` on a
+    retired version is a rollback.
+    """
+    from app.services.vector_collections import (
+        activate_collection,
+        gc_collections,
+        get_active_collection,
+        list_collections,
+    )
+    from app.services.vector_store import get_vector_backend
+
+    backend = get_vector_backend()
+
+    if args.action == "activate":
+        if not args.name:
+            print("   ❌ Usage: collections activate <name>")
+            sys.exit(1)
+        try:
+            activate_collection(backend, args.name)
+        except ValueError as exc:
+            print(f"   ❌ {exc}")
+            sys.exit(1)
+        print(f"   🔀 {args.name} is now the active {backend} collection")
+    elif args.action == "gc":
+        dropped = gc_collections(backend, keep=args.keep, dry_run=args.dry_run)
+        verb = "Would drop" if args.dry_run else "Dropped"
+        print(f"   🧹 {verb}: {', '.join(dropped) if dropped else 'nothing'}")
+        return
+
+    print(f"📚 {backend} collections (active: {get_active_collection(backend)})")
+    rows = list_collections(backend)
+    if not rows:
+        print("   No versions yet — the first `reindex` creates one")
+    for row in rows:
+        print(f"   {row.name:<28} {row.status:<9} {row.document_count:>7} docs  created {row.created_at:%Y-%m-%d %H:%M}")
+
+
+# ═════════════════════════════════════════════════════════
+# lexical-index — BM25 snapshot for hybrid search
+# ═════════════════════════════════════════════════════════
+
+
+def cmd_lexical_index(args):
+    """Rebuild the BM25 snapshot from the catalog, or run a query.
+
+    Run ``build`` after ingesting; serving processes pick up the new
+    snapshot on their next restart.
+    """
+    from app.core.config import settings
+    from app.services.lexical_index import BM25Index, load_lexical_index
+
+    if args.action == "build":
+        start = time.time()
+        index = load_lexical_index(rebuild=True)
+        if index is None:
+            print("   ❌ Could not build the lexical index (see log)")
+            sys.exit(1)
+        print(
+            f"   📖 Indexed {index.count()} anime in {time.time() - start:.1f}s "
+            f"→ {settings.LEXICAL_INDEX_PATH}"
+        )
+        return
+
+    if not args.text:
+        print("   ❌ Usage: lexical-index query \"<text>\"")
+        sys.exit(1)
+    try:
+        index = BM25Index.load(settings.LEXICAL_INDEX_PATH)
+    except FileNotFoundError:
+        print(f"   ❌ No snapshot at {settings.LEXICAL_INDEX_PATH} — run `lexical-index build`")
+        sys.exit(1)
+    match = index.match(args.text, k=args.k)
+    verdict = "confident — would skip embedding" if match.confident else "not confident — blended"
+    print(f"🔎 {args.text!r}: {verdict}")
+    for hit in match.hits:
+        print(f"   {hit['lexical_score']:.4f}  {hit['mal_id']:>6}  {hit['title']}")
+
+
+# ═════════════════════════════════════════════════════════
+# neighbors — precomputed item-to-item neighbour table
+# ═════════════════════════════════════════════════════════
+
+
+def cmd_neighbors(args):
+    """Rebuild the neighbour table from stored vectors, or show one row.
+
+    ``build`` makes zero OpenAI calls.  Run it after ``embed`` /
+    ``reindex``; serving processes load the new table on restart.
+    """
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+    from app.services.neighbor_index import NeighborTable, build_neighbor_table
+
+    if args.action == "build":
+        start = time.time()
+        try:
+            table = build_neighbor_table(top_n=args.top_n, block_size=args.block_size)
+        except ValueError as exc:
+            print(f"   ❌ {exc}")
+            sys.exit(1)
+        table.save(settings.NEIGHBOR_INDEX_PATH)
+        print(
+            f"   🧭 {table.count()} anime × {table.top_n} neighbours in "
+            f"{time.time() - start:.1f}s → {settings.NEIGHBOR_INDEX_PATH}"
+        )
+        return
+
+    if args.mal_id is None:
+        print("   ❌ Usage: neighbors show <mal_id>")
+        sys.exit(1)
+    try:
+        table = NeighborTable.load(settings.NEIGHBOR_INDEX_PATH)
+    except FileNotFoundError:
+        print(f"   ❌ No table at {settings.NEIGHBOR_INDEX_PATH} — run `neighbors build`")
+        sys.exit(1)
+    neighbours = table.neighbors_of(args.mal_id, k=args.k)
+    if not neighbours:
+        print(f"   ❌ {args.mal_id} is not in the table")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        titles = dict(
+            db.execute(
+                select(AnimeCatalogEntry.mal_id, AnimeCatalogEntry.title).where(
+                    AnimeCatalogEntry.mal_id.in_([args.mal_id] + [m for m, _ in neighbours])
+                )
+            ).all()
+        )
+    finally:
+        db.close()
+    print(f"🧭 Nearest to {titles.get(args.mal_id, args.mal_id)} (model={table.model}):")
+    for mal_id, similarity in neighbours:
+        print(f"   {similarity:.4f}  {mal_id:>6}  {titles.get(mal_id, '?')}")
+
+
+# ═════════════════════════════════════════════════════════
+# collab-index — item-based collaborative filtering
+# ═════════════════════════════════════════════════════════
+
+
+def cmd_collab_index(args):
+    """Rebuild the item–item matrix from every imported list, or show a row.
+
+    Meant to run on a schedule; serving processes load the new
+    snapshot on restart.
+    """
+    from app.core.config import settings
+    from app.services.collaborative_index import ItemSimilarityIndex, build_collab_index
+
+    if args.action == "build":
+        start = time.time()
+        index = build_collab_index()
+        index.save(settings.COLLAB_INDEX_PATH)
+        print(
+            f"   🤝 {index.count()} anime, {index.nnz()} neighbour links in "
+            f"{time.time() - start:.1f}s → {settings.COLLAB_INDEX_PATH}"
+        )
+        return
+
+    if args.mal_id is None:
+        print("   ❌ Usage: collab-index show <mal_id>")
+        sys.exit(1)
+    try:
+        index = ItemSimilarityIndex.load(settings.COLLAB_INDEX_PATH)
+    except FileNotFoundError:
+        print(f"   ❌ No snapshot at {settings.COLLAB_INDEX_PATH} — run `collab-index build`")
+        sys.exit(1)
+    neighbours = index.neighbors_of(args.mal_id, k=args.k)
+    if not neighbours:
+        print(f"   ❌ {args.mal_id} has no co-liked anime in the index")
+        sys.exit(1)
+    print(f"🤝 Users who liked {index.metadata_for(args.mal_id)['title']} also liked:")
+    for mal_id, similarity in neighbours:
+        print(f"   {similarity:.4f}  {mal_id:>6}  {index.metadata_for(mal_id)['title']}")
+
+
+# ═════════════════════════════════════════════════════════
+# franchises — franchise clusters from related_anime_ids
+# ═════════════════════════════════════════════════════════
+
+
+def cmd_franchises(args):
+    """Rebuild the franchise clusters from the catalog, or show one.
+
+    Run ``build`` after ingesting; serving processes pick up the new
+    snapshot on their next restart.
+    """
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+    from app.services.franchise_index import FranchiseIndex, load_franchise_index
+
+    if args.action == "build":
+        start = time.time()
+        index = load_franchise_index(rebuild=True)
+        if index is None:
+            print("   ❌ Could not build the franchise index (see log)")
+            sys.exit(1)
+        print(
+            f"   🧬 {index.count()} anime in {index.franchise_count()} franchises "
+            f"in {time.time() - start:.1f}s → {settings.FRANCHISE_INDEX_PATH}"
+        )
+        return
+
+    if args.mal_id is None:
+        print("   ❌ Usage: franchises show <mal_id>")
+        sys.exit(1)
+    try:
+        index = FranchiseIndex.load(settings.FRANCHISE_INDEX_PATH)
+    except FileNotFoundError:
+        print(f"   ❌ No snapshot at {settings.FRANCHISE_INDEX_PATH} — run `franchises build`")
+        sys.exit(1)
+    members = sorted(index.members_of(args.mal_id))
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(AnimeCatalogEntry.mal_id, AnimeCatalogEntry.title, AnimeCatalogEntry.year)
+            .where(AnimeCatalogEntry.mal_id.in_(members))
+        ).all()
+    finally:
+        db.close()
+    found = {mal_id: (title, year) for mal_id, title, year in rows}
+    print(f"🧬 Franchise {index.cluster_of(args.mal_id)}: {len(members)} anime")
+    for mal_id in members:
+        title, year = found.get(mal_id, ("?", None))
+        print(f"   {mal_id:>6}  {year or '----'}  {title}")
+
+
+# ═════════════════════════════════════════════════════════
+# pgvector-index — ANN index management and tuning
+# ═════════════════════════════════════════════════════════
+
+# Default sweep when --values isn't given
+_BENCHMARK_VALUES = {
+    "hnsw": [10, 20, 40, 80, 160],
+    "ivfflat": [1, 5, 10, 20, 50],
+}
+
+
+def cmd_pgvector_index(args):
+    """Create, rebuild, drop or benchmark the pgvector ANN index.
+
+    Build parameters default to the ``PGVECTOR_*`` settings.  The
+    benchmark prints recall@k and p50/p95 latency per ``ef_search`` /
+    ``probes`` value, against exact (sequential-scan) search, so the
+    search-time settings can be picked from data.
+    """
+    from app.core.config import settings
+    from app.services import pgvector_index
+    from app.services.vector_store import get_vector_backend
+
+    if get_vector_backend() != "pgvector":
+        print("   ❌ pgvector-index needs a PostgreSQL DATABASE_URL (or VECTOR_STORE_BACKEND=pgvector)")
+        sys.exit(1)
+
+    method = args.method or settings.PGVECTOR_INDEX_METHOD
+    build = dict(
+        m=args.m,
+        ef_construction=args.ef_construction,
+        lists=args.lists,
+        maintenance_work_mem=args.maintenance_work_mem,
+    )
+
+    try:
+        if args.action == "create":
+            if pgvector_index.index_status()["index"]:
+                print("   ⚠️  An ANN index already exists — use `rebuild` to change it")
+                return
+            start_time = time.time()
+            ddl = pgvector_index.create_index(method, **build)
+            print(f"   ✅ {ddl}  ({time.time() - start_time:.1f}s)")
+        elif args.action == "rebuild":
+            start_time = time.time()
+            ddl = pgvector_index.rebuild_index(method, **build)
+            print(f"   ✅ {ddl}  ({time.time() - start_time:.1f}s)")
+        elif args.action == "drop":
+            pgvector_index.drop_index()
+            print(f"   ✅ Dropped {pgvector_index.INDEX_NAME}")
+        elif args.action == "benchmark":
+            _print_index_benchmark(args)
+            return
+    except (RuntimeError, ValueError) as exc:
+        print(f"   ❌ {exc}")
+        sys.exit(1)
+
+    status = pgvector_index.index_status()
+    print(f"   Column:  embedding {status['column_type']} ({status['rows']} rows)")
+    if status["index"]:
+        print(f"   Index:   {status['index']}")
+        print(f"   Size:    {status['index_size']}")
+    else:
+        print("   Index:   none (every search is a sequential scan)")
+    print(
+        f"   Search:  hnsw.ef_search={settings.PGVECTOR_HNSW_EF_SEARCH}, "
+        f"ivfflat.probes={settings.PGVECTOR_IVFFLAT_PROBES}"
+    )
+
+
+def _print_index_benchmark(args):
+    from app.services import pgvector_index
+
+    status = pgvector_index.index_status()
+    method = "hnsw" if status["index"] and "USING hnsw" in status["index"] else "ivfflat"
+    knob = "ef_search" if method == "hnsw" else "probes"
+    if args.values:
+        values = [int(v) for v in args.values.split(",") if v.strip()]
+    else:
+        values = _BENCHMARK_VALUES[method]
+
+    print(f"🔎 Benchmarking {method} ({args.queries} queries, k={args.k})...")
+    report = pgvector_index.benchmark(values, queries=args.queries, k=args.k)
+
+    print(f"   {knob:>10}  {'recall@' + str(args.k):>9}  {'p50 ms':>8}  {'p95 ms':>8}")
+    for row in report:
+        label = "exact" if row["value"] is None else str(row["value"])
+        print(f"   {label:>10}  {row['recall']:>9.3f}  {row['p50_ms']:>8.2f}  {row['p95_ms']:>8.2f}")
+
+
 # ═════════════════════════════════════════════════════════
 # seed-demo — create demo user with curated data
 # ═════════════════════════════════════════════════════════
@@ -450,6 +1160,7 @@ def cmd_seed_demo():
     from app.models.recommendation import RecommendationSession, RecommendationEntry
     from app.services.auth import hash_password
     from app.services.preference_analyzer import analyze_preferences
+    from app.services.taste_vector import clear_taste_vector
 
     # ── Load fixture data ────────────────────────────────
     fixture_path = Path(__file__).parent / "fixtures" / "demo_seed.json"
@@ -555,6 +1266,7 @@ def cmd_seed_demo():
             existing_profile.profile_data = profile_data
             existing_profile.anime_count = len(orm_entries)
             existing_profile.generated_at = datetime.now(timezone.utc)
+            clear_taste_vector(existing_profile)
             print("   Updated existing preference profile")
         else:
             profile = UserPreferenceProfile(
@@ -44,6 +44,32 @@ class Settings(BaseSettings):
     # ── OpenAI ───────────────────────────────────────────
     OPENAI_API_KEY: str = ""
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # openai | hashing.  "hashing" is a deterministic, offline
+    # feature-hashing provider for benchmarks and load tests — no API
+    # key or network (see app/services/local_embeddings.py).
+    EMBEDDING_PROVIDER: str = "openai"
+    LOCAL_EMBEDDING_DIMENSIONS: int = 1536
+    LOCAL_EMBEDDING_SEED: int = 0
+    # Query-embedding cache: in-memory LRU in front of a SQLite file.
+    # Keyed by (model, normalised text); only search queries are cached.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 1024
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 50000
+    # Catalog vectors are also stored on AnimeCatalogEntry so the vector
+    # store can be rebuilt offline.  float16 halves the size.
+    EMBEDDING_STORAGE_DTYPE: str = "float16"  # float16 | float32
+    # Catalog embedding pipeline: concurrent requests under a token
+    # bucket.  Defaults match OpenAI tier 1 for text-embedding-3-small.
+    EMBEDDING_RPM_LIMIT: int = 3000
+    EMBEDDING_TPM_LIMIT: int = 1_000_000
+    EMBEDDING_MAX_IN_FLIGHT: int = 4
+    # Batches are packed by tokens, not document count.  OpenAI caps a
+    # request at 300k tokens / 2048 inputs and each input at 8191.
+    EMBEDDING_BATCH_TOKEN_BUDGET: int = 250_000
+    EMBEDDING_BATCH_MAX_INPUTS: int = 2048
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8191
+    EMBEDDING_REPORT_PATH: str = "./embedding_report.json"
 
     # ── OpenAI Chat (LLM for recommendations) ───────────
     # gpt-4.1-nano: cheapest/fastest, good for simple tasks
@@ -58,21 +84,144 @@ class Settings(BaseSettings):
     # reasoning is ~150 tokens, so 10 recs ≈ 1500.  2000 gives headroom.
     OPENAI_CHAT_MAX_TOKENS: int = 2000
 
+    # ── Startup warm-up ──────────────────────────────────
+    # Build the embeddings / vector store / LLM singletons and run one
+    # search in the background at startup; /api/health/ready returns
+    # 503 until done.  Off by default (it calls OpenAI).
+    WARMUP_ENABLED: bool = False
+    # Extra queries to pre-embed alongside the fallback query
+    WARMUP_EXTRA_QUERIES: list[str] = []
+    # Open the chat client's connection with a free models.retrieve call
+    WARMUP_LLM_PING: bool = True
+
     # ── Recommendation / LLM guardrails ────────────────
     RECOMMEND_MAX_ITEMS_PER_REQUEST: int = 10
     RECOMMEND_MAX_CUSTOM_QUERY_CHARS: int = 300
     RECOMMEND_JOB_TIMEOUT_SECONDS: int = 45
+    # Candidates handed to the LLM per recommendation requested.  3 gives
+    # it room to pick a varied set; with RETRIEVAL_MMR_ENABLED the pool
+    # is already varied and 1.5 (or even 1) cuts prompt size.
+    RECOMMEND_CANDIDATE_MULTIPLIER: float = 3.0
     LLM_MAX_INPUT_CHARS: int = 32000
     LLM_MAX_OUTPUT_TOKENS: int = 2000
     # Approximate guardrail to avoid runaway per-request spend.
     LLM_MAX_ESTIMATED_COST_USD: float = Field(default=0.03, ge=0.0)
 
+    # ── Retrieval ────────────────────────────────────────
+    # How retrieve_candidates merges its per-query result lists:
+    # max (best similarity per anime) | rrf (reciprocal rank fusion) |
+    # weighted (weighted similarity sum).  rrf / weighted reward anime
+    # that several profile queries agree on, so they hold up with a
+    # smaller per-query fetch (fetch_k = k × FETCH_MULTIPLIER, max 50).
+    RETRIEVAL_FUSION: str = "max"
+    RETRIEVAL_RRF_K: int = 60
+    RETRIEVAL_FETCH_MULTIPLIER: float = 1.0
+    # Adaptive fetch: the first page is divided by the share of the
+    # score-filtered catalog the user hasn't excluded (watched, disliked,
+    # recently recommended; at most ×10), then doubles per round while
+    # the fused pool is short of k — up to MAX_FETCH_K per query, and
+    # only while retrieval is under DEEPEN_BUDGET_MS.
+    RETRIEVAL_ADAPTIVE_FETCH: bool = True
+    RETRIEVAL_MAX_FETCH_K: int = 200
+    RETRIEVAL_DEEPEN_BUDGET_MS: int = 1000
+    # A round's searches (profile queries, taste vector; pgvector's
+    # per-query SQL) run concurrently on SEARCH_WORKERS threads.  Each
+    # gets BUDGET_SHARE of RECOMMEND_JOB_TIMEOUT_SECONDS (never past the
+    # job's own deadline); one that misses it is dropped and the pool is
+    # built from the rest.
+    RETRIEVAL_SEARCH_WORKERS: int = Field(default=8, ge=1)
+    RETRIEVAL_SEARCH_BUDGET_SHARE: float = Field(default=0.25, gt=0.0, le=1.0)
+    # Hybrid lexical search: a BM25 index over embedding_text, loaded
+    # from LEXICAL_INDEX_PATH (built from the catalog if missing) in the
+    # background at startup.  Per query, vector and BM25 scores blend as
+    # (1 − WEIGHT) × vector + WEIGHT × lexical; a confident lexical match
+    # (best hit covers COVERAGE of the query's IDF mass, and at most
+    # MAX_MATCHES anime do) skips the query embedding entirely.
+    LEXICAL_SEARCH_ENABLED: bool = False
+    LEXICAL_INDEX_PATH: str = "./lexical_index.npz"
+    LEXICAL_WEIGHT: float = 0.3
+    LEXICAL_CONFIDENT_COVERAGE: float = 0.8
+    LEXICAL_CONFIDENT_MAX_MATCHES: int = 10
+    # Cache ranked candidate pools (TTL + LRU), keyed by the profile
+    # fields retrieval reads + custom query, min_score and k.  Entries
+    # die when the active collection changes or this process writes
+    # vectors; the TTL covers writes made by other processes.
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 300
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = 256
+    # Search with the score-weighted centroid of the stored catalog
+    # vectors of the user's TASTE_VECTOR_TOP_N best-rated shows instead
+    # of embedding "anime similar to …".  "off", "top_shows" (replaces
+    # that query) or "only" (no query embeddings for profile runs).
+    TASTE_VECTOR_MODE: str = "off"
+    TASTE_VECTOR_TOP_N: int = 20
+    # Precomputed top-N cosine neighbours of every catalog anime
+    # (`cli neighbors build`).  With CAULDRON_NEIGHBORS_ENABLED, cauldron
+    # reads seed neighbours from the table instead of embedding a query.
+    NEIGHBOR_INDEX_PATH: str = "./neighbor_index.npz"
+    NEIGHBOR_TOP_N: int = 50
+    NEIGHBOR_BLOCK_SIZE: int = 512
+    CAULDRON_NEIGHBORS_ENABLED: bool = False
+    # Item-based collaborative filtering over every imported list
+    # (`cli collab-index build`, run periodically).  When enabled and
+    # loaded, anime co-liked with the profile's top-10 join the vector
+    # queries as one more candidate list.  COLLAB_WEIGHT scales that
+    # list's best hit for max fusion; rrf only uses ranks.
+    COLLAB_ENABLED: bool = False
+    COLLAB_INDEX_PATH: str = "./collab_index.npz"
+    COLLAB_TOP_N: int = 100
+    COLLAB_MIN_SUPPORT: int = 3
+    COLLAB_MAX_ITEMS_PER_USER: int = 300
+    COLLAB_BUILD_CHUNK_USERS: int = 500
+    COLLAB_WEIGHT: float = 0.8
+    # Franchise clusters (union-find over related_anime_ids).  When
+    # enabled, every entry of a franchise the user has started is
+    # excluded from search, and each franchise fills one candidate slot.
+    # Unions past MAX_CLUSTER_SIZE are skipped — loose "Other" relations
+    # would otherwise chain unrelated franchises together.
+    FRANCHISE_DEDUP_ENABLED: bool = False
+    FRANCHISE_INDEX_PATH: str = "./franchise_index.npz"
+    FRANCHISE_MAX_CLUSTER_SIZE: int = 150
+    # Maximal-marginal-relevance ordering of the ranked pool, over
+    # genre + theme similarity: λ × relevance − (1 − λ) × redundancy.
+    # LAMBDA 1.0 = relevance order only; lower = more variety.
+    RETRIEVAL_MMR_ENABLED: bool = False
+    RETRIEVAL_MMR_LAMBDA: float = 0.7
+
     # ── Vector Store ─────────────────────────────────────
     # ChromaDB is used locally (SQLite/dev); pgvector is used in production
     # (PostgreSQL/Neon). The backend auto-selects based on DATABASE_URL.
     CHROMA_PERSIST_DIR: str = "./chroma_data"
     CHROMA_COLLECTION_NAME: str = "anime_catalog"
     VECTOR_COLLECTION_NAME: str = "anime_catalog"
+    # auto | chroma | pgvector | numpy.  "auto" keeps the DATABASE_URL-based
+    # choice above; "numpy" serves searches from an in-process float32 matrix
+    # memory-mapped from NUMPY_INDEX_DIR (no Chroma/Postgres round-trip).
+    VECTOR_STORE_BACKEND: str = "auto"
+    NUMPY_INDEX_DIR: str = "./vector_index"
+    # Blue/green rebuilds: `reindex` writes anime_catalog_v{N} and flips
+    # a pointer in the vector_collections table.  Workers re-read the
+    # pointer every REFRESH seconds; GC keeps KEEP retired versions for
+    # rollback and only drops ones retired for GRACE seconds.
+    VECTOR_COLLECTION_REFRESH_SECONDS: int = 30
+    VECTOR_COLLECTION_KEEP: int = 1
+    VECTOR_COLLECTION_GC_GRACE_SECONDS: int = 3600
+    # Refuse to switch to a version with fewer docs than this × active
+    VECTOR_COLLECTION_MIN_RATIO: float = 0.9
+    # pgvector ANN index, managed by `python -m app.cli pgvector-index`.
+    # Build parameters: HNSW m / ef_construction, or IVFFlat lists.
+    PGVECTOR_INDEX_METHOD: str = "hnsw"  # hnsw | ivfflat
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_IVFFLAT_LISTS: int = 100
+    # Search-time settings, SET per session on every vector-store
+    # connection.  Higher = better recall, slower queries.
+    PGVECTOR_HNSW_EF_SEARCH: int = 40
+    PGVECTOR_IVFFLAT_PROBES: int = 10
+    # off | relaxed_order | strict_order — pgvector >= 0.8 only (skipped
+    # on older versions).  Without it a filtered HNSW search returns at
+    # most ef_search rows, however large fetch_k is.
+    PGVECTOR_ITERATIVE_SCAN: str = "relaxed_order"
 
 
 settings = Settings()
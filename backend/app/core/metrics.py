@@ -17,6 +17,8 @@ class RecommendationJobSnapshot:
     used_fallback: bool
     error_code: str | None
     error: str | None
+    fetch_k: int | None = None
+    retrieval_rounds: int | None = None
 
 
 _lock = Lock()
@@ -32,6 +34,18 @@ _counters: dict[str, float] = {
     "llm_tokens_prompt": 0,
     "llm_tokens_completion": 0,
     "llm_estimated_cost_usd": 0.0,
+    "embedding_cache_hit_memory": 0,
+    "embedding_cache_hit_disk": 0,
+    "embedding_cache_miss": 0,
+    "embedding_rate_limited": 0,
+    "embedding_inputs_truncated": 0,
+    "lexical_embedding_skipped": 0,
+    "retrieval_cache_hit": 0,
+    "retrieval_cache_miss": 0,
+    "retrieval_cache_stale": 0,
+    "neighbor_lookup_hit": 0,
+    "neighbor_lookup_fallback": 0,
+    "franchise_candidates_collapsed": 0,
 }
 _latencies_ms: deque[int] = deque(maxlen=500)
 _recent_jobs: deque[RecommendationJobSnapshot] = deque(maxlen=100)
@@ -67,6 +81,10 @@ def get_metrics_summary() -> dict:
         total = _counters.get("recommendation_total", 0)
         if total:
             fallback_rate = round(_counters.get("recommendation_fallback", 0) / total, 4)
+        cache_lookups = _counters.get("retrieval_cache_hit", 0) + _counters.get("retrieval_cache_miss", 0)
+        cache_hit_rate = (
+            round(_counters.get("retrieval_cache_hit", 0) / cache_lookups, 4) if cache_lookups else 0.0
+        )
 
         return {
             "counters": dict(_counters),
@@ -76,6 +94,7 @@ def get_metrics_summary() -> dict:
                 "latest_ms": latencies[0] if latencies else None,
             },
             "fallback_rate": fallback_rate,
+            "retrieval_cache_hit_rate": cache_hit_rate,
         }
 
 
@@ -1,5 +1,6 @@
 """FastAPI application entrypoint."""
 
+import asyncio
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 from time import perf_counter
@@ -15,6 +16,12 @@ from app.core.config import settings
 from app.core.exceptions import register_exception_handlers
 from app.core.logging import logger, setup_logging
 from app.core.request_context import set_request_id
+from app.services.catalog_stats import load_catalog_scores
+from app.services.collaborative_index import load_collab_index
+from app.services.franchise_index import load_franchise_index
+from app.services.lexical_index import load_lexical_index
+from app.services.neighbor_index import load_neighbor_table
+from app.services.warmup import mark_warmup_pending, run_warmup
 
 
 def validate_startup_settings() -> None:
@@ -37,8 +44,59 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     setup_logging(level="DEBUG" if settings.DEBUG else "INFO")
     validate_startup_settings()
     logger.info("Starting %s", settings.APP_NAME)
+
+    startup_tasks: dict[str, asyncio.Task] = {}
+
+    def start(name: str, coro) -> None:
+        task = asyncio.create_task(coro)
+        startup_tasks[name] = task
+        setattr(app.state, f"{name}_task", task)
+
+    if settings.WARMUP_ENABLED:
+        # Build the lazy singletons off the event loop (the LLM ping on
+        # it); readiness stays false until this finishes (see
+        # app/services/warmup.py).
+        mark_warmup_pending()
+        start("warmup", run_warmup())
+
+    if settings.LEXICAL_SEARCH_ENABLED:
+        # Searches skip the lexical side until this has loaded
+        start("lexical", asyncio.to_thread(load_lexical_index))
+
+    if settings.CAULDRON_NEIGHBORS_ENABLED:
+        # Cauldron uses vector search until this has loaded
+        start("neighbor", asyncio.to_thread(load_neighbor_table))
+
+    if settings.COLLAB_ENABLED:
+        # Retrieval stays content-only until this has loaded
+        start("collab", asyncio.to_thread(load_collab_index))
+
+    if settings.RETRIEVAL_ADAPTIVE_FETCH:
+        # Fetch sizing ignores exclusion density until this has loaded
+        start("catalog_scores", asyncio.to_thread(load_catalog_scores))
+
+    if settings.FRANCHISE_DEDUP_ENABLED:
+        # Retrieval skips franchise dedup until this has loaded
+        start("franchise", asyncio.to_thread(load_franchise_index))
+
     yield
     logger.info("Shutting down %s", settings.APP_NAME)
+    await _stop_startup_tasks(startup_tasks)
+
+
+async def _stop_startup_tasks(tasks: dict[str, asyncio.Task]) -> None:
+    """Cancel startup loads still running and wait for them to settle.
+
+    A load in a worker thread can't be interrupted — cancelling stops
+    waiting on it, so shutdown doesn't hang.  Failures are logged here
+    instead of surfacing as "Task exception was never retrieved".
+    """
+    for task in tasks.values():
+        task.cancel()
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    for name, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.warning("Startup task %s failed: %s", name, result)
 
 
 def create_app() -> FastAPI:
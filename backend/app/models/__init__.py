@@ -13,3 +13,4 @@ from app.models.recommendation import (  # noqa: F401
     RecommendationFeedback,
 )
 from app.models.watchlist import WatchlistEntry  # noqa: F401
+from app.models.vector_collection import VectorCollection  # noqa: F401
@@ -41,6 +41,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     JSON,
+    LargeBinary,
     func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -228,6 +229,17 @@ class UserPreferenceProfile(Base):
     # ── The computed profile ─────────────────────────────
     profile_data: Mapped[dict] = mapped_column(JSON, default=dict)
 
+    # ── Cached taste vector (see services/taste_vector.py) ──
+    # Score-weighted centroid of the user's top-rated catalog vectors;
+    # cleared on import, rebuilt on the next generation.
+    taste_vector: Mapped[bytes | None] = mapped_column(
+        LargeBinary, nullable=True, deferred=True
+    )
+    taste_vector_dim: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    taste_vector_model: Mapped[str | None] = mapped_column(
+        String(100), nullable=True
+    )
+
     # ── Metadata ─────────────────────────────────────────
     generated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -285,9 +297,15 @@ class AnimeCatalogEntry(Base):
 
     3. **is_embedded** — Tracks whether this entry has been embedded
        into the vector store.  Lets us do incremental embedding
-       (only embed new/changed entries).
+       (only embed new/changed entries).  Only a change to
+       ``embedding_text`` clears it; volatile numbers (members, rank)
+       just set ``vector_metadata_stale`` for a metadata-only push.
+
+    4. **embedding_vector** — The vector itself, stored next to the
+       row (with model name and text hash) so any vector backend can
+       be rebuilt with ``python -m app.cli reindex`` — no OpenAI calls.
 
-    4. **source** — Where we got this entry from (e.g. "top_anime",
+    5. **source** — Where we got this entry from (e.g. "top_anime",
        "seasonal_2024_winter", "genre_action").  Useful for debugging
        and understanding catalog coverage.
     """
@@ -354,6 +372,22 @@ class AnimeCatalogEntry(Base):
     is_embedded: Mapped[bool] = mapped_column(
         default=False, index=True
     )  # has this been embedded into the vector store?
+    vector_metadata_stale: Mapped[bool] = mapped_column(
+        default=False
+    )  # metadata changed (e.g. member count) but the text didn't
+
+    # ── Stored embedding (rebuild any backend offline) ───
+    # Deferred so ordinary catalog queries don't load ~3 KB per row.
+    embedding_vector: Mapped[bytes | None] = mapped_column(
+        LargeBinary, nullable=True, deferred=True
+    )  # little-endian float16/float32, see services/embedding_storage.py
+    embedding_dim: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    embedding_model: Mapped[str | None] = mapped_column(
+        String(100), nullable=True
+    )  # e.g. "text-embedding-3-small"
+    embedding_text_hash: Mapped[str | None] = mapped_column(
+        String(64), nullable=True
+    )  # sha256 of the text the vector was computed from
 
     # ── Ingestion metadata ───────────────────────────────
     source: Mapped[str | None] = mapped_column(
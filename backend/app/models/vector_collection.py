@@ -0,0 +1,74 @@
+"""Vector collection versions — blue/green rebuilds of the vector store.
+
+Rebuilding the vector store used to mean emptying the live collection
+and re-filling it, so searches returned nothing until the rebuild
+finished.  Instead, every rebuild writes a fresh versioned collection
+(``anime_catalog_v7``) while the current one keeps serving, then the
+pointer flips.
+
+Design notes
+────────────
+• One row per physical collection per backend.  ``status`` is the
+  pointer: exactly one ``active`` row per backend is what searches
+  read; ``building`` rows are in progress; ``retired`` rows are kept
+  for rollback until garbage-collected.
+• The switch is a single transaction (retire the old row, activate
+  the new one), so readers see either the old or the new version —
+  never a half-built one.
+• The pre-versioning collection (``anime_catalog``) is recorded as
+  version 0 on the first switch so it can be rolled back to and
+  eventually garbage-collected like any other version.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    String,
+    Integer,
+    DateTime,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class VectorCollection(Base):
+    """A single versioned vector collection (or NumPy index directory)."""
+
+    __tablename__ = "vector_collections"
+    __table_args__ = (
+        UniqueConstraint("backend", "name", name="uq_vector_collection_backend_name"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+    )
+
+    # ── Identity ─────────────────────────────────────────
+    backend: Mapped[str] = mapped_column(String(20), index=True)  # chroma | pgvector | numpy
+    name: Mapped[str] = mapped_column(String(100))
+    version: Mapped[int] = mapped_column(Integer)
+
+    # ── Lifecycle ────────────────────────────────────────
+    status: Mapped[str] = mapped_column(
+        String(20), default="building"
+    )  # building | active | retired
+    document_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    activated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    retired_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<VectorCollection {self.backend}:{self.name} ({self.status})>"
@@ -51,6 +51,14 @@ JIKAN_RATE_LIMIT_DELAY = 0.4  # ~3 req/s
 JIKAN_BACKOFF_DELAY = 2.0     # on 429 rate limit
 JIKAN_PAGE_SIZE = 25           # Jikan returns 25 items per page
 
+# Catalog fields copied into vector store metadata (see
+# ``vector_store.catalog_entry_metadata``).  A change to any of these without
+# a text change only needs a metadata push, not a re-embed.
+VECTOR_METADATA_FIELDS = frozenset({
+    "title", "image_url", "genres", "themes", "anime_type",
+    "year", "mal_score", "mal_members",
+})
+
 
 # ═════════════════════════════════════════════════════════
 # Fetching — async functions that hit the Jikan API
@@ -301,7 +309,7 @@ def build_embedding_text(anime: dict) -> str:
     - **Genres/Themes** — "action sci-fi space" matches genre queries
     - **Synopsis** — semantic meaning ("dark", "psychological", etc.)
     - **Studio** — fans of Madhouse or Bones have studio preferences
-    - **Score/Popularity** — quality signal for filtering
+    - **Score** — quality signal
     - **Year/Type** — era and format preferences
 
     Example output::
@@ -312,7 +320,7 @@ def build_embedding_text(anime: dict) -> str:
         Genres: Action, Sci-Fi
         Themes: Space, Adult Cast
         Studios: Sunrise
-        Score: 8.75 (1,500,000 members)
+        Score: 8.75
         Synopsis: In the year 2071, humanity has colonized...
 
     Args:
@@ -358,12 +366,11 @@ def build_embedding_text(anime: dict) -> str:
     if anime.get("studios"):
         lines.append(f"Studios: {anime['studios']}")
 
-    # Score and popularity
+    # Score.  Member counts, rank and popularity are deliberately left
+    # out: they change on every crawl and would force a re-embed each
+    # time (they still reach the vector store as metadata).
     if anime.get("mal_score"):
-        score_str = f"Score: {anime['mal_score']}"
-        if anime.get("mal_members"):
-            score_str += f" ({anime['mal_members']:,} members)"
-        lines.append(score_str)
+        lines.append(f"Score: {anime['mal_score']}")
 
     # Synopsis (the richest semantic signal)
     if anime.get("synopsis"):
@@ -460,8 +467,11 @@ def _update_catalog_entry(existing, new_data: dict) -> None:
 
     We only overwrite fields if the new data is non-None and
     potentially richer (e.g. has themes where the old one didn't).
-    We always regenerate the embedding text since the data may
-    have changed.
+    The embedding text is regenerated whenever anything changed, but
+    the entry is only flagged for re-embedding when that *text*
+    actually differs.  Changes that only affect vector store metadata
+    (member counts, score, image) set ``vector_metadata_stale`` so the
+    next ``embed`` run pushes them without an embedding call.
     """
     # Fields to update (only if new value is not None)
     update_fields = [
@@ -472,22 +482,28 @@ def _update_catalog_entry(existing, new_data: dict) -> None:
         "related_anime_ids",
     ]
 
-    changed = False
+    changed_fields: set[str] = set()
     for field in update_fields:
         new_val = new_data.get(field)
         if new_val is not None:
             old_val = getattr(existing, field, None)
             if new_val != old_val:
                 setattr(existing, field, new_val)
-                changed = True
+                changed_fields.add(field)
+
+    if not changed_fields:
+        return
+
+    old_text = existing.embedding_text
+    existing.embedding_text = new_data.get("embedding_text") or build_embedding_text(
+        {field: getattr(existing, field) for field in update_fields}
+    )
 
-    # Always regenerate embedding text if anything changed
-    if changed:
-        existing.embedding_text = new_data.get("embedding_text") or build_embedding_text(
-            {field: getattr(existing, field) for field in update_fields}
-        )
+    if existing.embedding_text != old_text:
         # Mark as needing re-embedding since the text changed
         existing.is_embedded = False
+    elif existing.is_embedded and changed_fields & VECTOR_METADATA_FIELDS:
+        existing.vector_metadata_stale = True
 
 
 # ═════════════════════════════════════════════════════════
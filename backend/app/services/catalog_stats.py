@@ -0,0 +1,132 @@
+"""Catalog score table — how much of the filtered catalog a user excludes.
+
+``retrieve_candidates`` sizes its per-query fetch from the share of
+the searchable catalog that is off-limits to the user: watched,
+disliked and recently recommended anime that would otherwise pass the
+active ``mal_score_gte`` filter.  A new user excludes ~0% and needs
+barely more than ``k`` results per query; a veteran with 2,000
+completed shows can exclude most of the 7.0+ catalog, and approximate
+indexes (Chroma's HNSW, pgvector's HNSW / IVFFlat) apply filters after
+their candidate walk — so they return a fraction of what was asked.
+
+Layout
+──────
+Two parallel arrays over every embedded catalog entry, sorted by
+``mal_id``:
+
+• ``mal_ids`` — ``int32 (N,)``
+• ``scores``  — ``float32 (N,)`` MAL community score, ``NaN`` if none
+  (never passes a score filter, as in the vector store)
+
+~8 bytes per anime.  ``excluded_fraction`` is one ``searchsorted`` over
+the exclusion set and two comparisons — microseconds for thousands of
+ids.
+
+Loaded from the database in the background at startup.  Until then
+(or if it fails) the fraction is treated as 0 and retrieval relies on
+deepening alone; a table that's stale after an ingest only shifts the
+first guess.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import Iterable
+
+import numpy as np
+
+from app.core.logging import logger
+
+
+class CatalogScores:
+    """``mal_id → mal_score`` for the searchable catalog."""
+
+    def __init__(self, mal_ids: Iterable[int], scores: Iterable[float | None]) -> None:
+        ids = np.asarray(list(mal_ids), dtype=np.int32)
+        values = np.asarray(
+            [np.nan if s is None else s for s in scores], dtype=np.float32,
+        )
+        order = np.argsort(ids, kind="stable")
+        self.mal_ids = ids[order]
+        self.scores = values[order]
+
+    def count(self, min_score: float | None = None) -> int:
+        """Catalog entries passing the score filter."""
+        if min_score is None:
+            return int(self.mal_ids.shape[0])
+        return int(np.count_nonzero(self.scores >= min_score))
+
+    def excluded_fraction(
+        self,
+        exclude_ids: Iterable[int],
+        min_score: float | None = None,
+    ) -> float:
+        """Share (0–1) of the entries passing the filter that are excluded.
+
+        Ids that aren't in the catalog, or don't pass the filter, don't
+        count: they were never going to be returned anyway.
+        """
+        total = self.count(min_score)
+        ids = np.fromiter(exclude_ids, dtype=np.int64)
+        if total == 0 or ids.size == 0 or self.mal_ids.size == 0:
+            return 0.0
+        pos = np.minimum(np.searchsorted(self.mal_ids, ids), self.mal_ids.size - 1)
+        rows = np.unique(pos[self.mal_ids[pos] == ids])
+        if min_score is not None:
+            rows = rows[self.scores[rows] >= min_score]
+        return rows.size / total
+
+
+# ═════════════════════════════════════════════════════════
+# Process-wide table
+# ═════════════════════════════════════════════════════════
+
+
+_table: CatalogScores | None = None
+_table_lock = Lock()
+
+
+def get_catalog_scores() -> CatalogScores | None:
+    """The loaded table, or ``None`` until ``load_catalog_scores`` ran."""
+    return _table
+
+
+def set_catalog_scores(table: CatalogScores | None) -> None:
+    global _table
+    with _table_lock:
+        _table = table
+
+
+def reset_catalog_scores() -> None:
+    """Drop the loaded table (useful for testing)."""
+    set_catalog_scores(None)
+
+
+def load_catalog_scores() -> CatalogScores | None:
+    """Read every embedded catalog entry's score from the database.
+
+    Runs in a background thread at startup; failures are logged and
+    leave fetch sizing at its exclusion-blind default.
+    """
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(AnimeCatalogEntry.mal_id, AnimeCatalogEntry.mal_score).where(
+                AnimeCatalogEntry.embedding_text.is_not(None)
+            )
+        ).all()
+    except Exception as exc:
+        logger.warning("Catalog score table unavailable: %s", exc)
+        return None
+    finally:
+        db.close()
+
+    table = CatalogScores((r[0] for r in rows), (r[1] for r in rows))
+    logger.info("Loaded catalog score table (%d anime)", table.count())
+    set_catalog_scores(table)
+    return table
@@ -22,25 +22,43 @@ The LLM system prompt is different: instead of "explain why this user
 would like this based on their watch history", it says "explain which
 aspect of the seed anime this captures — pacing, tone, themes, etc."
 
+With ``CAULDRON_NEIGHBORS_ENABLED`` and a loaded neighbour table
+(``neighbor_index.py``), candidates come straight from the seeds'
+precomputed neighbours — no query embedding, no vector search — and
+fall back to RAG when the table can't fill the pool.
+
 Architecture mirrors recommender.py:
 • Pure helper functions (build_cauldron_blend_profile, build_cauldron_query,
   build_cauldron_system_prompt, build_cauldron_user_prompt)
-• Orchestrator function (generate_cauldron_recommendations)
+• Orchestrator function (generate_cauldron_recommendations), and its
+  async twin for the API's background jobs (agenerate_cauldron_recommendations)
 • Reuses parse_recommendations() and call_llm_with_retry() from recommender.py
 """
 
 from __future__ import annotations
 
+import asyncio
 from collections import Counter
+from dataclasses import dataclass
+from time import perf_counter
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.logging import logger
+from app.core.metrics import increment
 from app.models.anime import AnimeCatalogEntry, AnimeList, AnimeEntry
 from app.models.recommendation import RecommendationFeedback
-from app.services.rag import retrieve_candidates
-from app.services.recommender import call_llm_with_retry
+from app.services.franchise_index import get_franchise_index
+from app.services.neighbor_index import get_neighbor_table
+from app.services.rag import (
+    DEFAULT_MIN_SCORE,
+    aretrieve_candidates,
+    diversify_candidates,
+    rerank_by_preferences,
+    retrieve_candidates,
+)
+from app.services.recommender import acall_llm_with_retry, call_llm_with_retry, candidate_pool_size
 from app.core.config import settings
 
 
@@ -335,6 +353,106 @@ def generate_cauldron_recommendations(
         ValueError: If any seed MAL ID is not found in the catalog,
             or if no candidates could be retrieved.
     """
+    plan = _prepare_cauldron(seed_mal_ids, num_recommendations, db, user_id)
+
+    # ── Step 4: Retrieve candidates ───────────────────────
+    candidates = plan.candidates
+    if candidates is None:
+        candidates = retrieve_candidates(
+            preference_profile=plan.blend_profile,
+            watched_mal_ids=plan.exclude_ids,
+            k=plan.pool_size,
+            custom_query=plan.query,
+        )
+    _check_candidates(candidates)
+
+    # ── Step 5: Build prompts and call LLM ───────────────
+    system_prompt, user_prompt = _cauldron_prompts(plan.seed_entries, candidates, num_recommendations)
+    recommendations = call_llm_with_retry(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        candidates=candidates,
+        num_recommendations=num_recommendations,
+        timeout_budget_seconds=settings.RECOMMEND_JOB_TIMEOUT_SECONDS,
+    )
+
+    logger.info(
+        "Cauldron: generated %d recommendations (is_fallback=%s)",
+        len(recommendations),
+        any(r.get("is_fallback") for r in recommendations),
+    )
+
+    return recommendations
+
+
+async def agenerate_cauldron_recommendations(
+    seed_mal_ids: list[int],
+    num_recommendations: int,
+    db: Session,
+    user_id: str | None = None,
+) -> list[dict]:
+    """Async ``generate_cauldron_recommendations`` — same arguments,
+    same result.
+
+    The database reads (seeds, exclusions, neighbour rows) run in one
+    short worker-thread hop; the query embedding and LLM call are
+    awaited (see ``recommender.agenerate_recommendations``).
+    """
+    started = perf_counter()
+    plan = await asyncio.to_thread(_prepare_cauldron, seed_mal_ids, num_recommendations, db, user_id)
+
+    candidates = plan.candidates
+    if candidates is None:
+        candidates = await aretrieve_candidates(
+            plan.blend_profile,
+            watched_mal_ids=plan.exclude_ids,
+            k=plan.pool_size,
+            custom_query=plan.query,
+        )
+    _check_candidates(candidates)
+
+    system_prompt, user_prompt = _cauldron_prompts(plan.seed_entries, candidates, num_recommendations)
+    recommendations = await acall_llm_with_retry(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        candidates=candidates,
+        num_recommendations=num_recommendations,
+        timeout_budget_seconds=settings.RECOMMEND_JOB_TIMEOUT_SECONDS - (perf_counter() - started),
+    )
+
+    logger.info(
+        "Cauldron: generated %d recommendations (is_fallback=%s)",
+        len(recommendations),
+        any(r.get("is_fallback") for r in recommendations),
+    )
+
+    return recommendations
+
+
+# ═════════════════════════════════════════════════════════
+# Private helpers
+# ═════════════════════════════════════════════════════════
+
+
+@dataclass
+class _CauldronPlan:
+    """Everything retrieval and prompting need, read from the database."""
+
+    seed_entries: list[AnimeCatalogEntry]
+    blend_profile: dict
+    query: str
+    exclude_ids: set[int]
+    pool_size: int
+    candidates: list[dict] | None  # from the neighbour table, if it could fill the pool
+
+
+def _prepare_cauldron(
+    seed_mal_ids: list[int],
+    num_recommendations: int,
+    db: Session,
+    user_id: str | None,
+) -> _CauldronPlan:
+    """Steps 1–3, plus the neighbour-table lookup — the database part."""
     # ── Step 1: Fetch seed entries ────────────────────────
     seed_entries: list[AnimeCatalogEntry] = []
     missing_ids: list[int] = []
@@ -383,14 +501,15 @@ def generate_cauldron_recommendations(
 
     logger.info("Cauldron: retrieval query = %r", query)
 
-    # ── Step 4: Retrieve candidates ───────────────────────
-    candidates = retrieve_candidates(
-        preference_profile=blend_profile,
-        watched_mal_ids=exclude_ids,
-        k=num_recommendations * 3,
-        custom_query=query,
+    # ── Neighbour table (None → vector search) ─────────────
+    pool_size = candidate_pool_size(num_recommendations)
+    candidates = _retrieve_from_neighbors(
+        seed_mal_ids, blend_profile, exclude_ids, pool_size, db,
     )
+    return _CauldronPlan(seed_entries, blend_profile, query, exclude_ids, pool_size, candidates)
 
+
+def _check_candidates(candidates: list[dict]) -> None:
     if not candidates:
         raise ValueError(
             "No candidate anime found. Ensure the anime catalog is ingested and embedded."
@@ -398,33 +517,85 @@ def generate_cauldron_recommendations(
 
     logger.info("Cauldron: retrieved %d candidates", len(candidates))
 
-    # ── Step 5: Build prompts and call LLM ───────────────
+
+def _cauldron_prompts(
+    seed_entries: list[AnimeCatalogEntry],
+    candidates: list[dict],
+    num_recommendations: int,
+) -> tuple[str, str]:
     seed_titles = [e.title for e in seed_entries]
     system_prompt = build_cauldron_system_prompt(seed_titles)
     user_prompt = build_cauldron_user_prompt(seed_entries, candidates, num_recommendations)
-
-    timeout_budget = settings.RECOMMEND_JOB_TIMEOUT_SECONDS
-
-    recommendations = call_llm_with_retry(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        candidates=candidates,
-        num_recommendations=num_recommendations,
-        timeout_budget_seconds=timeout_budget,
-    )
-
-    logger.info(
-        "Cauldron: generated %d recommendations (is_fallback=%s)",
-        len(recommendations),
-        any(r.get("is_fallback") for r in recommendations),
-    )
-
-    return recommendations
+    return system_prompt, user_prompt
 
 
-# ═════════════════════════════════════════════════════════
-# Private helpers
-# ═════════════════════════════════════════════════════════
+def _retrieve_from_neighbors(
+    seed_mal_ids: list[int],
+    blend_profile: dict,
+    exclude_ids: set[int],
+    k: int,
+    db: Session,
+) -> list[dict] | None:
+    """Candidates from the precomputed neighbour table.
+
+    Returns ``None`` — use vector search instead — when the feature is
+    off, the table isn't loaded or lacks a seed, or too few neighbours
+    survive exclusions and the score floor to fill ``k``.
+    Candidates have the same shape as ``retrieve_candidates`` output
+    and are re-ranked against the blend profile the same way —
+    including the franchise handling: a seed's sequels and recaps are
+    its nearest neighbours, so exclusions are expanded to whole
+    franchises and the pool keeps one entry per franchise.
+    """
+    from app.services.vector_store import catalog_entry_metadata
+
+    if not settings.CAULDRON_NEIGHBORS_ENABLED:
+        return None
+    table = get_neighbor_table()
+    if table is None or not all(mal_id in table for mal_id in seed_mal_ids):
+        increment("neighbor_lookup_fallback")
+        return None
+
+    franchises = get_franchise_index() if settings.FRANCHISE_DEDUP_ENABLED else None
+    if franchises is not None:
+        exclude_ids = franchises.expand_exclusions(exclude_ids)
+
+    neighbours = table.similar_to(seed_mal_ids, exclude_ids=exclude_ids)
+    rows = db.execute(
+        select(AnimeCatalogEntry).where(
+            AnimeCatalogEntry.mal_id.in_([mal_id for mal_id, _ in neighbours])
+        )
+    ).scalars().all()
+    by_id = {row.mal_id: row for row in rows}
+
+    candidates: list[dict] = []
+    for mal_id, similarity in neighbours:
+        row = by_id.get(mal_id)
+        if row is None or row.mal_score is None or row.mal_score < DEFAULT_MIN_SCORE:
+            continue
+        candidates.append({
+            "mal_id": mal_id,
+            "title": row.title,
+            "embedding_text": row.embedding_text or "",
+            "metadata": catalog_entry_metadata(row),
+            "similarity_score": round(similarity, 4),
+        })
+
+    candidates = rerank_by_preferences(candidates, blend_profile)
+    candidates.sort(key=lambda c: c.get("combined_score", 0), reverse=True)
+    if franchises is not None:
+        pooled = len(candidates)
+        candidates = franchises.collapse(candidates)
+        increment("franchise_candidates_collapsed", pooled - len(candidates))
+
+    if len(candidates) < k:
+        increment("neighbor_lookup_fallback")
+        return None
+
+    increment("neighbor_lookup_hit")
+    if settings.RETRIEVAL_MMR_ENABLED:
+        return diversify_candidates(candidates, settings.RETRIEVAL_MMR_LAMBDA, k=k)
+    return candidates[:k]
 
 
 def _get_user_watched_ids(user_id: str, db: Session) -> set[int]:
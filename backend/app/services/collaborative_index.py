@@ -0,0 +1,418 @@
+"""Item-based collaborative filtering over every imported list.
+
+Retrieval is content-only: everything comes from embedding similarity
+of synopses and tags.  But we also hold thousands of users' scored
+``AnimeEntry`` rows — "people who loved Monster also loved Mushishi"
+is a signal no embedding has.  This module turns them into an
+item–item similarity matrix that ``retrieve_candidates`` reads as one
+more candidate list, next to the vector queries.  Using it costs a few
+sparse row lookups: no embedding, no vector search.
+
+Similarity
+──────────
+Each user contributes a *basket*: the anime they scored at or above
+their own mean score (so harsh and generous raters count alike),
+capped at their ``COLLAB_MAX_ITEMS_PER_USER`` best.  Two anime are
+similar when the same users like both:
+
+    sim(a, b) = co(a, b) / sqrt(n(a) × n(b))      (binary cosine)
+
+where ``co`` counts baskets containing both and ``n`` baskets
+containing each.  Pairs with ``co < COLLAB_MIN_SUPPORT`` are dropped
+as noise, and each anime keeps its ``COLLAB_TOP_N`` most similar.
+
+Candidates for a profile are the anime most similar to its top-10,
+weighted by the user's scores:
+
+    score(j) = Σ_i score_i × sim(i, j) / Σ_i score_i
+
+Build
+─────
+``CooccurrenceCounter`` streams baskets in chunks of
+``COLLAB_BUILD_CHUNK_USERS`` lists: each chunk's pairs are encoded as
+``int64`` keys (``a << 32 | b``), counted with ``np.unique`` and merged
+into the running sorted counts, so memory tracks the number of
+distinct co-liked pairs — not users × items, and never a dense
+item × item matrix.  Only anime in the catalog are kept (candidates
+need metadata).
+
+Layout
+──────
+CSR, as in ``lexical_index``: row ``i``'s neighbours are
+``neighbors[indptr[i]:indptr[i + 1]]`` (row indices, best first) with
+``sims`` alongside, plus a ``mal_id → row`` dict — a row lookup is
+O(1) plus the slice.  SciPy isn't a dependency, and one slice per seed
+is all the sparse algebra this needs.
+
+The matrix is a snapshot at ``COLLAB_INDEX_PATH``, rebuilt
+periodically with ``python -m app.cli collab-index build`` (cron) and
+loaded at startup when ``COLLAB_ENABLED``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.numpy_index import MetadataFilterMixin, _top_k_indices
+from app.services.retrieval_cache import bump_index_version
+
+_LOW_BITS = np.int64(0xFFFFFFFF)
+
+
+class CooccurrenceCounter:
+    """Streaming co-like counts over user baskets."""
+
+    def __init__(self) -> None:
+        self._pair_keys = np.empty(0, dtype=np.int64)
+        self._pair_counts = np.empty(0, dtype=np.int64)
+        self._item_ids = np.empty(0, dtype=np.int64)
+        self._item_counts = np.empty(0, dtype=np.int64)
+        self.baskets = 0
+
+    @property
+    def pairs(self) -> int:
+        return int(self._pair_keys.shape[0])
+
+    def add(self, baskets: Iterable[Iterable[int]]) -> None:
+        """Count one chunk of baskets (one iterable of mal_ids per user)."""
+        keys: list[np.ndarray] = []
+        items: list[np.ndarray] = []
+        for basket in baskets:
+            ids = np.unique(np.fromiter(basket, dtype=np.int64))
+            if ids.shape[0] == 0:
+                continue
+            self.baskets += 1
+            items.append(ids)
+            if ids.shape[0] > 1:
+                a, b = np.triu_indices(ids.shape[0], k=1)
+                keys.append((ids[a] << 32) | ids[b])
+        if items:
+            self._item_ids, self._item_counts = _merge_counts(
+                self._item_ids, self._item_counts, np.concatenate(items),
+            )
+        if keys:
+            self._pair_keys, self._pair_counts = _merge_counts(
+                self._pair_keys, self._pair_counts, np.concatenate(keys),
+            )
+
+    def similarities(
+        self,
+        top_n: int,
+        min_support: int = 1,
+        keep_ids: Iterable[int] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Top-``top_n`` binary-cosine neighbours per anime, as CSR.
+
+        Args:
+            top_n: Neighbours kept per anime.
+            min_support: Minimum co-like count for a pair to count.
+            keep_ids: If given, only these anime (rows and neighbours).
+
+        Returns:
+            ``(item_ids, indptr, neighbors, sims)`` — ``neighbors`` are
+            row indices into ``item_ids``, best first within each row.
+        """
+        keep = self._pair_counts >= min_support
+        a = self._pair_keys[keep] >> 32
+        b = self._pair_keys[keep] & _LOW_BITS
+        co = self._pair_counts[keep].astype(np.float64)
+        if keep_ids is not None:
+            allowed = np.asarray(sorted(set(keep_ids)), dtype=np.int64)
+            both = np.isin(a, allowed) & np.isin(b, allowed)
+            a, b, co = a[both], b[both], co[both]
+
+        n_a = self._item_counts[np.searchsorted(self._item_ids, a)]
+        n_b = self._item_counts[np.searchsorted(self._item_ids, b)]
+        sim = (co / np.sqrt(n_a * n_b)).astype(np.float32)
+
+        # Symmetric: each pair is a neighbour in both rows
+        rows = np.concatenate([a, b])
+        cols = np.concatenate([b, a])
+        sims = np.concatenate([sim, sim])
+
+        order = np.lexsort((cols, -sims, rows))
+        rows, cols, sims = rows[order], cols[order], sims[order]
+        item_ids, starts, counts = np.unique(rows, return_index=True, return_counts=True)
+        rank = np.arange(rows.shape[0]) - np.repeat(starts, counts)
+        top = rank < top_n
+        rows, cols, sims = rows[top], cols[top], sims[top]
+
+        per_row = np.minimum(counts, top_n)
+        indptr = np.concatenate([[0], np.cumsum(per_row)]).astype(np.int64)
+        neighbors = np.searchsorted(item_ids, cols).astype(np.int32)
+        return item_ids.astype(np.int32), indptr, neighbors, sims
+
+
+def _merge_counts(
+    keys: np.ndarray,
+    counts: np.ndarray,
+    new_keys: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Add occurrences of ``new_keys`` to sorted ``(keys, counts)``."""
+    new_keys, new_counts = np.unique(new_keys, return_counts=True)
+    merged, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    totals = np.bincount(
+        inverse, weights=np.concatenate([counts, new_counts]), minlength=merged.shape[0],
+    )
+    return merged, totals.astype(np.int64)
+
+
+def user_basket(scored: list[tuple[int, int]], max_items: int) -> list[int]:
+    """The anime a user liked: scored at or above their mean, best first."""
+    scored = [(mal_id, score) for mal_id, score in scored if score > 0]
+    if not scored:
+        return []
+    mean = sum(score for _, score in scored) / len(scored)
+    liked = sorted(
+        ((mal_id, score) for mal_id, score in scored if score >= mean),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return [mal_id for mal_id, _ in liked[:max_items]]
+
+
+class ItemSimilarityIndex(MetadataFilterMixin):
+    """Sparse item–item similarities with catalog metadata per row."""
+
+    def __init__(
+        self,
+        item_ids: np.ndarray,
+        indptr: np.ndarray,
+        neighbors: np.ndarray,
+        sims: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        if not (len(item_ids) == len(documents) == len(metadatas) == len(indptr) - 1):
+            raise ValueError("item_ids, indptr, documents and metadatas must line up")
+        self._item_ids = np.asarray(item_ids, dtype=np.int32)
+        self._indptr = np.asarray(indptr, dtype=np.int64)
+        self._neighbors = np.asarray(neighbors, dtype=np.int32)
+        self._sims = np.asarray(sims, dtype=np.float32)
+        self._documents = list(documents)
+        self._metadatas = list(metadatas)
+        self._columns: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._row_of = {int(mal_id): row for row, mal_id in enumerate(self._item_ids)}
+
+    def count(self) -> int:
+        return int(self._item_ids.shape[0])
+
+    def nnz(self) -> int:
+        return int(self._neighbors.shape[0])
+
+    def metadata_for(self, mal_id: int) -> dict | None:
+        row = self._row_of.get(mal_id)
+        return None if row is None else self._metadatas[row]
+
+    def neighbors_of(self, mal_id: int, k: int | None = None) -> list[tuple[int, float]]:
+        """``(mal_id, similarity)`` of one anime's row, best first."""
+        row = self._row_of.get(mal_id)
+        if row is None:
+            return []
+        span = slice(self._indptr[row], self._indptr[row + 1])
+        idx, sims = self._neighbors[span][:k], self._sims[span][:k]
+        return [(int(m), float(s)) for m, s in zip(self._item_ids[idx], sims)]
+
+    def recommend(
+        self,
+        seeds: list[tuple[int, float]],
+        k: int = 20,
+        filter_dict: dict[str, Any] | None = None,
+        exclude_ids: Iterable[int] | None = None,
+    ) -> list[dict]:
+        """Top-``k`` anime similar to weighted ``(mal_id, weight)`` seeds.
+
+        Hits are shaped like ``search_anime`` results, plus the raw
+        ``collab_score``.  ``similarity_score`` is that score relative
+        to the best hit, times ``COLLAB_WEIGHT``, so with ``max``
+        fusion the CF list doesn't drown the vector queries.  Seeds are
+        never returned.
+        """
+        n = self.count()
+        if k <= 0 or n == 0:
+            return []
+
+        scores = np.zeros(n, dtype=np.float32)
+        total_weight = 0.0
+        for mal_id, weight in seeds:
+            row = self._row_of.get(mal_id)
+            if row is None or weight <= 0:
+                continue
+            span = slice(self._indptr[row], self._indptr[row + 1])
+            scores[self._neighbors[span]] += weight * self._sims[span]
+            total_weight += weight
+        if total_weight == 0.0:
+            return []
+        scores /= total_weight
+
+        excluded = {int(mal_id) for mal_id, _ in seeds} | {int(i) for i in exclude_ids or ()}
+        mask = self._filter_mask({**(filter_dict or {}), "mal_id_nin": sorted(excluded)})
+        scores[~mask] = 0.0
+
+        matched = int(np.count_nonzero(scores))
+        if matched == 0:
+            return []
+        top = _top_k_indices(scores, min(k, matched))
+        best = float(scores[top[0]])
+
+        hits = []
+        for i in top:
+            metadata = self._metadatas[i]
+            hits.append({
+                "mal_id": metadata.get("mal_id", 0),
+                "title": metadata.get("title", "Unknown"),
+                "embedding_text": self._documents[i],
+                "metadata": metadata,
+                "similarity_score": round(float(scores[i]) / best * settings.COLLAB_WEIGHT, 4),
+                "collab_score": round(float(scores[i]), 4),
+            })
+        return hits
+
+    # ── Persistence ──────────────────────────────────────
+
+    def save(self, path: str | Path) -> None:
+        """Write a snapshot (atomically — readers never see half a file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                item_ids=self._item_ids,
+                indptr=self._indptr,
+                neighbors=self._neighbors,
+                sims=self._sims,
+                documents=np.array(json.dumps(self._documents)),
+                metadatas=np.array(json.dumps(self._metadatas)),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> ItemSimilarityIndex:
+        """Load a snapshot written by ``save``."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(
+                data["item_ids"],
+                data["indptr"],
+                data["neighbors"],
+                data["sims"],
+                json.loads(str(data["documents"])),
+                json.loads(str(data["metadatas"])),
+            )
+
+
+# ═════════════════════════════════════════════════════════
+# Process-wide index
+# ═════════════════════════════════════════════════════════
+
+
+_index: ItemSimilarityIndex | None = None
+_index_lock = Lock()
+
+
+def get_collab_index() -> ItemSimilarityIndex | None:
+    """The loaded index, or ``None`` until ``load_collab_index`` ran."""
+    return _index
+
+
+def set_collab_index(index: ItemSimilarityIndex | None) -> None:
+    global _index
+    with _index_lock:
+        _index = index
+    bump_index_version()
+
+
+def reset_collab_index() -> None:
+    """Drop the loaded index (useful for testing)."""
+    set_collab_index(None)
+
+
+def load_collab_index() -> ItemSimilarityIndex | None:
+    """Load the snapshot at ``COLLAB_INDEX_PATH``.
+
+    Never builds — that's the periodic ``collab-index build`` job.
+    Failures are logged and leave retrieval content-only.
+    """
+    path = Path(settings.COLLAB_INDEX_PATH)
+    try:
+        index = ItemSimilarityIndex.load(path)
+    except FileNotFoundError:
+        logger.warning("Collaborative index not found at %s — run `collab-index build`", path)
+        return None
+    except Exception as exc:
+        logger.warning("Collaborative index unavailable: %s", exc)
+        return None
+
+    logger.info("Loaded collaborative index (%d anime, %d pairs) from %s", index.count(), index.nnz(), path)
+    set_collab_index(index)
+    return index
+
+
+def build_collab_index() -> ItemSimilarityIndex:
+    """Stream every imported list into a fresh index.
+
+    Lists are read ``COLLAB_BUILD_CHUNK_USERS`` at a time (keyset
+    pagination on ``AnimeList.id``), so neither the entries nor their
+    pairs are ever all in memory at once.
+    """
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry, AnimeEntry, AnimeList
+    from app.services.vector_store import catalog_entry_metadata
+
+    counter = CooccurrenceCounter()
+    last_list_id = ""
+    while True:
+        db = SessionLocal()
+        try:
+            list_ids = db.execute(
+                select(AnimeList.id)
+                .where(AnimeList.id > last_list_id)
+                .order_by(AnimeList.id)
+                .limit(settings.COLLAB_BUILD_CHUNK_USERS)
+            ).scalars().all()
+            if not list_ids:
+                break
+            last_list_id = list_ids[-1]
+            rows = db.execute(
+                select(AnimeEntry.anime_list_id, AnimeEntry.mal_anime_id, AnimeEntry.user_score)
+                .where(AnimeEntry.anime_list_id.in_(list_ids), AnimeEntry.user_score > 0)
+            ).all()
+        finally:
+            db.close()
+
+        scored: dict[str, list[tuple[int, int]]] = {}
+        for list_id, mal_id, score in rows:
+            scored.setdefault(list_id, []).append((mal_id, score))
+        counter.add(
+            user_basket(entries, settings.COLLAB_MAX_ITEMS_PER_USER)
+            for entries in scored.values()
+        )
+        logger.info("Collaborative index: %d baskets, %d pairs so far", counter.baskets, counter.pairs)
+
+    db = SessionLocal()
+    try:
+        catalog = {
+            row.mal_id: row
+            for row in db.execute(
+                select(AnimeCatalogEntry).where(AnimeCatalogEntry.embedding_text.is_not(None))
+            ).scalars()
+        }
+        item_ids, indptr, neighbors, sims = counter.similarities(
+            top_n=settings.COLLAB_TOP_N,
+            min_support=settings.COLLAB_MIN_SUPPORT,
+            keep_ids=catalog,
+        )
+        documents = [catalog[int(mal_id)].embedding_text for mal_id in item_ids]
+        metadatas = [catalog_entry_metadata(catalog[int(mal_id)]) for mal_id in item_ids]
+    finally:
+        db.close()
+    return ItemSimilarityIndex(item_ids, indptr, neighbors, sims, documents, metadatas)
@@ -0,0 +1,314 @@
+"""Query-embedding cache — stops paying OpenAI for the same query twice.
+
+Profile-generated search queries repeat constantly: every user whose
+top genres are Action/Sci-Fi/Drama produces the exact same genre query,
+and the ``"highly rated popular anime"`` fallback is a constant.  Each
+of those used to cost an embedding round-trip on every generation.
+
+Two tiers
+─────────
+1. **In-memory LRU** — an ``OrderedDict`` capped at
+   ``EMBEDDING_CACHE_MEMORY_SIZE`` entries.  Hits are free.
+2. **SQLite file** — ``EMBEDDING_CACHE_PATH``, survives restarts and
+   deploys.  Capped at ``EMBEDDING_CACHE_MAX_ENTRIES``; the least
+   recently used rows are evicted first.  We use a standalone SQLite
+   file (not the app database) so it works the same with Neon.
+
+Keeping the disk tier cheap
+───────────────────────────
+Both tiers share one lock, so the disk work done under it stays
+small.  Inserts keep a running row count instead of ``COUNT(*)`` over
+up to 50k rows, recounting only when the cap looks exceeded or every
+``_RECOUNT_EVERY`` inserts (other workers may share the file).  A disk
+hit's ``last_used`` bump is queued rather than committed on the spot
+— the key is promoted to memory, so it won't be read from disk again
+soon — and the queue is flushed in one statement with the next write
+or once ``_TOUCH_BATCH`` hits have piled up.
+
+Keys are ``sha256(model + normalised text)``, so switching embedding
+models never serves a stale vector.
+
+Only queries are cached — ``embed_query`` and its batched siblings
+``embed_queries`` / ``aembed_queries``.  ``embed_documents`` (catalog ingestion)
+passes straight through — caching 27k one-off documents would just
+evict the queries we actually want to keep.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from app.core.logging import logger
+from app.core.metrics import increment
+
+# Queued last_used bumps flushed together (see "Keeping the disk tier cheap")
+_TOUCH_BATCH = 64
+# Inserts between exact row counts of the disk tier
+_RECOUNT_EVERY = 1000
+
+
+class CachedEmbeddings:
+    """Wrap a LangChain embeddings object with a two-tier query cache.
+
+    Anything other than the query methods is delegated to the wrapped
+    object, so this can be handed to Chroma/PGVector unchanged.
+    """
+
+    def __init__(
+        self,
+        base: Any,
+        model: str,
+        path: str | Path | None,
+        memory_size: int = 1024,
+        max_entries: int = 50_000,
+    ) -> None:
+        self.base = base
+        self.model = model
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+
+        self._lock = Lock()
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        # Disk-tier bookkeeping, guarded by ``_lock``
+        self._disk_rows = 0  # running row count
+        self._inserts_since_count = 0
+        self._pending_touches: dict[str, float] = {}  # key → last_used
+        if path is not None:
+            self._conn = _open_disk_cache(Path(path))
+            self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined on the wrapper
+        return getattr(self.base, name)
+
+    # ── LangChain Embeddings interface ───────────────────
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+
+        vector = self._get_memory(key)
+        if vector is not None:
+            increment("embedding_cache_hit_memory")
+            return vector
+
+        vector = self._get_disk(key)
+        if vector is not None:
+            increment("embedding_cache_hit_disk")
+            self._put_memory(key, vector)
+            return vector
+
+        increment("embedding_cache_miss")
+        vector = list(self.base.embed_query(text))
+        self._put_memory(key, vector)
+        self._put_disk(key, vector)
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embed several queries, sending every cache miss in ONE request.
+
+        Used by ``search_anime_many``: a generation job's 1–3 profile
+        queries cost at most a single ``embed_documents`` round-trip.
+        """
+        keys, found, missing = self._lookup(texts)
+        if missing:
+            self._store(missing, self.base.embed_documents(list(missing.values())), found)
+        return [found[key] for key in keys]
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        """``embed_queries`` with the miss request awaited, not blocking a
+        thread (``aembed_documents``)."""
+        keys, found, missing = self._lookup(texts)
+        if missing:
+            self._store(missing, await self.base.aembed_documents(list(missing.values())), found)
+        return [found[key] for key in keys]
+
+    def _lookup(
+        self, texts: list[str],
+    ) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        """Keys per text, cached vectors by key, and misses (key → text)."""
+        keys = [self._key(text) for text in texts]
+        found: dict[str, list[float]] = {}
+        missing: dict[str, str] = {}  # key → first text with that key
+
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self._get_memory(key)
+            if vector is not None:
+                increment("embedding_cache_hit_memory")
+                found[key] = vector
+                continue
+            vector = self._get_disk(key)
+            if vector is not None:
+                increment("embedding_cache_hit_disk")
+                self._put_memory(key, vector)
+                found[key] = vector
+                continue
+            missing[key] = text
+
+        if missing:
+            increment("embedding_cache_miss", len(missing))
+        return keys, found, missing
+
+    def _store(
+        self,
+        missing: dict[str, str],
+        vectors: list[list[float]],
+        found: dict[str, list[float]],
+    ) -> None:
+        for key, vector in zip(missing, vectors):
+            vector = list(vector)
+            found[key] = vector
+            self._put_memory(key, vector)
+            self._put_disk(key, vector)
+
+    # ── Maintenance ──────────────────────────────────────
+
+    def clear(self) -> None:
+        """Drop every cached vector (both tiers)."""
+        with self._lock:
+            self._memory.clear()
+            self._pending_touches.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_embeddings")
+                self._conn.commit()
+                self._disk_rows = 0
+
+    def disk_size(self) -> int:
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+
+    # ── Tiers ────────────────────────────────────────────
+
+    def _key(self, text: str) -> str:
+        payload = f"{self.model}\0{normalize_query_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_memory(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _put_memory(self, key: str, vector: list[float]) -> None:
+        if self.memory_size <= 0:
+            return
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> list[float] | None:
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._pending_touches[key] = time.time()
+                if len(self._pending_touches) >= _TOUCH_BATCH:
+                    self._flush_touches()
+                    self._conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Embedding cache read failed: %s", exc)
+            return None
+        return array("f", row[0]).tolist()
+
+    def _put_disk(self, key: str, vector: list[float]) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._flush_touches()
+                blob, now = array("f", vector).tobytes(), time.time()
+                # Insert-or-update rather than REPLACE, to learn whether a row was added
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO query_embeddings (key, model, vector, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, self.model, blob, now),
+                ).rowcount
+                if not inserted:
+                    self._conn.execute(
+                        "UPDATE query_embeddings SET vector = ?, last_used = ? WHERE key = ?",
+                        (blob, now, key),
+                    )
+                self._disk_rows += inserted
+                self._inserts_since_count += inserted
+                if self._disk_rows > self.max_entries or self._inserts_since_count >= _RECOUNT_EVERY:
+                    self._evict_over_cap()
+                self._conn.commit()
+        except sqlite3.Error as exc:
+            # The cache is an optimisation — never fail a search over it
+            logger.warning("Embedding cache write failed: %s", exc)
+
+
+    def _flush_touches(self) -> None:
+        """Write queued ``last_used`` bumps (lock held; caller commits)."""
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            "UPDATE query_embeddings SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in self._pending_touches.items()],
+        )
+        self._pending_touches.clear()
+
+    def _evict_over_cap(self) -> None:
+        """Recount, then drop the least recently used rows beyond the cap
+        (lock held; caller commits)."""
+        count = self._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM query_embeddings WHERE key IN ("
+                "SELECT key FROM query_embeddings ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            count = self.max_entries
+        self._disk_rows = count
+        self._inserts_since_count = 0
+
+
+def normalize_query_text(text: str) -> str:
+    """Normalise a query for cache keying.
+
+    Unicode NFC plus whitespace collapsing — the same query built with
+    a trailing space or a different newline style shares one entry.
+    Case is preserved because it can change the embedding.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _open_disk_cache(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS query_embeddings ("
+        "key TEXT PRIMARY KEY, "
+        "model TEXT NOT NULL, "
+        "vector BLOB NOT NULL, "
+        "last_used REAL NOT NULL)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_query_embeddings_last_used "
+        "ON query_embeddings (last_used)"
+    )
+    conn.commit()
+    return conn
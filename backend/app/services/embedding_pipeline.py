@@ -0,0 +1,475 @@
+"""Concurrent, rate-limit-aware embedding pipeline for catalog ingestion.
+
+``add_anime_to_store`` used to embed one batch at a time, then sleep a
+fixed 6 seconds "to stay under TPM", and sleep again inside a retry
+loop on 429s.  The full ~27k catalog took far longer than the OpenAI
+limits actually require.
+
+How it works now
+────────────────
+1. **Several requests in flight** — up to ``EMBEDDING_MAX_IN_FLIGHT``
+   embedding calls run on a thread pool.
+2. **Token bucket** — every request first takes 1 request + its
+   estimated tokens from ``TokenBucketLimiter``, which refills at
+   ``EMBEDDING_RPM_LIMIT`` / ``EMBEDDING_TPM_LIMIT`` per minute.  No
+   fixed sleeps: we wait exactly as long as the budget requires.
+3. **Server feedback** — OpenAI's ``x-ratelimit-remaining-*`` /
+   ``x-ratelimit-reset-*`` response headers pull the local buckets
+   down to what the server says is left.  A 429 pauses *all* workers
+   for the server-suggested delay instead of each retrying blindly.
+4. **Overlapped writes** — vector-store writes run on a single writer
+   thread while the next embeddings are in flight.  One writer keeps
+   Chroma's SQLite and the NumPy index files single-threaded.
+5. **Token-sized batches** — synopses range from empty to thousands of
+   characters, so batches are packed by token count against
+   ``EMBEDDING_BATCH_TOKEN_BUDGET`` instead of a fixed document count
+   (``build_token_batches``).  Inputs over the model's per-input limit
+   are truncated deterministically first (``TokenCounter.fit``).
+
+Everything here is backend-agnostic: callers pass an ``embed_fn`` and
+a ``write_fn``, which keeps the module testable with fakes.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Mapping
+
+from app.core.logging import logger
+from app.core.metrics import increment
+
+
+@dataclass
+class EmbedResult:
+    """What one embedding request returned."""
+
+    vectors: list[list[float]]
+    tokens: int | None = None  # usage reported by the provider, if any
+    headers: Mapping[str, str] | None = None  # response headers, if any
+
+
+@dataclass
+class PipelineStats:
+    """Running totals, passed to ``on_progress`` after every write."""
+
+    documents: int = 0
+    tokens: int = 0
+    batches: int = 0
+    rate_limited: int = 0
+    batch_sizes: list[int] = field(default_factory=list)
+    batch_tokens: list[int] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started_at, 1e-9)
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.documents / self.elapsed
+
+    @property
+    def tokens_per_sec(self) -> float:
+        return self.tokens / self.elapsed
+
+
+# ═════════════════════════════════════════════════════════
+# Rate limiting
+# ═════════════════════════════════════════════════════════
+
+
+class TokenBucketLimiter:
+    """Two token buckets (requests and tokens) refilled per minute.
+
+    Thread-safe.  ``acquire`` blocks until both buckets can cover the
+    request; ``pause`` blocks every caller until a deadline (used on
+    429s); ``update_from_headers`` applies the server's view.
+    """
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rpm = max(rpm, 1)
+        self.tpm = max(tpm, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+
+        # Start full: the provider's window allows an initial burst
+        self._requests = float(self.rpm)
+        self._tokens = float(self.tpm)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """Block until one request carrying ``tokens`` may be sent."""
+        # A request bigger than the whole bucket could never proceed;
+        # let it through once the bucket is full instead.
+        tokens = min(max(tokens, 0), self.tpm)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                else:
+                    need_requests = max(0.0, 1 - self._requests) / (self.rpm / 60)
+                    need_tokens = max(0.0, tokens - self._tokens) / (self.tpm / 60)
+                    delay = max(need_requests, need_tokens)
+            self._sleep(max(delay, 0.001))
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str] | None) -> None:
+        """Lower the local buckets to what the server reports as left.
+
+        Understands OpenAI's ``x-ratelimit-remaining-requests``,
+        ``x-ratelimit-remaining-tokens`` and the matching ``reset``
+        headers.  When a bucket is exhausted server-side, we pause
+        until its reset time.
+        """
+        if not headers:
+            return
+        headers = {k.lower(): v for k, v in headers.items()}
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            for kind, attr in (("requests", "_requests"), ("tokens", "_tokens")):
+                remaining = _to_float(headers.get(f"x-ratelimit-remaining-{kind}"))
+                if remaining is None:
+                    continue
+                setattr(self, attr, min(getattr(self, attr), remaining))
+                if remaining <= 0:
+                    reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self._paused_until = max(self._paused_until, now + reset)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+            self._updated_at = now
+
+
+def parse_reset_duration(value: str | None) -> float | None:
+    """Parse OpenAI reset durations like ``"6ms"``, ``"1.5s"``, ``"1m30s"``."""
+    if not value:
+        return None
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts:
+        return _to_float(value)
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+def rate_limit_wait(exc: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying ``exc``, or None if not a 429.
+
+    Prefers the server's ``retry-after-ms`` / ``retry-after`` headers,
+    then a "try again in Xs" hint in the message, then exponential
+    backoff starting at 5s.
+    """
+    message = str(exc)
+    status = getattr(exc, "status_code", None)
+    if status != 429 and "rate_limit" not in message.lower() and "429" not in message:
+        return None
+
+    response = getattr(exc, "response", None)
+    headers = {k.lower(): v for k, v in (getattr(response, "headers", None) or {}).items()}
+    retry_ms = _to_float(headers.get("retry-after-ms"))
+    if retry_ms is not None:
+        return retry_ms / 1000
+    retry_s = _to_float(headers.get("retry-after"))
+    if retry_s is not None:
+        return retry_s
+
+    match = re.search(r"try again in (\d+(?:\.\d+)?)(ms|s)", message)
+    if match:
+        amount = float(match.group(1))
+        return (amount / 1000 if match.group(2) == "ms" else amount) + 0.5
+    return min(5 * 2 ** attempt, 60)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, conservative token estimate when no tokenizer is available.
+
+    ~3 UTF-8 bytes per token: overestimates English (~4 chars/token)
+    a little and stays safe for Japanese titles (3 bytes/char).
+    """
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+# ═════════════════════════════════════════════════════════
+# Token-aware batching
+# ═════════════════════════════════════════════════════════
+
+
+class TokenCounter:
+    """Count and truncate text in the embedding model's tokens.
+
+    Uses ``tiktoken`` (installed with ``langchain-openai``) when its
+    encoding can be loaded, otherwise falls back to ``estimate_tokens``
+    so batching still works offline.
+    """
+
+    def __init__(self, model: str) -> None:
+        self._encoding = None
+        try:
+            import tiktoken
+
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as exc:  # ImportError, or the BPE file can't be fetched
+            logger.info("tiktoken unavailable (%s); estimating embedding tokens", exc)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is None:
+            return estimate_tokens(text)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def fit(self, text: str, max_tokens: int) -> tuple[str, int, bool]:
+        """Truncate ``text`` to ``max_tokens``.
+
+        Deterministic: always keeps the longest prefix that fits (a
+        token boundary with tiktoken, a byte boundary otherwise).
+
+        Returns:
+            ``(text, token_count, was_truncated)``.
+        """
+        if self._encoding is None:
+            tokens = estimate_tokens(text)
+            if tokens <= max_tokens:
+                return text, tokens, False
+            cut = text.encode("utf-8")[: max(max_tokens - 1, 0) * 3]
+            text = cut.decode("utf-8", errors="ignore")
+            return text, estimate_tokens(text), True
+
+        ids = self._encoding.encode(text, disallowed_special=())
+        if len(ids) <= max_tokens:
+            return text, len(ids), False
+        ids = ids[:max_tokens]
+        return self._encoding.decode(ids), len(ids), True
+
+
+def build_token_batches(
+    items: list[Any],
+    tokens_of: Callable[[Any], int],
+    token_budget: int,
+    max_inputs: int,
+) -> list[list[Any]]:
+    """Pack items into request-sized batches by token count.
+
+    Greedy and order-preserving: a batch closes when the next item
+    would push it over ``token_budget`` tokens or ``max_inputs``
+    inputs.  Every batch except possibly the last is therefore within
+    one document of the budget.  An item larger than the budget on its
+    own gets a batch to itself (callers truncate to the per-input limit
+    first, which is far below any sane budget).
+    """
+    batches: list[list[Any]] = []
+    current: list[Any] = []
+    current_tokens = 0
+
+    for item in items:
+        tokens = tokens_of(item)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def summarize_batches(
+    batch_sizes: list[int],
+    batch_tokens: list[int],
+    token_budget: int,
+) -> dict:
+    """Distribution summary for the batch report shown by ``cli stats``."""
+
+    def spread(values: list[int]) -> dict:
+        if not values:
+            return {"min": 0, "median": 0, "max": 0, "mean": 0.0}
+        ordered = sorted(values)
+        return {
+            "min": ordered[0],
+            "median": ordered[len(ordered) // 2],
+            "max": ordered[-1],
+            "mean": round(sum(ordered) / len(ordered), 1),
+        }
+
+    return {
+        "batches": len(batch_sizes),
+        "documents_per_batch": spread(batch_sizes),
+        "tokens_per_batch": spread(batch_tokens),
+        "token_budget": token_budget,
+        "mean_budget_fill": (
+            round(sum(batch_tokens) / (len(batch_tokens) * token_budget), 3)
+            if batch_tokens and token_budget else 0.0
+        ),
+    }
+
+
+# ═════════════════════════════════════════════════════════
+# Pipeline
+# ═════════════════════════════════════════════════════════
+
+
+def run_embedding_pipeline(
+    batches: Iterable[list[Any]],
+    text_of: Callable[[Any], str],
+    embed_fn: Callable[[list[str]], EmbedResult],
+    write_fn: Callable[[list[Any], list[list[float]]], None],
+    limiter: TokenBucketLimiter,
+    max_in_flight: int = 4,
+    max_retries: int = 8,
+    on_progress: Callable[[PipelineStats], None] | None = None,
+    tokens_of: Callable[[Any], int] | None = None,
+) -> PipelineStats:
+    """Embed ``batches`` concurrently and hand each result to ``write_fn``.
+
+    ``tokens_of`` gives each item's token count for the limiter (e.g.
+    from ``TokenCounter``); without it tokens are estimated from text.
+
+    ``write_fn`` always runs on one dedicated writer thread, in
+    completion order.  The first error from either side stops the
+    pipeline and is re-raised.
+    """
+    stats = PipelineStats()
+    stats_lock = Lock()
+    max_in_flight = max(max_in_flight, 1)
+
+    def embed(texts: list[str], estimated: int) -> EmbedResult:
+        for attempt in range(max_retries):
+            limiter.acquire(estimated)
+            try:
+                result = embed_fn(texts)
+            except Exception as exc:
+                delay = rate_limit_wait(exc, attempt)
+                if delay is None or attempt == max_retries - 1:
+                    raise
+                with stats_lock:
+                    stats.rate_limited += 1
+                increment("embedding_rate_limited")
+                logger.warning(
+                    "Rate limited, pausing all embedding workers %.1fs (attempt %d/%d)",
+                    delay, attempt + 1, max_retries,
+                )
+                limiter.pause(delay)
+                continue
+            limiter.update_from_headers(result.headers)
+            if result.tokens is None:
+                result.tokens = estimated
+            return result
+        raise RuntimeError("max_retries must be at least 1")
+
+    def write(batch: list[Any], result: EmbedResult) -> None:
+        write_fn(batch, result.vectors)
+        with stats_lock:
+            stats.documents += len(batch)
+            stats.tokens += result.tokens or 0
+            stats.batches += 1
+            stats.batch_sizes.append(len(batch))
+            stats.batch_tokens.append(result.tokens or 0)
+        if on_progress is not None:
+            on_progress(stats)
+
+    embed_pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="embed")
+    write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-write")
+    in_flight: dict[Future, list[Any]] = {}
+    writes: list[Future] = []
+    pending = iter(batches)
+
+    try:
+        def fill() -> None:
+            while len(in_flight) < max_in_flight:
+                batch = next(pending, None)
+                if batch is None:
+                    return
+                if batch:
+                    texts = [text_of(x) for x in batch]
+                    if tokens_of is not None:
+                        estimated = sum(tokens_of(x) for x in batch)
+                    else:
+                        estimated = sum(estimate_tokens(t) for t in texts)
+                    in_flight[embed_pool.submit(embed, texts, estimated)] = batch
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                writes.append(write_pool.submit(write, batch, future.result()))
+
+            # Surface writer errors early and bound memory held by
+            # embedded-but-unwritten batches.
+            while writes and (writes[0].done() or len(writes) > max_in_flight):
+                writes.pop(0).result()
+            fill()
+
+        for future in writes:
+            future.result()
+    finally:
+        embed_pool.shutdown(wait=True, cancel_futures=True)
+        write_pool.shutdown(wait=True, cancel_futures=True)
+
+    return stats
+
+
+# ═════════════════════════════════════════════════════════
+# Batch report (read by ``cli stats``)
+# ═════════════════════════════════════════════════════════
+
+
+def save_batch_report(path: str | Path, report: dict) -> None:
+    """Write the last embedding run's batch report as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2))
+    tmp.replace(path)
+
+
+def load_batch_report(path: str | Path) -> dict | None:
+    """Read the last batch report, or None if no run has written one."""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
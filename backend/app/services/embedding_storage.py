@@ -0,0 +1,81 @@
+"""Catalog vector storage — keep every embedding next to its catalog row.
+
+Vectors used to live only inside the vector store (Chroma's SQLite
+file or ``langchain_pg_embedding``).  Switching backends, rebuilding
+after wiping a collection or bringing up a fresh node meant
+paying OpenAI to re-embed all ~27k catalog entries.
+
+Now each ``AnimeCatalogEntry`` also stores:
+
+• ``embedding_vector``    — the raw vector as a little-endian blob
+• ``embedding_dim``       — number of components (decodes the blob)
+• ``embedding_model``     — model that produced it
+• ``embedding_text_hash`` — hash of the text that was embedded
+
+``python -m app.cli reindex`` rebuilds any backend from these columns
+with zero API calls, and ``embed`` uses the hash + model to decide
+which entries actually need a new vector (``needs_embedding``).
+
+Blob format
+───────────
+float16 by default (``EMBEDDING_STORAGE_DTYPE``): 1536 dims × 2 bytes
+≈ 3 KB per anime, ~80 MB for the whole catalog.  The rounding error
+(~1e-3 relative) is far below the differences between neighbours.
+The dtype is recovered from ``len(blob) / dim``, so float32 and
+float16 rows can coexist after changing the setting.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+
+STORAGE_DTYPES: dict[str, np.dtype] = {
+    "float16": np.dtype("<f2"),
+    "float32": np.dtype("<f4"),
+}
+
+
+def pack_vector(vector: list[float] | np.ndarray, dtype: str = "float16") -> bytes:
+    """Encode a vector as a compact little-endian blob."""
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(
+            f"Unsupported embedding storage dtype {dtype!r}. "
+            f"Use one of: {', '.join(STORAGE_DTYPES)}."
+        )
+    return np.asarray(vector, dtype=STORAGE_DTYPES[dtype]).tobytes()
+
+
+def unpack_vector(blob: bytes, dim: int) -> np.ndarray:
+    """Decode a blob written by ``pack_vector`` into a float32 array."""
+    if dim <= 0 or len(blob) % dim:
+        raise ValueError(f"Blob of {len(blob)} bytes does not hold {dim} components")
+
+    itemsize = len(blob) // dim
+    for dtype in STORAGE_DTYPES.values():
+        if dtype.itemsize == itemsize:
+            return np.frombuffer(blob, dtype=dtype).astype(np.float32)
+    raise ValueError(f"No storage dtype is {itemsize} bytes wide")
+
+
+def embedding_text_hash(text: str) -> str:
+    """SHA-256 of the embedded text — detects stale stored vectors."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def needs_embedding(
+    text: str | None,
+    stored_hash: str | None,
+    stored_model: str | None,
+    model: str,
+) -> bool:
+    """True when the stored vector is missing or stale for ``text``.
+
+    Re-embedding is driven by content, not by "some field changed":
+    an entry is only re-embedded when the text it would embed, or the
+    embedding model, differs from what produced the stored vector.
+    """
+    if not text:
+        return False
+    return stored_model != model or stored_hash != embedding_text_hash(text)
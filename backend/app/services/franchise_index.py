@@ -0,0 +1,271 @@
+"""Franchise clusters from ``related_anime_ids`` — sequel-aware retrieval.
+
+A user who finished *Attack on Titan* gets "Attack on Titan Season 2",
+"Attack on Titan: Junior High" and two recaps as candidates: each is a
+distinct ``mal_id``, so watched-list exclusion doesn't catch them.
+They crowd out real discoveries, and we over-fetch to compensate.
+The catalog already knows these are one franchise
+(``AnimeCatalogEntry.related_anime_ids``); this module makes that a
+lookup.
+
+Clusters
+────────
+Union-find over the relation graph: every ``related_anime_ids`` link
+merges two anime into one franchise.  Jikan's relation list includes
+loose links ("Character", "Other") that can chain unrelated franchises
+into one giant component, and the stored ids no longer say which kind
+a link was — so unions that would grow a cluster past
+``FRANCHISE_MAX_CLUSTER_SIZE`` are skipped.  The cluster id is the
+smallest ``mal_id`` in the cluster.
+
+How retrieval uses it (``FRANCHISE_DEDUP_ENABLED``)
+────────────────────────────────────────────────────
+• **Started franchises are excluded** — ``expand_exclusions`` adds
+  every member of a watched anime's franchise to ``exclude_ids``, so
+  the vector search skips them itself and no slot is wasted.
+• **One entry per franchise** — ``collapse`` keeps a single candidate
+  per cluster, at the rank of the cluster's best one: the earliest
+  (by year) of its candidates, so an unstarted franchise is entered at
+  its start rather than with a sequel.
+
+Both are a dict / set lookup per id.  The table (``mal_ids`` →
+``cluster_ids``, two ``int32`` arrays) is built from the catalog at
+startup and saved to ``FRANCHISE_INDEX_PATH``; refresh it after
+ingesting with ``python -m app.cli franchises build``.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.retrieval_cache import bump_index_version
+
+
+class UnionFind:
+    """Disjoint sets over arbitrary ints, with a cap on set size."""
+
+    def __init__(self, max_size: int | None = None) -> None:
+        self.max_size = max_size
+        self._parent: dict[int, int] = {}
+        self._size: dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self._parent.setdefault(x, x)
+        if parent == x:
+            self._size.setdefault(x, 1)
+            return x
+        # Path halving
+        while self._parent[x] != x:
+            self._parent[x] = self._parent[self._parent[x]]
+            x = self._parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of ``a`` and ``b``; ``False`` if capped or already one."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        size = self._size[root_a] + self._size[root_b]
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] = size
+        return True
+
+    def clusters(self) -> dict[int, int]:
+        """``member → cluster id`` (the smallest member) for every element."""
+        smallest: dict[int, int] = {}
+        for x in self._parent:
+            root = self.find(x)
+            smallest[root] = min(smallest.get(root, x), x)
+        return {x: smallest[self.find(x)] for x in self._parent}
+
+
+def parse_related_ids(raw: str | None) -> list[int]:
+    """``"5, 17205"`` → ``[5, 17205]`` (bad tokens are skipped)."""
+    if not raw:
+        return []
+    return [int(token) for token in raw.split(",") if token.strip().isdigit()]
+
+
+def build_franchise_clusters(
+    relations: Iterable[tuple[int, list[int]]],
+    max_cluster_size: int | None = None,
+) -> dict[int, int]:
+    """Cluster ids from ``(mal_id, related_ids)`` rows.
+
+    Rows are processed in ``mal_id`` order so capped unions are
+    deterministic.  Only multi-anime clusters are returned; anything
+    missing is its own franchise.
+    """
+    uf = UnionFind(max_size=max_cluster_size)
+    for mal_id, related in sorted(relations, key=lambda row: row[0]):
+        for other in sorted(related):
+            uf.union(mal_id, other)
+    clusters = uf.clusters()
+    sizes: dict[int, int] = {}
+    for cluster in clusters.values():
+        sizes[cluster] = sizes.get(cluster, 0) + 1
+    return {m: c for m, c in clusters.items() if sizes[c] > 1}
+
+
+class FranchiseIndex:
+    """``mal_id → franchise`` lookups for retrieval."""
+
+    def __init__(self, mal_ids: Iterable[int], cluster_ids: Iterable[int]) -> None:
+        self.mal_ids = np.asarray(list(mal_ids), dtype=np.int32)
+        self.cluster_ids = np.asarray(list(cluster_ids), dtype=np.int32)
+        self._cluster_of = dict(zip(self.mal_ids.tolist(), self.cluster_ids.tolist()))
+        self._members: dict[int, list[int]] = {}
+        for mal_id, cluster in self._cluster_of.items():
+            self._members.setdefault(cluster, []).append(mal_id)
+
+    @classmethod
+    def from_clusters(cls, clusters: dict[int, int]) -> FranchiseIndex:
+        ordered = sorted(clusters)
+        return cls(ordered, [clusters[m] for m in ordered])
+
+    def count(self) -> int:
+        """Anime that belong to a multi-entry franchise."""
+        return int(self.mal_ids.shape[0])
+
+    def franchise_count(self) -> int:
+        return len(self._members)
+
+    def cluster_of(self, mal_id: int) -> int:
+        """Franchise id — the anime's own id if it stands alone."""
+        return self._cluster_of.get(mal_id, mal_id)
+
+    def members_of(self, mal_id: int) -> list[int]:
+        """Every anime in the same franchise (including ``mal_id``)."""
+        return self._members.get(self.cluster_of(mal_id), [mal_id])
+
+    def expand_exclusions(self, mal_ids: Iterable[int]) -> set[int]:
+        """``mal_ids`` plus every other entry of their franchises."""
+        expanded = set(mal_ids)
+        for cluster in {self._cluster_of[m] for m in expanded if m in self._cluster_of}:
+            expanded.update(self._members[cluster])
+        return expanded
+
+    def collapse(self, candidates: list[dict]) -> list[dict]:
+        """One candidate per franchise, in the order given.
+
+        Each franchise's slot is where its best-ranked candidate was;
+        it's filled by the franchise's earliest candidate by year
+        (ties and unknown years keep rank order).
+        """
+        groups: dict[int, list[dict]] = {}
+        for candidate in candidates:
+            cluster = self.cluster_of(candidate.get("mal_id", 0))
+            groups.setdefault(cluster, []).append(candidate)
+
+        collapsed = []
+        for group in groups.values():
+            if len(group) == 1:
+                collapsed.append(group[0])
+                continue
+            years = [c.get("metadata", {}).get("year") for c in group]
+            earliest = min(
+                range(len(group)),
+                key=lambda i: (years[i] is None, years[i] or 0, i),
+            )
+            collapsed.append(group[earliest])
+        return collapsed
+
+    # ── Persistence ──────────────────────────────────────
+
+    def save(self, path: str | Path) -> None:
+        """Write a snapshot (atomically — readers never see half a file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, mal_ids=self.mal_ids, cluster_ids=self.cluster_ids)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> FranchiseIndex:
+        """Load a snapshot written by ``save``."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(data["mal_ids"], data["cluster_ids"])
+
+
+# ═════════════════════════════════════════════════════════
+# Process-wide index
+# ═════════════════════════════════════════════════════════
+
+
+_index: FranchiseIndex | None = None
+_index_lock = Lock()
+
+
+def get_franchise_index() -> FranchiseIndex | None:
+    """The loaded index, or ``None`` until ``load_franchise_index`` ran."""
+    return _index
+
+
+def set_franchise_index(index: FranchiseIndex | None) -> None:
+    global _index
+    with _index_lock:
+        _index = index
+    bump_index_version()
+
+
+def reset_franchise_index() -> None:
+    """Drop the loaded index (useful for testing)."""
+    set_franchise_index(None)
+
+
+def load_franchise_index(rebuild: bool = False) -> FranchiseIndex | None:
+    """Load the snapshot, or build from the catalog and save one.
+
+    Runs in a background thread at startup; failures are logged and
+    leave franchise dedup off rather than taking the app down.
+    """
+    path = Path(settings.FRANCHISE_INDEX_PATH)
+    try:
+        if path.exists() and not rebuild:
+            index = FranchiseIndex.load(path)
+            logger.info("Loaded franchise index (%d franchises) from %s", index.franchise_count(), path)
+        else:
+            index = build_franchise_index()
+            index.save(path)
+            logger.info("Built franchise index (%d franchises) → %s", index.franchise_count(), path)
+    except Exception as exc:
+        logger.warning("Franchise index unavailable: %s", exc)
+        return None
+
+    set_franchise_index(index)
+    return index
+
+
+def build_franchise_index() -> FranchiseIndex:
+    """Cluster every catalog entry that lists related anime."""
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(AnimeCatalogEntry.mal_id, AnimeCatalogEntry.related_anime_ids).where(
+                AnimeCatalogEntry.related_anime_ids.is_not(None)
+            )
+        ).all()
+    finally:
+        db.close()
+    clusters = build_franchise_clusters(
+        ((mal_id, parse_related_ids(raw)) for mal_id, raw in rows),
+        max_cluster_size=settings.FRANCHISE_MAX_CLUSTER_SIZE,
+    )
+    return FranchiseIndex.from_clusters(clusters)
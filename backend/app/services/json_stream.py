@@ -0,0 +1,89 @@
+"""Incremental parser for a JSON array that arrives in chunks.
+
+The streaming endpoint feeds the LLM's output through this as tokens
+arrive.  Every element of the top-level array is handed back the
+moment its closing bracket is seen, so the first recommendation can
+be validated and sent while the model is still writing the rest.
+
+How it works
+────────────
+A small state machine over characters: it skips whatever comes
+before the first ``[`` (markdown fences, "Here are your picks:"),
+tracks string / escape state so brackets inside strings don't count,
+and buffers each object or array element from its opening bracket to
+the matching close, then ``json.loads`` that one element.  Anything
+after the array's closing ``]`` is ignored — the same leniency as
+``_clean_json_response`` on the buffered path.
+
+Scalars at the top level (``[1, "x"]``) are skipped: a recommendation
+is always an object.  An element that isn't valid JSON on its own is
+logged and skipped; the elements around it are unaffected.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from app.core.logging import logger
+
+
+class JSONArrayStream:
+    """Feed text chunks, get back each completed top-level element."""
+
+    def __init__(self) -> None:
+        self.started = False  # seen the opening ``[``
+        self.closed = False  # seen the matching ``]``
+        self._depth = 0  # nesting inside the current element
+        self._in_string = False
+        self._escape = False
+        self._buffer: list[str] = []
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume ``chunk``; return the elements it completed, in order."""
+        completed: list[Any] = []
+        for char in chunk:
+            if self.closed:
+                break
+            if not self.started:
+                self.started = char == "["
+                continue
+
+            if self._depth:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if not self._depth:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in "}]":
+                if not self._depth:
+                    # ``]`` between elements closes the array
+                    self.closed = char == "]"
+                    continue
+                self._depth -= 1
+                if not self._depth:
+                    element = self._parse("".join(self._buffer))
+                    if element is not None:
+                        completed.append(element)
+                    self._buffer = []
+        return completed
+
+    @staticmethod
+    def _parse(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as exc:
+            logger.warning("Skipping malformed streamed element: %s (%s)", exc, text[:200])
+            return None
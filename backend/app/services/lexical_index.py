@@ -0,0 +1,355 @@
+"""In-process BM25 index over the catalog's ``embedding_text``.
+
+Custom queries often name exact titles, studios or themes ("more like
+Steins;Gate", "Madhouse thrillers").  Vector search handles those
+poorly — "Steins;Gate" is two rare tokens, not a vibe — and every one
+costs a paid query embedding.  A lexical index nails them for free.
+
+How it's used
+─────────────
+With ``LEXICAL_SEARCH_ENABLED``, ``retrieve_candidates`` runs every
+query through both indexes:
+
+• **Confident lexical match** — the query's rare terms pin down a
+  handful of anime (see ``LexicalMatch.confident``).  The lexical hits
+  are used as-is and the query is never embedded.
+• **Otherwise** — vector and lexical hits are blended per query:
+  ``(1 − LEXICAL_WEIGHT) × similarity + LEXICAL_WEIGHT × lexical``
+  (``blend_lexical``).
+
+Layout
+──────
+Postings are stored CSR-style — one contiguous array per field, sliced
+per term by ``indptr`` — with each posting's BM25 contribution
+(``idf × saturated tf``) precomputed at build time.  Scoring a query is
+then one ``scores[docs] += impact`` per query term.
+
+The index is built from ``anime_catalog`` at startup (in the
+background) and saved to ``LEXICAL_INDEX_PATH``; later startups load
+that snapshot instead.  Refresh it after ingesting with
+``python -m app.cli lexical-index build``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.local_embeddings import tokenize
+from app.services.numpy_index import MetadataFilterMixin, _top_k_indices
+from app.services.retrieval_cache import bump_index_version
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+@dataclass
+class LexicalMatch:
+    """Lexical results for one query.
+
+    ``hits`` are shaped like ``search_anime`` results, plus a
+    ``lexical_score`` (BM25 relative to the best hit, 0–1) that is
+    also used as ``similarity_score``.
+    """
+
+    hits: list[dict]
+    confident: bool = False
+
+
+class BM25Index(MetadataFilterMixin):
+    """Okapi BM25 over a fixed set of documents.
+
+    Args:
+        documents: Document texts (``embedding_text``).
+        metadatas: One vector-store metadata dict per document.
+    """
+
+    def __init__(
+        self,
+        documents: list[str],
+        metadatas: list[dict],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> None:
+        if len(documents) != len(metadatas):
+            raise ValueError("documents and metadatas must have the same length")
+        self._documents = list(documents)
+        self._metadatas = list(metadatas)
+        self._columns: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+        counts = [Counter(analyze(text)) for text in self._documents]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+        avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        vocabulary = sorted({term for c in counts for term in c})
+        self._terms = {term: i for i, term in enumerate(vocabulary)}
+
+        term_ids: list[int] = []
+        doc_ids: list[int] = []
+        tfs: list[int] = []
+        for doc, c in enumerate(counts):
+            for term, tf in c.items():
+                term_ids.append(self._terms[term])
+                doc_ids.append(doc)
+                tfs.append(tf)
+
+        term_arr = np.asarray(term_ids, dtype=np.int64)
+        doc_arr = np.asarray(doc_ids, dtype=np.int32)
+        tf_arr = np.asarray(tfs, dtype=np.float64)
+        order = np.argsort(term_arr, kind="stable")
+        term_arr, doc_arr, tf_arr = term_arr[order], doc_arr[order], tf_arr[order]
+
+        df = np.bincount(term_arr, minlength=len(vocabulary)).astype(np.float64)
+        n = len(self._documents)
+        self._idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._unseen_idf = float(math.log1p((n + 0.5) / 0.5))
+
+        norm = k1 * (1.0 - b + b * lengths[doc_arr] / avg_length)
+        self._impact = (self._idf[term_arr] * tf_arr * (k1 + 1.0) / (tf_arr + norm)).astype(np.float32)
+        self._doc_idx = doc_arr
+        self._indptr = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+
+    def count(self) -> int:
+        return len(self._documents)
+
+    # ── Search ───────────────────────────────────────────
+
+    def match(
+        self,
+        query: str,
+        k: int = 20,
+        filter_dict: dict[str, Any] | None = None,
+        exclude_ids: Iterable[int] | None = None,
+    ) -> LexicalMatch:
+        """Top-``k`` BM25 hits for ``query``, and whether they're conclusive.
+
+        ``filter_dict`` / ``exclude_ids`` work as in ``search_anime``.
+
+        A match is *confident* when the best hit contains at least
+        ``LEXICAL_CONFIDENT_COVERAGE`` of the query's IDF mass (its rare
+        words — "steins", "gate" — not "more", "like") and no more
+        than ``LEXICAL_CONFIDENT_MAX_MATCHES`` anime do.  "Steins;Gate"
+        is confident; "anime with time travel" matches hundreds of
+        anime and is not.
+        """
+        n = len(self._documents)
+        terms = set(analyze(query))
+        if k <= 0 or n == 0 or not terms:
+            return LexicalMatch(hits=[])
+
+        scores = np.zeros(n, dtype=np.float32)
+        coverage = np.zeros(n, dtype=np.float32)
+        total_idf = 0.0
+        for term in terms:
+            t = self._terms.get(term)
+            if t is None:
+                total_idf += self._unseen_idf
+                continue
+            total_idf += float(self._idf[t])
+            span = slice(self._indptr[t], self._indptr[t + 1])
+            docs = self._doc_idx[span]
+            scores[docs] += self._impact[span]
+            coverage[docs] += self._idf[t]
+        coverage /= total_idf
+
+        filter_dict = dict(filter_dict or {})
+        if exclude_ids:
+            filter_dict["mal_id_nin"] = sorted({int(i) for i in exclude_ids})
+        if filter_dict:
+            mask = self._filter_mask(filter_dict)
+            scores[~mask] = 0.0
+            coverage[~mask] = 0.0
+
+        matched = int(np.count_nonzero(scores))
+        if matched == 0:
+            return LexicalMatch(hits=[])
+
+        top = _top_k_indices(scores, min(k, matched))
+        best = float(scores[top[0]])
+        covering = int(np.count_nonzero(coverage >= settings.LEXICAL_CONFIDENT_COVERAGE))
+        confident = (
+            float(coverage[top[0]]) >= settings.LEXICAL_CONFIDENT_COVERAGE
+            and covering <= settings.LEXICAL_CONFIDENT_MAX_MATCHES
+        )
+
+        hits = []
+        for i in top:
+            score = round(float(scores[i]) / best, 4)
+            metadata = self._metadatas[i]
+            hits.append({
+                "mal_id": metadata.get("mal_id", 0),
+                "title": metadata.get("title", "Unknown"),
+                "embedding_text": self._documents[i],
+                "metadata": metadata,
+                "similarity_score": score,
+                "lexical_score": score,
+            })
+        return LexicalMatch(hits=hits, confident=confident)
+
+    # ── Persistence ──────────────────────────────────────
+
+    def save(self, path: str | Path) -> None:
+        """Write a snapshot (atomically — readers never see half a file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                indptr=self._indptr,
+                doc_idx=self._doc_idx,
+                impact=self._impact,
+                idf=self._idf,
+                unseen_idf=np.float64(self._unseen_idf),
+                terms=np.array(json.dumps(sorted(self._terms, key=self._terms.get))),
+                documents=np.array(json.dumps(self._documents)),
+                metadatas=np.array(json.dumps(self._metadatas)),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> BM25Index:
+        """Load a snapshot written by ``save``."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            index = cls.__new__(cls)
+            index._indptr = data["indptr"]
+            index._doc_idx = data["doc_idx"]
+            index._impact = data["impact"]
+            index._idf = data["idf"]
+            index._unseen_idf = float(data["unseen_idf"])
+            terms = json.loads(str(data["terms"]))
+            index._documents = json.loads(str(data["documents"]))
+            index._metadatas = json.loads(str(data["metadatas"]))
+        index._terms = {term: i for i, term in enumerate(terms)}
+        index._columns = {}
+        return index
+
+
+def analyze(text: str) -> list[str]:
+    """Index / query terms: lower-cased word tokens, naive plural folding.
+
+    "Thrillers" and "thriller" must meet, and there's no stemmer
+    dependency in the tree — dropping a trailing ``s`` covers the
+    common case.
+    """
+    return [
+        t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+        for t in tokenize(text)
+    ]
+
+
+def blend_lexical(
+    vector_hits: list[dict],
+    lexical_hits: list[dict],
+    weight: float,
+    k: int,
+) -> list[dict]:
+    """Blend one query's vector and lexical hits into one ranked list.
+
+    ``similarity_score`` becomes ``(1 − weight) × vector + weight ×
+    lexical``.  Anime only the lexical index found get the query's
+    lowest vector similarity — they were outside the vector top-k, so
+    that's an upper bound.
+    """
+    lexical = {h["mal_id"]: h["lexical_score"] for h in lexical_hits}
+    floor = min((h["similarity_score"] for h in vector_hits), default=0.0)
+
+    blended: dict[int, dict] = {}
+    for hit in vector_hits:
+        blended[hit["mal_id"]] = dict(hit)
+    for hit in lexical_hits:
+        if hit["mal_id"] not in blended:
+            blended[hit["mal_id"]] = dict(hit, similarity_score=floor)
+
+    for mal_id, hit in blended.items():
+        lexical_score = lexical.get(mal_id, 0.0)
+        hit["lexical_score"] = lexical_score
+        hit["similarity_score"] = round(
+            (1.0 - weight) * hit["similarity_score"] + weight * lexical_score, 4
+        )
+
+    ranked = sorted(blended.values(), key=lambda h: h["similarity_score"], reverse=True)
+    return ranked[:k]
+
+
+# ═════════════════════════════════════════════════════════
+# Process-wide index
+# ═════════════════════════════════════════════════════════
+
+
+_index: BM25Index | None = None
+_index_lock = Lock()
+
+
+def get_lexical_index() -> BM25Index | None:
+    """The loaded index, or ``None`` until ``load_lexical_index`` ran.
+
+    Never builds on the request path — searches just skip the lexical
+    side until the startup task has finished.
+    """
+    return _index
+
+
+def set_lexical_index(index: BM25Index | None) -> None:
+    global _index
+    with _index_lock:
+        _index = index
+    bump_index_version()
+
+
+def reset_lexical_index() -> None:
+    """Drop the loaded index (useful for testing)."""
+    set_lexical_index(None)
+
+
+def load_lexical_index(rebuild: bool = False) -> BM25Index | None:
+    """Load the snapshot, or build from the catalog and save one.
+
+    Runs in a background thread at startup; failures are logged and
+    leave lexical search disabled rather than taking the app down.
+    """
+    path = Path(settings.LEXICAL_INDEX_PATH)
+    try:
+        if path.exists() and not rebuild:
+            index = BM25Index.load(path)
+            logger.info("Loaded lexical index (%d docs) from %s", index.count(), path)
+        else:
+            index = build_lexical_index()
+            index.save(path)
+            logger.info("Built lexical index (%d docs) → %s", index.count(), path)
+    except Exception as exc:
+        logger.warning("Lexical index unavailable: %s", exc)
+        return None
+
+    set_lexical_index(index)
+    return index
+
+
+def build_lexical_index() -> BM25Index:
+    """Build from every catalog entry that has ``embedding_text``."""
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+    from app.services.vector_store import catalog_entry_metadata
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(AnimeCatalogEntry).where(AnimeCatalogEntry.embedding_text.is_not(None))
+        ).scalars().all()
+        documents = [row.embedding_text for row in rows]
+        metadatas = [catalog_entry_metadata(row) for row in rows]
+    finally:
+        db.close()
+    return BM25Index(documents, metadatas)
@@ -0,0 +1,133 @@
+"""Deterministic offline embeddings — no API key, no network.
+
+``get_embeddings()`` used to hard-require ``OPENAI_API_KEY``, so
+``search_anime``, ``retrieve_candidates`` and the catalog pipeline
+could not be benchmarked in CI or on an isolated perf box.  With
+``EMBEDDING_PROVIDER=hashing`` they run against this provider instead.
+
+How it works
+────────────
+Feature hashing ("the hashing trick") over a bag of words:
+
+1. Lower-case the text and split it into word tokens.
+2. Features = unigrams + adjacent bigrams ("dark fantasy").
+3. Each token hashes with keyed BLAKE2b (``LOCAL_EMBEDDING_SEED``);
+   bigram hashes are mixed from their tokens' hashes.  A feature's
+   hash picks a slot in ``[0, LOCAL_EMBEDDING_DIMENSIONS)`` and a ±1
+   sign.
+4. Weight = ``1 + log(count)``; the vector is L2-normalised so cosine
+   similarity behaves like it does for OpenAI vectors.
+
+Texts sharing words land near each other, so retrieval results are
+plausible (not just random), and the same text always maps to the
+same vector — across processes, machines and runs.  A 30k-document
+catalog embeds in seconds.
+
+This is a benchmarking tool, not a quality substitute: there is no
+semantics beyond lexical overlap.  Vectors are tagged with their own
+model name (``local-hashing-…``) so they are never mistaken for
+OpenAI vectors by ``embed``/``reindex``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_TOKEN_RE = re.compile(r"[\w']+")
+_MAX_CACHED_TOKENS = 1 << 20
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class HashingEmbeddings(Embeddings):
+    """LangChain ``Embeddings`` backed by feature hashing.
+
+    Plugs into Chroma, PGVector and ``NumpyVectorIndex`` like
+    ``OpenAIEmbeddings`` does.
+    """
+
+    def __init__(self, dimensions: int = 1536, seed: int = 0) -> None:
+        if dimensions < 1:
+            raise ValueError("dimensions must be at least 1")
+        self.dimensions = dimensions
+        self.seed = seed
+        self._token_hashes: dict[str, int] = {}  # token → 64-bit keyed hash
+
+    @property
+    def model(self) -> str:
+        """Model name recorded on stored vectors and in cache keys."""
+        return local_model_name(self.dimensions, self.seed)
+
+    # ── LangChain Embeddings interface ───────────────────
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed_many(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed_many([text])[0].tolist()
+
+    # ── Hashing ──────────────────────────────────────────
+
+    def _embed_many(self, texts: list[str]) -> np.ndarray:
+        """Embed ``texts`` into an L2-normalised ``(n, dimensions)`` matrix."""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        cache = self._token_hashes
+        for row, text in enumerate(texts):
+            tokens = tokenize(text) or [""]
+            unigrams = np.fromiter(
+                (cache[t] if t in cache else self._hash_token(t) for t in tokens),
+                dtype=np.uint64,
+                count=len(tokens),
+            )
+            # Bigram hashes are derived from unigram hashes, so only
+            # tokens (a small vocabulary) ever go through BLAKE2b.
+            bigrams = _mix(unigrams[:-1] * _BIGRAM_MULTIPLIER + unigrams[1:])
+            features, counts = np.unique(np.concatenate([unigrams, bigrams]), return_counts=True)
+
+            slots = (features % np.uint64(self.dimensions)).astype(np.int64)
+            signs = np.where(features >> np.uint64(63), 1.0, -1.0)
+            matrix[row] = np.bincount(
+                slots,
+                weights=signs * (1.0 + np.log(counts)),
+                minlength=self.dimensions,
+            )
+
+        norms = np.linalg.norm(matrix, axis=1)
+        empty = norms == 0.0
+        if empty.any():
+            # Every feature cancelled out — fall back to a fixed slot
+            matrix[empty, int(self._hash_token("") % self.dimensions)] = 1.0
+            norms[empty] = 1.0
+        return matrix / norms[:, None]
+
+    def _hash_token(self, token: str) -> int:
+        digest = hashlib.blake2b(
+            token.encode("utf-8"),
+            digest_size=8,
+            key=self.seed.to_bytes(8, "little", signed=True),
+        ).digest()
+        value = int.from_bytes(digest, "little")
+        if len(self._token_hashes) < _MAX_CACHED_TOKENS:
+            self._token_hashes[token] = value
+        return value
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens of ``text``."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def local_model_name(dimensions: int, seed: int) -> str:
+    return f"local-hashing-{dimensions}-s{seed}"
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser — spreads bits of combined hashes (wraps mod 2**64)."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
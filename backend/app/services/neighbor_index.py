@@ -0,0 +1,302 @@
+"""Precomputed item-to-item neighbours for the whole catalog.
+
+"More like these" retrieval (cauldron seeds) used to embed a synthetic
+query built from the seeds' metadata and run a vector search — an
+OpenAI call and a full scan per request, to answer a question whose
+answer only changes when the catalog is re-embedded.  This table
+answers it with a dictionary lookup.
+
+Build
+─────
+``build_neighbor_table`` reads every stored catalog vector
+(``AnimeCatalogEntry.embedding_vector``, current embedding model only)
+and computes each anime's ``NEIGHBOR_TOP_N`` nearest neighbours by
+cosine similarity.  The all-pairs product is done in row blocks of
+``NEIGHBOR_BLOCK_SIZE``: each block is one ``(block × N)`` matmul,
+reduced to its top-N with ``argpartition`` before the next block, so
+the similarity scratch space stays at ``block × N × 4`` bytes (~55 MB
+for 512 rows of a 27k catalog) instead of N².
+
+Layout
+──────
+Saved to ``NEIGHBOR_INDEX_PATH`` as an ``.npz`` of three arrays plus
+the embedding model name:
+
+• ``mal_ids``   — ``int32 (N,)``
+• ``neighbors`` — ``int32 (N, top_n)`` row indices, best first, ``-1``
+  padding
+• ``scores``    — ``float16 (N, top_n)`` cosine similarities
+
+~200 bytes per anime at top_n = 50.  Loading builds a ``mal_id → row``
+dict, so ``neighbors_of`` is O(1) plus the slice.
+
+The table is a snapshot: rebuild it after ``embed`` / ``reindex`` with
+``python -m app.cli neighbors build``.  A table built with another
+embedding model is ignored on load.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class NeighborTable:
+    """Top-N cosine neighbours per catalog anime."""
+
+    def __init__(
+        self,
+        mal_ids: np.ndarray,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        model: str = "",
+    ) -> None:
+        self.mal_ids = np.asarray(mal_ids, dtype=np.int32)
+        self.neighbors = np.asarray(neighbors, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float16)
+        self.model = model
+        self._row_of = {int(mal_id): row for row, mal_id in enumerate(self.mal_ids)}
+
+    def count(self) -> int:
+        return int(self.mal_ids.shape[0])
+
+    @property
+    def top_n(self) -> int:
+        return int(self.neighbors.shape[1]) if self.neighbors.ndim == 2 else 0
+
+    def __contains__(self, mal_id: int) -> bool:
+        return mal_id in self._row_of
+
+    def neighbors_of(self, mal_id: int, k: int | None = None) -> list[tuple[int, float]]:
+        """``(mal_id, similarity)`` of the anime's nearest neighbours, best first.
+
+        Unknown ids get an empty list.
+        """
+        row = self._row_of.get(mal_id)
+        if row is None:
+            return []
+        idx = self.neighbors[row, :k]
+        sims = self.scores[row, :k]
+        keep = idx >= 0
+        return [
+            (int(m), float(s))
+            for m, s in zip(self.mal_ids[idx[keep]], sims[keep])
+        ]
+
+    def similar_to(
+        self,
+        seed_mal_ids: list[int],
+        exclude_ids: Iterable[int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Neighbours of several seeds, ranked by mean similarity.
+
+        A neighbour missing from one seed's list counts 0 for that seed
+        — anime close to *all* seeds beat anime very close to one.  The
+        seeds themselves and ``exclude_ids`` are left out.
+        """
+        excluded = set(exclude_ids or ()) | set(seed_mal_ids)
+        totals: dict[int, float] = {}
+        for seed in seed_mal_ids:
+            for mal_id, sim in self.neighbors_of(seed):
+                if mal_id not in excluded:
+                    totals[mal_id] = totals.get(mal_id, 0.0) + sim
+
+        count = max(len(seed_mal_ids), 1)
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(mal_id, total / count) for mal_id, total in ranked]
+
+    # ── Persistence ──────────────────────────────────────
+
+    def save(self, path: str | Path) -> None:
+        """Write a snapshot (atomically — readers never see half a file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                mal_ids=self.mal_ids,
+                neighbors=self.neighbors,
+                scores=self.scores,
+                model=np.array(self.model),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> NeighborTable:
+        """Load a snapshot written by ``save``."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(
+                data["mal_ids"],
+                data["neighbors"],
+                data["scores"],
+                model=str(data["model"]),
+            )
+
+
+def compute_neighbors(
+    vectors: np.ndarray,
+    top_n: int,
+    block_size: int = 512,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Top-``top_n`` cosine neighbours of every row, excluding itself.
+
+    Returns:
+        ``(neighbors, scores)`` — ``int32`` row indices and ``float16``
+        similarities, both ``(N, top_n)``, best first.  ``top_n`` is
+        clamped to ``N − 1``.
+    """
+    unit = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(unit, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = unit / norms
+
+    n = unit.shape[0]
+    top_n = max(0, min(top_n, n - 1))
+    neighbors = np.full((n, top_n), -1, dtype=np.int32)
+    scores = np.zeros((n, top_n), dtype=np.float16)
+    if top_n == 0:
+        return neighbors, scores
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        sims = unit[start:stop] @ unit.T
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        top = np.argpartition(-sims, top_n - 1, axis=1)[:, :top_n]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_sims, order, axis=1)
+
+    return neighbors, scores
+
+
+# ═════════════════════════════════════════════════════════
+# Process-wide table
+# ═════════════════════════════════════════════════════════
+
+
+_table: NeighborTable | None = None
+_table_lock = Lock()
+
+
+def get_neighbor_table() -> NeighborTable | None:
+    """The loaded table, or ``None`` until ``load_neighbor_table`` ran."""
+    return _table
+
+
+def set_neighbor_table(table: NeighborTable | None) -> None:
+    global _table
+    with _table_lock:
+        _table = table
+
+
+def reset_neighbor_table() -> None:
+    """Drop the loaded table (useful for testing)."""
+    set_neighbor_table(None)
+
+
+def load_neighbor_table() -> NeighborTable | None:
+    """Load the snapshot at ``NEIGHBOR_INDEX_PATH``.
+
+    Never builds (that's a batch job over every stored vector).
+    Failures and stale tables are logged and leave callers on their
+    vector-search path.
+    """
+    from app.services.vector_store import get_embedding_model_name
+
+    path = Path(settings.NEIGHBOR_INDEX_PATH)
+    try:
+        table = NeighborTable.load(path)
+    except FileNotFoundError:
+        logger.warning("Neighbour table not found at %s — run `neighbors build`", path)
+        return None
+    except Exception as exc:
+        logger.warning("Neighbour table unavailable: %s", exc)
+        return None
+
+    model = get_embedding_model_name()
+    if table.model != model:
+        logger.warning(
+            "Ignoring neighbour table built with %s (current model: %s)", table.model, model,
+        )
+        return None
+
+    logger.info("Loaded neighbour table (%d anime × %d) from %s", table.count(), table.top_n, path)
+    set_neighbor_table(table)
+    return table
+
+
+def build_neighbor_table(
+    top_n: int | None = None,
+    block_size: int | None = None,
+) -> NeighborTable:
+    """Compute the table from every usable stored catalog vector.
+
+    Rows are skipped like ``reindex`` skips them: no stored vector, a
+    different embedding model, or text changed since embedding.
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import undefer
+
+    from app.db.session import SessionLocal
+    from app.models.anime import AnimeCatalogEntry
+    from app.services.embedding_storage import embedding_text_hash, unpack_vector
+    from app.services.vector_store import get_embedding_model_name
+
+    model = get_embedding_model_name()
+    mal_ids: list[int] = []
+    vectors: list[np.ndarray] = []
+    last_mal_id = 0
+
+    while True:
+        # Keyset pagination on mal_id, as in reindex
+        db = SessionLocal()
+        try:
+            rows = (
+                db.execute(
+                    select(AnimeCatalogEntry)
+                    .options(undefer(AnimeCatalogEntry.embedding_vector))
+                    .where(
+                        AnimeCatalogEntry.mal_id > last_mal_id,
+                        AnimeCatalogEntry.embedding_text.isnot(None),
+                    )
+                    .order_by(AnimeCatalogEntry.mal_id)
+                    .limit(1000)
+                )
+                .scalars()
+                .all()
+            )
+            if not rows:
+                break
+            last_mal_id = rows[-1].mal_id
+            for row in rows:
+                if (
+                    row.embedding_vector is None
+                    or not row.embedding_dim
+                    or row.embedding_model != model
+                    or row.embedding_text_hash != embedding_text_hash(row.embedding_text)
+                ):
+                    continue
+                mal_ids.append(row.mal_id)
+                vectors.append(unpack_vector(row.embedding_vector, row.embedding_dim))
+        finally:
+            db.close()
+
+    if not vectors:
+        raise ValueError(f"No stored catalog vectors for model {model} — run `embed` first.")
+
+    neighbors, scores = compute_neighbors(
+        np.stack(vectors),
+        top_n=top_n or settings.NEIGHBOR_TOP_N,
+        block_size=block_size or settings.NEIGHBOR_BLOCK_SIZE,
+    )
+    return NeighborTable(np.array(mal_ids), neighbors, scores, model=model)
@@ -0,0 +1,582 @@
+"""In-process NumPy vector index — a zero-infrastructure search backend.
+
+The catalog is small (~27k anime × 1536 floats ≈ 165 MB as float32), so
+exact brute-force search over a contiguous matrix is both simpler and
+faster than going through a LangChain wrapper around Chroma's SQLite or
+a pgvector round-trip.  One matrix-vector product scores every anime;
+``argpartition`` picks the top K without sorting the whole catalog.
+
+On-disk layout (``NUMPY_INDEX_DIR``)
+────────────────────────────────────
+• ``vectors.f32``   — raw row-major float32 matrix (N × D), L2-normalised
+                      so a dot product IS the cosine similarity.
+                      Memory-mapped read-only, so startup is instant and
+                      the OS page cache is shared between workers.
+• ``records.jsonl`` — append-only log of per-row document id, original
+                      text and metadata, one JSON object per line.  An
+                      upsert appends a line for each row it touches
+                      (the last line for an id wins), so a batch writes
+                      O(batch) bytes; once the log holds more than
+                      twice as many lines as rows it is compacted.
+• ``manifest.json`` — dimensionality, row count and the committed
+                      length of the records log.  Written last, so a
+                      crash mid-write never exposes a half-written row.
+
+Several processes, one index
+────────────────────────────
+``embed`` in the CLI and a running server may share an index
+directory.  Each search stats the manifest; when another process has
+rewritten it, the index reloads before searching, so new vectors are
+visible without a restart.
+
+Searches run concurrently (``search_pool``) and take no lock: they
+read one immutable ``_Snapshot`` — vectors, documents, metadata,
+filter columns and manifest stamp.  Writes and reloads build the next
+snapshot under the lock and publish it with a single reference swap,
+so a search sees either the old index or the new one, never a mix.
+
+Why exact search (no HNSW)?
+───────────────────────────
+At this size a full scan is ~40M multiply-adds — a few milliseconds with
+BLAS.  Exact search has perfect recall, no index build step, and no
+tuning knobs.  If the catalog ever grows 100×, this is the piece to swap.
+
+The class mimics the subset of the LangChain ``VectorStore`` interface
+that ``vector_store.py`` uses for writes (``add_texts``), so ingestion
+code doesn't care which backend is active.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.core.logging import logger
+
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+
+class MetadataFilterMixin:
+    """Vectorised metadata filtering over ``self._metadatas``.
+
+    Shared by the indexes that keep their rows in process
+    (``NumpyVectorIndex``'s snapshots, ``lexical_index.BM25Index``).
+    Subclasses set ``self._metadatas`` (one dict per row) and
+    ``self._columns = {}``, and reset ``_columns`` whenever metadata
+    changes.
+    """
+
+    _metadatas: list[dict]
+    _columns: dict[str, tuple[np.ndarray, np.ndarray]]
+
+    def _filter_mask(self, filter_dict: dict[str, Any]) -> np.ndarray:
+        """Evaluate a user-friendly filter dict into a boolean row mask.
+
+        Rows missing the field never match (same as Chroma metadata
+        filters), including for ``_ne``.
+        """
+        mask = np.ones(len(self._metadatas), dtype=bool)
+
+        for key, value in filter_dict.items():
+            if key.endswith("_nin"):
+                mask &= self._not_in_mask(key[:-4], value)
+                continue
+            if key.endswith("_gte"):
+                field, op = key[:-4], "gte"
+            elif key.endswith("_lte"):
+                field, op = key[:-4], "lte"
+            elif key.endswith("_ne"):
+                field, op = key[:-3], "ne"
+            else:
+                field, op = key, "eq"
+
+            values, present = self._column(field)
+            if values.dtype == object:
+                # String columns: compare row by row, skipping missing values
+                cond = np.array(
+                    [p and _compare(v, op, value) for v, p in zip(values, present)],
+                    dtype=bool,
+                )
+            else:
+                with np.errstate(invalid="ignore"):
+                    cond = _compare(values, op, value)
+            mask &= present & np.asarray(cond, dtype=bool)
+
+        return mask
+
+    def _not_in_mask(self, field: str, excluded: Any) -> np.ndarray:
+        """Rows whose ``field`` is present and not in ``excluded``.
+
+        Used for ``mal_id_nin`` — excluding a power user's watched list
+        is one vectorised ``isin`` over the column.
+        """
+        values, present = self._column(field)
+        excluded = list(excluded)
+        if not excluded:
+            return present
+        if values.dtype == object:
+            excluded_set = set(excluded)
+            return present & np.array([v not in excluded_set for v in values], dtype=bool)
+        return present & ~np.isin(values, np.asarray(excluded, dtype=np.float64))
+
+    def _column(self, field: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(values, present_mask)`` for a metadata field (cached)."""
+        cached = self._columns.get(field)
+        if cached is not None:
+            return cached
+
+        raw = [m.get(field) for m in self._metadatas]
+        present = np.array([v is not None for v in raw], dtype=bool)
+        numeric = all(
+            isinstance(v, (int, float)) and not isinstance(v, bool)
+            for v in raw if v is not None
+        )
+        if numeric:
+            values = np.array(
+                [np.nan if v is None else float(v) for v in raw], dtype=np.float64
+            )
+        else:
+            values = np.array(raw, dtype=object)
+
+        self._columns[field] = (values, present)
+        return values, present
+
+
+class _Snapshot(MetadataFilterMixin):
+    """One published state of the index.
+
+    Never mutated after publication (filter columns are a cache of
+    values derived from it), so searches read it without the lock.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict],
+        stamp: tuple[int, int] | None,
+    ) -> None:
+        self.vectors = vectors
+        self.documents = documents
+        self._metadatas = metadatas
+        self._columns: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # Manifest (mtime_ns, size) this state was loaded or written at
+        self.stamp = stamp
+
+
+class NumpyVectorIndex:
+    """Brute-force cosine index over a memory-mapped float32 matrix.
+
+    Args:
+        index_dir: Directory holding the index files (created if missing).
+        embeddings: Optional LangChain-style embeddings object.  Only
+            needed for ``add_texts`` — searching takes pre-computed
+            query vectors.
+    """
+
+    def __init__(self, index_dir: str | Path, embeddings: Any = None) -> None:
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._embeddings = embeddings
+        self._lock = Lock()
+
+        # Writer state — only touched under the lock; searches read
+        # ``_snapshot``, rebuilt from it by ``_publish``
+        self._dim = 0
+        self._doc_ids: list[str] = []
+        self._row_by_id: dict[str, int] = {}
+        self._documents: list[str] = []
+        self._metadatas: list[dict] = []
+        # Records log: committed byte length and line count
+        self._records_bytes = 0
+        self._log_lines = 0
+        self._snapshot = _Snapshot(np.empty((0, 0), dtype=np.float32), [], [], None)
+
+        with self._lock:
+            self._load()
+
+    # ── Introspection ────────────────────────────────────
+
+    @property
+    def dim(self) -> int:
+        return self._snapshot.vectors.shape[1]
+
+    def count(self) -> int:
+        return len(self._snapshot.documents)
+
+    # ── Writes ───────────────────────────────────────────
+
+    def add_texts(
+        self,
+        texts: list[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+    ) -> list[str]:
+        """Embed ``texts`` and upsert them (LangChain-compatible signature)."""
+        if self._embeddings is None:
+            raise RuntimeError("NumpyVectorIndex.add_texts requires an embeddings object")
+        vectors = self._embeddings.embed_documents(list(texts))
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def add_embeddings(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]] | np.ndarray,
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+    ) -> list[str]:
+        """Upsert pre-computed vectors.
+
+        Existing ids are overwritten in place; new ids are appended to
+        the end of the matrix file, and every touched row appends one
+        line to the records log — a batch costs O(batch) disk writes
+        rather than rewriting the whole catalog (plus an occasional
+        compaction of the log, amortised O(1) per row).
+        """
+        if not texts:
+            return []
+
+        matrix = _normalise(np.asarray(embeddings, dtype=np.float32))
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("embeddings must be a (len(texts), dim) matrix")
+
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(m.get("mal_id", i)) for i, m in enumerate(metadatas)]
+
+        # Duplicate ids within one batch: the last occurrence wins
+        last_pos = {doc_id: pos for pos, doc_id in enumerate(ids)}
+
+        with self._lock:
+            if self._dim and matrix.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {matrix.shape[1]} does not match "
+                    f"index dimension {self._dim}. Rebuild the index after "
+                    "changing embedding models."
+                )
+            self._dim = matrix.shape[1]
+
+            updates: list[tuple[int, int]] = []  # (row, batch position)
+            appends: list[int] = []
+            touched: list[int] = []
+            for doc_id, pos in last_pos.items():
+                row = self._row_by_id.get(doc_id)
+                if row is None:
+                    self._row_by_id[doc_id] = len(self._doc_ids)
+                    self._doc_ids.append(doc_id)
+                    self._documents.append(texts[pos])
+                    self._metadatas.append(dict(metadatas[pos]))
+                    appends.append(pos)
+                    touched.append(len(self._doc_ids) - 1)
+                else:
+                    self._documents[row] = texts[pos]
+                    self._metadatas[row] = dict(metadatas[pos])
+                    updates.append((row, pos))
+                    touched.append(row)
+
+            self._write_vectors(matrix, updates, appends)
+            self._write_records(touched)
+            self._publish(self._write_manifest())
+
+        return list(ids)
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]) -> int:
+        """Replace metadata for existing ids — vectors are untouched.
+
+        Unknown ids are ignored.  Returns the number of rows updated.
+        """
+        touched: list[int] = []
+        with self._lock:
+            for doc_id, metadata in zip(ids, metadatas):
+                row = self._row_by_id.get(doc_id)
+                if row is None:
+                    continue
+                self._metadatas[row] = dict(metadata)
+                touched.append(row)
+            if touched:
+                self._write_records(touched)
+                self._publish(self._write_manifest())
+        return len(touched)
+
+    def delete_all(self) -> int:
+        """Remove every vector and record.  Returns the number deleted."""
+        with self._lock:
+            count = len(self._doc_ids)
+            # Manifest first: a reader never sees it pointing at missing files
+            for name in (MANIFEST_FILE, VECTORS_FILE, RECORDS_FILE):
+                (self.index_dir / name).unlink(missing_ok=True)
+            self._reset()
+            self._publish(None)
+        return count
+
+    # ── Search ───────────────────────────────────────────
+
+    def search(
+        self,
+        query_vector: list[float] | np.ndarray,
+        k: int = 20,
+        filter_dict: dict[str, Any] | None = None,
+    ) -> list[tuple[str, dict, float]]:
+        """Return the top-``k`` rows as ``(document, metadata, cosine)``.
+
+        ``filter_dict`` uses the same user-friendly syntax as
+        ``vector_store._build_chroma_filter`` (``year_gte``,
+        ``mal_score_gte``, ``anime_type_ne``, ``mal_id_nin``, exact
+        match...).
+        """
+        return self.search_many([query_vector], k=k, filter_dict=filter_dict)[0]
+
+    def search_many(
+        self,
+        query_vectors: list[list[float]] | np.ndarray,
+        k: int = 20,
+        filter_dict: dict[str, Any] | None = None,
+    ) -> list[list[tuple[str, dict, float]]]:
+        """Search several queries at once — one matrix-matrix product.
+
+        The filter mask is evaluated once and shared by every query.
+        Returns one hit list per query, in input order.
+        """
+        snapshot = self._current_snapshot()
+        vectors = snapshot.vectors
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if k <= 0 or vectors.shape[0] == 0 or queries.shape[0] == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        queries = _normalise(queries)
+        if queries.shape[1] != vectors.shape[1]:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match index dimension {vectors.shape[1]}"
+            )
+
+        scores = vectors @ queries.T  # (N, num_queries)
+
+        if filter_dict:
+            mask = snapshot._filter_mask(filter_dict)
+            eligible = int(mask.sum())
+            if eligible == 0:
+                return [[] for _ in range(queries.shape[0])]
+            scores[~mask] = -np.inf
+        else:
+            eligible = scores.shape[0]
+
+        results: list[list[tuple[str, dict, float]]] = []
+        for column in scores.T:
+            top = _top_k_indices(column, min(k, eligible))
+            results.append([
+                (snapshot.documents[i], snapshot._metadatas[i], float(column[i]))
+                for i in top
+            ])
+        return results
+
+    # ── Persistence ──────────────────────────────────────
+
+    def _reset(self) -> None:
+        self._dim = 0
+        self._doc_ids = []
+        self._row_by_id = {}
+        self._documents = []
+        self._metadatas = []
+        self._records_bytes = 0
+        self._log_lines = 0
+
+    def _publish(self, stamp: tuple[int, int] | None) -> None:
+        """Swap in a snapshot of the writer state (call under the lock).
+
+        The lists are copied so later writes never show through; the
+        metadata dicts are shared — writers replace them, never mutate.
+        """
+        self._snapshot = _Snapshot(
+            self._open_matrix(), list(self._documents), list(self._metadatas), stamp,
+        )
+
+    def _stat_manifest(self) -> tuple[int, int] | None:
+        try:
+            st = (self.index_dir / MANIFEST_FILE).stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _current_snapshot(self) -> _Snapshot:
+        """The snapshot to search — reloaded first when another process
+        rewrote the manifest (one ``stat`` when it hasn't)."""
+        snapshot = self._snapshot
+        if self._stat_manifest() == snapshot.stamp:
+            return snapshot
+        with self._lock:
+            # Re-check: our own write may have finished while we waited
+            if self._stat_manifest() != self._snapshot.stamp:
+                logger.info("NumPy vector index changed on disk — reloading")
+                self._reset()
+                self._load()
+            return self._snapshot
+
+    def _load(self) -> None:
+        """Rebuild the writer state from disk and publish it (under the lock)."""
+        # Stat before reading: a write racing the load only costs a reload
+        stamp = self._stat_manifest()
+        if stamp is None:
+            self._publish(None)
+            return
+
+        manifest = json.loads((self.index_dir / MANIFEST_FILE).read_text())
+        count = int(manifest["count"])
+        self._dim = int(manifest["dim"])
+        self._records_bytes = int(manifest["records_bytes"])
+        with open(self.index_dir / RECORDS_FILE, "rb") as f:
+            lines = f.read(self._records_bytes).splitlines()
+        self._log_lines = len(lines)
+        for line in lines:
+            self._apply_record(json.loads(line))
+
+        if len(self._doc_ids) != count:
+            raise ValueError(
+                f"NumPy index records hold {len(self._doc_ids)} rows, manifest says {count}"
+            )
+        self._publish(stamp)
+
+        logger.info(
+            "Loaded NumPy vector index (dir=%s, rows=%d, dim=%d)",
+            self.index_dir, count, self._dim,
+        )
+
+    def _apply_record(self, record: dict) -> None:
+        """Replay one records-log line: a new id appends a row."""
+        row = self._row_by_id.get(record["id"])
+        if row is None:
+            self._row_by_id[record["id"]] = len(self._doc_ids)
+            self._doc_ids.append(record["id"])
+            self._documents.append(record["document"])
+            self._metadatas.append(record["metadata"])
+        else:
+            self._documents[row] = record["document"]
+            self._metadatas[row] = record["metadata"]
+
+    def _open_matrix(self) -> np.ndarray:
+        count = len(self._doc_ids)
+        if count == 0 or self._dim == 0:
+            return np.empty((0, self._dim), dtype=np.float32)
+        return np.memmap(
+            self.index_dir / VECTORS_FILE,
+            dtype=np.float32,
+            mode="r",
+            shape=(count, self._dim),
+        )
+
+    def _write_vectors(
+        self,
+        matrix: np.ndarray,
+        updates: list[tuple[int, int]],
+        appends: list[int],
+    ) -> None:
+        path = self.index_dir / VECTORS_FILE
+        existing_rows = len(self._doc_ids) - len(appends)
+
+        if updates:
+            writable = np.memmap(
+                path, dtype=np.float32, mode="r+", shape=(existing_rows, self._dim)
+            )
+            for row, pos in updates:
+                writable[row] = matrix[pos]
+            writable.flush()
+            del writable
+
+        if appends:
+            # Truncate any tail left behind by an interrupted write so
+            # the new rows land exactly after the committed ones.
+            with open(path, "ab") as f:
+                f.truncate(existing_rows * self._dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(matrix[appends]).tobytes())
+
+    def _write_records(self, rows: list[int]) -> None:
+        """Append ``rows`` to the records log, or compact it when it has
+        grown past twice the row count (or doesn't exist yet)."""
+        path = self.index_dir / RECORDS_FILE
+        if self._log_lines + len(rows) > 2 * len(self._doc_ids) or not path.exists():
+            payload = self._records_payload(range(len(self._doc_ids)))
+            _atomic_write_bytes(path, payload)
+            self._log_lines = len(self._doc_ids)
+            self._records_bytes = len(payload)
+            return
+
+        payload = self._records_payload(rows)
+        with open(path, "ab") as f:
+            # Drop any tail an interrupted write left past the commit point
+            f.truncate(self._records_bytes)
+            f.seek(0, os.SEEK_END)
+            f.write(payload)
+        self._log_lines += len(rows)
+        self._records_bytes += len(payload)
+
+    def _records_payload(self, rows: Iterable[int]) -> bytes:
+        return b"".join(
+            json.dumps({
+                "id": self._doc_ids[row],
+                "document": self._documents[row],
+                "metadata": self._metadatas[row],
+            }).encode() + b"\n"
+            for row in rows
+        )
+
+    def _write_manifest(self) -> tuple[int, int] | None:
+        manifest = {
+            "dim": self._dim,
+            "count": len(self._doc_ids),
+            "records_bytes": self._records_bytes,
+        }
+        _atomic_write_text(self.index_dir / MANIFEST_FILE, json.dumps(manifest))
+        return self._stat_manifest()
+
+
+# ═════════════════════════════════════════════════════════
+# Private helpers
+# ═════════════════════════════════════════════════════════
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise rows so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _compare(left: Any, op: str, right: Any) -> Any:
+    if op == "gte":
+        return left >= right
+    if op == "lte":
+        return left <= right
+    if op == "ne":
+        return left != right
+    return left == right
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first.
+
+    ``argpartition`` is O(N); only the K winners get sorted.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= scores.shape[0]:
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _atomic_write_text(path: Path, content: str) -> None:
+    _atomic_write_bytes(path, content.encode())
+
+
+def _atomic_write_bytes(path: Path, content: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
@@ -0,0 +1,393 @@
+"""pgvector ANN index management and search-time tuning.
+
+``langchain-postgres`` stores every vector in ``langchain_pg_embedding``
+but never creates an approximate-nearest-neighbour index on it, so in
+production every similarity search was a sequential scan over the
+whole catalog.
+
+What this module does
+─────────────────────
+1. **Index DDL** — create / rebuild / drop one ANN index
+   (``ix_langchain_pg_embedding_ann``), either:
+   • **HNSW**    — graph index; best recall/latency, slower to build.
+     Tuned by ``m`` (links per node) and ``ef_construction``.
+   • **IVFFlat** — k-means lists; fast to build, needs data first.
+     Tuned by ``lists`` (≈ rows / 1000 up to 1M rows).
+
+2. **Per-session search settings** — ``hnsw.ef_search`` and
+   ``ivfflat.probes`` trade recall for latency at query time.  The
+   engine returned by ``get_pgvector_engine()`` runs ``SET`` on every
+   new connection, so PGVector picks them up without code changes.
+   Session settings do not survive a transaction-mode pooler (Neon's
+   ``-pooler`` host); use the direct connection string for vectors.
+
+Filtered searches and ``ef_search``
+───────────────────────────────────
+An HNSW scan returns at most ``ef_search`` rows, and the WHERE clause
+— the ``collection_id`` of the active version and the ``mal_id NOT IN``
+watched-list exclusion — is applied to those rows afterwards.  So with
+iterative scans off, a search never yields more than ``ef_search``
+(40 by default) results, whatever its ``k``: retrieval's deeper rounds
+(``fetch_k`` up to ``RETRIEVAL_MAX_FETCH_K``) come back short, and
+retired blue/green copies in the same table thin the yield further.
+``PGVECTOR_ITERATIVE_SCAN=relaxed_order`` (the default) lets pgvector
+>= 0.8 keep scanning until ``k`` rows pass the filter; results are
+then only approximately ordered, which retrieval's re-ranking absorbs.
+On older pgvector the iterative settings are skipped (with a warning)
+— raise ``PGVECTOR_HNSW_EF_SEARCH`` to ``RETRIEVAL_MAX_FETCH_K`` there.
+
+3. **Benchmark** — recall@k vs latency against exact search for a
+   range of ``ef_search`` / ``probes`` values, so parameters are chosen
+   from data rather than guesswork (``python -m app.cli pgvector-index
+   benchmark``).
+
+Distances are cosine (``vector_cosine_ops``), matching PGVector's
+default ``DistanceStrategy.COSINE``.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+import time
+
+from app.core.config import settings
+from app.core.logging import logger
+
+INDEX_NAME = "ix_langchain_pg_embedding_ann"
+TABLE_NAME = "langchain_pg_embedding"
+INDEX_METHODS = ("hnsw", "ivfflat")
+
+_engine = None
+
+
+# ═════════════════════════════════════════════════════════
+# Engine with per-session search settings
+# ═════════════════════════════════════════════════════════
+
+
+def search_settings_sql() -> list[str]:
+    """``SET`` statements applied to every new vector-store connection."""
+    statements = [
+        f"SET hnsw.ef_search = {int(settings.PGVECTOR_HNSW_EF_SEARCH)}",
+        f"SET ivfflat.probes = {int(settings.PGVECTOR_IVFFLAT_PROBES)}",
+    ]
+    iterative = settings.PGVECTOR_ITERATIVE_SCAN.strip().lower()
+    if iterative not in ("", "off"):
+        # pgvector >= 0.8: keep scanning the index until enough rows
+        # pass the WHERE clause (e.g. a large mal_id NOT IN list).
+        if iterative not in ("relaxed_order", "strict_order"):
+            raise RuntimeError(
+                f"Unknown PGVECTOR_ITERATIVE_SCAN={settings.PGVECTOR_ITERATIVE_SCAN!r}. "
+                "Use one of: off, relaxed_order, strict_order."
+            )
+        statements.append(f"SET hnsw.iterative_scan = {iterative}")
+        statements.append(f"SET ivfflat.iterative_scan = {iterative}")
+    return statements
+
+
+def supported_search_settings(statements: list[str], extversion: str | None) -> list[str]:
+    """``statements`` minus the iterative-scan ones before pgvector 0.8.
+
+    Those parameters don't exist on older versions, and ``SET`` of an
+    unknown ``hnsw.*`` parameter is an error once the extension is loaded.
+    """
+    if _version_tuple(extversion) >= (0, 8):
+        return statements
+    supported = [s for s in statements if "iterative_scan" not in s]
+    if len(supported) < len(statements):
+        logger.warning(
+            "pgvector %s has no iterative index scans (needs >= 0.8) — filtered "
+            "searches return at most hnsw.ef_search rows",
+            extversion or "(not installed)",
+        )
+    return supported
+
+
+def _version_tuple(version: str | None) -> tuple[int, ...]:
+    parts = []
+    for part in (version or "").split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    return tuple(parts)
+
+
+def get_pgvector_engine():
+    """Get or create the SQLAlchemy engine PGVector runs on.
+
+    Applies ``search_settings_sql()`` once per physical connection.
+    """
+    global _engine
+
+    if _engine is not None:
+        return _engine
+
+    from sqlalchemy import create_engine, event
+
+    from app.services.vector_store import _psycopg_url
+
+    _engine = create_engine(_psycopg_url(settings.DATABASE_URL), pool_pre_ping=True)
+    statements = search_settings_sql()
+
+    @event.listens_for(_engine, "connect")
+    def _apply_search_settings(dbapi_connection, connection_record):
+        # Autocommit so the pool's reset-on-return rollback can't undo
+        # the SETs (recipe from the SQLAlchemy docs).
+        autocommit = dbapi_connection.autocommit
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cursor.fetchone()
+            for statement in supported_search_settings(statements, row[0] if row else None):
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+            dbapi_connection.autocommit = autocommit
+
+    logger.info("Initialised pgvector engine (%s)", "; ".join(statements))
+    return _engine
+
+
+def reset_pgvector_engine() -> None:
+    """Reset the module-level engine (useful for testing)."""
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+
+
+# ═════════════════════════════════════════════════════════
+# Index DDL
+# ═════════════════════════════════════════════════════════
+
+
+def index_ddl(
+    method: str,
+    m: int | None = None,
+    ef_construction: int | None = None,
+    lists: int | None = None,
+) -> str:
+    """Build the ``CREATE INDEX CONCURRENTLY`` statement for ``method``."""
+    method = method.lower()
+    if method == "hnsw":
+        m = m or settings.PGVECTOR_HNSW_M
+        ef_construction = ef_construction or settings.PGVECTOR_HNSW_EF_CONSTRUCTION
+        if ef_construction < 2 * m:
+            # pgvector rejects ef_construction < 2 * m
+            raise ValueError(f"ef_construction ({ef_construction}) must be at least 2 * m ({2 * m})")
+        options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    elif method == "ivfflat":
+        lists = lists or settings.PGVECTOR_IVFFLAT_LISTS
+        if lists < 1:
+            raise ValueError("lists must be at least 1")
+        options = f"lists = {int(lists)}"
+    else:
+        raise ValueError(f"Unknown index method {method!r}. Use one of: {', '.join(INDEX_METHODS)}.")
+
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+        f"ON {TABLE_NAME} USING {method} (embedding vector_cosine_ops) "
+        f"WITH ({options})"
+    )
+
+
+def index_status() -> dict:
+    """Describe the embedding column and the ANN index, if any."""
+    from sqlalchemy import text
+
+    with get_pgvector_engine().connect() as conn:
+        column_type = conn.execute(text(
+            "SELECT format_type(a.atttypid, a.atttypmod) FROM pg_attribute a "
+            "WHERE a.attrelid = CAST(:table AS regclass) AND a.attname = 'embedding'"
+        ), {"table": TABLE_NAME}).scalar()
+        rows = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE_NAME}")).scalar() or 0
+        index = conn.execute(text(
+            "SELECT indexdef, pg_size_pretty(pg_relation_size(CAST(:name AS regclass))) "
+            "FROM pg_indexes WHERE indexname = :name"
+        ), {"name": INDEX_NAME}).first()
+
+    return {
+        "column_type": column_type,
+        "rows": rows,
+        "index": index[0] if index else None,
+        "index_size": index[1] if index else None,
+    }
+
+
+def create_index(
+    method: str,
+    m: int | None = None,
+    ef_construction: int | None = None,
+    lists: int | None = None,
+    maintenance_work_mem: str | None = None,
+) -> str:
+    """Create the ANN index (no-op if one already exists).
+
+    Pins the ``embedding`` column to a fixed dimension first if needed —
+    langchain-postgres creates it as a dimensionless ``vector``, which
+    HNSW/IVFFlat cannot index.
+
+    Returns:
+        The DDL that was executed.
+    """
+    from sqlalchemy import text
+
+    ddl = index_ddl(method, m=m, ef_construction=ef_construction, lists=lists)
+    _ensure_fixed_dimension()
+
+    # CONCURRENTLY can't run inside a transaction block
+    with get_pgvector_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if maintenance_work_mem:
+            conn.execute(text("SELECT set_config('maintenance_work_mem', :mem, false)"),
+                         {"mem": maintenance_work_mem})
+        conn.execute(text(ddl))
+
+    logger.info("Created pgvector index: %s", ddl)
+    return ddl
+
+
+def drop_index() -> None:
+    from sqlalchemy import text
+
+    with get_pgvector_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+    logger.info("Dropped pgvector index %s", INDEX_NAME)
+
+
+def rebuild_index(
+    method: str,
+    m: int | None = None,
+    ef_construction: int | None = None,
+    lists: int | None = None,
+    maintenance_work_mem: str | None = None,
+) -> str:
+    """Drop and re-create the index (new parameters, or IVFFlat lists
+    re-clustered after the catalog grew)."""
+    drop_index()
+    return create_index(method, m, ef_construction, lists, maintenance_work_mem)
+
+
+def _ensure_fixed_dimension() -> None:
+    from sqlalchemy import text
+
+    with get_pgvector_engine().begin() as conn:
+        column_type = conn.execute(text(
+            "SELECT format_type(a.atttypid, a.atttypmod) FROM pg_attribute a "
+            "WHERE a.attrelid = CAST(:table AS regclass) AND a.attname = 'embedding'"
+        ), {"table": TABLE_NAME}).scalar()
+        if column_type != "vector":
+            return  # already vector(N)
+
+        dim = conn.execute(text(f"SELECT vector_dims(embedding) FROM {TABLE_NAME} LIMIT 1")).scalar()
+        if not dim:
+            raise RuntimeError(
+                f"{TABLE_NAME} is empty — embed the catalog before creating an index"
+            )
+        conn.execute(text(f"ALTER TABLE {TABLE_NAME} ALTER COLUMN embedding TYPE vector({int(dim)})"))
+        logger.info("Pinned %s.embedding to vector(%d)", TABLE_NAME, dim)
+
+
+# ═════════════════════════════════════════════════════════
+# Recall vs latency benchmark
+# ═════════════════════════════════════════════════════════
+
+
+def recall_at_k(exact: list[str], approximate: list[str]) -> float:
+    """Fraction of the exact top-k that the ANN search also returned."""
+    if not exact:
+        return 1.0
+    return len(set(exact) & set(approximate)) / len(exact)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (``pct`` in 0–100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def benchmark(
+    values: list[int],
+    queries: int = 50,
+    k: int = 20,
+) -> list[dict]:
+    """Measure recall@k and latency for each ``ef_search``/``probes`` value.
+
+    Query vectors are sampled from the collection itself.  Ground truth
+    comes from the same query with index scans disabled (exact search).
+
+    Returns:
+        One row per value: ``{"value", "recall", "p50_ms", "p95_ms"}``,
+        plus a first row for exact search (``value=None``).
+    """
+    from sqlalchemy import text
+
+    status = index_status()
+    if not status["index"]:
+        raise RuntimeError("No ANN index — run `pgvector-index create` first")
+    method = "hnsw" if "USING hnsw" in status["index"] else "ivfflat"
+    knob = "hnsw.ef_search" if method == "hnsw" else "ivfflat.probes"
+
+    search_sql = text(
+        f"SELECT e.id FROM {TABLE_NAME} e "
+        "WHERE e.collection_id = :cid "
+        "ORDER BY e.embedding <=> CAST(:q AS vector) LIMIT :k"
+    )
+
+    from app.services.vector_collections import get_active_collection
+
+    collection = get_active_collection("pgvector")
+    engine = get_pgvector_engine()
+    with engine.connect() as conn:
+        cid = conn.execute(
+            text("SELECT uuid FROM langchain_pg_collection WHERE name = :name"),
+            {"name": collection},
+        ).scalar()
+        if cid is None:
+            raise RuntimeError(f"Collection {collection!r} not found")
+        samples = [
+            row[0] for row in conn.execute(text(
+                f"SELECT CAST(embedding AS text) FROM {TABLE_NAME} "
+                "WHERE collection_id = :cid ORDER BY random() LIMIT :n"
+            ), {"cid": cid, "n": queries})
+        ]
+
+    def run(setting: tuple[str, str] | None, exact: bool) -> tuple[list[list[str]], list[float]]:
+        results: list[list[str]] = []
+        latencies: list[float] = []
+        with engine.connect() as conn:
+            with conn.begin():
+                if exact:
+                    conn.execute(text("SET LOCAL enable_indexscan = off"))
+                if setting:
+                    conn.execute(text("SELECT set_config(:name, :value, true)"),
+                                 {"name": setting[0], "value": setting[1]})
+                for q in samples:
+                    start = time.perf_counter()
+                    ids = [r[0] for r in conn.execute(search_sql, {"cid": cid, "q": q, "k": k})]
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    results.append(ids)
+        return results, latencies
+
+    truth, exact_latencies = run(None, exact=True)
+    report = [{
+        "value": None,
+        "recall": 1.0,
+        "p50_ms": round(statistics.median(exact_latencies), 2),
+        "p95_ms": round(percentile(exact_latencies, 95), 2),
+    }]
+
+    for value in values:
+        approx, latencies = run((knob, str(value)), exact=False)
+        recalls = [recall_at_k(t, a) for t, a in zip(truth, approx)]
+        report.append({
+            "value": value,
+            "recall": round(statistics.mean(recalls), 4),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+        })
+    return report
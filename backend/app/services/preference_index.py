@@ -0,0 +1,287 @@
+"""Vectorised preference scoring over precomputed multi-hot arrays.
+
+``rerank_by_preferences`` used to score candidates one at a time in
+pure Python: split the ``genres``/``themes`` strings, look each token
+up in a dict, rebuild the decade bucket — for every candidate on every
+request.  That's fine for 50 candidates, and slow for large pools or
+offline scoring of many users.
+
+Layout
+──────
+``PreferenceFeatureIndex`` keeps, per anime (row, looked up by
+``mal_id``):
+
+• ``genre_counts`` — ``(rows, genres)`` uint8 multi-hot (token counts,
+  so duplicated tokens average exactly like the string version)
+• ``theme_counts`` — same for themes
+• ``genre_totals`` / ``theme_totals`` — token count per row (0 = none)
+• ``format_idx`` / ``decade_idx`` — one column index, -1 if unknown
+
+Each anime's metadata is parsed once per process, then only re-parsed
+if its raw values change.  A profile becomes weight vectors over those
+vocabularies, and scoring a pool is a few array operations:
+
+    genre  = G[rows] @ w_genre / genre_totals      (0.5 if no data)
+    theme  = T[rows] @ w_theme / theme_totals      (0.5 if no data)
+    format = w_format[format_idx]                  (0.5 if no data)
+    era    = w_era[decade_idx]                     (0.5 if no data)
+    score  = 0.4·genre + 0.2·theme + 0.2·format + 0.2·era
+
+This reproduces ``rag._compute_preference_score`` (the scalar
+reference) exactly, up to float summation order (~1e-16) — identical
+after the 4-decimal rounding the API returns.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import Hashable, Iterable
+
+import numpy as np
+
+_GENRE_WEIGHT = 0.4
+_THEME_WEIGHT = 0.2
+_FORMAT_WEIGHT = 0.2
+_ERA_WEIGHT = 0.2
+# Same summation order as the scalar version
+_TOTAL_WEIGHT = sum([_GENRE_WEIGHT, _THEME_WEIGHT, _FORMAT_WEIGHT, _ERA_WEIGHT])
+
+
+class PreferenceFeatureIndex:
+    """Genre / theme / format / decade memberships for anime, by ``mal_id``.
+
+    Thread-safe: rows are added under a lock, and scoring reads a
+    consistent snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._row_of: dict[Hashable, int] = {}
+        self._raw: list[tuple] = []  # metadata values each row was parsed from
+
+        self._genres: dict[str, int] = {}
+        self._themes: dict[str, int] = {}
+        self._formats: dict[str, int] = {}
+        self._decades: dict[str, int] = {}
+
+        self._genre_counts = np.zeros((0, 0), dtype=np.uint8)
+        self._theme_counts = np.zeros((0, 0), dtype=np.uint8)
+        self._genre_totals = np.zeros(0, dtype=np.float64)
+        self._theme_totals = np.zeros(0, dtype=np.float64)
+        self._format_idx = np.zeros(0, dtype=np.int32)
+        self._decade_idx = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    # ── Building ─────────────────────────────────────────
+
+    def rows_for(self, items: Iterable[tuple[Hashable, dict]]) -> np.ndarray:
+        """Row indices for ``(mal_id, metadata)`` pairs, adding or
+        refreshing rows whose metadata is new or changed."""
+        items = list(items)
+        rows = np.empty(len(items), dtype=np.int64)
+        with self._lock:
+            for i, (key, metadata) in enumerate(items):
+                raw = _raw_values(metadata)
+                row = self._row_of.get(key)
+                if row is None:
+                    row = self._append_row()
+                    self._row_of[key] = row
+                    self._set_row(row, raw)
+                elif self._raw[row] != raw:
+                    self._set_row(row, raw)
+                rows[i] = row
+        return rows
+
+    def _append_row(self) -> int:
+        row = len(self._raw)
+        self._raw.append(())
+        if row >= len(self._format_idx):
+            capacity = max(64, 2 * len(self._format_idx))
+            self._genre_counts = _grow(self._genre_counts, capacity, self._genre_counts.shape[1])
+            self._theme_counts = _grow(self._theme_counts, capacity, self._theme_counts.shape[1])
+            self._genre_totals = _grow(self._genre_totals, capacity)
+            self._theme_totals = _grow(self._theme_totals, capacity)
+            self._format_idx = _grow(self._format_idx, capacity, fill=-1)
+            self._decade_idx = _grow(self._decade_idx, capacity, fill=-1)
+        return row
+
+    def _set_row(self, row: int, raw: tuple) -> None:
+        genres, themes, anime_type, year = raw
+        self._raw[row] = raw
+
+        self._genre_counts, self._genre_totals[row] = _set_tokens(
+            self._genre_counts, row, genres, self._genres,
+        )
+        self._theme_counts, self._theme_totals[row] = _set_tokens(
+            self._theme_counts, row, themes, self._themes,
+        )
+        self._format_idx[row] = _column(self._formats, anime_type) if anime_type else -1
+        # Same bucket string as the scalar version builds
+        self._decade_idx[row] = _column(self._decades, f"{(year // 10) * 10}s") if year else -1
+
+    def tag_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Unit-length genre + theme membership vectors of ``rows``.
+
+        Their dot products are tag cosine similarities — what the
+        retriever's MMR pass uses to tell near-duplicates apart.
+        Rows without tags are all zeros.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            vectors = np.hstack([
+                self._genre_counts[rows, : len(self._genres)],
+                self._theme_counts[rows, : len(self._themes)],
+            ]).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    # ── Scoring ──────────────────────────────────────────
+
+    def score(self, profile: dict, rows: np.ndarray) -> np.ndarray:
+        """Preference scores (0–1) of ``rows`` for one profile."""
+        return self.score_profiles([profile], rows)[0]
+
+    def score_profiles(self, profiles: list[dict], rows: np.ndarray) -> np.ndarray:
+        """Score ``rows`` for many profiles at once → ``(profiles, rows)``.
+
+        For offline batch scoring: the per-anime arrays are gathered
+        once and every profile is a row of a weight matrix.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            genres = dict(self._genres)
+            themes = dict(self._themes)
+            formats = dict(self._formats)
+            decades = dict(self._decades)
+            genre_counts = self._genre_counts[rows, : len(genres)].astype(np.float64)
+            theme_counts = self._theme_counts[rows, : len(themes)].astype(np.float64)
+            genre_totals = self._genre_totals[rows]
+            theme_totals = self._theme_totals[rows]
+            format_idx = self._format_idx[rows]
+            decade_idx = self._decade_idx[rows]
+
+        genre_aff = [_affinity_map(p.get("genre_affinity", [])) for p in profiles]
+        theme_aff = [_affinity_map(p.get("theme_affinity", [])) for p in profiles]
+        format_prefs = [p.get("preferred_formats", {}) for p in profiles]
+        era_prefs = [p.get("watch_era_preference", {}) for p in profiles]
+
+        genre = _average_affinity(genre_counts, genre_totals, genre_aff, genres)
+        theme = _average_affinity(theme_counts, theme_totals, theme_aff, themes)
+        fmt = _share_score(format_idx, format_prefs, formats, scale=2)
+        era = _share_score(decade_idx, era_prefs, decades, scale=3)
+
+        total = genre * _GENRE_WEIGHT + theme * _THEME_WEIGHT + fmt * _FORMAT_WEIGHT + era * _ERA_WEIGHT
+        return total / _TOTAL_WEIGHT
+
+
+_index: PreferenceFeatureIndex | None = None
+_index_lock = Lock()
+
+
+def get_preference_index() -> PreferenceFeatureIndex:
+    """The process-wide index (rows accumulate as anime are seen)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PreferenceFeatureIndex()
+        return _index
+
+
+def reset_preference_index() -> None:
+    """Drop the process-wide index (useful for testing)."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+# ═════════════════════════════════════════════════════════
+# Private helpers
+# ═════════════════════════════════════════════════════════
+
+
+def _raw_values(metadata: dict) -> tuple:
+    return (
+        metadata.get("genres") or "",
+        metadata.get("themes") or "",
+        metadata.get("anime_type") or "",
+        metadata.get("year"),
+    )
+
+
+def _column(vocab: dict[str, int], name: str) -> int:
+    if name not in vocab:
+        vocab[name] = len(vocab)
+    return vocab[name]
+
+
+def _set_tokens(
+    counts: np.ndarray,
+    row: int,
+    value: str,
+    vocab: dict[str, int],
+) -> tuple[np.ndarray, float]:
+    """Write one row's token counts; returns (matrix, token total)."""
+    counts[row] = 0
+    if not value:
+        return counts, 0.0
+    tokens = [t.strip() for t in value.split(",")]
+    columns = [_column(vocab, t) for t in tokens]
+    if len(vocab) > counts.shape[1]:
+        counts = _grow(counts, counts.shape[0], max(16, 2 * len(vocab)))
+    for column in columns:
+        counts[row, column] = min(int(counts[row, column]) + 1, 255)
+    return counts, float(len(tokens))
+
+
+def _grow(array: np.ndarray, rows: int, cols: int | None = None, fill: int = 0) -> np.ndarray:
+    shape = (rows,) if cols is None else (rows, cols)
+    grown = np.full(shape, fill, dtype=array.dtype)
+    if cols is None:
+        grown[: len(array)] = array
+    else:
+        grown[: array.shape[0], : array.shape[1]] = array
+    return grown
+
+
+def _affinity_map(entries: list[dict]) -> dict[str, float]:
+    return {e["genre"]: e.get("affinity", 0) for e in entries}
+
+
+def _average_affinity(
+    counts: np.ndarray,
+    totals: np.ndarray,
+    affinities: list[dict[str, float]],
+    vocab: dict[str, int],
+) -> np.ndarray:
+    """Mean affinity of each row's tokens, or 0.5 without data."""
+    names = sorted(vocab, key=vocab.get)
+    weights = np.array(
+        [[aff.get(name, 0) for name in names] for aff in affinities],
+        dtype=np.float64,
+    ).reshape(len(affinities), len(names))
+    sums = weights @ counts.T  # (profiles, rows)
+    has_data = (totals > 0)[None, :] & np.array([bool(a) for a in affinities])[:, None]
+    return np.where(has_data, sums / np.where(totals > 0, totals, 1.0), 0.5)
+
+
+def _share_score(
+    idx: np.ndarray,
+    prefs: list[dict[str, int]],
+    vocab: dict[str, int],
+    scale: int,
+) -> np.ndarray:
+    """``min(share × scale, 1)`` of each row's bucket, or 0.5 without data."""
+    names = sorted(vocab, key=vocab.get)
+    # One extra trailing column so idx == -1 gathers a harmless value
+    weights = np.zeros((len(prefs), len(names) + 1), dtype=np.float64)
+    for p, counts in enumerate(prefs):
+        total = sum(counts.values())
+        for column, name in enumerate(names):
+            ratio = counts.get(name, 0) / total if total else 0
+            weights[p, column] = min(ratio * scale, 1.0)
+    gathered = weights[:, idx]  # (profiles, rows)
+    has_data = (idx >= 0)[None, :] & np.array([bool(c) for c in prefs])[:, None]
+    return np.where(has_data, gathered, 0.5)
@@ -31,25 +31,86 @@ Design decisions
 1. **Multiple search queries** — We generate several queries from
    different angles of the user's profile (top genres, favorite
    shows, themes) and merge results.  This gives broader coverage
-   than a single query.
+   than a single query.  ``fuse_results`` merges them by best
+   similarity, or with rank fusion that rewards anime several
+   queries agree on (``RETRIEVAL_FUSION``).  With
+   ``LEXICAL_SEARCH_ENABLED`` each query is also matched against a
+   BM25 index, so exact titles and studios land (``lexical_index``).
+   Ranked pools are cached per profile fingerprint
+   (``retrieval_cache``), so repeat generations skip all of this.
+   With ``TASTE_VECTOR_MODE`` the top-shows query is replaced by a
+   search with the user's cached taste vector (``taste_vector``).
+   With ``COLLAB_ENABLED``, anime other users co-liked with the
+   profile's top-10 join as one more list (``collaborative_index``).
 
 2. **Watched anime exclusion** — We pass the user's watched MAL IDs
-   and filter them out post-retrieval (ChromaDB doesn't support
-   "NOT IN" filters on metadata, so we filter in Python).
+   into the search itself (``exclude_ids``), so each query's top-k is
+   computed over unseen anime only.  Power users with 1,500 completed
+   shows used to get a tiny pool when we dropped watched titles after
+   fetching the top 50.
+   With ``FRANCHISE_DEDUP_ENABLED`` the whole franchise of every
+   watched anime is excluded (sequels, recaps), and the pool keeps
+   one entry per franchise (``franchise_index``).
+   The per-query fetch is sized from the share of the filtered
+   catalog the user excludes (``plan_fetch_k``), and deepens in
+   rounds while the pool is short of k (``RETRIEVAL_ADAPTIVE_FETCH``).
+   Each round's searches run concurrently with their own deadlines; a
+   slow one is dropped rather than stalling the job (``search_pool``).
 
 3. **Preference-weighted re-ranking** — After vector search, we
    boost results that align with the user's genre/theme preferences.
    This combines semantic similarity (from embeddings) with
    collaborative signals (from their watch history).
 
-4. **Pure functions where possible** — Query building and re-ranking
+4. **Diversified ordering** — With ``RETRIEVAL_MMR_ENABLED`` the
+   ranked pool is re-ordered by maximal marginal relevance, so the
+   top k aren't five shows from the same genre cluster
+   (``diversify_candidates``).  A varied k can then replace the 3×k
+   pool the LLM used to pick from (``RECOMMEND_CANDIDATE_MULTIPLIER``).
+
+5. **Pure functions where possible** — Query building and re-ranking
    are pure functions, easy to test without a vector store.
 """
 
 from __future__ import annotations
 
+import asyncio
+import math
+from dataclasses import dataclass
+from time import perf_counter
+
+import numpy as np
+
+from app.core.config import settings
 from app.core.logging import logger
-from app.services.vector_store import search_anime
+from app.core.metrics import increment
+from app.services.catalog_stats import get_catalog_scores
+from app.services.collaborative_index import get_collab_index
+from app.services.franchise_index import FranchiseIndex, get_franchise_index
+from app.services.lexical_index import LexicalMatch, blend_lexical, get_lexical_index
+from app.services.preference_index import get_preference_index
+from app.services.retrieval_cache import (
+    RetrievalCache,
+    current_index_version,
+    get_retrieval_cache,
+    retrieval_cache_key,
+)
+from app.services.search_pool import fan_out, search_timeout
+from app.services.taste_vector import get_taste_vector_mode
+from app.services.vector_store import (
+    awarm_query_embeddings,
+    get_vector_backend,
+    search_anime_by_vectors,
+    search_anime_many,
+)
+
+# Used when a profile yields no queries; also pre-embedded at warm-up
+FALLBACK_QUERY = "highly rated popular anime"
+
+FUSION_METHODS = ("max", "rrf", "weighted")
+# Community-score floor for candidates unless the caller overrides it
+DEFAULT_MIN_SCORE = 7.0
+_MAX_FIRST_PAGE = 50  # per query, before scaling for exclusions
 
 
 # ═════════════════════════════════════════════════════════
@@ -61,8 +122,13 @@ def retrieve_candidates(
     preference_profile: dict,
     watched_mal_ids: set[int] | None = None,
     k: int = 30,
-    min_score: float | None = 7.0,
+    min_score: float | None = DEFAULT_MIN_SCORE,
     custom_query: str | None = None,
+    fusion: str | None = None,
+    fetch_k: int | None = None,
+    taste_vector: list[float] | None = None,
+    stats: dict | None = None,
+    deadline: float | None = None,
 ) -> list[dict]:
     """Retrieve anime candidates for recommendation.
 
@@ -82,6 +148,26 @@ def retrieve_candidates(
         custom_query: Optional custom search query (overrides auto-
             generated queries).  Used for conversational follow-ups
             like "something darker" or "more like Steins;Gate".
+        fusion: How per-query results are merged — ``"max"``,
+            ``"rrf"`` or ``"weighted"`` (see ``fuse_results``).
+            Defaults to ``RETRIEVAL_FUSION``.
+        fetch_k: Results fetched per query in the first round.
+            Defaults to ``plan_fetch_k`` — sized from ``k`` and the
+            share of the filtered catalog the user excludes.  Doubles
+            each round while the pool is short of ``k`` (see
+            ``RETRIEVAL_ADAPTIVE_FETCH``).
+        taste_vector: The user's taste vector (see ``taste_vector``).
+            Searched directly in place of the top-shows query — or of
+            every query with ``TASTE_VECTOR_MODE=only``.  Ignored for
+            custom queries.
+        stats: Optional dict filled with how the pool was gathered:
+            ``fetch_k`` (last round's), ``rounds``,
+            ``excluded_fraction``, ``dropped_searches`` and ``cached``.
+        deadline: ``perf_counter`` time retrieval must finish by (the
+            job's budget).  Searches run concurrently, each with its
+            own timeout (``search_pool.search_timeout``) capped at
+            this; one that misses it is dropped and the pool is built
+            from the rest.
 
     Returns:
         List of candidate dicts, sorted by combined score (descending).
@@ -94,53 +180,160 @@ def retrieve_candidates(
         - ``preference_score``: float (from re-ranking)
         - ``combined_score``: float (weighted combination)
     """
-    watched_mal_ids = watched_mal_ids or set()
+    stats = {} if stats is None else stats
+    started = perf_counter()
+    plan = _plan_retrieval(
+        preference_profile, watched_mal_ids, k, min_score, custom_query,
+        fusion, fetch_k, taste_vector, stats,
+    )
+    if plan.result is not None:
+        return plan.result
+    return _run_retrieval(plan, stats, started, deadline)
+
+
+async def aretrieve_candidates(
+    preference_profile: dict,
+    watched_mal_ids: set[int] | None = None,
+    k: int = 30,
+    min_score: float | None = DEFAULT_MIN_SCORE,
+    custom_query: str | None = None,
+    fusion: str | None = None,
+    fetch_k: int | None = None,
+    taste_vector: list[float] | None = None,
+    stats: dict | None = None,
+    deadline: float | None = None,
+) -> list[dict]:
+    """Async ``retrieve_candidates`` — same arguments, same result.
 
-    # Build metadata filter
-    filter_dict = {}
-    if min_score is not None:
-        filter_dict["mal_score_gte"] = min_score
+    Embedding the queries is retrieval's one network wait; here it's
+    awaited into the query cache (``awarm_query_embeddings``), and the
+    searches, fusion and re-ranking run in a worker thread that finds
+    every vector cached.  The thread is held for the in-process / SQL
+    search, not across an HTTP round-trip.
 
-    # Generate search queries
-    if custom_query:
-        queries = [custom_query]
-    else:
-        queries = build_search_queries(preference_profile)
+    Only what the first round will actually embed is warmed: nothing
+    on a retrieval-cache hit, and not the queries BM25 answers
+    confidently (see ``lexical_index``).
+    """
+    stats = {} if stats is None else stats
+    started = perf_counter()
+    plan = await asyncio.to_thread(
+        _plan_retrieval,
+        preference_profile, watched_mal_ids, k, min_score, custom_query,
+        fusion, fetch_k, taste_vector, stats,
+    )
+    if plan.result is not None:
+        return plan.result
+
+    to_embed = await asyncio.to_thread(_vector_queries, plan)
+    if to_embed:
+        try:
+            await awarm_query_embeddings(to_embed)
+        except Exception as exc:
+            # The search embeds for itself (and surfaces the error properly)
+            logger.warning("Could not pre-embed retrieval queries: %s", exc)
+    return await asyncio.to_thread(_run_retrieval, plan, stats, started, deadline)
+
+
+def plan_fetch_k(k: int, excluded_fraction: float = 0.0) -> int:
+    """First-page size per query: ``k × RETRIEVAL_FETCH_MULTIPLIER``
+    (at most 50), divided by the share of the filtered catalog still
+    open to the user — at most ×10, and never above
+    ``RETRIEVAL_MAX_FETCH_K``.
+
+    With the default multiplier, ``k=30`` fetches 30 for a new user
+    and 75 for one who has watched 60% of the 7.0+ catalog.
+    """
+    base = min(math.ceil(k * settings.RETRIEVAL_FETCH_MULTIPLIER), _MAX_FIRST_PAGE)
+    if settings.RETRIEVAL_ADAPTIVE_FETCH:
+        base = math.ceil(base / max(1.0 - excluded_fraction, 0.1))
+    return max(1, min(base, settings.RETRIEVAL_MAX_FETCH_K))
 
-    if not queries:
-        logger.warning("No search queries generated from profile")
-        return []
 
-    # Search with each query and merge results
-    # We fetch more than k per query because we'll deduplicate and filter
-    fetch_k = min(k * 2, 50)  # fetch extra to account for filtering
-    all_results: dict[int, dict] = {}  # mal_id → best result
+# ═════════════════════════════════════════════════════════
+# Fusion — merges the per-query result lists into one pool
+# ═════════════════════════════════════════════════════════
+
 
-    for query in queries:
-        results = search_anime(
-            query=query,
-            k=fetch_k,
-            filter_dict=filter_dict if filter_dict else None,
-        )
+def fuse_results(
+    result_lists: list[list[dict]],
+    method: str = "max",
+    weights: list[float] | None = None,
+    rrf_k: int | None = None,
+) -> list[dict]:
+    """Merge per-query search results into one candidate per anime.
 
-        for result in results:
-            mal_id = result.get("mal_id", 0)
+    Methods:
+
+    • ``max``      — keep the result with the best ``similarity_score``.
+      An anime found by all three queries gets no credit for it.
+    • ``rrf``      — reciprocal rank fusion: ``Σ w / (rrf_k + rank)``,
+      divided by its maximum (rank 1 in every query) so it is 0–1.
+      Rank-based, so it's immune to score scales differing per query.
+    • ``weighted`` — ``Σ w × similarity / Σ w``, where a query that
+      didn't return the anime contributes 0.
 
-            # Skip watched anime
-            if mal_id in watched_mal_ids:
+    For ``rrf`` / ``weighted`` the fused value is stored as
+    ``retrieval_score`` — it replaces ``similarity_score`` in the
+    combined score — and ``query_hits`` counts the queries that
+    returned the anime.  ``similarity_score`` stays the best raw
+    similarity either way.
+
+    Args:
+        result_lists: One ranked result list per query.
+        method: ``"max"``, ``"rrf"`` or ``"weighted"``.
+        weights: Per-query weights (default: all 1).
+        rrf_k: RRF damping constant (default ``RETRIEVAL_RRF_K``).
+
+    Returns:
+        Fused candidates (copies), in no particular order.
+
+    Raises:
+        ValueError: On an unknown ``method`` or mismatched ``weights``.
+    """
+    method = method.strip().lower()
+    if method not in FUSION_METHODS:
+        raise ValueError(
+            f"Unknown fusion method {method!r}. Use one of: {', '.join(FUSION_METHODS)}"
+        )
+    weights = [1.0] * len(result_lists) if weights is None else list(weights)
+    if len(weights) != len(result_lists):
+        raise ValueError("weights must have one entry per result list")
+    rrf_k = settings.RETRIEVAL_RRF_K if rrf_k is None else rrf_k
+
+    best: dict[int, dict] = {}   # mal_id → best-similarity result
+    fused: dict[int, float] = {}
+    hits: dict[int, int] = {}
+    for results, weight in zip(result_lists, weights):
+        seen: set[int] = set()
+        for rank, result in enumerate(results, start=1):
+            mal_id = result.get("mal_id", 0)
+            if mal_id in seen:
                 continue
+            seen.add(mal_id)
 
-            # Keep the result with the highest similarity score
-            if mal_id not in all_results or result["similarity_score"] > all_results[mal_id]["similarity_score"]:
-                all_results[mal_id] = result
+            if mal_id not in best or result["similarity_score"] > best[mal_id]["similarity_score"]:
+                best[mal_id] = result
+            hits[mal_id] = hits.get(mal_id, 0) + 1
+            if method == "rrf":
+                fused[mal_id] = fused.get(mal_id, 0.0) + weight / (rrf_k + rank)
+            elif method == "weighted":
+                fused[mal_id] = fused.get(mal_id, 0.0) + weight * result["similarity_score"]
 
-    # Re-rank by preference alignment
-    candidates = list(all_results.values())
-    candidates = rerank_by_preferences(candidates, preference_profile)
+    if method == "max":
+        return [dict(result) for result in best.values()]
 
-    # Sort by combined score and return top k
-    candidates.sort(key=lambda x: x.get("combined_score", 0), reverse=True)
-    return candidates[:k]
+    if method == "rrf":
+        norm = sum(w / (rrf_k + 1) for w in weights)
+    else:
+        norm = sum(weights)
+    candidates = []
+    for mal_id, result in best.items():
+        candidate = dict(result)
+        candidate["retrieval_score"] = round(fused[mal_id] / norm, 4) if norm > 0 else 0.0
+        candidate["query_hits"] = hits[mal_id]
+        candidates.append(candidate)
+    return candidates
 
 
 # ═════════════════════════════════════════════════════════
@@ -190,7 +383,7 @@ def build_search_queries(profile: dict) -> list[str]:
 
     # Fallback: if no queries could be generated
     if not queries:
-        queries.append("highly rated popular anime")
+        queries.append(FALLBACK_QUERY)
 
     return queries
 
@@ -231,33 +424,448 @@ def rerank_by_preferences(
     Returns:
         Same list with ``preference_score`` and ``combined_score`` added.
     """
-    # Extract user's genre preferences as a lookup
-    genre_affinities = _get_genre_affinity_map(profile)
-    theme_affinities = _get_theme_affinity_map(profile)
-    preferred_formats = profile.get("preferred_formats", {})
-    era_prefs = profile.get("watch_era_preference", {})
-
-    for candidate in candidates:
-        metadata = candidate.get("metadata", {})
-        pref_score = _compute_preference_score(
-            metadata=metadata,
-            genre_affinities=genre_affinities,
-            theme_affinities=theme_affinities,
-            preferred_formats=preferred_formats,
-            era_prefs=era_prefs,
+    # Vectorised path: anime with a mal_id are scored in one pass over
+    # the precomputed multi-hot arrays (see preference_index).
+    keyed = [c for c in candidates if c.get("mal_id") is not None]
+    if keyed:
+        index = get_preference_index()
+        rows = index.rows_for((c["mal_id"], c.get("metadata", {})) for c in keyed)
+        for candidate, pref_score in zip(keyed, index.score(profile, rows).tolist()):
+            _set_scores(candidate, pref_score)
+
+    # Anything without a mal_id goes through the scalar reference
+    unkeyed = [c for c in candidates if c.get("mal_id") is None]
+    if unkeyed:
+        genre_affinities = _get_genre_affinity_map(profile)
+        theme_affinities = _get_theme_affinity_map(profile)
+        preferred_formats = profile.get("preferred_formats", {})
+        era_prefs = profile.get("watch_era_preference", {})
+        for candidate in unkeyed:
+            pref_score = _compute_preference_score(
+                metadata=candidate.get("metadata", {}),
+                genre_affinities=genre_affinities,
+                theme_affinities=theme_affinities,
+                preferred_formats=preferred_formats,
+                era_prefs=era_prefs,
+            )
+            _set_scores(candidate, pref_score)
+
+    return candidates
+
+
+# ═════════════════════════════════════════════════════════
+# Diversification — maximal marginal relevance over the
+# ranked pool
+# ═════════════════════════════════════════════════════════
+
+
+def diversify_candidates(
+    candidates: list[dict],
+    lambda_: float = 0.7,
+    k: int | None = None,
+) -> list[dict]:
+    """Re-order ranked candidates by maximal marginal relevance.
+
+    Each next pick maximises
+
+        λ × combined_score − (1 − λ) × max similarity to picks so far
+
+    where similarity is the cosine of genre + theme memberships (from
+    ``preference_index``; search hits carry no vectors).  λ = 1 keeps
+    the relevance order; lower λ trades relevance for variety.
+
+    The whole pool is ordered (unless ``k`` is given), so callers and
+    the retrieval cache can keep taking prefixes of it.
+
+    Args:
+        candidates: Re-ranked candidates (with ``combined_score``).
+        lambda_: Relevance vs. diversity trade-off, 0–1.
+        k: Stop after this many picks.
+
+    Returns:
+        The first ``k`` candidates in MMR order.
+    """
+    n = len(candidates)
+    if n <= 1:
+        return list(candidates)
+
+    relevance = np.array([c.get("combined_score", 0.0) for c in candidates], dtype=np.float64)
+    vectors = np.zeros((n, 0), dtype=np.float32)
+    keyed = [i for i, c in enumerate(candidates) if c.get("mal_id") is not None]
+    if keyed:
+        index = get_preference_index()
+        rows = index.rows_for(
+            (candidates[i]["mal_id"], candidates[i].get("metadata", {})) for i in keyed
         )
+        tags = index.tag_vectors(rows)
+        vectors = np.zeros((n, tags.shape[1]), dtype=np.float32)
+        vectors[keyed] = tags
+
+    order = mmr_order(relevance, vectors @ vectors.T, lambda_, k)
+    return [candidates[i] for i in order]
+
+
+def mmr_order(
+    relevance: np.ndarray,
+    similarity: np.ndarray,
+    lambda_: float,
+    k: int | None = None,
+) -> list[int]:
+    """Greedy MMR selection → indices in pick order.
+
+    One vectorised pass per pick: O(k × n) on top of the ``(n, n)``
+    similarity matrix.  Ties go to the earlier (better-ranked) index.
+    """
+    n = relevance.shape[0]
+    k = n if k is None else max(0, min(k, n))
+    max_similarity = np.zeros(n, dtype=np.float64)
+    available = np.ones(n, dtype=bool)
+    order: list[int] = []
+    for _ in range(k):
+        scores = lambda_ * relevance - (1.0 - lambda_) * max_similarity
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        order.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, similarity[pick], out=max_similarity)
+    return order
+
+
+# ═════════════════════════════════════════════════════════
+# Private helpers — search
+# ═════════════════════════════════════════════════════════
+
+
+@dataclass
+class _RetrievalPlan:
+    """Everything decided before the first search."""
+
+    profile: dict
+    custom_query: str | None
+    k: int
+    fusion: str
+    exclude_ids: set[int]  # watched + franchise expansion
+    franchises: FranchiseIndex | None
+    filter_dict: dict | None
+    queries: list[str]
+    taste_vector: list[float] | None
+    fetch_k: int
+    excluded_fraction: float
+    cache: RetrievalCache | None
+    cache_key: str | None
+    index_version: tuple
+    # Set when no search is needed: a cache hit, or nothing to search
+    result: list[dict] | None = None
+
+
+def _plan_retrieval(
+    preference_profile: dict,
+    watched_mal_ids: set[int] | None,
+    k: int,
+    min_score: float | None,
+    custom_query: str | None,
+    fusion: str | None,
+    fetch_k: int | None,
+    taste_vector: list[float] | None,
+    stats: dict,
+) -> _RetrievalPlan:
+    """Exclusions, cache lookup, filter, queries and first fetch depth."""
+    watched_mal_ids = watched_mal_ids or set()
+    fusion = fusion or settings.RETRIEVAL_FUSION
 
-        candidate["preference_score"] = round(pref_score, 4)
+    if custom_query or get_taste_vector_mode() == "off":
+        taste_vector = None
 
-        # Combined score: weighted blend of similarity and preference
-        sim_score = candidate.get("similarity_score", 0)
-        candidate["combined_score"] = round(
-            0.6 * sim_score + 0.4 * pref_score, 4
+    # Sequels and recaps of started franchises are excluded in the search
+    franchises = get_franchise_index() if settings.FRANCHISE_DEDUP_ENABLED else None
+    if franchises is not None:
+        watched_mal_ids = franchises.expand_exclusions(watched_mal_ids)
+
+    # Build metadata filter
+    filter_dict = {}
+    if min_score is not None:
+        filter_dict["mal_score_gte"] = min_score
+
+    plan = _RetrievalPlan(
+        profile=preference_profile,
+        custom_query=custom_query,
+        k=k,
+        fusion=fusion,
+        exclude_ids=watched_mal_ids,
+        franchises=franchises,
+        filter_dict=filter_dict or None,
+        queries=[],
+        taste_vector=taste_vector,
+        fetch_k=0,
+        excluded_fraction=0.0,
+        cache=get_retrieval_cache(),
+        cache_key=None,
+        index_version=(),
+    )
+
+    # Repeat generations with an unchanged profile reuse the ranked pool.
+    # Keyed on the requested fetch_k, not the adaptive one: that moves
+    # with every new exclusion, and the cache filters those itself.
+    if plan.cache is not None:
+        plan.cache_key = retrieval_cache_key(
+            preference_profile, custom_query, min_score, k, fusion, fetch_k, taste_vector,
+        )
+        plan.index_version = current_index_version()
+        cached = plan.cache.get(plan.cache_key, plan.index_version, watched_mal_ids, k)
+        if cached is not None:
+            stats.update(
+                fetch_k=None, rounds=0, excluded_fraction=None, dropped_searches=0, cached=True,
+            )
+            plan.result = cached
+            return plan
+
+    # Generate search queries
+    plan.queries = _retrieval_queries(preference_profile, custom_query, taste_vector)
+    if not plan.queries and taste_vector is None:
+        logger.warning("No search queries generated from profile")
+        plan.result = []
+        return plan
+
+    # We fetch more than k per query because we'll deduplicate and filter.
+    # Watched anime are excluded inside the search, but approximate
+    # indexes drop them after their walk, and franchise dedup drops
+    # more — so the first page grows with the excluded share.
+    plan.excluded_fraction = _excluded_fraction(watched_mal_ids, min_score)
+    if fetch_k is None:
+        fetch_k = plan_fetch_k(k, plan.excluded_fraction)
+    plan.fetch_k = max(1, min(fetch_k, settings.RETRIEVAL_MAX_FETCH_K))
+    return plan
+
+
+def _run_retrieval(
+    plan: _RetrievalPlan,
+    stats: dict,
+    started: float,
+    deadline: float | None,
+) -> list[dict]:
+    """Search, deepening as needed, then rank, diversify and cache."""
+    # Deepen until the pool holds k candidates, the backends run dry,
+    # fetch_k hits its ceiling or the latency budget is spent.  Short
+    # lists mean "dry" when exclusions are applied before the top-k
+    # (the exact NumPy scan) or there are none; approximate indexes may
+    # drop excluded anime after their walk, and a deeper walk refills
+    # them — unless it added nothing (e.g. capped at hnsw.ef_search).
+    budget = settings.RETRIEVAL_DEEPEN_BUDGET_MS / 1000
+    exact = not plan.exclude_ids or get_vector_backend() == "numpy"
+    fetch_k = plan.fetch_k
+    rounds = 0
+    pooled = 0
+    while True:
+        rounds += 1
+        result_lists, dropped = _search_round(
+            plan.queries,
+            plan.taste_vector,
+            plan.profile if not plan.custom_query else None,
+            k=fetch_k,
+            filter_dict=plan.filter_dict,
+            exclude_ids=plan.exclude_ids,
+            timeout=search_timeout(deadline),
+        )
+        candidates = _rank_pool(
+            result_lists, plan.profile, plan.fusion, plan.exclude_ids, plan.franchises,
+        )
+        exhausted = exact and all(len(results) < fetch_k for results in result_lists)
+        stalled = rounds > 1 and 0 < len(candidates) <= pooled
+        pooled = len(candidates)
+        if (
+            len(candidates) >= plan.k
+            or exhausted
+            or stalled
+            or dropped  # a deeper search would be slower still
+            or not settings.RETRIEVAL_ADAPTIVE_FETCH
+            or fetch_k >= settings.RETRIEVAL_MAX_FETCH_K
+            or perf_counter() - started >= budget
+            or (deadline is not None and perf_counter() >= deadline)
+        ):
+            break
+        fetch_k = min(fetch_k * 2, settings.RETRIEVAL_MAX_FETCH_K)
+
+    if rounds > 1:
+        increment("retrieval_deepen_rounds", rounds - 1)
+    if len(candidates) < plan.k:
+        increment("retrieval_pool_short")
+    stats.update(
+        fetch_k=fetch_k,
+        rounds=rounds,
+        excluded_fraction=round(plan.excluded_fraction, 4),
+        dropped_searches=dropped,
+        cached=False,
+    )
+
+    if settings.RETRIEVAL_MMR_ENABLED:
+        candidates = diversify_candidates(candidates, settings.RETRIEVAL_MMR_LAMBDA)
+    # A pool missing a timed-out search isn't worth serving again
+    if plan.cache is not None and not dropped:
+        plan.cache.put(plan.cache_key, plan.index_version, plan.exclude_ids, candidates)
+    return candidates[:plan.k]
+
+
+def _vector_queries(plan: _RetrievalPlan) -> list[str]:
+    """The plan's queries the first round sends to vector search —
+    all but those BM25 answers confidently."""
+    matches = _lexical_matches(plan.queries, plan.fetch_k, plan.filter_dict, plan.exclude_ids)
+    if matches is None:
+        return list(plan.queries)
+    return [q for q, m in zip(plan.queries, matches) if not m.confident]
+
+
+def _lexical_matches(
+    queries: list[str],
+    k: int,
+    filter_dict: dict | None,
+    exclude_ids: set[int],
+) -> list[LexicalMatch] | None:
+    """BM25 matches per query; ``None`` without a lexical index."""
+    index = get_lexical_index() if settings.LEXICAL_SEARCH_ENABLED else None
+    if index is None:
+        return None
+    return [
+        index.match(query, k=k, filter_dict=filter_dict, exclude_ids=exclude_ids)
+        for query in queries
+    ]
+
+
+def _excluded_fraction(exclude_ids: set[int], min_score: float | None) -> float:
+    """Share of the filtered catalog in ``exclude_ids`` (0 while the
+    catalog score table isn't loaded)."""
+    if not exclude_ids or not settings.RETRIEVAL_ADAPTIVE_FETCH:
+        return 0.0
+    table = get_catalog_scores()
+    if table is None:
+        return 0.0
+    return table.excluded_fraction(exclude_ids, min_score)
+
+
+def _search_round(
+    queries: list[str],
+    taste_vector: list[float] | None,
+    collab_profile: dict | None,
+    k: int,
+    filter_dict: dict | None,
+    exclude_ids: set[int],
+    timeout: float,
+) -> tuple[list[list[dict]], int]:
+    """Every result list for one fetch depth: text queries, the taste
+    vector and (given a profile) collaborative hits.
+
+    The text queries (one batched embedding + search) and the taste
+    vector search run concurrently, each dropped if it takes longer
+    than ``timeout`` (see ``search_pool``).  Collaborative hits are an
+    in-memory lookup and run inline.  Query embeddings are cached, so
+    a deeper round re-runs only the searches themselves.
+
+    Returns the result lists and how many searches were dropped.
+    """
+    tasks = []
+    if queries:
+        tasks.append((
+            "profile queries",
+            lambda: _search_queries(queries, k=k, filter_dict=filter_dict, exclude_ids=exclude_ids),
+        ))
+    if taste_vector is not None:
+        tasks.append((
+            "taste vector",
+            lambda: search_anime_by_vectors(
+                [taste_vector], k=k, filter_dict=filter_dict, exclude_ids=exclude_ids,
+            ),
+        ))
+    outcomes = fan_out(tasks, timeout)
+
+    result_lists = [results for lists in outcomes if lists is not None for results in lists]
+    if collab_profile is not None:
+        collab_hits = _collaborative_hits(
+            collab_profile, k=k, filter_dict=filter_dict, exclude_ids=exclude_ids,
         )
+        if collab_hits:
+            result_lists.append(collab_hits)
+    return result_lists, sum(lists is None for lists in outcomes)
+
+
+def _rank_pool(
+    result_lists: list[list[dict]],
+    profile: dict,
+    fusion: str,
+    exclude_ids: set[int],
+    franchises: FranchiseIndex | None,
+) -> list[dict]:
+    """Fuse, re-rank and sort one round's results (one per franchise)."""
+    # Backends already exclude watched anime — cheap safety net
+    result_lists = [
+        [r for r in results if r.get("mal_id", 0) not in exclude_ids]
+        for results in result_lists
+    ]
+    candidates = fuse_results(result_lists, method=fusion)
 
+    # Re-rank by preference alignment
+    candidates = rerank_by_preferences(candidates, profile)
+    candidates.sort(key=lambda x: x.get("combined_score", 0), reverse=True)
+    if franchises is not None:
+        pooled = len(candidates)
+        candidates = franchises.collapse(candidates)
+        increment("franchise_candidates_collapsed", pooled - len(candidates))
     return candidates
 
 
+def _search_queries(
+    queries: list[str],
+    k: int,
+    filter_dict: dict | None,
+    exclude_ids: set[int],
+) -> list[list[dict]]:
+    """One result list per query — vector search, hybrid with BM25 when
+    the lexical index is loaded (see ``lexical_index``)."""
+    matches = _lexical_matches(queries, k, filter_dict, exclude_ids)
+    if matches is None:
+        return search_anime_many(queries, k=k, filter_dict=filter_dict, exclude_ids=exclude_ids)
+
+    vector_queries = [q for q, m in zip(queries, matches) if not m.confident]
+    vector_lists = iter(
+        search_anime_many(vector_queries, k=k, filter_dict=filter_dict, exclude_ids=exclude_ids)
+        if vector_queries else []
+    )
+
+    result_lists = []
+    for query, match in zip(queries, matches):
+        if match.confident:
+            logger.info("Lexical match for %r — skipped embedding", query)
+            increment("lexical_embedding_skipped")
+            result_lists.append(match.hits)
+        else:
+            result_lists.append(
+                blend_lexical(next(vector_lists), match.hits, settings.LEXICAL_WEIGHT, k)
+            )
+    return result_lists
+
+
+def _collaborative_hits(
+    profile: dict,
+    k: int,
+    filter_dict: dict | None,
+    exclude_ids: set[int],
+) -> list[dict]:
+    """Anime co-liked with the profile's top-10, weighted by score.
+
+    Empty when collaborative filtering is off or its index isn't
+    loaded yet.  A few sparse row lookups — no embedding, no search.
+    """
+    if not settings.COLLAB_ENABLED:
+        return []
+    index = get_collab_index()
+    if index is None:
+        return []
+    seeds = [
+        (show["mal_anime_id"], float(show.get("user_score") or 0))
+        for show in profile.get("top_10", [])
+        if show.get("mal_anime_id")
+    ]
+    return index.recommend(seeds, k=k, filter_dict=filter_dict, exclude_ids=exclude_ids)
+
+
 # ═════════════════════════════════════════════════════════
 # Private helpers — query building
 # ═════════════════════════════════════════════════════════
@@ -282,6 +890,31 @@ def _build_genre_query(profile: dict) -> str | None:
     return f"{genre_str} anime with compelling stories and high quality"
 
 
+def _retrieval_queries(
+    profile: dict,
+    custom_query: str | None,
+    taste_vector: list[float] | None,
+) -> list[str]:
+    """The text queries ``retrieve_candidates`` searches with."""
+    if custom_query:
+        return [custom_query]
+    if taste_vector is not None:
+        return _queries_beside_taste_vector(profile)
+    return build_search_queries(profile)
+
+
+def _queries_beside_taste_vector(profile: dict) -> list[str]:
+    """Text queries still embedded when a taste vector is searched.
+
+    The taste vector stands in for the top-shows query (and for the
+    fallback); in ``only`` mode it stands in for everything.
+    """
+    if get_taste_vector_mode() == "only":
+        return []
+    replaced = {_build_top_shows_query(profile), FALLBACK_QUERY}
+    return [q for q in build_search_queries(profile) if q not in replaced]
+
+
 def _build_top_shows_query(profile: dict) -> str | None:
     """Build a search query from the user's top-rated shows.
 
@@ -324,6 +957,19 @@ def _build_theme_query(profile: dict) -> str | None:
 # ═════════════════════════════════════════════════════════
 
 
+def _set_scores(candidate: dict, pref_score: float) -> None:
+    """Attach ``preference_score`` and the 60/40 ``combined_score``.
+
+    A fused ``retrieval_score`` (see ``fuse_results``) takes the place
+    of ``similarity_score`` when present.
+    """
+    candidate["preference_score"] = round(pref_score, 4)
+    sim_score = candidate.get("retrieval_score", candidate.get("similarity_score", 0))
+    candidate["combined_score"] = round(
+        0.6 * sim_score + 0.4 * pref_score, 4
+    )
+
+
 def _get_genre_affinity_map(profile: dict) -> dict[str, float]:
     """Convert genre_affinity list to a {genre: affinity} lookup."""
     return {
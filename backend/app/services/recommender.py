@@ -28,6 +28,12 @@ Architecture
 ────────────
 • ``get_llm()`` — lazy singleton for the ChatOpenAI instance
 • ``generate_recommendations()`` — main entry point (orchestrator)
+• ``agenerate_recommendations()`` — the same pipeline for the event
+  loop: embedding and LLM calls are awaited (``ainvoke``), not run on
+  a blocked thread
+• ``astream_recommendations()`` — the async pipeline with the LLM
+  call streamed: each recommendation is yielded as soon as its JSON
+  object closes in the output, not after the whole array
 • ``build_system_prompt()`` — tells the LLM its role and output format
 • ``build_user_prompt()`` — constructs the context-rich prompt
 • ``parse_recommendations()`` — extracts structured data from LLM output
@@ -39,14 +45,18 @@ thoroughly without mocking the LLM or vector store.
 
 from __future__ import annotations
 
+import asyncio
 import json
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from time import perf_counter
+from typing import AsyncIterator
 
 from app.core.config import settings
 from app.core.logging import logger
 from app.core.metrics import record_llm_usage
-from app.services.rag import retrieve_candidates
+from app.services.json_stream import JSONArrayStream
+from app.services.rag import aretrieve_candidates, retrieve_candidates
 
 
 @dataclass
@@ -127,6 +137,14 @@ def reset_llm() -> None:
     _llm = None
 
 
+def candidate_pool_size(num_recommendations: int) -> int:
+    """Candidates to retrieve for the LLM to pick ``num_recommendations`` from."""
+    return max(
+        num_recommendations,
+        math.ceil(num_recommendations * settings.RECOMMEND_CANDIDATE_MULTIPLIER),
+    )
+
+
 # ═════════════════════════════════════════════════════════
 # Main entry point
 # ═════════════════════════════════════════════════════════
@@ -140,6 +158,8 @@ def generate_recommendations(
     timeout_budget_seconds: int | None = None,
     max_input_chars: int | None = None,
     max_estimated_cost_usd: float | None = None,
+    taste_vector: list[float] | None = None,
+    retrieval_stats: dict | None = None,
 ) -> list[dict]:
     """Generate personalised anime recommendations with reasoning.
 
@@ -160,6 +180,10 @@ def generate_recommendations(
         custom_query: Optional custom search query for the retriever.
             Used for functional buttons like "more action anime" or
             "something shorter".  Overrides auto-generated queries.
+        taste_vector: The user's cached taste vector, searched in place
+            of the top-shows query (see ``services/taste_vector.py``).
+        retrieval_stats: Optional dict the retriever fills with its
+            fetch depth and round count (see ``retrieve_candidates``).
 
     Returns:
         List of recommendation dicts, each containing:
@@ -176,8 +200,245 @@ def generate_recommendations(
         RuntimeError: If OPENAI_API_KEY is not configured.
         ValueError: If no candidates could be retrieved.
     """
-    watched_mal_ids = watched_mal_ids or set()
+    # ── Steps 1 & 2: Retrieve candidates, build the prompt ─
+    generation = _prepare_generation(
+        _Generation.start(
+            preference_profile, watched_mal_ids, num_recommendations, custom_query,
+            timeout_budget_seconds, max_input_chars, max_estimated_cost_usd,
+            taste_vector, retrieval_stats,
+        )
+    )
+
+    # ── Step 3 & 4: Call LLM and parse (with retry) ─────
+    #
+    # Why retry?
+    # ──────────
+    # LLMs are probabilistic — they usually return valid JSON,
+    # but sometimes they don't (partial response, commentary,
+    # wrong format).  We retry once with a stricter prompt.
+    # If that also fails, we fall back to a deterministic
+    # response built from the retriever's candidates (no LLM).
+    #
+    # This guarantees the user ALWAYS gets recommendations,
+    # even if the LLM is having a bad day.
+
+    recommendations = call_llm_with_retry(
+        system_prompt=generation.system_prompt,
+        user_prompt=generation.user_prompt,
+        candidates=generation.candidates,
+        num_recommendations=num_recommendations,
+        timeout_budget_seconds=generation.remaining(),
+    )
+
+    record_llm_usage(**generation.usage)
+
+    logger.info(
+        "Final result: %d recommendations",
+        len(recommendations),
+    )
+
+    return recommendations
+
+
+async def agenerate_recommendations(
+    preference_profile: dict,
+    watched_mal_ids: set[int] | None = None,
+    num_recommendations: int = 10,
+    custom_query: str | None = None,
+    timeout_budget_seconds: int | None = None,
+    max_input_chars: int | None = None,
+    max_estimated_cost_usd: float | None = None,
+    taste_vector: list[float] | None = None,
+    retrieval_stats: dict | None = None,
+) -> list[dict]:
+    """Async ``generate_recommendations`` — same arguments, same result.
+
+    For the API's background jobs, which run on the event loop: the
+    query embedding and the LLM call (3–45 s) are awaited, so a
+    generation holds no thread while it waits on OpenAI
+    (see ``aretrieve_candidates`` / ``acall_llm_with_retry``).
+    """
+    generation = await _aprepare_generation(
+        _Generation.start(
+            preference_profile, watched_mal_ids, num_recommendations, custom_query,
+            timeout_budget_seconds, max_input_chars, max_estimated_cost_usd,
+            taste_vector, retrieval_stats,
+        )
+    )
+
+    recommendations = await acall_llm_with_retry(
+        system_prompt=generation.system_prompt,
+        user_prompt=generation.user_prompt,
+        candidates=generation.candidates,
+        num_recommendations=num_recommendations,
+        timeout_budget_seconds=generation.remaining(),
+    )
+
+    record_llm_usage(**generation.usage)
+
+    logger.info("Final result: %d recommendations", len(recommendations))
+    return recommendations
+
+
+async def astream_recommendations(
+    preference_profile: dict,
+    watched_mal_ids: set[int] | None = None,
+    num_recommendations: int = 10,
+    custom_query: str | None = None,
+    timeout_budget_seconds: int | None = None,
+    max_input_chars: int | None = None,
+    max_estimated_cost_usd: float | None = None,
+    taste_vector: list[float] | None = None,
+    retrieval_stats: dict | None = None,
+) -> AsyncIterator[dict]:
+    """Streaming ``agenerate_recommendations`` — yields each
+    recommendation as soon as the LLM has finished writing it.
+
+    Same arguments, guardrails and (collected) result; only the LLM
+    call differs (see ``astream_llm_recommendations``).  Time to the
+    first recommendation drops from the whole generation to roughly
+    one item's worth of tokens.
+    """
+    generation = await _aprepare_generation(
+        _Generation.start(
+            preference_profile, watched_mal_ids, num_recommendations, custom_query,
+            timeout_budget_seconds, max_input_chars, max_estimated_cost_usd,
+            taste_vector, retrieval_stats,
+        )
+    )
+
+    total = 0
+    async for recommendation in astream_llm_recommendations(
+        system_prompt=generation.system_prompt,
+        user_prompt=generation.user_prompt,
+        candidates=generation.candidates,
+        num_recommendations=num_recommendations,
+        timeout_budget_seconds=generation.remaining(),
+    ):
+        total += 1
+        yield recommendation
+
+    record_llm_usage(**generation.usage)
+
+    logger.info("Final result: %d recommendations (streamed)", total)
+
+
+@dataclass
+class _Generation:
+    """One request through the steps every entry point shares.
+
+    ``start`` applies the request guardrails and fills budgets from
+    settings; ``_prepare_generation`` / ``_aprepare_generation``
+    retrieve candidates and build the prompts within budget.  The
+    entry points differ only in the LLM call that follows.
+    """
 
+    preference_profile: dict
+    watched_mal_ids: set[int]
+    num_recommendations: int
+    custom_query: str | None
+    taste_vector: list[float] | None
+    retrieval_stats: dict | None
+    timeout_budget_seconds: float
+    max_input_chars: int
+    max_estimated_cost_usd: float
+    started: float = field(default_factory=perf_counter)
+    # Filled by ``prepare``
+    candidates: list[dict] = field(default_factory=list)
+    system_prompt: str = ""
+    user_prompt: str = ""
+    usage: dict = field(default_factory=dict)
+
+    @classmethod
+    def start(
+        cls,
+        preference_profile: dict,
+        watched_mal_ids: set[int] | None,
+        num_recommendations: int,
+        custom_query: str | None,
+        timeout_budget_seconds: int | None,
+        max_input_chars: int | None,
+        max_estimated_cost_usd: float | None,
+        taste_vector: list[float] | None,
+        retrieval_stats: dict | None,
+    ) -> _Generation:
+        _check_request_limits(num_recommendations, custom_query)
+        timeout_budget_seconds, max_input_chars, max_estimated_cost_usd = _resolve_budgets(
+            timeout_budget_seconds, max_input_chars, max_estimated_cost_usd,
+        )
+        return cls(
+            preference_profile=preference_profile,
+            watched_mal_ids=watched_mal_ids or set(),
+            num_recommendations=num_recommendations,
+            custom_query=custom_query,
+            taste_vector=taste_vector,
+            retrieval_stats=retrieval_stats,
+            timeout_budget_seconds=timeout_budget_seconds,
+            max_input_chars=max_input_chars,
+            max_estimated_cost_usd=max_estimated_cost_usd,
+        )
+
+    def retrieval_kwargs(self) -> dict:
+        """Keyword arguments for the retriever, beside the profile."""
+        # We ask for more candidates than we need (3x by default) so the
+        # LLM has a good pool to choose from.  The retriever already
+        # excludes watched anime and re-ranks by preference fit (and, with
+        # MMR on, orders the pool for variety, so a smaller pool will do).
+        return {
+            "watched_mal_ids": self.watched_mal_ids,
+            "k": candidate_pool_size(self.num_recommendations),
+            "custom_query": self.custom_query,
+            "taste_vector": self.taste_vector,
+            "stats": self.retrieval_stats,
+            "deadline": self.started + self.timeout_budget_seconds,
+        }
+
+    def prepare(self, candidates: list[dict]) -> _Generation:
+        """Check the retrieved pool and build the prompts.
+
+        Raises:
+            ValueError: If no candidates were retrieved.
+            GuardrailError: If the prompt is over budget, or the budget
+                ran out before the LLM call.
+        """
+        _check_candidates(candidates, self.num_recommendations)
+        self.candidates = candidates
+        self.system_prompt, self.user_prompt, self.usage = _build_prompts_within_budget(
+            self.preference_profile,
+            candidates,
+            self.num_recommendations,
+            self.max_input_chars,
+            self.max_estimated_cost_usd,
+        )
+
+        if self.remaining() < 0:
+            raise GuardrailError(
+                code="UPSTREAM_TIMEOUT",
+                message="Recommendation pipeline timed out before LLM call.",
+            )
+        return self
+
+    def remaining(self) -> float:
+        """Seconds of the timeout budget left."""
+        return self.timeout_budget_seconds - (perf_counter() - self.started)
+
+
+def _prepare_generation(generation: _Generation) -> _Generation:
+    """Retrieve candidates and build the prompts for ``generation``."""
+    return generation.prepare(
+        retrieve_candidates(generation.preference_profile, **generation.retrieval_kwargs())
+    )
+
+
+async def _aprepare_generation(generation: _Generation) -> _Generation:
+    """``_prepare_generation`` with the query embedding awaited."""
+    return generation.prepare(
+        await aretrieve_candidates(generation.preference_profile, **generation.retrieval_kwargs())
+    )
+
+
+def _check_request_limits(num_recommendations: int, custom_query: str | None) -> None:
+    """Reject requests over the configured size limits."""
     if num_recommendations > settings.RECOMMEND_MAX_ITEMS_PER_REQUEST:
         raise GuardrailError(
             code="VALIDATION_ERROR",
@@ -193,27 +454,23 @@ def generate_recommendations(
             message="Custom query exceeds configured maximum length.",
         )
 
-    timeout_budget_seconds = timeout_budget_seconds or settings.RECOMMEND_JOB_TIMEOUT_SECONDS
-    max_input_chars = max_input_chars or settings.LLM_MAX_INPUT_CHARS
-    max_estimated_cost_usd = (
+
+def _resolve_budgets(
+    timeout_budget_seconds: int | None,
+    max_input_chars: int | None,
+    max_estimated_cost_usd: float | None,
+) -> tuple[int, int, float]:
+    """Fill unset budgets from settings."""
+    return (
+        timeout_budget_seconds or settings.RECOMMEND_JOB_TIMEOUT_SECONDS,
+        max_input_chars or settings.LLM_MAX_INPUT_CHARS,
         max_estimated_cost_usd
         if max_estimated_cost_usd is not None
-        else settings.LLM_MAX_ESTIMATED_COST_USD
+        else settings.LLM_MAX_ESTIMATED_COST_USD,
     )
 
-    started = perf_counter()
-
-    # ── Step 1: Retrieve candidates from vector store ────
-    # We ask for more candidates than we need (2-3x) so the LLM
-    # has a good pool to choose from.  The retriever already
-    # excludes watched anime and re-ranks by preference fit.
-    candidates = retrieve_candidates(
-        preference_profile=preference_profile,
-        watched_mal_ids=watched_mal_ids,
-        k=num_recommendations * 3,  # 3x for a good selection pool
-        custom_query=custom_query,
-    )
 
+def _check_candidates(candidates: list[dict], num_recommendations: int) -> None:
     if not candidates:
         logger.warning("No candidates retrieved from vector store")
         raise ValueError(
@@ -227,10 +484,22 @@ def generate_recommendations(
         num_recommendations,
     )
 
-    # ── Step 2: Build the prompt ─────────────────────────
+
+def _build_prompts_within_budget(
+    profile: dict,
+    candidates: list[dict],
+    num_recommendations: int,
+    max_input_chars: int,
+    max_estimated_cost_usd: float,
+) -> tuple[str, str, dict]:
+    """System + user prompts, and the usage estimate to record.
+
+    Raises:
+        GuardrailError: If the prompt or its estimated cost is over budget.
+    """
     system_prompt = build_system_prompt()
     user_prompt = build_user_prompt(
-        profile=preference_profile,
+        profile=profile,
         candidates=candidates,
         num_recommendations=num_recommendations,
     )
@@ -251,45 +520,12 @@ def generate_recommendations(
             message="Estimated LLM request cost exceeds configured budget.",
         )
 
-    if perf_counter() - started > timeout_budget_seconds:
-        raise GuardrailError(
-            code="UPSTREAM_TIMEOUT",
-            message="Recommendation pipeline timed out before LLM call.",
-        )
-
-    # ── Step 3 & 4: Call LLM and parse (with retry) ─────
-    #
-    # Why retry?
-    # ──────────
-    # LLMs are probabilistic — they usually return valid JSON,
-    # but sometimes they don't (partial response, commentary,
-    # wrong format).  We retry once with a stricter prompt.
-    # If that also fails, we fall back to a deterministic
-    # response built from the retriever's candidates (no LLM).
-    #
-    # This guarantees the user ALWAYS gets recommendations,
-    # even if the LLM is having a bad day.
-
-    recommendations = call_llm_with_retry(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        candidates=candidates,
-        num_recommendations=num_recommendations,
-        timeout_budget_seconds=timeout_budget_seconds,
-    )
-
-    record_llm_usage(
-        prompt_tokens=estimated_prompt_tokens,
-        completion_tokens=estimated_completion_tokens,
-        estimated_cost_usd=estimated_cost_usd,
-    )
-
-    logger.info(
-        "Final result: %d recommendations",
-        len(recommendations),
-    )
-
-    return recommendations
+    usage = {
+        "prompt_tokens": estimated_prompt_tokens,
+        "completion_tokens": estimated_completion_tokens,
+        "estimated_cost_usd": estimated_cost_usd,
+    }
+    return system_prompt, user_prompt, usage
 
 
 # ═════════════════════════════════════════════════════════
@@ -481,18 +717,7 @@ def parse_recommendations(
     Returns:
         List of validated, enriched recommendation dicts.
     """
-    # Build lookups for validation — by mal_id AND by title
-    # The title lookup is a fallback: if the LLM returns the right
-    # title but wrong mal_id (e.g. uses index number instead of
-    # actual mal_id), we can still match it.
-    candidate_lookup: dict[int, dict] = {
-        c["mal_id"]: c for c in candidates if c.get("mal_id")
-    }
-    title_lookup: dict[str, dict] = {}
-    for c in candidates:
-        title = (c.get("metadata", {}).get("title") or c.get("title", "")).lower().strip()
-        if title:
-            title_lookup[title] = c
+    candidate_lookup, title_lookup = _candidate_lookups(candidates)
 
     # ── Clean the response ───────────────────────────────
     cleaned = _clean_json_response(raw_response)
@@ -516,64 +741,9 @@ def parse_recommendations(
     recommendations: list[dict] = []
 
     for item in parsed:
-        if not isinstance(item, dict):
-            continue
-
-        mal_id = item.get("mal_id")
-        candidate = None
-
-        if mal_id and mal_id in candidate_lookup:
-            # Happy path: mal_id matches a candidate directly
-            candidate = candidate_lookup[mal_id]
-        else:
-            # Fallback: try to match by title instead.
-            # This catches the case where the LLM used the right title
-            # but wrong mal_id (e.g. used index number 1,2,3 instead
-            # of the actual 5-digit mal_id).
-            item_title = (item.get("title") or "").lower().strip()
-            if item_title and item_title in title_lookup:
-                candidate = title_lookup[item_title]
-                real_mal_id = candidate.get("mal_id", 0)
-                logger.info(
-                    "LLM used wrong mal_id=%s but title '%s' matched candidate mal_id=%s — correcting",
-                    mal_id,
-                    item.get("title"),
-                    real_mal_id,
-                )
-                mal_id = real_mal_id
-            else:
-                logger.warning(
-                    "LLM recommended mal_id=%s (title='%s') which is not in candidates, skipping",
-                    mal_id,
-                    item.get("title", "?"),
-                )
-                continue
-
-        # Enrich with metadata from the candidate
-        metadata = candidate.get("metadata", {})
-
-        recommendation = {
-            "mal_id": mal_id,
-            "title": item.get("title", metadata.get("title", "Unknown")),
-            "image_url": metadata.get("image_url"),
-            "genres": metadata.get("genres", ""),
-            "themes": metadata.get("themes", ""),
-            "synopsis": _truncate(
-                candidate.get("embedding_text", ""), max_length=300
-            ),
-            "mal_score": metadata.get("mal_score"),
-            "year": metadata.get("year"),
-            "anime_type": metadata.get("anime_type"),
-            "reasoning": _clean_reasoning(item.get("reasoning", "No reasoning provided.")),
-            "confidence": _validate_confidence(item.get("confidence", "medium")),
-            "similar_to": _clean_similar_to(item.get("similar_to", [])),
-            # Preserve scores from the retriever for transparency
-            "similarity_score": candidate.get("similarity_score", 0),
-            "preference_score": candidate.get("preference_score", 0),
-            "combined_score": candidate.get("combined_score", 0),
-        }
-
-        recommendations.append(recommendation)
+        recommendation = _recommendation_from_item(item, candidate_lookup, title_lookup)
+        if recommendation is not None:
+            recommendations.append(recommendation)
 
     return recommendations
 
@@ -613,7 +783,7 @@ def call_llm_with_retry(
     user_prompt: str,
     candidates: list[dict],
     num_recommendations: int,
-    timeout_budget_seconds: int,
+    timeout_budget_seconds: float,
 ) -> list[dict]:
     """Call the LLM with retry logic and deterministic fallback.
 
@@ -630,8 +800,6 @@ def call_llm_with_retry(
     Returns:
         List of recommendation dicts (always non-empty if candidates exist).
     """
-    from langchain_core.messages import HumanMessage, SystemMessage
-
     llm = get_llm()
     started = perf_counter()
 
@@ -644,68 +812,84 @@ def call_llm_with_retry(
                 message="LLM invocation exceeded timeout budget.",
             )
         try:
-            # On retry, add a correction message to guide the LLM
-            if attempt == 1:
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=user_prompt),
-                ]
-            else:
-                # Attempt 2: include the failed response and ask for correction
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=user_prompt),
-                    # Show the LLM its own failed response
-                    HumanMessage(
-                        content=(
-                            "Your previous response could not be parsed as valid JSON. "
-                            "Here is what you returned:\n\n"
-                            f"{last_raw_response[:500]}\n\n"
-                            "Please try again. Return ONLY a valid JSON array, "
-                            "no markdown fences, no extra text. Just the raw JSON array."
-                        )
-                    ),
-                ]
+            messages = _llm_messages(system_prompt, user_prompt, attempt, last_raw_response)
 
             logger.info("LLM attempt %d/%d...", attempt, MAX_LLM_RETRIES)
             response = llm.invoke(messages)
             last_raw_response = response.content
 
-            logger.info(
-                "LLM response received (attempt %d, %d chars)",
+            recommendations = _parse_llm_response(
+                last_raw_response, candidates, num_recommendations, attempt,
+            )
+            if recommendations:
+                return recommendations
+
+        except Exception as e:
+            logger.error(
+                "LLM call failed on attempt %d: %s",
                 attempt,
-                len(last_raw_response),
+                str(e),
             )
 
-            # Try to parse
-            recommendations = parse_recommendations(last_raw_response, candidates)
-            recommendations = _strict_validate_recommendations(
-                recommendations,
-                num_recommendations=num_recommendations,
+    # ── All LLM attempts failed — use deterministic fallback ──
+    logger.warning(
+        "All %d LLM attempts failed. Using deterministic fallback.",
+        MAX_LLM_RETRIES,
+    )
+    return _build_fallback_recommendations(candidates, num_recommendations)
+
+
+async def acall_llm_with_retry(
+    system_prompt: str,
+    user_prompt: str,
+    candidates: list[dict],
+    num_recommendations: int,
+    timeout_budget_seconds: float,
+    failed_response: str | None = None,
+) -> list[dict]:
+    """Async ``call_llm_with_retry`` — same attempts, same fallback.
+
+    Each attempt is ``await llm.ainvoke``, cut off when the remaining
+    budget runs out (the sync version can only check between
+    attempts); a cut-off attempt counts as a failed one.
+
+    ``failed_response`` is the output of a first attempt made
+    elsewhere (the streaming path); retrying then starts at the
+    corrective attempt 2.
+    """
+    llm = get_llm()
+    started = perf_counter()
+
+    last_raw_response = failed_response or ""
+    first_attempt = 1 if failed_response is None else 2
+
+    for attempt in range(first_attempt, MAX_LLM_RETRIES + 1):
+        remaining = timeout_budget_seconds - (perf_counter() - started)
+        if remaining < 0:
+            raise GuardrailError(
+                code="UPSTREAM_TIMEOUT",
+                message="LLM invocation exceeded timeout budget.",
             )
+        try:
+            messages = _llm_messages(system_prompt, user_prompt, attempt, last_raw_response)
 
-            if recommendations:
-                logger.info(
-                    "Successfully parsed %d recommendations on attempt %d",
-                    len(recommendations),
-                    attempt,
-                )
-                return recommendations
+            logger.info("LLM attempt %d/%d...", attempt, MAX_LLM_RETRIES)
+            response = await asyncio.wait_for(llm.ainvoke(messages), timeout=remaining)
+            last_raw_response = response.content
 
-            # Parsed but got 0 valid recommendations — retry
-            logger.warning(
-                "LLM returned parseable JSON but 0 valid recommendations (attempt %d)",
-                attempt,
+            recommendations = _parse_llm_response(
+                last_raw_response, candidates, num_recommendations, attempt,
             )
+            if recommendations:
+                return recommendations
 
         except Exception as e:
             logger.error(
                 "LLM call failed on attempt %d: %s",
                 attempt,
-                str(e),
+                str(e) or type(e).__name__,
             )
 
-    # ── All LLM attempts failed — use deterministic fallback ──
     logger.warning(
         "All %d LLM attempts failed. Using deterministic fallback.",
         MAX_LLM_RETRIES,
@@ -713,6 +897,153 @@ def call_llm_with_retry(
     return _build_fallback_recommendations(candidates, num_recommendations)
 
 
+async def astream_llm_recommendations(
+    system_prompt: str,
+    user_prompt: str,
+    candidates: list[dict],
+    num_recommendations: int,
+    timeout_budget_seconds: float,
+) -> AsyncIterator[dict]:
+    """Attempt 1 as a stream (``llm.astream``), validated element by element.
+
+    The output is fed through ``JSONArrayStream``; each array element
+    is matched against the candidates, strictly validated and yielded
+    the moment it closes.  Duplicates are dropped and the stream is
+    stopped once ``num_recommendations`` are out.
+
+    If nothing valid came out — unparseable output, an error before
+    the first element — ``acall_llm_with_retry`` takes over from the
+    corrective attempt 2, with its deterministic fallback.  Once
+    something has been sent it can't be taken back: a later error or
+    timeout ends the stream with what was sent, as the buffered path
+    returns however many of the LLM's picks were valid.
+    """
+    llm = get_llm()
+    started = perf_counter()
+    candidate_lookup, title_lookup = _candidate_lookups(candidates)
+    parser = JSONArrayStream()
+    raw_parts: list[str] = []
+    sent: set[int] = set()
+
+    logger.info("LLM attempt 1/%d (streamed)...", MAX_LLM_RETRIES)
+    chunks = llm.astream(_llm_messages(system_prompt, user_prompt, 1, ""))
+    try:
+        while len(sent) < num_recommendations and not parser.closed:
+            remaining = timeout_budget_seconds - (perf_counter() - started)
+            try:
+                chunk = await asyncio.wait_for(anext(chunks), timeout=max(remaining, 0))
+            except StopAsyncIteration:
+                break
+            raw_parts.append(chunk.content)
+
+            for item in parser.feed(chunk.content):
+                recommendation = _recommendation_from_item(item, candidate_lookup, title_lookup)
+                valid = _strict_validate_recommendations(
+                    [recommendation] if recommendation else [], num_recommendations=1,
+                )
+                if not valid or valid[0]["mal_id"] in sent:
+                    continue
+                sent.add(valid[0]["mal_id"])
+                yield valid[0]
+                if len(sent) >= num_recommendations:
+                    break
+    except asyncio.TimeoutError:
+        if not sent:
+            raise GuardrailError(
+                code="UPSTREAM_TIMEOUT",
+                message="LLM invocation exceeded timeout budget.",
+            )
+        logger.warning("LLM stream timed out after %d recommendations", len(sent))
+    except Exception as e:
+        logger.error("LLM stream failed: %s", str(e) or type(e).__name__)
+    finally:
+        await chunks.aclose()
+
+    if sent:
+        logger.info("Streamed %d recommendations on attempt 1", len(sent))
+        return
+
+    raw_response = "".join(raw_parts)
+    logger.warning(
+        "LLM stream produced 0 valid recommendations (%d chars) — retrying buffered",
+        len(raw_response),
+    )
+    for recommendation in await acall_llm_with_retry(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        candidates=candidates,
+        num_recommendations=num_recommendations,
+        timeout_budget_seconds=timeout_budget_seconds - (perf_counter() - started),
+        failed_response=raw_response,
+    ):
+        yield recommendation
+
+
+def _llm_messages(
+    system_prompt: str,
+    user_prompt: str,
+    attempt: int,
+    last_raw_response: str,
+) -> list:
+    """Messages for one attempt — a retry shows the LLM its failed output."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    if attempt == 1:
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt),
+        ]
+    # Attempt 2: include the failed response and ask for correction
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+        # Show the LLM its own failed response
+        HumanMessage(
+            content=(
+                "Your previous response could not be parsed as valid JSON. "
+                "Here is what you returned:\n\n"
+                f"{last_raw_response[:500]}\n\n"
+                "Please try again. Return ONLY a valid JSON array, "
+                "no markdown fences, no extra text. Just the raw JSON array."
+            )
+        ),
+    ]
+
+
+def _parse_llm_response(
+    raw: str,
+    candidates: list[dict],
+    num_recommendations: int,
+    attempt: int,
+) -> list[dict]:
+    """Parse and validate one attempt's output (empty → retry)."""
+    logger.info(
+        "LLM response received (attempt %d, %d chars)",
+        attempt,
+        len(raw),
+    )
+
+    recommendations = parse_recommendations(raw, candidates)
+    recommendations = _strict_validate_recommendations(
+        recommendations,
+        num_recommendations=num_recommendations,
+    )
+
+    if recommendations:
+        logger.info(
+            "Successfully parsed %d recommendations on attempt %d",
+            len(recommendations),
+            attempt,
+        )
+    else:
+        # Parsed but got 0 valid recommendations — retry
+        logger.warning(
+            "LLM returned parseable JSON but 0 valid recommendations (attempt %d)",
+            attempt,
+        )
+    return recommendations
+
+
 def _build_fallback_recommendations(
     candidates: list[dict],
     num_recommendations: int,
@@ -942,6 +1273,94 @@ def _format_candidates(candidates: list[dict]) -> str:
 # ═════════════════════════════════════════════════════════
 
 
+def _candidate_lookups(
+    candidates: list[dict],
+) -> tuple[dict[int, dict], dict[str, dict]]:
+    """Candidates by mal_id and by lower-cased title, for validation."""
+    # The title lookup is a fallback: if the LLM returns the right
+    # title but wrong mal_id (e.g. uses index number instead of
+    # actual mal_id), we can still match it.
+    candidate_lookup: dict[int, dict] = {
+        c["mal_id"]: c for c in candidates if c.get("mal_id")
+    }
+    title_lookup: dict[str, dict] = {}
+    for c in candidates:
+        title = (c.get("metadata", {}).get("title") or c.get("title", "")).lower().strip()
+        if title:
+            title_lookup[title] = c
+
+    return candidate_lookup, title_lookup
+
+
+def _recommendation_from_item(
+    item: object,
+    candidate_lookup: dict[int, dict],
+    title_lookup: dict[str, dict],
+) -> dict | None:
+    """Validate one parsed LLM item and enrich it from its candidate.
+
+    ``None`` if it isn't an object or names no candidate.
+    """
+    if not isinstance(item, dict):
+        return None
+
+    mal_id = item.get("mal_id")
+    candidate = None
+
+    if mal_id and mal_id in candidate_lookup:
+        # Happy path: mal_id matches a candidate directly
+        candidate = candidate_lookup[mal_id]
+    else:
+        # Fallback: try to match by title instead.
+        # This catches the case where the LLM used the right title
+        # but wrong mal_id (e.g. used index number 1,2,3 instead
+        # of the actual 5-digit mal_id).
+        item_title = (item.get("title") or "").lower().strip()
+        if item_title and item_title in title_lookup:
+            candidate = title_lookup[item_title]
+            real_mal_id = candidate.get("mal_id", 0)
+            logger.info(
+                "LLM used wrong mal_id=%s but title '%s' matched candidate mal_id=%s — correcting",
+                mal_id,
+                item.get("title"),
+                real_mal_id,
+            )
+            mal_id = real_mal_id
+        else:
+            logger.warning(
+                "LLM recommended mal_id=%s (title='%s') which is not in candidates, skipping",
+                mal_id,
+                item.get("title", "?"),
+            )
+            return None
+
+    # Enrich with metadata from the candidate
+    metadata = candidate.get("metadata", {})
+
+    recommendation = {
+        "mal_id": mal_id,
+        "title": item.get("title", metadata.get("title", "Unknown")),
+        "image_url": metadata.get("image_url"),
+        "genres": metadata.get("genres", ""),
+        "themes": metadata.get("themes", ""),
+        "synopsis": _truncate(
+            candidate.get("embedding_text", ""), max_length=300
+        ),
+        "mal_score": metadata.get("mal_score"),
+        "year": metadata.get("year"),
+        "anime_type": metadata.get("anime_type"),
+        "reasoning": _clean_reasoning(item.get("reasoning", "No reasoning provided.")),
+        "confidence": _validate_confidence(item.get("confidence", "medium")),
+        "similar_to": _clean_similar_to(item.get("similar_to", [])),
+        # Preserve scores from the retriever for transparency
+        "similarity_score": candidate.get("similarity_score", 0),
+        "preference_score": candidate.get("preference_score", 0),
+        "combined_score": candidate.get("combined_score", 0),
+    }
+
+    return recommendation
+
+
 def _clean_json_response(raw: str) -> str:
     """Clean LLM response to extract valid JSON.
 
@@ -0,0 +1,221 @@
+"""Retrieval result cache — skip re-doing identical retrievals.
+
+Users hit Generate repeatedly with an unchanged profile, and the UI's
+quick-action buttons send the same ``custom_query`` strings over and
+over.  Each time ``retrieve_candidates`` re-embedded the queries (or
+hit the embedding cache), re-ran every vector search, re-fused and
+re-ranked.  This caches the ranked pool instead.
+
+Keys
+────
+``sha256`` of the inputs that decide the pool: the profile fields that
+drive query building and re-ranking (``profile_fingerprint``), the
+custom query, ``min_score``, ``k``, fusion method, ``fetch_k`` and the
+taste vector, if one was searched with.
+Unrelated profile fields (stats, timestamps…) don't split the cache.
+
+Exclusions are applied after the lookup
+───────────────────────────────────────
+The watched list isn't part of the key, so a user who finishes a show
+still reuses their pool.  A cached pool was fetched excluding some set
+``E`` *inside* the search (so it's full of unseen anime); a lookup
+excluding ``E'`` can reuse it when ``E' ⊇ E`` — it just filters the
+extra ids out — as long as at least ``k`` candidates survive.
+Otherwise (e.g. another user with an identical profile but a shorter
+watched list) it's a miss and the pool is re-fetched.
+
+Invalidation
+────────────
+Entries expire after ``RETRIEVAL_CACHE_TTL_SECONDS`` and are evicted
+LRU beyond ``RETRIEVAL_CACHE_MAX_ENTRIES``.  Each entry also records
+the index version — backend, active collection, and a generation
+bumped by every vector write or lexical-index load in this process —
+and is dropped when that changes.  A ``reindex`` switch is seen via
+the collection pointer; writes from other processes (``embed``) are
+covered by the TTL.
+
+Hit / miss counts are in the job metrics
+(``GET /api/recommendations/jobs/recent``): the ``retrieval_cache_*``
+counters and ``retrieval_cache_hit_rate``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Iterable
+
+from app.core.config import settings
+from app.core.metrics import increment
+
+# Profile fields read by build_search_queries / rerank_by_preferences
+_PROFILE_FIELDS = (
+    "genre_affinity",
+    "theme_affinity",
+    "top_10",
+    "preferred_formats",
+    "watch_era_preference",
+)
+
+
+@dataclass
+class _Entry:
+    version: tuple
+    expires_at: float
+    excluded: frozenset[int]
+    candidates: list[dict]
+
+
+class RetrievalCache:
+    """TTL + LRU cache of ranked candidate pools."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        key: str,
+        version: tuple,
+        exclude_ids: Iterable[int],
+        k: int,
+    ) -> list[dict] | None:
+        """Return up to ``k`` cached candidates not in ``exclude_ids``.
+
+        ``None`` on a miss, including a stale entry or one that can't
+        satisfy this exclusion set (see module docstring).
+        """
+        excluded = frozenset(exclude_ids)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.expires_at <= now or entry.version != version):
+                del self._entries[key]
+                increment("retrieval_cache_stale")
+                entry = None
+            if entry is None or not entry.excluded <= excluded:
+                increment("retrieval_cache_miss")
+                return None
+
+            pool = [c for c in entry.candidates if c.get("mal_id") not in excluded]
+            if len(pool) < k and len(pool) < len(entry.candidates):
+                increment("retrieval_cache_miss")
+                return None
+
+            self._entries.move_to_end(key)
+            increment("retrieval_cache_hit")
+            return [dict(c) for c in pool[:k]]
+
+    def put(
+        self,
+        key: str,
+        version: tuple,
+        exclude_ids: Iterable[int],
+        candidates: list[dict],
+    ) -> None:
+        """Store a ranked pool fetched while excluding ``exclude_ids``."""
+        entry = _Entry(
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            excluded=frozenset(exclude_ids),
+            candidates=[dict(c) for c in candidates],
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ═════════════════════════════════════════════════════════
+# Keys and index version
+# ═════════════════════════════════════════════════════════
+
+
+_generation = 0
+_generation_lock = Lock()
+
+
+def profile_fingerprint(profile: dict) -> str:
+    """Stable hash of the profile fields retrieval depends on."""
+    relevant = {field: profile.get(field) for field in _PROFILE_FIELDS}
+    payload = json.dumps(relevant, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def retrieval_cache_key(
+    profile: dict,
+    custom_query: str | None,
+    min_score: float | None,
+    k: int,
+    fusion: str,
+    fetch_k: int,
+    taste_vector: list[float] | None = None,
+) -> str:
+    taste = None
+    if taste_vector is not None:
+        taste = hashlib.sha256(json.dumps([round(x, 6) for x in taste_vector]).encode()).hexdigest()
+    payload = json.dumps(
+        [profile_fingerprint(profile), custom_query, min_score, k, fusion, fetch_k, taste],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def bump_index_version() -> None:
+    """Invalidate cached pools after this process changes an index."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def current_index_version() -> tuple:
+    """``(backend, active collection, local generation)``."""
+    from app.services.vector_collections import get_active_collection
+    from app.services.vector_store import get_vector_backend
+
+    backend = get_vector_backend()
+    return backend, get_active_collection(backend), _generation
+
+
+# ═════════════════════════════════════════════════════════
+# Process-wide cache
+# ═════════════════════════════════════════════════════════
+
+
+_cache: RetrievalCache | None = None
+_cache_lock = Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache | None:
+    """The shared cache, or ``None`` when ``RETRIEVAL_CACHE_ENABLED`` is off."""
+    global _cache
+    if not settings.RETRIEVAL_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = RetrievalCache(
+                max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+            )
+        return _cache
+
+
+def reset_retrieval_cache() -> None:
+    """Drop the shared cache (useful for testing)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
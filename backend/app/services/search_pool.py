@@ -0,0 +1,125 @@
+"""Concurrent retrieval searches, each with its own deadline.
+
+A retrieval round reads from several independent sources — the
+profile's text queries (one batched embedding + search), the taste
+vector, collaborative hits — and, on pgvector, runs one SQL search per
+query vector.  Run one after another, a single slow source (an
+embedding request stuck on a retry, a cold pgvector page) holds up
+all the others, and the job's timeout guardrail only notices between
+pipeline stages, after the budget is already gone.
+
+How it works
+────────────
+``fan_out`` submits every task to one bounded, process-wide
+``ThreadPoolExecutor`` (``RETRIEVAL_SEARCH_WORKERS``; the vector stores
+and their LangChain clients are synchronous, so threads, not asyncio)
+and waits for each until its deadline.  A task that misses it is
+dropped: cancelled if it hasn't started, abandoned otherwise (Python
+can't interrupt a thread blocked on I/O — its worker frees up when the
+call returns).  The caller gets ``None`` in its slot and carries on
+with the results that did arrive.
+
+``map_queries`` is the inner level: pgvector's per-vector searches
+inside one source task.  They run on a second pool, so a source task
+waiting on its own queries can never starve the pool it runs on.
+
+Errors raised by a task that finished in time propagate as before.
+Request ids are carried into the worker threads, so their log lines
+stay attributed.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterable, TypeVar
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import increment
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_pools: dict[str, ThreadPoolExecutor] = {}
+_pool_lock = Lock()
+
+
+def get_search_pool(name: str = "search") -> ThreadPoolExecutor:
+    """A shared pool — ``"search"`` for sources, ``"query"`` for the
+    searches inside one (created on first use)."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=settings.RETRIEVAL_SEARCH_WORKERS,
+                    thread_name_prefix=name,
+                )
+                _pools[name] = pool
+    return pool
+
+
+def reset_search_pool() -> None:
+    """Shut the pools down without waiting (useful for testing)."""
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def search_timeout(deadline: float | None = None) -> float:
+    """Seconds one search may take: ``RETRIEVAL_SEARCH_BUDGET_SHARE`` of
+    ``RECOMMEND_JOB_TIMEOUT_SECONDS``, and never past ``deadline``
+    (a ``perf_counter`` timestamp)."""
+    timeout = settings.RECOMMEND_JOB_TIMEOUT_SECONDS * settings.RETRIEVAL_SEARCH_BUDGET_SHARE
+    if deadline is not None:
+        timeout = min(timeout, deadline - perf_counter())
+    return max(timeout, 0.0)
+
+
+def fan_out(
+    tasks: list[tuple[str, Callable[[], T]]],
+    timeout: float,
+) -> list[T | None]:
+    """Run ``(name, fn)`` tasks concurrently; ``None`` for any that
+    didn't finish within ``timeout`` seconds of submission.
+
+    Results come back in task order.
+    """
+    if not tasks:
+        return []
+    pool = get_search_pool()
+    submitted = perf_counter()
+    futures = [pool.submit(copy_context().run, fn) for _, fn in tasks]
+
+    results: list[T | None] = []
+    for (name, _), future in zip(tasks, futures):
+        # Each task's deadline runs from submission, not from when the
+        # previous one was collected
+        wait([future], timeout=max(submitted + timeout - perf_counter(), 0.0))
+        if not future.done():
+            future.cancel()
+            increment("retrieval_search_timeout")
+            logger.warning("Search %r missed its %.1fs deadline — continuing without it", name, timeout)
+            results.append(None)
+            continue
+        results.append(future.result())
+    return results
+
+
+def map_queries(fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+    """``[fn(x) for x in items]``, concurrently on the query pool.
+
+    No deadline of its own: it runs inside a ``fan_out`` task, whose
+    deadline covers it.
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [fn(x) for x in items]
+    pool = get_search_pool("query")
+    futures = [pool.submit(copy_context().run, fn, x) for x in items]
+    return [future.result() for future in futures]
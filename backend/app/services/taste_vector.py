@@ -0,0 +1,163 @@
+"""User taste vectors — retrieve by what the user loved, not by a string.
+
+``_build_top_shows_query`` turns the user's top three titles into
+"anime similar to A, B, C" and embeds that string: an OpenAI call per
+generation, and a lossy one — the catalog already holds a vector for
+each of those shows.
+
+A taste vector is the score-weighted centroid of the stored catalog
+embeddings (``AnimeCatalogEntry.embedding_vector``) of the user's
+``TASTE_VECTOR_TOP_N`` highest-scored ``AnimeEntry`` rows:
+
+    taste = normalise( Σ score_i × v_i / |v_i| )
+
+Searching with it directly finds anime near the centre of what they
+rated highest, with no embedding call.
+
+Modes (``TASTE_VECTOR_MODE``)
+─────────────────────────────
+• ``off``       — unchanged behaviour.
+• ``top_shows`` — the taste vector replaces the top-shows query; the
+  genre / theme queries are templated, so they're shared by many
+  users and served by the embedding cache.
+• ``only``      — profile generations search with the taste vector
+  alone: no query embedding at all.
+
+Custom queries are always embedded — they're about the text.
+
+Caching
+───────
+The vector is stored on ``UserPreferenceProfile`` (``taste_vector*``
+columns) the first time a generation needs it, and cleared by every
+list import (``clear_taste_vector``), so it's rebuilt from the new
+list on the next generation.  It's also rebuilt if the embedding
+model changed since — centroids of another model's vectors are
+meaningless in the current store.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.embedding_storage import pack_vector, unpack_vector
+
+TASTE_VECTOR_MODES = ("off", "top_shows", "only")
+
+
+def get_taste_vector_mode() -> str:
+    """Resolve ``TASTE_VECTOR_MODE``.
+
+    Raises:
+        ValueError: On an unknown mode.
+    """
+    mode = settings.TASTE_VECTOR_MODE.strip().lower()
+    if mode not in TASTE_VECTOR_MODES:
+        raise ValueError(
+            f"Unknown TASTE_VECTOR_MODE={settings.TASTE_VECTOR_MODE!r}. "
+            f"Use one of: {', '.join(TASTE_VECTOR_MODES)}."
+        )
+    return mode
+
+
+def compute_taste_vector(
+    scored: list[tuple[int, float]],
+    vectors: dict[int, np.ndarray],
+) -> np.ndarray | None:
+    """Score-weighted, L2-normalised centroid of ``vectors``.
+
+    Args:
+        scored: ``(mal_id, user_score)`` pairs; non-positive scores and
+            ids without a vector are skipped.
+        vectors: Catalog vector per ``mal_id``.
+
+    Returns:
+        A float32 unit vector, or ``None`` if nothing usable was found.
+    """
+    rows = [(vectors[mal_id], score) for mal_id, score in scored if score > 0 and mal_id in vectors]
+    if not rows:
+        return None
+
+    matrix = np.stack([np.asarray(v, dtype=np.float32) for v, _ in rows])
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    weights = np.array([score for _, score in rows], dtype=np.float32)
+
+    centroid = weights @ (matrix / norms)
+    length = float(np.linalg.norm(centroid))
+    if length == 0.0:
+        return None
+    return (centroid / length).astype(np.float32)
+
+
+def get_taste_vector(db, profile) -> list[float] | None:
+    """The user's taste vector, from the profile cache or built now.
+
+    Returns ``None`` when the mode is off or the user's top shows have
+    no stored catalog vectors (e.g. not embedded yet) — callers then
+    fall back to the text queries.
+    """
+    from app.services.vector_store import get_embedding_model_name
+
+    if get_taste_vector_mode() == "off":
+        return None
+
+    model = get_embedding_model_name()
+    if profile.taste_vector and profile.taste_vector_dim and profile.taste_vector_model == model:
+        return unpack_vector(profile.taste_vector, profile.taste_vector_dim).tolist()
+
+    vector = build_taste_vector(db, profile.user_id, model)
+    if vector is None:
+        return None
+
+    profile.taste_vector = pack_vector(vector, settings.EMBEDDING_STORAGE_DTYPE)
+    profile.taste_vector_dim = int(vector.shape[0])
+    profile.taste_vector_model = model
+    db.commit()
+    logger.info("Cached taste vector for user %s (%s)", profile.user_id, model)
+    # Return the stored precision, so later cached reads (and retrieval
+    # cache keys) match this one exactly
+    return unpack_vector(profile.taste_vector, profile.taste_vector_dim).tolist()
+
+
+def build_taste_vector(db, user_id: str, model: str) -> np.ndarray | None:
+    """Centroid of the stored vectors of the user's top-scored anime."""
+    from sqlalchemy import select
+
+    from app.models.anime import AnimeCatalogEntry, AnimeEntry, AnimeList
+
+    scored = db.execute(
+        select(AnimeEntry.mal_anime_id, AnimeEntry.user_score)
+        .join(AnimeList, AnimeEntry.anime_list_id == AnimeList.id)
+        .where(AnimeList.user_id == user_id, AnimeEntry.user_score > 0)
+        .order_by(AnimeEntry.user_score.desc(), AnimeEntry.mal_anime_id)
+        .limit(settings.TASTE_VECTOR_TOP_N)
+    ).all()
+    if not scored:
+        return None
+
+    rows = db.execute(
+        select(
+            AnimeCatalogEntry.mal_id,
+            AnimeCatalogEntry.embedding_vector,
+            AnimeCatalogEntry.embedding_dim,
+        ).where(
+            AnimeCatalogEntry.mal_id.in_([mal_id for mal_id, _ in scored]),
+            AnimeCatalogEntry.embedding_vector.is_not(None),
+            AnimeCatalogEntry.embedding_model == model,
+        )
+    ).all()
+    vectors = {
+        mal_id: unpack_vector(blob, dim)
+        for mal_id, blob, dim in rows
+        if blob and dim
+    }
+    return compute_taste_vector([(m, float(s)) for m, s in scored], vectors)
+
+
+def clear_taste_vector(profile) -> None:
+    """Forget the cached vector — call whenever the list is re-imported."""
+    profile.taste_vector = None
+    profile.taste_vector_dim = None
+    profile.taste_vector_model = None
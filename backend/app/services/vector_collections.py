@@ -0,0 +1,332 @@
+"""Versioned vector collections — zero-downtime rebuilds.
+
+``reindex`` used to empty the live collection before re-filling it, so
+every search returned nothing until the rebuild finished.  Now every
+rebuild goes blue/green:
+
+1. ``start_build()`` registers ``anime_catalog_v{N+1}`` as ``building``.
+2. Vectors are written into that collection while the active one keeps
+   serving searches.
+3. ``activate_collection()`` flips the pointer in one transaction.
+4. ``gc_collections()`` drops retired versions beyond the newest
+   ``VECTOR_COLLECTION_KEEP`` (kept for rollback), once they have been
+   retired longer than ``VECTOR_COLLECTION_GC_GRACE_SECONDS``.  Run it
+   from cron (``python -m app.cli collections gc``); ``reindex`` also
+   runs it after every successful switch.
+
+How serving processes notice a switch
+─────────────────────────────────────
+``get_active_collection()`` caches the pointer for
+``VECTOR_COLLECTION_REFRESH_SECONDS``.  ``get_vector_store()`` compares
+it with the collection it has open and re-opens on change, so API
+workers move to the new version within one refresh interval — which is
+why GC waits out a grace period before dropping a retired collection.
+
+Before the first switch there is no pointer row, and the original
+un-versioned collection (``VECTOR_COLLECTION_NAME`` /
+``CHROMA_COLLECTION_NAME`` / ``NUMPY_INDEX_DIR``) is used, so
+deploying this needs no data migration.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+
+from app.core.config import settings
+from app.core.logging import logger
+
+_cache_lock = Lock()
+_active_cache: dict[str, tuple[str, float]] = {}  # backend → (name, expires_at)
+
+
+# ═════════════════════════════════════════════════════════
+# Naming
+# ═════════════════════════════════════════════════════════
+
+
+def base_collection_name(backend: str) -> str:
+    """The original, un-versioned collection name for ``backend``."""
+    if backend == "chroma":
+        return settings.CHROMA_COLLECTION_NAME
+    return settings.VECTOR_COLLECTION_NAME
+
+
+def versioned_name(backend: str, version: int) -> str:
+    """``anime_catalog`` → ``anime_catalog_v7`` (version 0 is the original)."""
+    base = base_collection_name(backend)
+    return base if version == 0 else f"{base}_v{version}"
+
+
+def numpy_index_dir(name: str) -> Path:
+    """Directory for a NumPy collection.
+
+    The original collection lives directly in ``NUMPY_INDEX_DIR``;
+    versions live in sub-directories of it.
+    """
+    root = Path(settings.NUMPY_INDEX_DIR)
+    return root if name == base_collection_name("numpy") else root / name
+
+
+# ═════════════════════════════════════════════════════════
+# Active pointer
+# ═════════════════════════════════════════════════════════
+
+
+def get_active_collection(backend: str) -> str:
+    """Name of the collection searches should read, cached briefly.
+
+    Falls back to the un-versioned name when nothing has been switched
+    yet, or when the pointer table can't be read (e.g. migrations not
+    applied) — a search should never fail over this lookup.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _active_cache.get(backend)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    name = _load_active_name(backend) or base_collection_name(backend)
+
+    with _cache_lock:
+        _active_cache[backend] = (name, now + settings.VECTOR_COLLECTION_REFRESH_SECONDS)
+    return name
+
+
+def reset_collection_cache() -> None:
+    """Forget cached pointers (after a switch, or in tests)."""
+    with _cache_lock:
+        _active_cache.clear()
+
+
+def _load_active_name(backend: str) -> str | None:
+    from sqlalchemy import select
+    from sqlalchemy.exc import SQLAlchemyError
+
+    from app.db.session import SessionLocal
+    from app.models.vector_collection import VectorCollection
+
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(VectorCollection.name).where(
+                VectorCollection.backend == backend,
+                VectorCollection.status == "active",
+            )
+        ).scalar()
+    except SQLAlchemyError as exc:
+        logger.warning("Could not read active vector collection: %s", exc)
+        return None
+    finally:
+        db.close()
+
+
+# ═════════════════════════════════════════════════════════
+# Build → switch → garbage-collect
+# ═════════════════════════════════════════════════════════
+
+
+def start_build(backend: str):
+    """Register the next collection version as ``building``.
+
+    Returns:
+        The new ``VectorCollection`` row (detached; read ``.name``).
+    """
+    from sqlalchemy import func, select
+
+    from app.db.session import SessionLocal
+    from app.models.vector_collection import VectorCollection
+
+    db = SessionLocal()
+    try:
+        latest = db.execute(
+            select(func.max(VectorCollection.version)).where(VectorCollection.backend == backend)
+        ).scalar() or 0
+        version = latest + 1
+        row = VectorCollection(
+            backend=backend,
+            name=versioned_name(backend, version),
+            version=version,
+            status="building",
+            document_count=0,
+        )
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        db.expunge(row)
+    finally:
+        db.close()
+
+    logger.info("Started building vector collection %s (%s)", row.name, backend)
+    return row
+
+
+def activate_collection(backend: str, name: str, document_count: int | None = None) -> None:
+    """Atomically point searches at ``name``.
+
+    Retires the current active collection and activates ``name`` in a
+    single transaction.  Re-activating a retired collection is how a
+    rollback works.  On the very first switch the un-versioned
+    collection is recorded as retired version 0.
+
+    Raises:
+        ValueError: If ``name`` isn't a registered collection.
+    """
+    from sqlalchemy import select, update
+
+    from app.db.session import SessionLocal
+    from app.models.vector_collection import VectorCollection
+
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        target = db.execute(
+            select(VectorCollection).where(
+                VectorCollection.backend == backend,
+                VectorCollection.name == name,
+            )
+        ).scalar_one_or_none()
+        if target is None:
+            raise ValueError(f"Unknown {backend} collection {name!r}")
+
+        has_original = db.execute(
+            select(VectorCollection.id).where(
+                VectorCollection.backend == backend,
+                VectorCollection.version == 0,
+            )
+        ).first() is not None
+        has_active = db.execute(
+            select(VectorCollection.id).where(
+                VectorCollection.backend == backend,
+                VectorCollection.status == "active",
+            )
+        ).first() is not None
+        if not has_active and not has_original:
+            db.add(VectorCollection(
+                backend=backend,
+                name=versioned_name(backend, 0),
+                version=0,
+                status="retired",
+                document_count=0,
+                retired_at=now,
+            ))
+
+        db.execute(
+            update(VectorCollection)
+            .where(
+                VectorCollection.backend == backend,
+                VectorCollection.status == "active",
+                VectorCollection.id != target.id,
+            )
+            .values(status="retired", retired_at=now)
+        )
+        target.status = "active"
+        target.activated_at = now
+        target.retired_at = None
+        if document_count is not None:
+            target.document_count = document_count
+        db.commit()
+    finally:
+        db.close()
+
+    reset_collection_cache()
+    logger.info("Activated vector collection %s (%s)", name, backend)
+
+
+def select_for_gc(
+    rows: Iterable,
+    keep: int,
+    now: datetime,
+    grace: timedelta,
+    building_timeout: timedelta = timedelta(days=1),
+) -> list:
+    """Pick the collections that can be dropped.
+
+    • ``retired`` — all but the newest ``keep`` versions, and only once
+      retired for longer than ``grace`` (workers may still be reading
+      them until their pointer cache refreshes).
+    • ``building`` — abandoned builds older than ``building_timeout``.
+    • ``active`` — never.
+    """
+    rows = list(rows)
+    retired = sorted(
+        (r for r in rows if r.status == "retired"),
+        key=lambda r: r.version,
+        reverse=True,
+    )
+    doomed = [
+        r for r in retired[max(keep, 0):]
+        if r.retired_at is None or now - _aware(r.retired_at) >= grace
+    ]
+    doomed += [
+        r for r in rows
+        if r.status == "building" and now - _aware(r.created_at) >= building_timeout
+    ]
+    return doomed
+
+
+def gc_collections(backend: str, keep: int | None = None, dry_run: bool = False) -> list[str]:
+    """Drop old collection versions for ``backend``.
+
+    Returns:
+        Names of the collections dropped (or that would be, if ``dry_run``).
+    """
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.vector_collection import VectorCollection
+    from app.services.vector_store import drop_collection
+
+    keep = settings.VECTOR_COLLECTION_KEEP if keep is None else keep
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(VectorCollection).where(VectorCollection.backend == backend)
+        ).scalars().all()
+        doomed = select_for_gc(
+            rows,
+            keep=keep,
+            now=datetime.now(timezone.utc),
+            grace=timedelta(seconds=settings.VECTOR_COLLECTION_GC_GRACE_SECONDS),
+        )
+        dropped: list[str] = []
+        for row in doomed:
+            dropped.append(row.name)
+            if dry_run:
+                continue
+            drop_collection(row.name, backend=backend)
+            db.delete(row)
+            db.commit()
+            logger.info("Garbage-collected vector collection %s (%s)", row.name, backend)
+        return dropped
+    finally:
+        db.close()
+
+
+def list_collections(backend: str) -> list:
+    """All registered collections for ``backend``, newest first."""
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.vector_collection import VectorCollection
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(VectorCollection)
+            .where(VectorCollection.backend == backend)
+            .order_by(VectorCollection.version.desc())
+        ).scalars().all()
+        for row in rows:
+            db.expunge(row)
+        return rows
+    finally:
+        db.close()
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone=True columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -32,6 +32,16 @@ Why ChromaDB for dev?
 • Persistent storage — survives server restarts
 • In production we'd swap to pgvector (same interface via LangChain)
 
+Backends
+────────
+``VECTOR_STORE_BACKEND`` picks where vectors live:
+• ``auto``     — pgvector for PostgreSQL DATABASE_URLs, ChromaDB otherwise
+• ``chroma``   — ChromaDB on disk (``langchain-chroma``)
+• ``pgvector`` — PGVector (``langchain-postgres``)
+• ``numpy``    — in-process matrix memory-mapped from ``NUMPY_INDEX_DIR``
+  (see ``numpy_index.py``).  No wrapper overhead, no SQLite, a few
+  milliseconds per search for the whole catalog.
+
 Why OpenAI text-embedding-3-small?
 ──────────────────────────────────
 • Cheapest OpenAI embedding model ($0.02 / 1M tokens)
@@ -43,10 +53,17 @@ Why OpenAI text-embedding-3-small?
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import increment
+from app.services.anime_catalog import VECTOR_METADATA_FIELDS
+from app.services.retrieval_cache import bump_index_version
+from app.services.search_pool import map_queries
+
+if TYPE_CHECKING:
+    from app.services.embedding_pipeline import EmbedResult, PipelineStats, TokenBucketLimiter
 
 
 # ── Module-level singleton ───────────────────────────────
@@ -55,30 +72,53 @@ from app.core.logging import logger
 # load time (which would slow down every test and CLI command).
 
 _vector_store = None
+_vector_store_name: str | None = None  # collection _vector_store has open
+_named_stores: dict[str, Any] = {}  # non-active collections being built
 _embeddings = None
 
 
 def get_embeddings():
-    """Get or create the OpenAI embeddings instance.
+    """Get or create the embeddings instance.
 
-    Uses ``text-embedding-3-small`` by default (configurable via
-    ``OPENAI_EMBEDDING_MODEL`` in .env).
+    ``EMBEDDING_PROVIDER`` picks the implementation:
+    • ``openai``  — ``OpenAIEmbeddings`` with ``OPENAI_EMBEDDING_MODEL``
+      (``text-embedding-3-small`` by default).
+    • ``hashing`` — ``HashingEmbeddings``, deterministic and offline
+      (see ``local_embeddings.py``) for benchmarks and load tests.
 
     This is lazy-initialised so we don't hit OpenAI just by
     importing this module.
 
+    When ``EMBEDDING_CACHE_ENABLED`` is set, OpenAI embeddings are
+    wrapped in ``CachedEmbeddings`` so repeated query embeddings are
+    served from memory / disk (see ``embedding_cache.py``).  The local
+    provider is faster than the cache, so it is never wrapped.
+
     Raises:
-        RuntimeError: If OPENAI_API_KEY is not configured.
+        RuntimeError: If OPENAI_API_KEY is not configured (``openai``).
     """
     global _embeddings
 
     if _embeddings is not None:
         return _embeddings
 
+    provider = get_embedding_provider()
+
+    if provider == "hashing":
+        from app.services.local_embeddings import HashingEmbeddings
+
+        _embeddings = HashingEmbeddings(
+            dimensions=settings.LOCAL_EMBEDDING_DIMENSIONS,
+            seed=settings.LOCAL_EMBEDDING_SEED,
+        )
+        logger.info("Initialised local hashing embeddings (model=%s)", _embeddings.model)
+        return _embeddings
+
     if not settings.OPENAI_API_KEY:
         raise RuntimeError(
             "OPENAI_API_KEY is not configured. "
-            "Get one at https://platform.openai.com/api-keys and add it to .env"
+            "Get one at https://platform.openai.com/api-keys and add it to .env "
+            "(or set EMBEDDING_PROVIDER=hashing to run offline)"
         )
 
     from langchain_openai import OpenAIEmbeddings
@@ -88,53 +128,142 @@ def get_embeddings():
         openai_api_key=settings.OPENAI_API_KEY,
     )
 
+    if settings.EMBEDDING_CACHE_ENABLED:
+        # Repeated search queries (genre/theme queries, the fallback
+        # query) are served from the cache instead of OpenAI.
+        from app.services.embedding_cache import CachedEmbeddings
+
+        _embeddings = CachedEmbeddings(
+            _embeddings,
+            model=settings.OPENAI_EMBEDDING_MODEL,
+            path=settings.EMBEDDING_CACHE_PATH,
+            memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+
     logger.info(
-        "Initialised OpenAI embeddings (model=%s)",
+        "Initialised OpenAI embeddings (model=%s, query_cache=%s)",
         settings.OPENAI_EMBEDDING_MODEL,
+        settings.EMBEDDING_CACHE_ENABLED,
     )
     return _embeddings
 
 
+def get_embedding_provider() -> str:
+    """Resolve ``EMBEDDING_PROVIDER`` to ``"openai"`` or ``"hashing"``."""
+    provider = settings.EMBEDDING_PROVIDER.strip().lower()
+    if provider not in {"openai", "hashing"}:
+        raise RuntimeError(
+            f"Unknown EMBEDDING_PROVIDER={settings.EMBEDDING_PROVIDER!r}. "
+            "Use one of: openai, hashing."
+        )
+    return provider
+
+
+def get_embedding_model_name() -> str:
+    """Name recorded on stored vectors (``AnimeCatalogEntry.embedding_model``).
+
+    Differs per provider, so switching providers makes ``embed`` and
+    ``reindex`` treat the other provider's vectors as stale.
+    """
+    if get_embedding_provider() == "hashing":
+        from app.services.local_embeddings import local_model_name
+
+        return local_model_name(settings.LOCAL_EMBEDDING_DIMENSIONS, settings.LOCAL_EMBEDDING_SEED)
+    return settings.OPENAI_EMBEDDING_MODEL
+
+
+def get_vector_backend() -> str:
+    """Resolve which vector store backend is active.
+
+    ``VECTOR_STORE_BACKEND=auto`` (the default) keeps the original
+    behaviour of choosing by DATABASE_URL.
+
+    Returns:
+        One of ``"chroma"``, ``"pgvector"`` or ``"numpy"``.
+    """
+    backend = settings.VECTOR_STORE_BACKEND.strip().lower()
+    if backend == "auto":
+        return "pgvector" if _is_postgres_url(settings.DATABASE_URL) else "chroma"
+    if backend not in {"chroma", "pgvector", "numpy"}:
+        raise RuntimeError(
+            f"Unknown VECTOR_STORE_BACKEND={settings.VECTOR_STORE_BACKEND!r}. "
+            "Use one of: auto, chroma, pgvector, numpy."
+        )
+    return backend
+
+
 def get_vector_store():
-    """Get or create the vector store.
+    """Get or create the vector store for the active collection.
 
-    Automatically selects the backend based on DATABASE_URL:
+    The backend comes from ``get_vector_backend()``:
     - PostgreSQL (production/Neon) → PGVector (langchain-postgres)
     - SQLite (local dev) → ChromaDB (langchain-chroma)
+    - ``numpy`` → in-process ``NumpyVectorIndex``
+
+    The collection comes from the blue/green pointer
+    (``vector_collections.get_active_collection``); when a rebuild
+    switches it, the next call re-opens the store on the new version.
 
     Returns:
-        A LangChain vector store instance.
+        A LangChain vector store instance (or a ``NumpyVectorIndex``,
+        which supports the same ``add_texts`` call).
 
     Raises:
         RuntimeError: If OPENAI_API_KEY is not configured.
     """
-    global _vector_store
+    global _vector_store, _vector_store_name
 
-    if _vector_store is not None:
+    from app.services.vector_collections import get_active_collection
+
+    backend = get_vector_backend()
+    name = get_active_collection(backend)
+    if _vector_store is not None and _vector_store_name == name:
         return _vector_store
 
+    store = _named_stores.pop(name, None) or open_vector_store(name, backend)
+    if _vector_store is not None:
+        logger.info("Vector collection switched: %s → %s", _vector_store_name, name)
+    _vector_store, _vector_store_name = store, name
+    return _vector_store
+
+
+def open_vector_store(name: str, backend: str | None = None):
+    """Open (creating if needed) the collection ``name`` on ``backend``.
+
+    ``get_vector_store()`` uses this for the active collection; rebuilds
+    use it to write into a new version while the active one serves.
+    """
     embeddings = get_embeddings()
-    db_url = settings.DATABASE_URL
+    backend = backend or get_vector_backend()
 
-    if db_url.startswith("postgresql") or db_url.startswith("postgres"):
+    if backend == "numpy":
+        # ── In-process matrix (memory-mapped) ─────────────
+        from app.services.numpy_index import NumpyVectorIndex
+        from app.services.vector_collections import numpy_index_dir
+
+        index_dir = numpy_index_dir(name)
+        store = NumpyVectorIndex(index_dir, embeddings=embeddings)
+        logger.info(
+            "Initialised NumPy vector index (dir=%s, rows=%d)",
+            index_dir,
+            store.count(),
+        )
+    elif backend == "pgvector":
         # ── Production: pgvector on Neon ──────────────────
         from langchain_postgres.vectorstores import PGVector
 
-        # langchain-postgres requires the psycopg (v3) driver prefix
-        conn = db_url.replace("postgresql://", "postgresql+psycopg://", 1)
-        conn = conn.replace("postgres://", "postgresql+psycopg://", 1)
+        from app.services.pgvector_index import get_pgvector_engine
 
-        _vector_store = PGVector(
+        # Engine applies hnsw.ef_search / ivfflat.probes per session
+        store = PGVector(
             embeddings=embeddings,
-            collection_name=settings.VECTOR_COLLECTION_NAME,
-            connection=conn,
+            collection_name=name,
+            connection=get_pgvector_engine(),
             use_jsonb=True,
             pre_delete_collection=False,
         )
-        logger.info(
-            "Initialised PGVector store (collection=%s)",
-            settings.VECTOR_COLLECTION_NAME,
-        )
+        logger.info("Initialised PGVector store (collection=%s)", name)
     else:
         # ── Development: ChromaDB on disk ─────────────────
         from langchain_chroma import Chroma
@@ -142,24 +271,35 @@ def get_vector_store():
         persist_dir = Path(settings.CHROMA_PERSIST_DIR)
         persist_dir.mkdir(parents=True, exist_ok=True)
 
-        _vector_store = Chroma(
-            collection_name=settings.CHROMA_COLLECTION_NAME,
+        store = Chroma(
+            collection_name=name,
             embedding_function=embeddings,
             persist_directory=str(persist_dir),
         )
         logger.info(
             "Initialised ChromaDB vector store (dir=%s, collection=%s)",
             persist_dir,
-            settings.CHROMA_COLLECTION_NAME,
+            name,
         )
-    return _vector_store
+    return store
 
 
 def reset_vector_store() -> None:
     """Reset the module-level singleton (useful for testing)."""
-    global _vector_store, _embeddings
+    global _vector_store, _vector_store_name, _embeddings
     _vector_store = None
+    _vector_store_name = None
     _embeddings = None
+    _named_stores.clear()
+
+
+def _store_for(collection: str | None):
+    """The active store, or the (cached) store for ``collection``."""
+    if collection is None or collection == _vector_store_name:
+        return get_vector_store()
+    if collection not in _named_stores:
+        _named_stores[collection] = open_vector_store(collection)
+    return _named_stores[collection]
 
 
 # ═════════════════════════════════════════════════════════
@@ -169,7 +309,10 @@ def reset_vector_store() -> None:
 
 def add_anime_to_store(
     entries: list[dict],
-    batch_size: int = 500,
+    batch_size: int | None = None,
+    on_batch: Callable[[list[dict], list[list[float]]], None] | None = None,
+    on_progress: Callable[[PipelineStats], None] | None = None,
+    collection: str | None = None,
 ) -> int:
     """Embed and store anime documents in the vector store.
 
@@ -183,80 +326,278 @@ def add_anime_to_store(
 
     Args:
         entries: List of dicts with anime data.
-        batch_size: How many to embed at once (OpenAI has token limits).
+        batch_size: Max documents per request (default
+            ``EMBEDDING_BATCH_MAX_INPUTS``).  Batches are sized by
+            tokens first — see below.
+        on_batch: Optional callback, called after each batch is written
+            with ``(entries, vectors)`` — the CLI uses it to persist
+            vectors on ``AnimeCatalogEntry`` (see ``embedding_storage.py``).
+        on_progress: Optional callback receiving running
+            ``PipelineStats`` (docs/sec, tokens/sec) after each write.
+        collection: Write into this collection instead of the active
+            one (a blue/green build — see ``vector_collections.py``).
 
     Returns:
         Number of documents added/updated.
 
     How batching works:
-        OpenAI's embedding API accepts multiple texts at once.
-        We batch to avoid hitting token limits and to show progress.
-        100 anime × ~200 tokens each = ~20K tokens per batch (well
-        within the 8191 token-per-text limit).
+        OpenAI's embedding API accepts multiple texts at once, capped
+        per request in tokens.  Each text is counted (and truncated to
+        ``EMBEDDING_MAX_INPUT_TOKENS`` if needed), then texts are
+        packed into batches of up to ``EMBEDDING_BATCH_TOKEN_BUDGET``
+        tokens.  Batches are embedded concurrently by ``embedding_pipeline``
+        under a token-bucket limiter driven by ``EMBEDDING_RPM_LIMIT``,
+        ``EMBEDDING_TPM_LIMIT`` and OpenAI's rate-limit headers, while
+        a writer thread upserts finished batches into the store.
+
+    We embed explicitly (rather than ``store.add_texts``) so the
+    vectors are in hand for ``on_batch`` and the write below is the
+    same call ``reindex`` uses for stored vectors.
     """
-    store = get_vector_store()
-    total_added = 0
+    from datetime import datetime, timezone
+
+    from app.services.embedding_pipeline import (
+        TokenCounter,
+        build_token_batches,
+        run_embedding_pipeline,
+        save_batch_report,
+        summarize_batches,
+    )
 
-    for i in range(0, len(entries), batch_size):
-        batch = entries[i : i + batch_size]
+    valid = [e for e in entries if _is_embeddable(e)]
+    if not valid:
+        return 0
+
+    # ── Count tokens, truncating oversized inputs ────────
+    # The stored document (and its hash) keep the full text; only
+    # what we send to the API is cut.
+    model = get_embedding_model_name()
+    counter = TokenCounter(model)
+    prepared: list[tuple[dict, str, int]] = []  # (entry, text to embed, tokens)
+    truncated: list[int] = []
+    for entry in valid:
+        text, tokens, was_cut = counter.fit(
+            entry["embedding_text"], settings.EMBEDDING_MAX_INPUT_TOKENS,
+        )
+        if was_cut:
+            truncated.append(entry["mal_id"])
+        prepared.append((entry, text, tokens))
+
+    if truncated:
+        increment("embedding_inputs_truncated", len(truncated))
+        logger.warning(
+            "Truncated %d documents to %d tokens: mal_ids=%s",
+            len(truncated), settings.EMBEDDING_MAX_INPUT_TOKENS, truncated[:20],
+        )
 
-        texts: list[str] = []
-        metadatas: list[dict] = []
-        ids: list[str] = []
+    batches = build_token_batches(
+        prepared,
+        tokens_of=lambda p: p[2],
+        token_budget=settings.EMBEDDING_BATCH_TOKEN_BUDGET,
+        max_inputs=batch_size or settings.EMBEDDING_BATCH_MAX_INPUTS,
+    )
 
-        for entry in batch:
-            mal_id = entry.get("mal_id")
-            embedding_text = entry.get("embedding_text", "")
+    # Initialise the store on this thread before workers touch it
+    _store_for(collection)
+
+    def write(batch: list[tuple[dict, str, int]], vectors: list[list[float]]) -> None:
+        batch_entries = [entry for entry, _, _ in batch]
+        write_anime_vectors(batch_entries, vectors, collection=collection)
+        if on_batch is not None:
+            on_batch(batch_entries, vectors)
+
+    stats = run_embedding_pipeline(
+        batches=batches,
+        text_of=lambda p: p[1],
+        tokens_of=lambda p: p[2],
+        embed_fn=_embed_catalog_batch,
+        write_fn=write,
+        limiter=_embedding_limiter(),
+        max_in_flight=settings.EMBEDDING_MAX_IN_FLIGHT,
+        on_progress=on_progress,
+    )
 
-            if not mal_id or not embedding_text:
-                continue
+    # Planned sizes (not completion order) describe how we packed
+    save_batch_report(settings.EMBEDDING_REPORT_PATH, {
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "model": model,
+        "documents": stats.documents,
+        "exact_token_counts": counter.exact,
+        "max_input_tokens": settings.EMBEDDING_MAX_INPUT_TOKENS,
+        "truncated_count": len(truncated),
+        "truncated_mal_ids": truncated,
+        **summarize_batches(
+            [len(b) for b in batches],
+            [sum(p[2] for p in b) for b in batches],
+            settings.EMBEDDING_BATCH_TOKEN_BUDGET,
+        ),
+    })
 
-            # Document ID = "anime_{mal_id}" for deduplication
-            # If we add the same anime twice, ChromaDB updates it
-            doc_id = f"anime_{mal_id}"
+    logger.info(
+        "Embedded %d documents in %d batches (%.1fs, %.0f docs/s, %.0f tokens/s, %d rate-limit pauses)",
+        stats.documents, stats.batches, stats.elapsed,
+        stats.docs_per_sec, stats.tokens_per_sec, stats.rate_limited,
+    )
+    return stats.documents
 
-            # Metadata for filtering during search
-            # ChromaDB metadata values must be str, int, float, or bool
-            metadata = _build_metadata(entry)
 
-            texts.append(embedding_text)
-            metadatas.append(metadata)
-            ids.append(doc_id)
+def _embedding_limiter() -> TokenBucketLimiter:
+    """Rate limiter for catalog embedding — effectively off when local."""
+    from app.services.embedding_pipeline import TokenBucketLimiter
 
-        if not texts:
-            continue
+    if get_embedding_provider() == "hashing":
+        return TokenBucketLimiter(rpm=10**9, tpm=10**12)
+    return TokenBucketLimiter(
+        rpm=settings.EMBEDDING_RPM_LIMIT,
+        tpm=settings.EMBEDDING_TPM_LIMIT,
+    )
 
-        # Embed with retry on OpenAI rate limit errors.
-        # Parse the suggested wait from the error message when available;
-        # otherwise back off exponentially starting at 5s.
-        import re
-        import time
-        for attempt in range(8):
-            try:
-                store.add_texts(texts=texts, metadatas=metadatas, ids=ids)
-                break
-            except Exception as e:
-                err = str(e)
-                if "rate_limit" in err.lower() or "429" in err:
-                    # Try to extract "try again in Xs" from the error message
-                    match = re.search(r"try again in (\d+(?:\.\d+)?)s", err)
-                    wait = float(match.group(1)) + 1 if match else min(5 * 2 ** attempt, 60)
-                    logger.warning("Rate limited, waiting %.1fs (attempt %d/8)", wait, attempt + 1)
-                    time.sleep(wait)
-                else:
-                    raise
-        # Small pause between batches to stay under TPM limit.
-        # 500 anime × ~200 tokens = ~100k tokens/batch.
-        # At 1M TPM limit, ~10 batches/min max → 6s between batches.
-        time.sleep(6)
-
-        total_added += len(texts)
-        logger.info(
-            "Embedded batch %d–%d (%d documents, total: %d)",
-            i, i + len(batch), len(texts), total_added,
+
+def _embed_catalog_batch(texts: list[str]) -> EmbedResult:
+    """One embedding request, keeping usage and rate-limit headers.
+
+    LangChain's ``embed_documents`` hides the HTTP response, so for
+    OpenAI we call the SDK's raw-response API on the same client the
+    LangChain object wraps.  Anything else falls back to
+    ``embed_documents`` (no headers; tokens are estimated).
+    """
+    from app.services.embedding_pipeline import EmbedResult
+
+    embeddings = get_embeddings()
+    client = getattr(embeddings, "client", None)
+    if client is None or not hasattr(client, "with_raw_response"):
+        return EmbedResult(vectors=embeddings.embed_documents(texts))
+
+    kwargs: dict[str, Any] = {"input": texts, "model": embeddings.model}
+    if getattr(embeddings, "dimensions", None):
+        kwargs["dimensions"] = embeddings.dimensions
+    raw = client.with_raw_response.create(**kwargs)
+    response = raw.parse()
+    data = sorted(response.data, key=lambda d: d.index)
+    usage = getattr(response, "usage", None)
+    return EmbedResult(
+        vectors=[list(d.embedding) for d in data],
+        tokens=getattr(usage, "total_tokens", None),
+        headers=raw.headers,
+    )
+
+
+def write_anime_vectors(
+    entries: list[dict],
+    vectors: list[list[float]],
+    collection: str | None = None,
+) -> int:
+    """Upsert pre-computed vectors into the active backend — no embedding.
+
+    Used both right after embedding and by ``reindex`` to rebuild a
+    backend from the vectors stored on ``AnimeCatalogEntry``.
+    ``collection`` targets a version being built instead of the
+    active one.
+
+    Returns:
+        Number of documents written.
+    """
+    if len(entries) != len(vectors):
+        raise ValueError(f"Got {len(entries)} entries but {len(vectors)} vectors")
+    if not entries:
+        return 0
+
+    store = _store_for(collection)
+    backend = get_vector_backend()
+
+    texts = [e["embedding_text"] for e in entries]
+    # Metadata for filtering during search
+    # ChromaDB metadata values must be str, int, float, or bool
+    metadatas = [_build_metadata(e) for e in entries]
+    # Document ID = "anime_{mal_id}" for deduplication
+    # If we add the same anime twice, the backend updates it
+    ids = [f"anime_{e['mal_id']}" for e in entries]
+    if backend != "numpy":
+        # Chroma/PGVector want plain Python floats; NumPy takes the
+        # vectors as-is (converting 30k × 1536 floats costs seconds)
+        vectors = [list(map(float, v)) for v in vectors]
+
+    if backend == "chroma":
+        store._collection.upsert(
+            ids=ids, embeddings=vectors, metadatas=metadatas, documents=texts,
         )
+    else:
+        # NumpyVectorIndex and PGVector share this signature
+        store.add_embeddings(
+            texts=texts, embeddings=vectors, metadatas=metadatas, ids=ids,
+        )
+    bump_index_version()
+    return len(entries)
+
+
+def update_anime_metadata(entries: list[dict]) -> int:
+    """Push metadata-only changes (e.g. member counts) — no embedding.
+
+    Crawls change ``mal_members``/``mal_score`` constantly without
+    touching the embedded text, so the vector stays valid and only the
+    filterable metadata needs refreshing.  Entries not yet in the store
+    are ignored.
+
+    Returns:
+        Number of entries sent to the backend.
+    """
+    entries = [e for e in entries if e.get("mal_id")]
+    if not entries:
+        return 0
 
-    return total_added
+    backend = get_vector_backend()
+    ids = [f"anime_{e['mal_id']}" for e in entries]
+    metadatas = [_build_metadata(e) for e in entries]
+
+    if backend == "numpy":
+        get_vector_store().update_metadata(ids, metadatas)
+    elif backend == "chroma":
+        store = get_vector_store()
+        existing = set(store._collection.get(ids=ids, include=[])["ids"])
+        pairs = [(i, m) for i, m in zip(ids, metadatas) if i in existing]
+        if pairs:
+            store._collection.update(
+                ids=[i for i, _ in pairs], metadatas=[m for _, m in pairs],
+            )
+    else:
+        # langchain-postgres has no metadata-only update; write the
+        # JSONB column directly.
+        import json
+        from sqlalchemy import text
+
+        from app.services.pgvector_index import get_pgvector_engine
+        from app.services.vector_collections import get_active_collection
+
+        name = get_active_collection(backend)
+        # The shared pool PGVector searches on — not a new one per call
+        with get_pgvector_engine().begin() as c:
+            c.execute(
+                text(
+                    "UPDATE langchain_pg_embedding SET cmetadata = CAST(:meta AS jsonb) "
+                    "WHERE id = :id AND collection_id = ("
+                    "SELECT uuid FROM langchain_pg_collection WHERE name = :name)"
+                ),
+                [
+                    {"id": i, "meta": json.dumps(m), "name": name}
+                    for i, m in zip(ids, metadatas)
+                ],
+            )
+
+    bump_index_version()
+    return len(entries)
+
+
+def catalog_entry_metadata(entry: Any) -> dict:
+    """Vector-store metadata for an ``AnimeCatalogEntry`` row.
+
+    The same dict ``add_anime_to_store`` stores, for the indexes and
+    lookups built straight from the catalog table (lexical index,
+    neighbour table, collaborative candidates).
+    """
+    return _build_metadata({
+        "mal_id": entry.mal_id,
+        **{field: getattr(entry, field) for field in VECTOR_METADATA_FIELDS},
+    })
 
 
 # ═════════════════════════════════════════════════════════
@@ -269,6 +610,7 @@ def search_anime(
     k: int = 20,
     filter_dict: dict[str, Any] | None = None,
     score_threshold: float | None = None,
+    exclude_ids: Iterable[int] | None = None,
 ) -> list[dict]:
     """Search the vector store for anime matching a query.
 
@@ -285,9 +627,12 @@ def search_anime(
         k: Number of results to return (default 20).
         filter_dict: Optional ChromaDB metadata filter.
             Example: {"anime_type": "TV", "year_gte": 2020}
-            See ``_build_filter()`` for supported filters.
+            See ``_build_chroma_filter()`` for supported filters.
         score_threshold: Optional minimum similarity score (0–1).
             Results below this threshold are excluded.
+        exclude_ids: Optional MAL IDs to leave out (e.g. the user's
+            watched list).  Applied *inside* the search, so you still
+            get up to ``k`` unseen results — see ``_with_exclusions``.
 
     Returns:
         List of dicts, each containing:
@@ -303,36 +648,187 @@ def search_anime(
         good matches are typically 0.3–0.7 for our document type.
     """
     store = get_vector_store()
+    filter_dict = _with_exclusions(filter_dict, exclude_ids)
+
+    if get_vector_backend() == "numpy":
+        # Embed once, then a single matrix-vector product over the
+        # memory-mapped catalog.  Scores are plain cosine similarity,
+        # the same scale PGVector's relevance scores use.
+        query_vector = get_embeddings().embed_query(query)
+        hits = store.search(query_vector, k=k, filter_dict=filter_dict)
+    else:
+        # Build ChromaDB where filter if provided
+        where_filter = _build_chroma_filter(filter_dict) if filter_dict else None
+
+        # search with scores
+        results = store.similarity_search_with_relevance_scores(
+            query=query,
+            k=k,
+            filter=where_filter,
+        )
+        hits = [(doc.page_content, doc.metadata or {}, score) for doc, score in results]
 
-    # Build ChromaDB where filter if provided
-    where_filter = _build_filter(filter_dict) if filter_dict else None
+    return _format_results(hits, score_threshold)
 
-    # search with scores
-    results = store.similarity_search_with_relevance_scores(
-        query=query,
+
+def search_anime_many(
+    queries: list[str],
+    k: int = 20,
+    filter_dict: dict[str, Any] | None = None,
+    score_threshold: float | None = None,
+    exclude_ids: Iterable[int] | None = None,
+) -> list[list[dict]]:
+    """Search several queries with ONE embedding round-trip.
+
+    ``retrieve_candidates`` fires 1–3 profile queries per generation.
+    Calling ``search_anime`` in a loop paid one OpenAI request per
+    query; here every query is embedded in a single batched call (cache
+    misses only) and the store is searched by vector.
+
+    Per backend:
+    ─────────────
+    • **numpy**    — one matrix-matrix product for all queries.
+    • **chroma**   — one ``collection.query`` with multiple embeddings.
+    • **pgvector** — one vector search per query (no re-embedding),
+      run concurrently (``search_pool.map_queries``).
+
+    ``exclude_ids`` works as in ``search_anime``.
+
+    Returns one result list per query, in input order, each shaped
+    exactly like ``search_anime``'s output.
+    """
+    if not queries:
+        return []
+
+    return search_anime_by_vectors(
+        _embed_queries(queries),
         k=k,
-        filter=where_filter,
+        filter_dict=filter_dict,
+        score_threshold=score_threshold,
+        exclude_ids=exclude_ids,
     )
 
-    # Format results
-    formatted: list[dict] = []
-    for doc, score in results:
-        if score_threshold is not None and score < score_threshold:
-            continue
 
-        # Extract mal_id from metadata
-        metadata = doc.metadata or {}
-        mal_id = metadata.get("mal_id", 0)
+def search_anime_by_vectors(
+    query_vectors: list[list[float]],
+    k: int = 20,
+    filter_dict: dict[str, Any] | None = None,
+    score_threshold: float | None = None,
+    exclude_ids: Iterable[int] | None = None,
+) -> list[list[dict]]:
+    """Search with pre-computed query vectors — no embedding call.
+
+    Used by ``search_anime_many`` after embedding, and directly for
+    vectors we already have (a user's taste vector, built from stored
+    catalog embeddings).  Returns one result list per vector, shaped
+    like ``search_anime``'s output.
+    """
+    if not len(query_vectors):
+        return []
 
-        formatted.append({
-            "mal_id": mal_id,
-            "title": metadata.get("title", "Unknown"),
-            "embedding_text": doc.page_content,
-            "metadata": metadata,
-            "similarity_score": round(score, 4),
-        })
+    store = get_vector_store()
+    backend = get_vector_backend()
+    filter_dict = _with_exclusions(filter_dict, exclude_ids)
 
-    return formatted
+    if backend == "numpy":
+        hit_lists = store.search_many(query_vectors, k=k, filter_dict=filter_dict)
+    elif backend == "chroma":
+        hit_lists = _chroma_search_by_vectors(store, query_vectors, k, filter_dict)
+    else:
+        where_filter = _build_chroma_filter(filter_dict) if filter_dict else None
+        relevance = store._select_relevance_score_fn()
+
+        def search_one(vector: list[float]) -> list[tuple[str, dict, float]]:
+            results = store.similarity_search_with_score_by_vector(
+                list(map(float, vector)), k=k, filter=where_filter,
+            )
+            return [
+                (doc.page_content, doc.metadata or {}, relevance(distance))
+                for doc, distance in results
+            ]
+
+        # One SQL search per vector, run concurrently on the engine's pool
+        hit_lists = map_queries(search_one, query_vectors)
+
+    return [_format_results(hits, score_threshold) for hits in hit_lists]
+
+
+def _with_exclusions(
+    filter_dict: dict[str, Any] | None,
+    exclude_ids: Iterable[int] | None,
+) -> dict[str, Any] | None:
+    """Fold ``exclude_ids`` into the filter as ``mal_id_nin``.
+
+    Every backend then excludes inside the search itself:
+    • numpy    — a vectorised ``isin`` mask over the mal_id column
+    • chroma   — a ``$nin`` metadata filter
+    • pgvector — ``$nin``, which langchain-postgres compiles to
+      ``NOT IN`` on the JSONB metadata
+
+    So the top-k is computed over unseen anime only, instead of
+    fetching extra and dropping watched titles afterwards (which
+    starved power users with thousands of completed shows).
+    """
+    if not exclude_ids:
+        return filter_dict
+    merged = dict(filter_dict or {})
+    merged["mal_id_nin"] = sorted({int(i) for i in exclude_ids})
+    return merged
+
+
+def _embed_queries(queries: list[str]) -> list[list[float]]:
+    """Embed queries in one request, through the query cache if enabled."""
+    embeddings = get_embeddings()
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(queries)
+    return embeddings.embed_documents(queries)
+
+
+async def awarm_query_embeddings(queries: list[str]) -> bool:
+    """Await the embedding of ``queries`` into the query cache.
+
+    The async pipeline calls this before handing the (synchronous)
+    search to a worker thread: the search then finds every vector
+    cached and makes no HTTP call, so the thread is held for the
+    in-process search only.  ``False`` when there's no cache to warm —
+    local embeddings need no network, and without
+    ``EMBEDDING_CACHE_ENABLED`` the search embeds for itself.
+    """
+    if not queries:
+        return False
+    embeddings = get_embeddings()
+    if not hasattr(embeddings, "aembed_queries"):
+        return False
+    await embeddings.aembed_queries(queries)
+    return True
+
+
+def _chroma_search_by_vectors(
+    store: Any,
+    query_vectors: list[list[float]],
+    k: int,
+    filter_dict: dict[str, Any] | None,
+) -> list[list[tuple[str, dict, float]]]:
+    """Batched nearest-neighbour query against the raw Chroma collection."""
+    where_filter = _build_chroma_filter(filter_dict) if filter_dict else None
+    relevance = store._select_relevance_score_fn()
+
+    raw = store._collection.query(
+        query_embeddings=query_vectors,
+        n_results=k,
+        where=where_filter,
+        include=["documents", "metadatas", "distances"],
+    )
+
+    hit_lists = []
+    for documents, metadatas, distances in zip(
+        raw["documents"], raw["metadatas"], raw["distances"]
+    ):
+        hit_lists.append([
+            (document or "", metadata or {}, relevance(distance))
+            for document, metadata, distance in zip(documents, metadatas, distances)
+        ])
+    return hit_lists
 
 
 # ═════════════════════════════════════════════════════════
@@ -340,16 +836,28 @@ def search_anime(
 # ═════════════════════════════════════════════════════════
 
 
-def get_store_stats() -> dict:
-    """Get statistics about the vector store."""
-    db_url = settings.DATABASE_URL
+def get_store_stats(collection: str | None = None) -> dict:
+    """Get statistics about the vector store.
+
+    Args:
+        collection: Collection to describe (default: the active one).
+    """
+    from app.services.vector_collections import get_active_collection, numpy_index_dir
+
+    backend = get_vector_backend()
+    name = collection or get_active_collection(backend)
 
-    if db_url.startswith("postgresql") or db_url.startswith("postgres"):
+    if backend == "numpy":
+        store = _store_for(collection)
+        return {
+            "total_documents": store.count(),
+            "collection_name": name,
+            "persist_directory": str(numpy_index_dir(name)),
+        }
+    elif backend == "pgvector":
         from sqlalchemy import create_engine, text
 
-        conn = db_url.replace("postgresql://", "postgresql+psycopg://", 1)
-        conn = conn.replace("postgres://", "postgresql+psycopg://", 1)
-        engine = create_engine(conn)
+        engine = create_engine(_psycopg_url(settings.DATABASE_URL))
         with engine.connect() as c:
             result = c.execute(
                 text(
@@ -357,50 +865,51 @@ def get_store_stats() -> dict:
                     "JOIN langchain_pg_collection col ON e.collection_id = col.uuid "
                     "WHERE col.name = :name"
                 ),
-                {"name": settings.VECTOR_COLLECTION_NAME},
+                {"name": name},
             )
             count = result.scalar() or 0
         return {
             "total_documents": count,
-            "collection_name": settings.VECTOR_COLLECTION_NAME,
+            "collection_name": name,
         }
     else:
-        store = get_vector_store()
-        collection = store._collection
+        store = _store_for(collection)
+        collection_obj = store._collection
         return {
-            "total_documents": collection.count(),
-            "collection_name": settings.CHROMA_COLLECTION_NAME,
+            "total_documents": collection_obj.count(),
+            "collection_name": name,
             "persist_directory": settings.CHROMA_PERSIST_DIR,
         }
 
 
-def delete_all_documents() -> int:
-    """Delete all documents from the vector store.
+def drop_collection(name: str, backend: str | None = None) -> None:
+    """Drop a whole collection — used by blue/green garbage collection.
 
-    Useful for rebuilding the index from scratch.
-
-    Returns:
-        Number of documents that were deleted.
+    Never call this on the active collection; rebuilds write a new
+    version instead of emptying the live one (``vector_collections.py``).
+    Dropping is a single call per backend — no loading every id into
+    memory first.
     """
-    db_url = settings.DATABASE_URL
+    backend = backend or get_vector_backend()
+    if name == _vector_store_name:
+        raise RuntimeError(f"Refusing to drop the active collection {name!r}")
 
-    if db_url.startswith("postgresql") or db_url.startswith("postgres"):
-        store = get_vector_store()
-        count = get_store_stats()["total_documents"]
-        store.delete_collection()
-        store.create_collection()
-        logger.info("Deleted %d documents from PGVector store", count)
-        return count
+    store = _named_stores.pop(name, None) or open_vector_store(name, backend)
+    if backend == "numpy":
+        import shutil
+
+        from app.services.vector_collections import numpy_index_dir
+
+        store.delete_all()
+        index_dir = numpy_index_dir(name)
+        if index_dir != Path(settings.NUMPY_INDEX_DIR):
+            # Versions are sub-directories; the original lives in the root
+            shutil.rmtree(index_dir, ignore_errors=True)
     else:
-        store = get_vector_store()
-        collection = store._collection
-        count = collection.count()
-        if count > 0:
-            all_data = collection.get()
-            if all_data["ids"]:
-                collection.delete(ids=all_data["ids"])
-        logger.info("Deleted %d documents from ChromaDB store", count)
-        return count
+        # Chroma and PGVector both drop the collection server-side
+        store.delete_collection()
+    bump_index_version()
+    logger.info("Dropped %s vector collection %s", backend, name)
 
 
 # ═════════════════════════════════════════════════════════
@@ -408,6 +917,10 @@ def delete_all_documents() -> int:
 # ═════════════════════════════════════════════════════════
 
 
+def _is_embeddable(entry: dict) -> bool:
+    return bool(entry.get("mal_id")) and bool(entry.get("embedding_text"))
+
+
 def _build_metadata(entry: dict) -> dict:
     """Build ChromaDB metadata dict from an anime entry.
 
@@ -451,7 +964,45 @@ def _build_metadata(entry: dict) -> dict:
     return metadata
 
 
-def _build_filter(filter_dict: dict) -> dict | None:
+def _format_results(
+    hits: list[tuple[str, dict, float]],
+    score_threshold: float | None = None,
+) -> list[dict]:
+    """Turn ``(document, metadata, score)`` hits into search result dicts.
+
+    Every backend funnels through here so callers (``rag.py``) see the
+    exact same shape regardless of where the vectors live.
+    """
+    formatted: list[dict] = []
+    for document, metadata, score in hits:
+        if score_threshold is not None and score < score_threshold:
+            continue
+
+        # Extract mal_id from metadata
+        mal_id = metadata.get("mal_id", 0)
+
+        formatted.append({
+            "mal_id": mal_id,
+            "title": metadata.get("title", "Unknown"),
+            "embedding_text": document,
+            "metadata": metadata,
+            "similarity_score": round(score, 4),
+        })
+
+    return formatted
+
+
+def _is_postgres_url(db_url: str) -> bool:
+    return db_url.startswith("postgresql") or db_url.startswith("postgres")
+
+
+def _psycopg_url(db_url: str) -> str:
+    """langchain-postgres requires the psycopg (v3) driver prefix."""
+    conn = db_url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return conn.replace("postgres://", "postgresql+psycopg://", 1)
+
+
+def _build_chroma_filter(filter_dict: dict) -> dict | None:
     """Build a ChromaDB ``where`` filter from a user-friendly dict.
 
     Supports simple equality and range filters:
@@ -459,12 +1010,14 @@ def _build_filter(filter_dict: dict) -> dict | None:
     - ``{"year_gte": 2020}`` → year >= 2020
     - ``{"mal_score_gte": 7.0}`` → score >= 7.0
     - ``{"year_lte": 2010}`` → year <= 2010
+    - ``{"mal_id_nin": [1, 5]}`` → mal_id not in [1, 5]
 
     Multiple conditions are combined with ``$and``.
 
     ChromaDB where filter syntax:
         {"field": {"$gte": value}}  — greater than or equal
         {"field": {"$lte": value}}  — less than or equal
+        {"field": {"$nin": [...]}}  — not in list
         {"field": value}            — exact match
         {"$and": [cond1, cond2]}    — combine conditions
 
@@ -474,7 +1027,11 @@ def _build_filter(filter_dict: dict) -> dict | None:
     conditions: list[dict] = []
 
     for key, value in filter_dict.items():
-        if key.endswith("_gte"):
+        if key.endswith("_nin"):
+            field = key[:-4]  # Remove "_nin" suffix
+            if value:
+                conditions.append({field: {"$nin": list(value)}})
+        elif key.endswith("_gte"):
             field = key[:-4]  # Remove "_gte" suffix
             conditions.append({field: {"$gte": value}})
         elif key.endswith("_lte"):
@@ -0,0 +1,159 @@
+"""Startup warm-up — pay the cold-start cost before the first user does.
+
+``get_embeddings()``, ``get_vector_store()`` and ``get_llm()`` are lazy
+singletons, which keeps imports and tests cheap — but it means the
+first generation job after a deploy imports langchain_openai /
+langchain_chroma / langchain_postgres, opens Chroma's persistent
+client and does the first TLS handshakes.  That's several seconds on
+one unlucky user's request.
+
+With ``WARMUP_ENABLED`` the app lifespan runs ``run_warmup()`` as a
+background task right after startup — blocking steps in a worker
+thread, async ones on the serving event loop:
+
+1. ``embeddings``   — build the embeddings client (and query cache)
+2. ``vector_store`` — open the active collection
+3. ``search``       — one real search for the fallback query plus
+   ``WARMUP_EXTRA_QUERIES``; this opens the embeddings connection and
+   leaves those query vectors in the cache
+4. ``llm``          — build ``ChatOpenAI`` and, with
+   ``WARMUP_LLM_PING``, open its async connection pool with a free
+   ``models.retrieve`` call.  Generation jobs call ``ainvoke``, which
+   goes through ``root_async_client`` — an httpx ``AsyncClient`` whose
+   connections belong to the loop that opened them — so the ping is
+   awaited on the serving loop, not in the worker thread
+
+Each step is timed.  A failing step is logged and recorded but does not
+stop the rest — the lazy path will simply retry it on first use.
+
+``/api/health`` stays a pure liveness check; ``/api/health/ready``
+returns 503 until warm-up has finished, so a load balancer only routes
+traffic to warm instances.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from typing import Callable
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+@dataclass
+class WarmupState:
+    status: str = "disabled"  # disabled | pending | running | ready
+    started_at: float | None = None
+    finished_at: float | None = None
+    timings_ms: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("disabled", "ready")
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["ready"] = self.ready
+        if self.started_at is not None and self.finished_at is not None:
+            data["total_ms"] = int((self.finished_at - self.started_at) * 1000)
+        return data
+
+
+_lock = Lock()
+_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    with _lock:
+        return WarmupState(**asdict(_state))
+
+
+def mark_warmup_pending() -> None:
+    """Flag warm-up as scheduled, so readiness is false from startup."""
+    global _state
+    with _lock:
+        _state = WarmupState(status="pending")
+
+
+def reset_warmup() -> None:
+    """Reset to the disabled state (useful for testing)."""
+    global _state
+    with _lock:
+        _state = WarmupState()
+
+
+async def run_warmup(steps: list[tuple[str, Callable[[], object]]] | None = None) -> WarmupState:
+    """Run every warm-up step, recording per-step timings and errors.
+
+    Blocking steps run in a worker thread (``asyncio.to_thread``);
+    coroutine functions are awaited on the calling loop.
+    """
+    steps = default_warmup_steps() if steps is None else steps
+    with _lock:
+        _state.status = "running"
+        _state.started_at = time.time()
+        _state.timings_ms = {}
+        _state.errors = {}
+
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(step):
+                await step()
+            else:
+                await asyncio.to_thread(step)
+        except Exception as exc:  # warm-up must never take the app down
+            logger.warning("Warm-up step %s failed: %s", name, exc)
+            with _lock:
+                _state.errors[name] = str(exc)
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+        with _lock:
+            _state.timings_ms[name] = elapsed_ms
+
+    with _lock:
+        _state.status = "ready"
+        _state.finished_at = time.time()
+        summary = WarmupState(**asdict(_state))
+
+    logger.info(
+        "Warm-up finished in %d ms (%s)%s",
+        summary.to_dict()["total_ms"],
+        ", ".join(f"{k}={v}ms" for k, v in summary.timings_ms.items()),
+        f" with errors in {sorted(summary.errors)}" if summary.errors else "",
+    )
+    return summary
+
+
+def default_warmup_steps() -> list[tuple[str, Callable[[], object]]]:
+    from app.services.vector_store import get_embeddings, get_vector_store
+
+    return [
+        ("embeddings", get_embeddings),
+        ("vector_store", get_vector_store),
+        ("search", _warm_search),
+        ("llm", _warm_llm),
+    ]
+
+
+def _warm_search() -> None:
+    from app.services.rag import FALLBACK_QUERY
+    from app.services.vector_store import search_anime_many
+
+    queries = [FALLBACK_QUERY, *settings.WARMUP_EXTRA_QUERIES]
+    search_anime_many(queries, k=1)
+
+
+async def _warm_llm() -> None:
+    from app.services.recommender import get_llm
+
+    llm = await asyncio.to_thread(get_llm)
+    client = getattr(llm, "root_async_client", None)
+    if settings.WARMUP_LLM_PING and client is not None:
+        # Free endpoint — opens the pooled TLS connection ``ainvoke``
+        # reuses, on the loop the jobs run on
+        await client.models.retrieve(settings.OPENAI_CHAT_MODEL)
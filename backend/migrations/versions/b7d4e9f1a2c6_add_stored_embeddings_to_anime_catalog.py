@@ -0,0 +1,46 @@
+"""add_stored_embeddings_to_anime_catalog
+
+Stores each catalog entry's embedding next to the row so any vector
+backend can be rebuilt without calling OpenAI:
+  - embedding_vector: raw little-endian float16/float32 blob
+  - embedding_dim: number of components in the blob
+  - embedding_model: embedding model that produced the vector
+  - embedding_text_hash: sha256 of the embedded text
+
+All columns are nullable — existing rows get vectors the next time
+they are embedded.
+
+Uses batch_alter_table for SQLite compatibility.
+
+Revision ID: b7d4e9f1a2c6
+Revises: a3f7c2e8d1b5
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e9f1a2c6'
+down_revision: Union[str, None] = 'a3f7c2e8d1b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("anime_catalog") as batch_op:
+        batch_op.add_column(sa.Column("embedding_vector", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("embedding_dim", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("embedding_model", sa.String(100), nullable=True))
+        batch_op.add_column(sa.Column("embedding_text_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("anime_catalog") as batch_op:
+        batch_op.drop_column("embedding_text_hash")
+        batch_op.drop_column("embedding_model")
+        batch_op.drop_column("embedding_dim")
+        batch_op.drop_column("embedding_vector")
@@ -0,0 +1,42 @@
+"""add_vector_metadata_stale_to_anime_catalog
+
+Adds anime_catalog.vector_metadata_stale: set when an update only
+touched vector store metadata (member counts, score, image) so the
+next ``embed`` run pushes metadata without re-embedding.  Defaults to
+false so existing rows are unaffected.
+
+Uses batch_alter_table for SQLite compatibility.
+
+Revision ID: c4a8e2f6b9d3
+Revises: b7d4e9f1a2c6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e2f6b9d3'
+down_revision: Union[str, None] = 'b7d4e9f1a2c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("anime_catalog") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "vector_metadata_stale",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.false(),
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("anime_catalog") as batch_op:
+        batch_op.drop_column("vector_metadata_stale")
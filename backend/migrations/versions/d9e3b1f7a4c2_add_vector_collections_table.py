@@ -0,0 +1,45 @@
+"""add_vector_collections_table
+
+Adds vector_collections: one row per versioned vector collection, with
+``status`` acting as the active pointer for blue/green rebuilds.  No
+rows are created here — until the first ``reindex`` switch, searches
+keep using the original un-versioned collection.
+
+Revision ID: d9e3b1f7a4c2
+Revises: c4a8e2f6b9d3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e3b1f7a4c2'
+down_revision: Union[str, None] = 'c4a8e2f6b9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('vector_collections',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('backend', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('activated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('retired_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('backend', 'name', name='uq_vector_collection_backend_name')
+    )
+    op.create_index(op.f('ix_vector_collections_backend'), 'vector_collections', ['backend'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_vector_collections_backend'), table_name='vector_collections')
+    op.drop_table('vector_collections')
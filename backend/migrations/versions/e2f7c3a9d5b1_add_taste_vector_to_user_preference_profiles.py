@@ -0,0 +1,44 @@
+"""add_taste_vector_to_user_preference_profiles
+
+Caches the user's taste vector — a score-weighted centroid of the
+stored catalog embeddings of their top-rated anime — on the profile:
+
+  - taste_vector: little-endian float16/float32 blob
+  - taste_vector_dim: number of components in the blob
+  - taste_vector_model: embedding model the centroid was built from
+
+All nullable; cleared on every list import and rebuilt lazily on the
+next generation.
+
+Uses batch_alter_table for SQLite compatibility.
+
+Revision ID: e2f7c3a9d5b1
+Revises: d9e3b1f7a4c2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f7c3a9d5b1'
+down_revision: Union[str, None] = 'd9e3b1f7a4c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("user_preference_profiles") as batch_op:
+        batch_op.add_column(sa.Column("taste_vector", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("taste_vector_dim", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("taste_vector_model", sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("user_preference_profiles") as batch_op:
+        batch_op.drop_column("taste_vector_model")
+        batch_op.drop_column("taste_vector_dim")
+        batch_op.drop_column("taste_vector")
@@ -10,3 +10,13 @@ from app.main import app
 def client() -> TestClient:
     """Return a test client for the FastAPI app."""
     return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_retrieval_cache():
+    """Tests stub the vector search per test — never serve a cached pool."""
+    from app.services.retrieval_cache import reset_retrieval_cache
+
+    reset_retrieval_cache()
+    yield
+    reset_retrieval_cache()
@@ -3,6 +3,7 @@
 These tests cover the pure functions in anime_catalog.py:
 • Jikan response parsing (parse_jikan_to_catalog)
 • Embedding text construction (build_embedding_text)
+• Re-embed vs metadata-only decisions (_update_catalog_entry)
 • Helper functions (_extract_names, _extract_related_anime_ids)
 
 All tests use mock data — no network calls, no DB, no API keys.
@@ -18,9 +19,11 @@ These are the highest-value tests we can write.
 
 import pytest
 
+from app.models.anime import AnimeCatalogEntry
 from app.services.anime_catalog import (
     parse_jikan_to_catalog,
     build_embedding_text,
+    _update_catalog_entry,
     _extract_names,
     _extract_related_anime_ids,
 )
@@ -246,7 +249,9 @@ class TestBuildEmbeddingText:
         assert "Themes: Time Travel" in text
         assert "Demographics: Seinen" in text
         assert "Studios: White Fox" in text
-        assert "Score: 9.07 (2,500,000 members)" in text
+        assert "Score: 9.07" in text
+        # Volatile member counts stay out of the embedded text
+        assert "members" not in text
         assert "Synopsis: Eccentric scientist" in text
 
     def test_english_title_different_from_main(self):
@@ -313,6 +318,61 @@ class TestBuildEmbeddingText:
         assert "Type: 12 episodes" in text
 
 
+# ═════════════════════════════════════════════════════════
+# Tests: _update_catalog_entry
+# ═════════════════════════════════════════════════════════
+
+
+def _embedded_entry() -> AnimeCatalogEntry:
+    parsed = parse_jikan_to_catalog(MOCK_JIKAN_COWBOY_BEBOP, source="top_anime")
+    entry = AnimeCatalogEntry(**{k: v for k, v in parsed.items() if hasattr(AnimeCatalogEntry, k)})
+    entry.is_embedded = True
+    entry.vector_metadata_stale = False
+    return entry
+
+
+class TestUpdateCatalogEntry:
+    """Test which updates trigger a re-embed vs a metadata-only push."""
+
+    def test_member_count_change_is_metadata_only(self):
+        entry = _embedded_entry()
+        crawl = dict(MOCK_JIKAN_COWBOY_BEBOP, members=1_900_000, rank=45, popularity=40)
+
+        _update_catalog_entry(entry, parse_jikan_to_catalog(crawl))
+
+        assert entry.mal_members == 1_900_000
+        assert entry.is_embedded is True
+        assert entry.vector_metadata_stale is True
+
+    def test_rank_change_needs_nothing(self):
+        entry = _embedded_entry()
+        crawl = dict(MOCK_JIKAN_COWBOY_BEBOP, rank=1)
+
+        _update_catalog_entry(entry, parse_jikan_to_catalog(crawl))
+
+        assert entry.is_embedded is True
+        assert entry.vector_metadata_stale is False
+
+    def test_synopsis_change_triggers_reembed(self):
+        entry = _embedded_entry()
+        crawl = dict(MOCK_JIKAN_COWBOY_BEBOP, synopsis="A brand new synopsis.")
+
+        _update_catalog_entry(entry, parse_jikan_to_catalog(crawl))
+
+        assert entry.is_embedded is False
+        assert "A brand new synopsis." in entry.embedding_text
+
+    def test_identical_crawl_changes_nothing(self):
+        entry = _embedded_entry()
+        text = entry.embedding_text
+
+        _update_catalog_entry(entry, parse_jikan_to_catalog(MOCK_JIKAN_COWBOY_BEBOP))
+
+        assert entry.embedding_text == text
+        assert entry.is_embedded is True
+        assert entry.vector_metadata_stale is False
+
+
 # ═════════════════════════════════════════════════════════
 # Tests: Helper functions
 # ═════════════════════════════════════════════════════════
@@ -0,0 +1,79 @@
+"""Tests for the catalog score table behind adaptive fetch sizing."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.anime import AnimeCatalogEntry
+from app.services.catalog_stats import (
+    CatalogScores,
+    get_catalog_scores,
+    load_catalog_scores,
+    reset_catalog_scores,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_table():
+    reset_catalog_scores()
+    yield
+    reset_catalog_scores()
+
+
+def _table() -> CatalogScores:
+    # 10 anime, ids out of order; 7 score 7.0+, one unscored
+    return CatalogScores(
+        [10, 3, 7, 1, 2, 4, 5, 6, 8, 9],
+        [8.1, 6.5, 7.2, 9.0, 7.0, None, 6.9, 8.8, 7.7, 7.4],
+    )
+
+
+# ═════════════════════════════════════════════════════════
+# CatalogScores
+# ═════════════════════════════════════════════════════════
+
+
+class TestCatalogScores:
+    def test_count_under_filter(self):
+        table = _table()
+
+        assert table.count() == 10
+        assert table.count(7.0) == 7
+
+    def test_excluded_fraction_counts_only_filtered_catalog(self):
+        # 3 and 5 are below 7.0, 4 is unscored, 999 isn't in the catalog
+        fraction = _table().excluded_fraction({1, 2, 3, 4, 5, 999}, min_score=7.0)
+
+        assert fraction == pytest.approx(2 / 7)
+
+    def test_excluded_fraction_without_filter(self):
+        assert _table().excluded_fraction([1, 2, 3, 4, 5], None) == pytest.approx(0.5)
+
+    def test_nothing_excluded(self):
+        assert _table().excluded_fraction(set(), 7.0) == 0.0
+        assert CatalogScores([], []).excluded_fraction({1}, 7.0) == 0.0
+
+
+class TestLoadCatalogScores:
+    def test_reads_embedded_entries(self, tmp_path, monkeypatch):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'catalog.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        monkeypatch.setattr("app.db.session.SessionLocal", factory)
+        db = factory()
+        db.add(AnimeCatalogEntry(mal_id=1, title="A", mal_score=8.0, embedding_text="a"))
+        db.add(AnimeCatalogEntry(mal_id=2, title="B", mal_score=6.0, embedding_text="b"))
+        db.add(AnimeCatalogEntry(mal_id=3, title="Not embedded", mal_score=9.0))
+        db.commit()
+        db.close()
+
+        table = load_catalog_scores()
+
+        assert table is get_catalog_scores()
+        assert table.count() == 2
+        assert table.count(7.0) == 1
+        engine.dispose()
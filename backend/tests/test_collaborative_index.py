@@ -0,0 +1,266 @@
+"""Tests for the item-based collaborative-filtering index."""
+
+import itertools
+import math
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.anime import AnimeCatalogEntry, AnimeEntry, AnimeList
+from app.models.user import User
+from app.services import rag
+from app.services.collaborative_index import (
+    CooccurrenceCounter,
+    ItemSimilarityIndex,
+    build_collab_index,
+    reset_collab_index,
+    set_collab_index,
+    user_basket,
+)
+from app.services.rag import retrieve_candidates
+
+BASKETS = [[1, 2, 3], [1, 2], [2, 3, 4], [1, 2, 4], [3, 4]]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index():
+    reset_collab_index()
+    yield
+    reset_collab_index()
+
+
+def _brute_force(baskets: list[list[int]]) -> dict[tuple[int, int], float]:
+    liked = {i: {u for u, b in enumerate(baskets) if i in b} for b in baskets for i in b}
+    sims = {}
+    for a, b in itertools.permutations(sorted(liked), 2):
+        co = len(liked[a] & liked[b])
+        if co:
+            sims[(a, b)] = co / math.sqrt(len(liked[a]) * len(liked[b]))
+    return sims
+
+
+def _as_dict(item_ids, indptr, neighbors, sims) -> dict[tuple[int, int], float]:
+    out = {}
+    for row, mal_id in enumerate(item_ids):
+        for j in range(indptr[row], indptr[row + 1]):
+            out[(int(mal_id), int(item_ids[neighbors[j]]))] = float(sims[j])
+    return out
+
+
+# ═════════════════════════════════════════════════════════
+# CooccurrenceCounter
+# ═════════════════════════════════════════════════════════
+
+
+class TestCooccurrenceCounter:
+    def test_binary_cosine_matches_brute_force(self):
+        counter = CooccurrenceCounter()
+        counter.add(BASKETS)
+
+        got = _as_dict(*counter.similarities(top_n=10))
+
+        assert got.keys() == _brute_force(BASKETS).keys()
+        for pair, sim in _brute_force(BASKETS).items():
+            assert got[pair] == pytest.approx(sim, rel=1e-6)
+
+    def test_chunked_build_equals_single_pass(self):
+        whole = CooccurrenceCounter()
+        whole.add(BASKETS)
+        chunked = CooccurrenceCounter()
+        for chunk in (BASKETS[:2], BASKETS[2:3], BASKETS[3:]):
+            chunked.add(chunk)
+
+        assert _as_dict(*chunked.similarities(top_n=10)) == _as_dict(*whole.similarities(top_n=10))
+        assert chunked.baskets == whole.baskets == 5
+
+    def test_rows_are_top_n_best_first(self):
+        counter = CooccurrenceCounter()
+        counter.add(BASKETS)
+
+        item_ids, indptr, _, sims = counter.similarities(top_n=2)
+
+        for row in range(len(item_ids)):
+            row_sims = sims[indptr[row]:indptr[row + 1]]
+            assert len(row_sims) <= 2
+            assert np.all(np.diff(row_sims) <= 0)
+
+    def test_min_support_and_keep_ids(self):
+        counter = CooccurrenceCounter()
+        counter.add(BASKETS)
+
+        got = _as_dict(*counter.similarities(top_n=10, min_support=2, keep_ids={1, 2, 3}))
+
+        # 1–2 are co-liked 3 times, 2–3 twice, 1–3 only once
+        assert set(got) == {(1, 2), (2, 1), (2, 3), (3, 2)}
+
+    def test_empty(self):
+        item_ids, indptr, neighbors, _ = CooccurrenceCounter().similarities(top_n=5)
+
+        assert len(item_ids) == len(neighbors) == 0
+        assert list(indptr) == [0]
+
+
+class TestUserBasket:
+    def test_at_or_above_own_mean(self):
+        # Mean of scored entries is 7; unscored (0) entries are ignored
+        assert user_basket([(1, 9), (2, 5), (3, 7), (4, 0)], max_items=10) == [1, 3]
+
+    def test_capped_to_best(self):
+        assert user_basket([(1, 8), (2, 10), (3, 9)], max_items=2) == [2, 3]
+
+
+# ═════════════════════════════════════════════════════════
+# ItemSimilarityIndex
+# ═════════════════════════════════════════════════════════
+
+
+def _index() -> ItemSimilarityIndex:
+    counter = CooccurrenceCounter()
+    counter.add(BASKETS)
+    item_ids, indptr, neighbors, sims = counter.similarities(top_n=10)
+    metadatas = [
+        {"mal_id": int(m), "title": f"Anime {m}", "mal_score": 8.0 if m != 4 else 6.5}
+        for m in item_ids
+    ]
+    return ItemSimilarityIndex(
+        item_ids, indptr, neighbors, sims, [f"doc {m}" for m in item_ids], metadatas,
+    )
+
+
+class TestItemSimilarityIndex:
+    def test_recommend_excludes_seeds_and_watched(self):
+        hits = _index().recommend([(1, 10.0)], k=5, exclude_ids={3})
+
+        assert [h["mal_id"] for h in hits] == [2, 4]
+        assert hits[0]["similarity_score"] == pytest.approx(settings.COLLAB_WEIGHT)
+        assert hits[0]["embedding_text"] == "doc 2"
+
+    def test_recommend_weights_seeds(self):
+        brute = _brute_force(BASKETS)
+
+        hits = _index().recommend([(1, 9.0), (3, 6.0)], k=5)
+
+        expected = (9 * brute[(1, 2)] + 6 * brute[(3, 2)]) / 15
+        assert hits[0]["mal_id"] == 2
+        assert hits[0]["collab_score"] == pytest.approx(expected, abs=1e-4)
+
+    def test_recommend_applies_metadata_filter(self):
+        hits = _index().recommend([(1, 10.0)], k=5, filter_dict={"mal_score_gte": 7.0})
+
+        assert 4 not in {h["mal_id"] for h in hits}
+
+    def test_unknown_seeds(self):
+        assert _index().recommend([(999, 10.0)], k=5) == []
+
+    def test_save_load_roundtrip(self, tmp_path):
+        path = tmp_path / "collab.npz"
+        _index().save(path)
+
+        loaded = ItemSimilarityIndex.load(path)
+
+        assert loaded.neighbors_of(1) == _index().neighbors_of(1)
+        assert loaded.metadata_for(2)["title"] == "Anime 2"
+
+
+# ═════════════════════════════════════════════════════════
+# Build from the database
+# ═════════════════════════════════════════════════════════
+
+
+@pytest.fixture()
+def lists_db(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'collab.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr("app.db.session.SessionLocal", factory)
+    monkeypatch.setattr(settings, "COLLAB_MIN_SUPPORT", 1)
+    monkeypatch.setattr(settings, "COLLAB_BUILD_CHUNK_USERS", 2)
+
+    db = factory()
+    for mal_id in (1, 2, 3, 4):
+        db.add(AnimeCatalogEntry(mal_id=mal_id, title=f"Anime {mal_id}", embedding_text=f"doc {mal_id}"))
+    for n, basket in enumerate(BASKETS):
+        user = User(email=f"user{n}@example.com", provider="email")
+        db.add(user)
+        db.flush()
+        anime_list = AnimeList(user_id=user.id, source="mal")
+        db.add(anime_list)
+        db.flush()
+        # Liked shows score 9, plus one disliked show below the user's mean
+        for mal_id in basket:
+            db.add(AnimeEntry(anime_list_id=anime_list.id, mal_anime_id=mal_id,
+                              title="", watch_status="completed", user_score=9))
+        db.add(AnimeEntry(anime_list_id=anime_list.id, mal_anime_id=99,
+                          title="", watch_status="dropped", user_score=3))
+    db.commit()
+    db.close()
+    yield
+    engine.dispose()
+
+
+class TestBuildCollabIndex:
+    def test_streams_lists_into_catalog_only_index(self, lists_db):
+        index = build_collab_index()
+
+        brute = _brute_force(BASKETS)
+        assert index.count() == 4  # 99 is disliked by everyone and not in the catalog
+        assert dict(index.neighbors_of(1)) == pytest.approx(
+            {b: s for (a, b), s in brute.items() if a == 1}
+        )
+        assert index.metadata_for(3)["title"] == "Anime 3"
+
+
+# ═════════════════════════════════════════════════════════
+# retrieve_candidates integration
+# ═════════════════════════════════════════════════════════
+
+
+PROFILE = {
+    "genre_affinity": [{"genre": "Action", "affinity": 0.9}],
+    "top_10": [{"title": "Anime 1", "mal_anime_id": 1, "user_score": 10}],
+}
+
+
+@pytest.fixture()
+def vector_search(monkeypatch):
+    calls = []
+
+    def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+        calls.extend(queries)
+        return [[] for _ in queries]
+
+    monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+    monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+    return calls
+
+
+class TestRetrieveWithCollaborative:
+    def test_adds_collaborative_list_without_embedding(self, vector_search, monkeypatch):
+        monkeypatch.setattr(settings, "COLLAB_ENABLED", True)
+        set_collab_index(_index())
+
+        result = retrieve_candidates(PROFILE, k=5, min_score=None)
+
+        assert len(vector_search) == 2  # genre + top-shows queries, nothing extra
+        assert [c["mal_id"] for c in result][:1] == [2]
+
+    def test_disabled_or_unloaded(self, vector_search, monkeypatch):
+        set_collab_index(_index())
+        assert retrieve_candidates(PROFILE, k=5, min_score=None) == []
+
+        monkeypatch.setattr(settings, "COLLAB_ENABLED", True)
+        reset_collab_index()
+        assert retrieve_candidates(PROFILE, k=5, min_score=None) == []
+
+    def test_not_used_for_custom_queries(self, vector_search, monkeypatch):
+        monkeypatch.setattr(settings, "COLLAB_ENABLED", True)
+        set_collab_index(_index())
+
+        assert retrieve_candidates(PROFILE, k=5, custom_query="space westerns") == []
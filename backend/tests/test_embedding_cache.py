@@ -0,0 +1,185 @@
+"""Tests for the query-embedding cache.
+
+Uses a fake embeddings object that counts calls, so we can assert
+exactly when OpenAI would have been hit.  The disk tier is a SQLite
+file in a temporary directory.
+"""
+
+import pytest
+
+from app.core.metrics import get_metrics_summary
+from app.services.embedding_cache import CachedEmbeddings, normalize_query_text
+
+
+class FakeEmbeddings:
+    """Deterministic stand-in for OpenAIEmbeddings."""
+
+    def __init__(self):
+        self.query_calls = 0
+        self.document_calls = 0
+        self.async_document_calls = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.query_calls += 1
+        return [float(len(text)), 1.0, 0.5]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.document_calls += 1
+        return [[float(len(t)), 0.0, 0.0] for t in texts]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.async_document_calls += 1
+        return [[float(len(t)), 0.0, 0.0] for t in texts]
+
+
+def _cache(tmp_path, base=None, **kwargs) -> CachedEmbeddings:
+    return CachedEmbeddings(
+        base or FakeEmbeddings(),
+        model="test-model",
+        path=tmp_path / "cache.sqlite3",
+        **kwargs,
+    )
+
+
+class TestNormalizeQueryText:
+    def test_collapses_whitespace(self):
+        assert normalize_query_text("  Action,\n Sci-Fi   anime ") == "Action, Sci-Fi anime"
+
+    def test_preserves_case(self):
+        assert normalize_query_text("Madhouse") != normalize_query_text("madhouse")
+
+
+class TestCachedEmbeddings:
+    def test_repeat_query_hits_memory(self, tmp_path):
+        base = FakeEmbeddings()
+        cache = _cache(tmp_path, base)
+
+        first = cache.embed_query("highly rated popular anime")
+        second = cache.embed_query("highly rated popular anime ")
+
+        assert first == second
+        assert base.query_calls == 1
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        base = FakeEmbeddings()
+        _cache(tmp_path, base).embed_query("dark fantasy")
+
+        fresh_base = FakeEmbeddings()
+        vector = _cache(tmp_path, fresh_base).embed_query("dark fantasy")
+
+        assert fresh_base.query_calls == 0
+        assert vector == [12.0, 1.0, 0.5]
+
+    def test_model_is_part_of_key(self, tmp_path):
+        base = FakeEmbeddings()
+        _cache(tmp_path, base).embed_query("mecha")
+        CachedEmbeddings(base, model="other-model", path=tmp_path / "cache.sqlite3").embed_query("mecha")
+
+        assert base.query_calls == 2
+
+    def test_documents_are_not_cached(self, tmp_path):
+        base = FakeEmbeddings()
+        cache = _cache(tmp_path, base)
+
+        cache.embed_documents(["a", "b"])
+        cache.embed_documents(["a", "b"])
+
+        assert base.document_calls == 2
+        assert cache.disk_size() == 0
+
+    def test_memory_lru_eviction(self, tmp_path):
+        cache = CachedEmbeddings(FakeEmbeddings(), model="m", path=None, memory_size=2)
+        for text in ("a", "b", "c"):
+            cache.embed_query(text)
+
+        assert list(cache._memory) == [cache._key("b"), cache._key("c")]
+
+    def test_disk_size_based_eviction(self, tmp_path):
+        cache = _cache(tmp_path, memory_size=0, max_entries=2)
+        for text in ("one", "two", "three"):
+            cache.embed_query(text)
+
+        assert cache.disk_size() == 2
+        assert cache._get_disk(cache._key("one")) is None
+
+    def test_eviction_recounts_rows_from_other_writers(self, tmp_path):
+        cache = _cache(tmp_path, memory_size=0, max_entries=3)
+        other = _cache(tmp_path, memory_size=0, max_entries=3)
+        for text in ("a", "b", "c"):
+            other.embed_query(text)
+
+        # ``cache``'s running count misses other's rows until it passes
+        # the cap; the recount then evicts down to it
+        for text in ("d", "e", "f"):
+            cache.embed_query(text)
+        assert cache.disk_size() == 6
+
+        cache.embed_query("g")
+        assert cache.disk_size() == 3
+        assert cache._get_disk(cache._key("g")) is not None
+
+    def test_disk_hit_touch_is_batched(self, tmp_path):
+        cache = _cache(tmp_path, memory_size=0, max_entries=2)
+        cache.embed_query("one")
+        cache.embed_query("two")
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+
+        cache.embed_query("one")  # disk hit: a SELECT, no write
+
+        assert [s.split()[0] for s in statements] == ["SELECT"]
+        assert cache._pending_touches.keys() == {cache._key("one")}
+
+        cache.embed_query("three")  # the write flushes the touch first
+
+        assert cache._get_disk(cache._key("one")) is not None
+        assert cache._get_disk(cache._key("two")) is None
+
+    def test_hit_and_miss_counters(self, tmp_path):
+        before = get_metrics_summary()["counters"]
+        cache = _cache(tmp_path)
+        cache.embed_query("slice of life")
+        cache.embed_query("slice of life")
+        after = get_metrics_summary()["counters"]
+
+        assert after["embedding_cache_miss"] == before["embedding_cache_miss"] + 1
+        assert after["embedding_cache_hit_memory"] == before["embedding_cache_hit_memory"] + 1
+
+    def test_embed_queries_batches_misses(self, tmp_path):
+        base = FakeEmbeddings()
+        cache = _cache(tmp_path, base)
+        cache.embed_query("mecha")
+
+        vectors = cache.embed_queries(["mecha", "isekai", "sports", "isekai"])
+
+        assert base.document_calls == 1
+        assert vectors[0] == [5.0, 1.0, 0.5]
+        assert vectors[1] == vectors[3] == [6.0, 0.0, 0.0]
+
+    def test_embed_queries_all_cached_skips_base(self, tmp_path):
+        base = FakeEmbeddings()
+        cache = _cache(tmp_path, base)
+        cache.embed_queries(["a", "b"])
+        cache.embed_queries(["b", "a"])
+
+        assert base.document_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_aembed_queries_shares_the_cache(self, tmp_path):
+        base = FakeEmbeddings()
+        cache = _cache(tmp_path, base)
+        cache.embed_query("mecha")
+
+        vectors = await cache.aembed_queries(["mecha", "isekai", "isekai"])
+
+        assert base.async_document_calls == 1
+        assert base.document_calls == 0
+        assert vectors[1] == vectors[2] == [6.0, 0.0, 0.0]
+        # Warmed asynchronously, served synchronously
+        assert cache.embed_queries(["isekai"]) == [[6.0, 0.0, 0.0]]
+        assert base.document_calls == 0
+
+    def test_delegates_unknown_attributes(self, tmp_path):
+        base = FakeEmbeddings()
+        base.chunk_size = 1000
+        assert _cache(tmp_path, base).chunk_size == 1000
@@ -0,0 +1,328 @@
+"""Tests for the concurrent catalog embedding pipeline.
+
+The limiter runs on a fake clock (``sleep`` just advances it), and the
+pipeline gets fake embed/write functions — no OpenAI, no vector store.
+They cover:
+
+• Token-bucket accounting and waits
+• Applying OpenAI rate-limit headers
+• 429 detection and retry delays
+• Concurrent embedding, ordered hand-off to the writer, error paths
+• Token counting/truncation and token-budget batch packing
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services.embedding_pipeline import (
+    EmbedResult,
+    TokenBucketLimiter,
+    TokenCounter,
+    build_token_batches,
+    estimate_tokens,
+    load_batch_report,
+    parse_reset_duration,
+    save_batch_report,
+    summarize_batches,
+    rate_limit_wait,
+    run_embedding_pipeline,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.slept += seconds
+
+
+def _limiter(rpm=60, tpm=6000) -> tuple[TokenBucketLimiter, FakeClock]:
+    clock = FakeClock()
+    return TokenBucketLimiter(rpm=rpm, tpm=tpm, clock=clock, sleep=clock.sleep), clock
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("Error code: 429 - rate_limit_exceeded")
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: TokenBucketLimiter
+# ═════════════════════════════════════════════════════════
+
+
+class TestTokenBucketLimiter:
+    """Test the request/token buckets on a fake clock."""
+
+    def test_initial_burst_does_not_wait(self):
+        limiter, clock = _limiter()
+        for _ in range(3):
+            limiter.acquire(1000)
+        assert clock.slept == 0
+
+    def test_waits_for_token_refill(self):
+        limiter, clock = _limiter(tpm=6000)  # refills 100 tokens/s
+        limiter.acquire(6000)
+        limiter.acquire(500)
+        assert clock.slept == pytest.approx(5.0, rel=0.01)
+
+    def test_waits_for_request_refill(self):
+        limiter, clock = _limiter(rpm=2)  # one request per 30s
+        limiter.acquire(1)
+        limiter.acquire(1)
+        limiter.acquire(1)
+        assert clock.slept == pytest.approx(30.0, rel=0.01)
+
+    def test_oversized_request_is_clamped(self):
+        limiter, clock = _limiter(tpm=100)
+        limiter.acquire(10_000)
+        assert clock.slept == 0
+
+    def test_pause_blocks_until_deadline(self):
+        limiter, clock = _limiter()
+        limiter.pause(7.5)
+        limiter.acquire(1)
+        assert clock.slept == pytest.approx(7.5, rel=0.01)
+
+    def test_headers_lower_remaining_tokens(self):
+        limiter, clock = _limiter(tpm=6000)
+        limiter.update_from_headers({"x-ratelimit-remaining-tokens": "100"})
+        limiter.acquire(600)
+        assert clock.slept == pytest.approx(5.0, rel=0.01)
+
+    def test_exhausted_header_pauses_until_reset(self):
+        limiter, clock = _limiter()
+        limiter.update_from_headers({
+            "X-RateLimit-Remaining-Requests": "0",
+            "X-RateLimit-Reset-Requests": "2s",
+        })
+        limiter.acquire(1)
+        assert clock.slept >= 2.0
+
+
+class TestParseResetDuration:
+    @pytest.mark.parametrize("value, expected", [
+        ("6ms", 0.006),
+        ("1.5s", 1.5),
+        ("1m30s", 90.0),
+        ("3", 3.0),
+    ])
+    def test_formats(self, value, expected):
+        assert parse_reset_duration(value) == pytest.approx(expected)
+
+    def test_missing(self):
+        assert parse_reset_duration(None) is None
+
+
+class TestRateLimitWait:
+    """Test 429 detection and delay selection."""
+
+    def test_other_errors_are_not_retried(self):
+        assert rate_limit_wait(ValueError("bad input"), 0) is None
+
+    def test_retry_after_ms_header_wins(self):
+        exc = FakeRateLimitError({"retry-after-ms": "250", "retry-after": "9"})
+        assert rate_limit_wait(exc, 0) == pytest.approx(0.25)
+
+    def test_message_hint(self):
+        exc = Exception("rate_limit_exceeded: Please try again in 1.2s")
+        assert rate_limit_wait(exc, 0) == pytest.approx(1.7)
+
+    def test_exponential_backoff_capped(self):
+        assert rate_limit_wait(FakeRateLimitError(), 0) == 5
+        assert rate_limit_wait(FakeRateLimitError(), 10) == 60
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: run_embedding_pipeline
+# ═════════════════════════════════════════════════════════
+
+
+def _fake_embed(texts):
+    return EmbedResult(vectors=[[float(len(t))] for t in texts], tokens=len(texts))
+
+
+class TestRunEmbeddingPipeline:
+    """Test concurrency, hand-off to the writer and error handling."""
+
+    def test_every_batch_written_with_its_vectors(self):
+        written = {}
+
+        def write(batch, vectors):
+            for item, vector in zip(batch, vectors):
+                written[item] = vector
+
+        batches = [["a", "bb"], ["ccc"], ["dddd", "e"]]
+        stats = run_embedding_pipeline(
+            batches, text_of=lambda x: x, embed_fn=_fake_embed, write_fn=write,
+            limiter=TokenBucketLimiter(rpm=10_000, tpm=10_000_000),
+        )
+
+        assert written == {"a": [1.0], "bb": [2.0], "ccc": [3.0], "dddd": [4.0], "e": [1.0]}
+        assert (stats.documents, stats.batches, stats.tokens) == (5, 3, 5)
+
+    def test_requests_run_concurrently(self):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_embed(texts):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return _fake_embed(texts)
+
+        run_embedding_pipeline(
+            [[str(i)] for i in range(8)], text_of=lambda x: x, embed_fn=slow_embed,
+            write_fn=lambda b, v: None,
+            limiter=TokenBucketLimiter(rpm=10_000, tpm=10_000_000), max_in_flight=4,
+        )
+        assert peak > 1
+
+    def test_writes_run_on_one_thread(self):
+        threads = set()
+        run_embedding_pipeline(
+            [[str(i)] for i in range(6)], text_of=lambda x: x, embed_fn=_fake_embed,
+            write_fn=lambda b, v: threads.add(threading.get_ident()),
+            limiter=TokenBucketLimiter(rpm=10_000, tpm=10_000_000), max_in_flight=3,
+        )
+        assert len(threads) == 1
+
+    def test_rate_limited_request_is_retried(self):
+        calls = {"n": 0}
+
+        def flaky_embed(texts):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise FakeRateLimitError({"retry-after-ms": "1"})
+            return _fake_embed(texts)
+
+        stats = run_embedding_pipeline(
+            [["x"]], text_of=lambda x: x, embed_fn=flaky_embed, write_fn=lambda b, v: None,
+            limiter=TokenBucketLimiter(rpm=10_000, tpm=10_000_000),
+        )
+        assert calls["n"] == 2
+        assert stats.rate_limited == 1
+        assert stats.documents == 1
+
+    def test_non_rate_limit_error_propagates(self):
+        def broken_embed(texts):
+            raise ValueError("invalid input")
+
+        with pytest.raises(ValueError):
+            run_embedding_pipeline(
+                [["x"], ["y"]], text_of=lambda x: x, embed_fn=broken_embed,
+                write_fn=lambda b, v: None,
+                limiter=TokenBucketLimiter(rpm=10_000, tpm=10_000_000),
+            )
+
+    def test_writer_error_propagates(self):
+        def broken_write(batch, vectors):
+            raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            run_embedding_pipeline(
+                [["x"], ["y"]], text_of=lambda x: x, embed_fn=_fake_embed,
+                write_fn=broken_write,
+                limiter=TokenBucketLimiter(rpm=10_000, tpm=10_000_000),
+            )
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: token-aware batching
+# ═════════════════════════════════════════════════════════
+
+
+class TestBuildTokenBatches:
+    """Test greedy packing against a token budget."""
+
+    def test_packs_up_to_budget(self):
+        batches = build_token_batches(
+            [40, 40, 30, 50, 10, 90], tokens_of=lambda t: t, token_budget=100, max_inputs=10,
+        )
+        assert batches == [[40, 40], [30, 50, 10], [90]]
+
+    def test_respects_max_inputs(self):
+        batches = build_token_batches([1] * 5, tokens_of=lambda t: t, token_budget=100, max_inputs=2)
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_oversized_item_gets_own_batch(self):
+        batches = build_token_batches(
+            [10, 500, 10], tokens_of=lambda t: t, token_budget=100, max_inputs=10,
+        )
+        assert batches == [[10], [500], [10]]
+
+    def test_every_batch_within_budget(self):
+        sizes = [(i * 37) % 300 + 1 for i in range(200)]
+        batches = build_token_batches(sizes, tokens_of=lambda t: t, token_budget=1000, max_inputs=2048)
+
+        assert sum(len(b) for b in batches) == 200
+        assert all(sum(b) <= 1000 for b in batches)
+        # Greedy: each closed batch couldn't take the next item
+        for batch, nxt in zip(batches, batches[1:]):
+            assert sum(batch) + nxt[0] > 1000
+
+    def test_empty(self):
+        assert build_token_batches([], tokens_of=len, token_budget=10, max_inputs=10) == []
+
+
+class TestTokenCounter:
+    """Test truncation with whichever tokenizer is available."""
+
+    def test_short_text_untouched(self):
+        counter = TokenCounter("text-embedding-3-small")
+        text, tokens, cut = counter.fit("Title: Monster", 100)
+
+        assert (text, cut) == ("Title: Monster", False)
+        assert tokens == counter.count("Title: Monster")
+
+    def test_long_text_truncated_deterministically(self):
+        counter = TokenCounter("text-embedding-3-small")
+        long_text = "Synopsis: " + "a detective hunts a killer across Germany. " * 500
+
+        first = counter.fit(long_text, 200)
+        second = counter.fit(long_text, 200)
+
+        assert first == second
+        text, tokens, cut = first
+        assert cut is True
+        assert tokens <= 200
+        assert long_text.startswith(text)
+
+    def test_fallback_estimate_is_conservative_for_multibyte(self):
+        assert estimate_tokens("進撃の巨人") >= 5
+
+
+class TestBatchReport:
+    """Test the stats summary and its JSON round trip."""
+
+    def test_summary(self):
+        summary = summarize_batches([3, 1, 2], [300, 100, 200], token_budget=400)
+
+        assert summary["batches"] == 3
+        assert summary["documents_per_batch"] == {"min": 1, "median": 2, "max": 3, "mean": 2.0}
+        assert summary["tokens_per_batch"]["max"] == 300
+        assert summary["mean_budget_fill"] == 0.5
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "report.json"
+        save_batch_report(path, {"documents": 3})
+        assert load_batch_report(path) == {"documents": 3}
+
+    def test_missing_report(self, tmp_path):
+        assert load_batch_report(tmp_path / "nope.json") is None
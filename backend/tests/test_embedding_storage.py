@@ -0,0 +1,77 @@
+"""Tests for the catalog vector blob format.
+
+Covers the round trip through ``pack_vector`` / ``unpack_vector`` for
+both storage dtypes and the text hash used to decide what to re-embed.
+Pure functions — no database, no vector store.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.embedding_storage import (
+    embedding_text_hash,
+    needs_embedding,
+    pack_vector,
+    unpack_vector,
+)
+
+
+class TestPackUnpack:
+    """Test the compact blob encoding."""
+
+    def test_float32_round_trip_is_exact(self):
+        vector = [0.1, -0.25, 0.333333, 1.0]
+        blob = pack_vector(vector, "float32")
+
+        assert len(blob) == 16
+        np.testing.assert_array_equal(unpack_vector(blob, 4), np.float32(vector))
+
+    def test_float16_halves_size_and_stays_close(self):
+        rng = np.random.default_rng(0)
+        vector = rng.normal(size=1536).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        blob = pack_vector(vector, "float16")
+
+        restored = unpack_vector(blob, 1536)
+        assert len(blob) == 1536 * 2
+        assert restored.dtype == np.float32
+        assert float(restored @ vector) == pytest.approx(1.0, abs=1e-3)
+
+    def test_unknown_dtype_rejected(self):
+        with pytest.raises(ValueError):
+            pack_vector([1.0], "int8")
+
+    def test_blob_not_matching_dim_rejected(self):
+        with pytest.raises(ValueError):
+            unpack_vector(b"\x00" * 6, 4)
+
+
+class TestEmbeddingTextHash:
+    """Test the stale-vector detection hash."""
+
+    def test_stable_and_text_sensitive(self):
+        assert embedding_text_hash("Title: Monster") == embedding_text_hash("Title: Monster")
+        assert embedding_text_hash("Title: Monster") != embedding_text_hash("Title: Monster ")
+        assert len(embedding_text_hash("x")) == 64
+
+
+class TestNeedsEmbedding:
+    """Test the content-hash re-embed decision."""
+
+    def test_never_embedded(self):
+        assert needs_embedding("Title: X", None, None, "m") is True
+
+    def test_unchanged_text_and_model(self):
+        h = embedding_text_hash("Title: X")
+        assert needs_embedding("Title: X", h, "m", "m") is False
+
+    def test_text_changed(self):
+        h = embedding_text_hash("Title: X")
+        assert needs_embedding("Title: X\nSynopsis: new", h, "m", "m") is True
+
+    def test_model_changed(self):
+        h = embedding_text_hash("Title: X")
+        assert needs_embedding("Title: X", h, "m", "other") is True
+
+    def test_no_text_never_embeds(self):
+        assert needs_embedding(None, None, None, "m") is False
@@ -0,0 +1,203 @@
+"""Tests for franchise clusters and sequel-aware retrieval."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.anime import AnimeCatalogEntry
+from app.services import rag
+from app.services.franchise_index import (
+    FranchiseIndex,
+    UnionFind,
+    build_franchise_clusters,
+    build_franchise_index,
+    parse_related_ids,
+    reset_franchise_index,
+    set_franchise_index,
+)
+from app.services.rag import retrieve_candidates
+
+# Two franchises: AoT (16498 → 25777 → 35760, recap 19285) and Bebop (1 ↔ 5)
+RELATIONS = [
+    (16498, [25777, 19285]),
+    (25777, [16498, 35760]),
+    (35760, [25777]),
+    (1, [5]),
+    (5, [1]),
+]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index():
+    reset_franchise_index()
+    yield
+    reset_franchise_index()
+
+
+# ═════════════════════════════════════════════════════════
+# Union-find
+# ═════════════════════════════════════════════════════════
+
+
+class TestUnionFind:
+    def test_transitive_clusters_named_by_smallest_member(self):
+        clusters = build_franchise_clusters(RELATIONS)
+
+        assert {clusters[m] for m in (16498, 25777, 35760, 19285)} == {16498}
+        assert clusters[1] == clusters[5] == 1
+
+    def test_singletons_are_omitted(self):
+        assert build_franchise_clusters([(7, [])]) == {}
+
+    def test_cap_keeps_clusters_bounded(self):
+        chain = [(i, [i + 1]) for i in range(1, 10)]
+
+        clusters = build_franchise_clusters(chain, max_cluster_size=4)
+
+        sizes = {}
+        for cluster in clusters.values():
+            sizes[cluster] = sizes.get(cluster, 0) + 1
+        assert max(sizes.values()) <= 4
+
+    def test_union_reports_merges(self):
+        uf = UnionFind()
+
+        assert uf.union(1, 2) is True
+        assert uf.union(2, 1) is False
+        assert uf.find(1) == uf.find(2)
+
+    def test_parse_related_ids(self):
+        assert parse_related_ids("5, 17205") == [5, 17205]
+        assert parse_related_ids("5,,x, 6") == [5, 6]
+        assert parse_related_ids(None) == []
+
+
+# ═════════════════════════════════════════════════════════
+# FranchiseIndex
+# ═════════════════════════════════════════════════════════
+
+
+def _index() -> FranchiseIndex:
+    return FranchiseIndex.from_clusters(build_franchise_clusters(RELATIONS))
+
+
+def _candidate(mal_id: int, year: int | None) -> dict:
+    return {"mal_id": mal_id, "metadata": {"year": year} if year else {}}
+
+
+class TestFranchiseIndex:
+    def test_expand_exclusions(self):
+        expanded = _index().expand_exclusions({16498, 42})
+
+        assert expanded == {16498, 25777, 35760, 19285, 42}
+
+    def test_lookups_for_unknown_anime(self):
+        index = _index()
+
+        assert index.cluster_of(42) == 42
+        assert index.members_of(42) == [42]
+
+    def test_collapse_keeps_best_slot_filled_by_earliest_entry(self):
+        ranked = [
+            _candidate(35760, 2017),  # Season 3 ranked first
+            _candidate(1, 1998),
+            _candidate(16498, 2013),
+            _candidate(5, 2001),
+            _candidate(42, None),
+        ]
+
+        collapsed = _index().collapse(ranked)
+
+        assert [c["mal_id"] for c in collapsed] == [16498, 1, 42]
+
+    def test_collapse_without_years_keeps_rank_order(self):
+        collapsed = _index().collapse([_candidate(5, None), _candidate(1, None)])
+
+        assert [c["mal_id"] for c in collapsed] == [5]
+
+    def test_save_load_roundtrip(self, tmp_path):
+        path = tmp_path / "franchises.npz"
+        _index().save(path)
+
+        loaded = FranchiseIndex.load(path)
+
+        assert loaded.cluster_of(35760) == 16498
+        assert loaded.franchise_count() == 2
+
+    def test_build_from_catalog(self, tmp_path, monkeypatch):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'franchises.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        monkeypatch.setattr("app.db.session.SessionLocal", factory)
+        db = factory()
+        for mal_id, related in RELATIONS:
+            db.add(AnimeCatalogEntry(
+                mal_id=mal_id, title=str(mal_id),
+                related_anime_ids=", ".join(map(str, related)),
+            ))
+        db.add(AnimeCatalogEntry(mal_id=42, title="Standalone"))
+        db.commit()
+        db.close()
+
+        index = build_franchise_index()
+
+        assert index.cluster_of(19285) == 16498
+        assert index.count() == 6
+        engine.dispose()
+
+
+# ═════════════════════════════════════════════════════════
+# retrieve_candidates integration
+# ═════════════════════════════════════════════════════════
+
+
+PROFILE = {"genre_affinity": [{"genre": "Action", "affinity": 0.9}]}
+
+
+@pytest.fixture()
+def search(monkeypatch):
+    """Fake search over a pool full of franchise entries."""
+    pool = [(16498, 2013), (25777, 2017), (35760, 2018), (1, 1998), (5, 2001), (42, 2020)]
+    excluded_in_search = []
+
+    def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+        excluded_in_search.append(set(exclude_ids or ()))
+        return [
+            [
+                {"mal_id": m, "title": str(m), "embedding_text": "",
+                 "metadata": {"genres": "Action", "year": y}, "similarity_score": 0.9 - i / 100}
+                for i, (m, y) in enumerate(pool) if m not in (exclude_ids or ())
+            ]
+            for _ in queries
+        ]
+
+    monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+    monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "FRANCHISE_DEDUP_ENABLED", True)
+    set_franchise_index(_index())
+    return excluded_in_search
+
+
+class TestRetrieveWithFranchises:
+    def test_started_franchise_excluded_inside_search(self, search):
+        result = retrieve_candidates(PROFILE, watched_mal_ids={16498}, k=10, min_score=None)
+
+        assert {25777, 35760, 19285} <= search[0]
+        assert [c["mal_id"] for c in result] == [1, 42]
+
+    def test_one_entry_per_franchise(self, search):
+        result = retrieve_candidates(PROFILE, k=10, min_score=None)
+
+        assert sorted(c["mal_id"] for c in result) == [1, 42, 16498]
+
+    def test_disabled(self, search, monkeypatch):
+        monkeypatch.setattr(settings, "FRANCHISE_DEDUP_ENABLED", False)
+
+        result = retrieve_candidates(PROFILE, watched_mal_ids={16498}, k=10, min_score=None)
+
+        assert len(result) == 5
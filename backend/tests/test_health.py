@@ -1,9 +1,98 @@
 """Tests for the health check endpoint."""
 
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app.services.warmup import mark_warmup_pending, reset_warmup, run_warmup
+
 
 def test_health_check(client: TestClient) -> None:
     response = client.get("/api/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+# ── Readiness ────────────────────────────────────────────
+
+
+@pytest.fixture()
+def warmup_state():
+    reset_warmup()
+    yield
+    reset_warmup()
+
+
+def test_ready_when_warmup_disabled(client: TestClient, warmup_state) -> None:
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["warmup"]["status"] == "disabled"
+
+
+def test_not_ready_while_warmup_pending(client: TestClient, warmup_state) -> None:
+    mark_warmup_pending()
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+    # Liveness is unaffected
+    assert client.get("/api/health").json() == {"status": "ok"}
+
+
+def test_ready_after_warmup_with_timings(client: TestClient, warmup_state) -> None:
+    mark_warmup_pending()
+    asyncio.run(run_warmup([("vector_store", lambda: None), ("search", lambda: None)]))
+
+    body = client.get("/api/health/ready").json()
+    assert body["status"] == "ready"
+    assert set(body["warmup"]["timings_ms"]) == {"vector_store", "search"}
+    assert body["warmup"]["total_ms"] >= 0
+
+
+def test_failed_step_is_recorded_and_others_still_run(warmup_state) -> None:
+    ran = []
+
+    def broken():
+        raise RuntimeError("OPENAI_API_KEY is not configured")
+
+    state = asyncio.run(run_warmup([("embeddings", broken), ("llm", lambda: ran.append("llm"))]))
+
+    assert state.ready
+    assert state.errors == {"embeddings": "OPENAI_API_KEY is not configured"}
+    assert ran == ["llm"]
+    assert set(state.timings_ms) == {"embeddings", "llm"}
+
+
+@pytest.mark.asyncio
+async def test_async_step_awaited_on_serving_loop(warmup_state) -> None:
+    # The LLM ping must open its connections on the loop jobs run on
+    loops = []
+
+    async def ping():
+        loops.append(asyncio.get_running_loop())
+
+    state = await run_warmup([("llm", ping)])
+
+    assert loops == [asyncio.get_running_loop()]
+    assert state.timings_ms.keys() == {"llm"}
+
+
+@pytest.mark.asyncio
+async def test_shutdown_settles_startup_tasks() -> None:
+    from app.main import _stop_startup_tasks
+
+    async def still_loading():
+        await asyncio.sleep(60)
+
+    async def broken():
+        raise RuntimeError("index file is corrupt")
+
+    tasks = {"lexical": asyncio.create_task(still_loading()), "collab": asyncio.create_task(broken())}
+    await asyncio.sleep(0)
+
+    await _stop_startup_tasks(tasks)
+
+    assert tasks["lexical"].cancelled()
+    assert all(task.done() for task in tasks.values())
@@ -0,0 +1,54 @@
+"""Tests for the incremental JSON array parser behind streamed recommendations."""
+
+import json
+
+from app.services.json_stream import JSONArrayStream
+
+ITEMS = [
+    {"mal_id": 1, "title": "Cowboy Bebop", "reasoning": "Jazz, [space] and {noir}.", "similar_to": ["Trigun"]},
+    {"mal_id": 5, "title": "Say \"Bang\"", "reasoning": "A\\\\b", "similar_to": []},
+]
+
+
+def _feed_in_chunks(parser: JSONArrayStream, text: str, size: int) -> list[list]:
+    return [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+
+
+class TestJSONArrayStream:
+    def test_elements_complete_in_order_across_any_chunking(self):
+        text = json.dumps(ITEMS, indent=2)
+        for size in (1, 3, 7, len(text)):
+            parser = JSONArrayStream()
+
+            elements = [e for batch in _feed_in_chunks(parser, text, size) for e in batch]
+
+            assert elements == ITEMS
+            assert parser.closed
+
+    def test_first_element_before_array_closes(self):
+        text = json.dumps(ITEMS)
+        first_end = len("[" + json.dumps(ITEMS[0]))
+        parser = JSONArrayStream()
+
+        assert parser.feed(text[:first_end]) == [ITEMS[0]]
+        assert not parser.closed
+
+    def test_skips_fences_and_prose(self):
+        text = "Sure! Here you go:\n```json\n" + json.dumps(ITEMS) + "\n```\nEnjoy [them]!"
+        parser = JSONArrayStream()
+
+        assert parser.feed(text) == ITEMS
+
+    def test_malformed_element_skipped(self):
+        parser = JSONArrayStream()
+
+        elements = parser.feed('[{"mal_id": 1,}, {"mal_id": 2}, 3, "x]"]')
+
+        assert elements == [{"mal_id": 2}]
+        assert parser.closed
+
+    def test_nothing_before_array(self):
+        parser = JSONArrayStream()
+
+        assert parser.feed("I can't help with that.") == []
+        assert not parser.started
@@ -0,0 +1,212 @@
+"""Tests for the BM25 lexical index and hybrid retrieval."""
+
+import pytest
+
+from app.core.config import settings
+from app.services import rag
+from app.services.lexical_index import (
+    BM25Index,
+    analyze,
+    blend_lexical,
+    get_lexical_index,
+    reset_lexical_index,
+    set_lexical_index,
+)
+from app.services.rag import aretrieve_candidates, retrieve_candidates
+
+CATALOG = [
+    (9253, "Steins;Gate", "Steins;Gate. A self-proclaimed mad scientist discovers time travel by microwave.", 9.1),
+    (30484, "Steins;Gate 0", "Steins;Gate 0. Sequel where the mad scientist lives with his failure.", 8.5),
+    (1535, "Death Note", "Death Note. Thriller about a notebook that kills. Studio: Madhouse.", 8.6),
+    (19, "Monster", "Monster. Psychological thriller about a surgeon hunting a killer. Studio: Madhouse.", 8.9),
+    (32182, "Mob Psycho 100", "Mob Psycho 100. Comedy action about a psychic middle school boy.", 8.5),
+    (1, "Cowboy Bebop", "Cowboy Bebop. Bounty hunters travel through space with jazz.", 8.8),
+]
+# Filler so common words have a realistic document frequency
+CATALOG += [
+    (10_000 + i, f"Filler {i}", f"Filler {i}. An anime about school life, more or less like any other, and friends who travel.", 6.5)
+    for i in range(40)
+]
+
+
+def _index() -> BM25Index:
+    documents = [text for _, _, text, _ in CATALOG]
+    metadatas = [
+        {"mal_id": mal_id, "title": title, "mal_score": score}
+        for mal_id, title, _, score in CATALOG
+    ]
+    return BM25Index(documents, metadatas)
+
+
+def _hit(mal_id: int, similarity: float) -> dict:
+    return {
+        "mal_id": mal_id,
+        "title": f"Anime {mal_id}",
+        "embedding_text": "",
+        "metadata": {"genres": "Action"},
+        "similarity_score": similarity,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _no_global_index():
+    reset_lexical_index()
+    yield
+    reset_lexical_index()
+
+
+# ═════════════════════════════════════════════════════════
+# Analysis and scoring
+# ═════════════════════════════════════════════════════════
+
+
+class TestAnalyze:
+    def test_folds_plurals(self):
+        assert analyze("Madhouse thrillers") == ["madhouse", "thriller"]
+
+    def test_keeps_short_and_double_s_words(self):
+        assert analyze("gas boss") == ["gas", "boss"]
+
+
+class TestBM25Match:
+    def test_title_query_ranks_exact_title_first(self):
+        match = _index().match("more like Steins;Gate", k=5)
+
+        assert [h["mal_id"] for h in match.hits[:2]] == [9253, 30484]
+        assert match.hits[0]["lexical_score"] == 1.0
+        assert match.confident
+
+    def test_broad_query_is_not_confident(self):
+        match = _index().match("school friends travel", k=5)
+
+        assert match.hits
+        assert not match.confident
+
+    def test_unknown_words_lower_confidence(self):
+        assert not _index().match("Steins;Gate xyzzy plugh frobnicate").confident
+
+    def test_plural_query_matches_singular_text(self):
+        match = _index().match("Madhouse thrillers", k=5)
+
+        assert {h["mal_id"] for h in match.hits[:2]} == {1535, 19}
+
+    def test_filter_and_exclusions(self):
+        match = _index().match(
+            "Steins;Gate", k=5, filter_dict={"mal_score_gte": 8.0}, exclude_ids={9253},
+        )
+
+        assert [h["mal_id"] for h in match.hits] == [30484]
+
+    def test_no_hits(self):
+        match = _index().match("nonexistentword")
+
+        assert match.hits == []
+        assert not match.confident
+
+    def test_result_shape_matches_vector_search(self):
+        hit = _index().match("Cowboy Bebop").hits[0]
+
+        assert set(hit) >= {"mal_id", "title", "embedding_text", "metadata", "similarity_score"}
+        assert hit["title"] == "Cowboy Bebop"
+
+
+class TestSnapshot:
+    def test_save_load_round_trip(self, tmp_path):
+        index = _index()
+        path = tmp_path / "lexical.npz"
+        index.save(path)
+
+        loaded = BM25Index.load(path)
+
+        assert loaded.count() == index.count()
+        for query in ["Steins;Gate", "Madhouse thrillers", "school travel"]:
+            assert loaded.match(query, k=5) == index.match(query, k=5)
+
+
+# ═════════════════════════════════════════════════════════
+# Blending and retrieve_candidates integration
+# ═════════════════════════════════════════════════════════
+
+
+class TestBlendLexical:
+    def test_blends_and_backfills_with_floor(self):
+        vector = [_hit(1, 0.8), _hit(2, 0.6)]
+        lexical = [dict(_hit(3, 1.0), lexical_score=1.0), dict(_hit(2, 0.5), lexical_score=0.5)]
+
+        blended = {h["mal_id"]: h for h in blend_lexical(vector, lexical, weight=0.3, k=10)}
+
+        assert blended[1]["similarity_score"] == pytest.approx(0.56)
+        assert blended[2]["similarity_score"] == pytest.approx(0.7 * 0.6 + 0.3 * 0.5)
+        assert blended[3]["similarity_score"] == pytest.approx(0.7 * 0.6 + 0.3 * 1.0)
+
+    def test_truncates_to_k(self):
+        vector = [_hit(i, 0.5) for i in range(5)]
+
+        assert len(blend_lexical(vector, [], weight=0.3, k=3)) == 3
+
+
+class TestHybridRetrieval:
+    def test_confident_query_skips_embedding(self, monkeypatch):
+        monkeypatch.setattr(settings, "LEXICAL_SEARCH_ENABLED", True)
+        set_lexical_index(_index())
+        calls = []
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            calls.append(list(queries))
+            return [[] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        result = retrieve_candidates({}, min_score=None, custom_query="Steins;Gate")
+
+        assert calls == []
+        assert result[0]["mal_id"] == 9253
+
+    @pytest.mark.asyncio
+    async def test_async_confident_query_warms_nothing(self, monkeypatch):
+        monkeypatch.setattr(settings, "LEXICAL_SEARCH_ENABLED", True)
+        set_lexical_index(_index())
+        warmed = []
+
+        async def fake_warm(queries):
+            warmed.append(list(queries))
+            return True
+
+        monkeypatch.setattr(rag, "awarm_query_embeddings", fake_warm)
+        monkeypatch.setattr(
+            rag, "search_anime_many",
+            lambda queries, k, filter_dict=None, exclude_ids=None: [[] for _ in queries],
+        )
+        result = await aretrieve_candidates({}, min_score=None, custom_query="Steins;Gate")
+
+        assert warmed == []
+        assert result[0]["mal_id"] == 9253
+
+    def test_unconfident_query_blends(self, monkeypatch):
+        monkeypatch.setattr(settings, "LEXICAL_SEARCH_ENABLED", True)
+        set_lexical_index(_index())
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            return [[_hit(1, 0.7), _hit(5, 0.6)] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        result = retrieve_candidates({}, k=50, min_score=None, custom_query="school friends travel")
+
+        ids = {c["mal_id"] for c in result}
+        assert {1, 5} <= ids
+        assert len(ids) > 2
+        assert all("lexical_score" in c for c in result)
+
+    def test_disabled_setting_ignores_loaded_index(self, monkeypatch):
+        monkeypatch.setattr(settings, "LEXICAL_SEARCH_ENABLED", False)
+        set_lexical_index(_index())
+        calls = []
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            calls.append(list(queries))
+            return [[] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        retrieve_candidates({}, custom_query="Steins;Gate")
+
+        assert calls == [["Steins;Gate"]]
+        assert get_lexical_index() is not None
@@ -0,0 +1,79 @@
+"""Tests for the deterministic offline embedding provider."""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.local_embeddings import HashingEmbeddings, local_model_name, tokenize
+from app.services.numpy_index import NumpyVectorIndex
+
+
+def _cosine(a, b) -> float:
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestTokenize:
+    def test_lowercases_and_splits(self):
+        assert tokenize("Dark Fantasy, revenge!") == ["dark", "fantasy", "revenge"]
+
+    def test_empty(self):
+        assert tokenize("  ...  ") == []
+
+
+class TestHashingEmbeddings:
+    def test_dimensions_and_unit_norm(self):
+        vector = HashingEmbeddings(dimensions=64).embed_query("mecha pilots in space")
+
+        assert len(vector) == 64
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-6)
+
+    def test_deterministic_across_instances(self):
+        text = "A quiet slice of life story about a bakery"
+        assert HashingEmbeddings(seed=3).embed_query(text) == HashingEmbeddings(seed=3).embed_query(text)
+
+    def test_seed_changes_vectors(self):
+        text = "psychological thriller"
+        assert HashingEmbeddings(seed=1).embed_query(text) != HashingEmbeddings(seed=2).embed_query(text)
+
+    def test_documents_match_queries(self):
+        emb = HashingEmbeddings(dimensions=128)
+        docs = emb.embed_documents(["sports anime", "space opera"])
+
+        assert docs[0] == emb.embed_query("sports anime")
+        assert docs[1] == emb.embed_query("space opera")
+
+    def test_lexical_overlap_is_closer(self):
+        emb = HashingEmbeddings()
+        query = emb.embed_query("dark fantasy revenge")
+        related = emb.embed_query("A dark fantasy tale of revenge and betrayal")
+        unrelated = emb.embed_query("Cheerful high school volleyball club comedy")
+
+        assert _cosine(query, related) > _cosine(query, unrelated)
+
+    def test_word_order_matters_through_bigrams(self):
+        emb = HashingEmbeddings()
+        assert emb.embed_query("dog bites man") != emb.embed_query("man bites dog")
+
+    def test_empty_text_is_still_a_unit_vector(self):
+        vector = HashingEmbeddings(dimensions=32).embed_query("")
+        assert np.linalg.norm(vector) == pytest.approx(1.0)
+
+    def test_invalid_dimensions(self):
+        with pytest.raises(ValueError):
+            HashingEmbeddings(dimensions=0)
+
+    def test_model_name(self):
+        assert HashingEmbeddings(dimensions=256, seed=7).model == local_model_name(256, 7)
+        assert local_model_name(256, 7) != settings.OPENAI_EMBEDDING_MODEL
+
+    def test_plugs_into_numpy_index(self, tmp_path):
+        index = NumpyVectorIndex(tmp_path, embeddings=HashingEmbeddings(dimensions=256))
+        index.add_texts(
+            ["space opera with giant robots", "romantic comedy at a cafe"],
+            metadatas=[{"mal_id": 1}, {"mal_id": 2}],
+            ids=["anime_1", "anime_2"],
+        )
+        query = HashingEmbeddings(dimensions=256).embed_query("giant robots in space")
+
+        top = index.search(query, k=1)
+        assert top[0][1]["mal_id"] == 1
@@ -0,0 +1,202 @@
+"""Tests for the precomputed item-to-item neighbour table."""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.anime import AnimeCatalogEntry
+from app.services import neighbor_index
+from app.services.cauldron import _retrieve_from_neighbors
+from app.services.franchise_index import FranchiseIndex, reset_franchise_index, set_franchise_index
+from app.services.neighbor_index import (
+    NeighborTable,
+    compute_neighbors,
+    get_neighbor_table,
+    load_neighbor_table,
+    reset_neighbor_table,
+    set_neighbor_table,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_table():
+    reset_neighbor_table()
+    reset_franchise_index()
+    yield
+    reset_neighbor_table()
+    reset_franchise_index()
+
+
+def _brute_force(vectors: np.ndarray, top_n: int) -> np.ndarray:
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = unit @ unit.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1, kind="stable")[:, :top_n]
+
+
+# ═════════════════════════════════════════════════════════
+# compute_neighbors
+# ═════════════════════════════════════════════════════════
+
+
+class TestComputeNeighbors:
+    @pytest.mark.parametrize("block_size", [1, 7, 64, 1000])
+    def test_matches_brute_force_for_any_block_size(self, block_size):
+        vectors = np.random.default_rng(0).normal(size=(40, 16))
+
+        neighbors, scores = compute_neighbors(vectors, top_n=5, block_size=block_size)
+
+        assert np.array_equal(neighbors, _brute_force(vectors, 5))
+        assert np.all(np.diff(scores.astype(np.float32), axis=1) <= 0)
+
+    def test_never_its_own_neighbour(self):
+        vectors = np.random.default_rng(1).normal(size=(10, 4))
+
+        neighbors, _ = compute_neighbors(vectors, top_n=9, block_size=3)
+
+        assert not np.any(neighbors == np.arange(10)[:, None])
+
+    def test_top_n_clamped_to_catalog(self):
+        neighbors, scores = compute_neighbors(np.eye(3), top_n=50)
+
+        assert neighbors.shape == scores.shape == (3, 2)
+
+    def test_single_anime(self):
+        neighbors, _ = compute_neighbors(np.ones((1, 4)), top_n=5)
+
+        assert neighbors.shape == (1, 0)
+
+
+# ═════════════════════════════════════════════════════════
+# NeighborTable
+# ═════════════════════════════════════════════════════════
+
+
+def _table() -> NeighborTable:
+    # Rows: 10 → [20, 30], 20 → [10, 30], 30 → [20, 40], 40 → [30, -]
+    return NeighborTable(
+        mal_ids=np.array([10, 20, 30, 40]),
+        neighbors=np.array([[1, 2], [0, 2], [1, 3], [2, -1]]),
+        scores=np.array([[0.9, 0.5], [0.9, 0.8], [0.8, 0.6], [0.6, 0.0]]),
+        model="hashing-4",
+    )
+
+
+class TestNeighborTable:
+    def test_neighbors_of(self):
+        table = _table()
+
+        assert [m for m, _ in table.neighbors_of(10)] == [20, 30]
+        assert table.neighbors_of(10, k=1)[0][1] == pytest.approx(0.9, abs=1e-3)
+        assert table.neighbors_of(40) == [(30, pytest.approx(0.6, abs=1e-3))]
+        assert table.neighbors_of(999) == []
+
+    def test_similar_to_favours_shared_neighbours(self):
+        table = _table()
+
+        ranked = table.similar_to([10, 40])
+
+        # 30 neighbours both seeds; 20 only the first
+        assert [m for m, _ in ranked] == [30, 20]
+        assert ranked[0][1] == pytest.approx((0.5 + 0.6) / 2, abs=1e-3)
+
+    def test_similar_to_excludes(self):
+        assert _table().similar_to([20], exclude_ids={10}) == [(30, pytest.approx(0.8, abs=1e-3))]
+
+    def test_save_load_roundtrip(self, tmp_path):
+        path = tmp_path / "neighbors.npz"
+        _table().save(path)
+
+        loaded = NeighborTable.load(path)
+
+        assert loaded.model == "hashing-4"
+        assert 30 in loaded
+        assert loaded.neighbors_of(20) == _table().neighbors_of(20)
+
+    def test_load_ignores_other_model(self, tmp_path, monkeypatch):
+        path = tmp_path / "neighbors.npz"
+        _table().save(path)
+        monkeypatch.setattr(settings, "NEIGHBOR_INDEX_PATH", str(path))
+        monkeypatch.setattr(
+            "app.services.vector_store.get_embedding_model_name", lambda: "other-model",
+        )
+
+        assert load_neighbor_table() is None
+        assert get_neighbor_table() is None
+
+    def test_missing_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "NEIGHBOR_INDEX_PATH", str(tmp_path / "absent.npz"))
+
+        assert load_neighbor_table() is None
+
+
+# ═════════════════════════════════════════════════════════
+# Cauldron retrieval from the table
+# ═════════════════════════════════════════════════════════
+
+
+@pytest.fixture()
+def catalog_db(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'neighbors.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for mal_id, score in [(10, 8.5), (20, 8.0), (30, 7.5), (40, 6.0)]:
+        db.add(AnimeCatalogEntry(
+            mal_id=mal_id, title=f"Anime {mal_id}", genres="Action",
+            mal_score=score, embedding_text=f"Anime {mal_id}",
+        ))
+    db.commit()
+    monkeypatch.setattr(settings, "CAULDRON_NEIGHBORS_ENABLED", True)
+    set_neighbor_table(_table())
+    yield db
+    db.close()
+    engine.dispose()
+
+
+class TestCauldronNeighbors:
+    def test_candidates_from_table(self, catalog_db):
+        candidates = _retrieve_from_neighbors([10], {}, {10}, k=2, db=catalog_db)
+
+        assert [c["mal_id"] for c in candidates] == [20, 30]
+        assert candidates[0]["metadata"]["mal_score"] == 8.0
+        assert "combined_score" in candidates[0]
+
+    def test_score_floor_and_short_pool_fall_back(self, catalog_db):
+        # 40 is the only other neighbour of 30 besides 20, and scores 6.0
+        assert _retrieve_from_neighbors([30], {}, {30, 20}, k=1, db=catalog_db) is None
+
+    def test_unknown_seed_falls_back(self, catalog_db):
+        assert _retrieve_from_neighbors([999], {}, set(), k=1, db=catalog_db) is None
+
+    def test_disabled(self, catalog_db, monkeypatch):
+        monkeypatch.setattr(settings, "CAULDRON_NEIGHBORS_ENABLED", False)
+
+        assert _retrieve_from_neighbors([10], {}, set(), k=1, db=catalog_db) is None
+
+    def test_table_not_loaded(self, catalog_db):
+        neighbor_index.reset_neighbor_table()
+
+        assert _retrieve_from_neighbors([10], {}, set(), k=1, db=catalog_db) is None
+
+    def test_seed_franchise_excluded(self, catalog_db, monkeypatch):
+        monkeypatch.setattr(settings, "FRANCHISE_DEDUP_ENABLED", True)
+        # 20 is a sequel of seed 10
+        set_franchise_index(FranchiseIndex([10, 20, 30, 40], [1, 1, 2, 3]))
+
+        candidates = _retrieve_from_neighbors([10], {}, {10}, k=1, db=catalog_db)
+
+        assert [c["mal_id"] for c in candidates] == [30]
+
+    def test_one_candidate_per_franchise(self, catalog_db, monkeypatch):
+        monkeypatch.setattr(settings, "FRANCHISE_DEDUP_ENABLED", True)
+        # 20 and 30 are one franchise: collapsed, the pool can't fill k=2
+        set_franchise_index(FranchiseIndex([10, 20, 30, 40], [1, 2, 2, 3]))
+
+        assert _retrieve_from_neighbors([10], {}, {10}, k=2, db=catalog_db) is None
+        assert len(_retrieve_from_neighbors([10], {}, {10}, k=1, db=catalog_db)) == 1
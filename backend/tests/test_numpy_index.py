@@ -0,0 +1,252 @@
+"""Tests for the in-process NumPy vector index.
+
+These tests build tiny indexes in a temporary directory with
+hand-made vectors — no OpenAI, no ChromaDB, no network.  They cover:
+
+• Top-k cosine search ordering
+• Metadata filters (same syntax as ``_build_chroma_filter``)
+• Upserts (overwrite in place) and appends
+• Persistence — a fresh instance memory-maps what the last one wrote
+• The append-only records log, its compaction, and reloading when
+  another process writes the index — without tearing concurrent searches
+"""
+
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.numpy_index import NumpyVectorIndex
+
+
+def _build_index(tmp_path) -> NumpyVectorIndex:
+    index = NumpyVectorIndex(tmp_path)
+    index.add_embeddings(
+        texts=["Title: A", "Title: B", "Title: C"],
+        embeddings=[[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]],
+        metadatas=[
+            {"mal_id": 1, "title": "A", "anime_type": "TV", "year": 1998, "mal_score": 8.7},
+            {"mal_id": 2, "title": "B", "anime_type": "Movie", "year": 2016, "mal_score": 8.9},
+            {"mal_id": 3, "title": "C", "anime_type": "TV", "year": 2021},
+        ],
+        ids=["anime_1", "anime_2", "anime_3"],
+    )
+    return index
+
+
+class TestSearch:
+    """Test brute-force cosine search."""
+
+    def test_results_sorted_by_cosine(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([1.0, 0.0], k=3)
+
+        assert [meta["mal_id"] for _, meta, _ in hits] == [1, 2, 3]
+        assert hits[0][2] == pytest.approx(1.0)
+        assert hits[1][2] == pytest.approx(0.6)
+
+    def test_k_limits_results(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([0.0, 1.0], k=1)
+
+        assert len(hits) == 1
+        assert hits[0][1]["mal_id"] == 3
+
+    def test_query_is_normalised(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([10.0, 0.0], k=1)
+        assert hits[0][2] == pytest.approx(1.0)
+
+    def test_empty_index_returns_nothing(self, tmp_path):
+        assert NumpyVectorIndex(tmp_path).search([1.0, 0.0], k=5) == []
+
+    def test_search_many_matches_single_searches(self, tmp_path):
+        index = _build_index(tmp_path)
+        queries = [[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]]
+        batched = index.search_many(queries, k=2)
+
+        assert batched == [index.search(q, k=2) for q in queries]
+
+    def test_search_many_shares_filter(self, tmp_path):
+        index = _build_index(tmp_path)
+        batched = index.search_many(
+            [[1.0, 0.0], [0.0, 1.0]], k=3, filter_dict={"anime_type": "TV"},
+        )
+        assert [[meta["mal_id"] for _, meta, _ in hits] for hits in batched] == [[1, 3], [3, 1]]
+
+    def test_dimension_mismatch_raises(self, tmp_path):
+        index = _build_index(tmp_path)
+        with pytest.raises(ValueError):
+            index.search([1.0, 0.0, 0.0], k=1)
+
+
+class TestFilters:
+    """Test metadata filtering inside the index."""
+
+    def test_gte_excludes_missing_values(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([0.0, 1.0], k=3, filter_dict={"mal_score_gte": 8.8})
+        assert [meta["mal_id"] for _, meta, _ in hits] == [2]
+
+    def test_exact_match_and_range_combined(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search(
+            [1.0, 0.0], k=3, filter_dict={"anime_type": "TV", "year_gte": 2000}
+        )
+        assert [meta["mal_id"] for _, meta, _ in hits] == [3]
+
+    def test_ne_filter(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([1.0, 0.0], k=3, filter_dict={"anime_type_ne": "TV"})
+        assert [meta["mal_id"] for _, meta, _ in hits] == [2]
+
+    def test_nin_excludes_ids_inside_search(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([1.0, 0.0], k=2, filter_dict={"mal_id_nin": [1, 2]})
+        # Still k results' worth of unseen rows (only one is left)
+        assert [meta["mal_id"] for _, meta, _ in hits] == [3]
+
+    def test_nin_returns_full_k_from_unseen(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([1.0, 0.0], k=2, filter_dict={"mal_id_nin": [1]})
+        assert [meta["mal_id"] for _, meta, _ in hits] == [2, 3]
+
+    def test_nin_on_string_column(self, tmp_path):
+        index = _build_index(tmp_path)
+        hits = index.search([1.0, 0.0], k=3, filter_dict={"anime_type_nin": ["Movie"]})
+        assert [meta["mal_id"] for _, meta, _ in hits] == [1, 3]
+
+    def test_no_matches_returns_empty(self, tmp_path):
+        index = _build_index(tmp_path)
+        assert index.search([1.0, 0.0], k=3, filter_dict={"year_lte": 1900}) == []
+
+
+class TestWritesAndPersistence:
+    """Test upserts and on-disk round-trips."""
+
+    def test_upsert_overwrites_existing_row(self, tmp_path):
+        index = _build_index(tmp_path)
+        index.add_embeddings(
+            texts=["Title: A v2"],
+            embeddings=[[0.0, 1.0]],
+            metadatas=[{"mal_id": 1, "title": "A"}],
+            ids=["anime_1"],
+        )
+
+        assert index.count() == 3
+        top = index.search([0.0, 1.0], k=1)
+        assert top[0][0] in {"Title: A v2", "Title: C"}
+        assert top[0][2] == pytest.approx(1.0)
+
+    def test_reload_from_disk(self, tmp_path):
+        _build_index(tmp_path)
+        reloaded = NumpyVectorIndex(tmp_path)
+
+        assert reloaded.count() == 3
+        assert reloaded.dim == 2
+        assert isinstance(reloaded._snapshot.vectors, np.memmap)
+        assert reloaded.search([1.0, 0.0], k=1)[0][1]["mal_id"] == 1
+
+    def test_append_after_reload(self, tmp_path):
+        _build_index(tmp_path)
+        reloaded = NumpyVectorIndex(tmp_path)
+        reloaded.add_embeddings(
+            texts=["Title: D"],
+            embeddings=[[-1.0, 0.0]],
+            metadatas=[{"mal_id": 4, "title": "D"}],
+            ids=["anime_4"],
+        )
+
+        again = NumpyVectorIndex(tmp_path)
+        assert again.count() == 4
+        assert again.search([-1.0, 0.0], k=1)[0][1]["mal_id"] == 4
+
+    def test_dimension_change_rejected(self, tmp_path):
+        index = _build_index(tmp_path)
+        with pytest.raises(ValueError):
+            index.add_embeddings(["x"], [[1.0, 0.0, 0.0]], [{"mal_id": 9}], ["anime_9"])
+
+    def test_delete_all(self, tmp_path):
+        index = _build_index(tmp_path)
+        assert index.delete_all() == 3
+        assert index.count() == 0
+        assert NumpyVectorIndex(tmp_path).count() == 0
+
+
+class TestRecordsLog:
+    """Test the append-only records log and cross-process reloads."""
+
+    def _lines(self, tmp_path) -> list[dict]:
+        return [json.loads(line) for line in (tmp_path / "records.jsonl").read_text().splitlines()]
+
+    def test_batch_appends_only_its_rows(self, tmp_path):
+        index = _build_index(tmp_path)
+        index.add_embeddings(["Title: D"], [[-1.0, 0.0]], [{"mal_id": 4}], ["anime_4"])
+
+        assert [r["id"] for r in self._lines(tmp_path)] == ["anime_1", "anime_2", "anime_3", "anime_4"]
+
+    def test_last_line_wins_on_reload(self, tmp_path):
+        index = _build_index(tmp_path)
+        index.update_metadata(["anime_2"], [{"mal_id": 2, "title": "B", "year": 2017}])
+
+        reloaded = NumpyVectorIndex(tmp_path)
+
+        assert len(self._lines(tmp_path)) == 4
+        assert reloaded.count() == 3
+        assert reloaded.search([0.6, 0.8], k=1)[0][1]["year"] == 2017
+
+    def test_compacts_when_log_outgrows_rows(self, tmp_path):
+        index = _build_index(tmp_path)
+        for year in range(2000, 2005):
+            index.update_metadata(["anime_1"], [{"mal_id": 1, "year": year}])
+
+        assert len(self._lines(tmp_path)) <= 2 * index.count()
+        assert NumpyVectorIndex(tmp_path).search([1.0, 0.0], k=1)[0][1]["year"] == 2004
+
+    def test_uncommitted_tail_ignored(self, tmp_path):
+        _build_index(tmp_path)
+        with open(tmp_path / "records.jsonl", "a") as f:
+            f.write('{"id": "anime_9", "document": "half-writ')
+
+        index = NumpyVectorIndex(tmp_path)
+        index.add_embeddings(["Title: D"], [[-1.0, 0.0]], [{"mal_id": 4}], ["anime_4"])
+
+        assert NumpyVectorIndex(tmp_path).count() == 4
+
+    def test_sees_rows_written_by_another_instance(self, tmp_path):
+        server = _build_index(tmp_path)
+        cli = NumpyVectorIndex(tmp_path)
+        cli.add_embeddings(["Title: D"], [[-1.0, 0.0]], [{"mal_id": 4}], ["anime_4"])
+
+        assert server.search([-1.0, 0.0], k=1)[0][1]["mal_id"] == 4
+        assert server.count() == 4
+
+    def test_concurrent_searches_survive_reloads(self, tmp_path):
+        server = _build_index(tmp_path)
+        cli = NumpyVectorIndex(tmp_path)
+        errors: list[Exception] = []
+        done = threading.Event()
+
+        def search_loop():
+            while not done.is_set():
+                try:
+                    for hits in server.search_many(
+                        [[1.0, 0.0], [0.0, 1.0]], k=50, filter_dict={"mal_id_nin": [2]},
+                    ):
+                        assert all(meta["mal_id"] != 2 for _, meta, _ in hits)
+                except Exception as exc:  # pragma: no cover - reported below
+                    errors.append(exc)
+                    return
+
+        threads = [threading.Thread(target=search_loop) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(4, 80):
+            cli.add_embeddings([f"Title: {i}"], [[1.0, i / 80]], [{"mal_id": i}], [f"anime_{i}"])
+        done.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert server.count() == 79
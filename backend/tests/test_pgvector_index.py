@@ -0,0 +1,119 @@
+"""Tests for pgvector index management helpers.
+
+Only the pure parts are covered — DDL generation, per-session search
+settings and the recall/percentile maths.  Nothing here needs a
+PostgreSQL server.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services.pgvector_index import (
+    INDEX_NAME,
+    index_ddl,
+    percentile,
+    recall_at_k,
+    search_settings_sql,
+    supported_search_settings,
+)
+
+
+# ═════════════════════════════════════════════════════════
+# DDL
+# ═════════════════════════════════════════════════════════
+
+
+class TestIndexDdl:
+    def test_hnsw_with_parameters(self):
+        ddl = index_ddl("hnsw", m=24, ef_construction=100)
+
+        assert f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}" in ddl
+        assert "USING hnsw (embedding vector_cosine_ops)" in ddl
+        assert ddl.endswith("WITH (m = 24, ef_construction = 100)")
+
+    def test_hnsw_defaults_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "PGVECTOR_HNSW_M", 8)
+        monkeypatch.setattr(settings, "PGVECTOR_HNSW_EF_CONSTRUCTION", 32)
+
+        assert index_ddl("hnsw").endswith("WITH (m = 8, ef_construction = 32)")
+
+    def test_hnsw_rejects_small_ef_construction(self):
+        with pytest.raises(ValueError, match="2 \\* m"):
+            index_ddl("hnsw", m=16, ef_construction=20)
+
+    def test_ivfflat_lists(self):
+        ddl = index_ddl("IVFFlat", lists=250)
+
+        assert "USING ivfflat (embedding vector_cosine_ops)" in ddl
+        assert ddl.endswith("WITH (lists = 250)")
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError, match="Unknown index method"):
+            index_ddl("diskann")
+
+
+# ═════════════════════════════════════════════════════════
+# Per-session search settings
+# ═════════════════════════════════════════════════════════
+
+
+class TestSearchSettingsSql:
+    def test_ef_search_and_probes(self, monkeypatch):
+        monkeypatch.setattr(settings, "PGVECTOR_HNSW_EF_SEARCH", 100)
+        monkeypatch.setattr(settings, "PGVECTOR_IVFFLAT_PROBES", 7)
+        monkeypatch.setattr(settings, "PGVECTOR_ITERATIVE_SCAN", "off")
+
+        assert search_settings_sql() == [
+            "SET hnsw.ef_search = 100",
+            "SET ivfflat.probes = 7",
+        ]
+
+    def test_iterative_scan(self, monkeypatch):
+        monkeypatch.setattr(settings, "PGVECTOR_ITERATIVE_SCAN", "relaxed_order")
+
+        statements = search_settings_sql()
+        assert "SET hnsw.iterative_scan = relaxed_order" in statements
+        assert "SET ivfflat.iterative_scan = relaxed_order" in statements
+
+    def test_iterative_scan_skipped_before_0_8(self, monkeypatch):
+        monkeypatch.setattr(settings, "PGVECTOR_HNSW_EF_SEARCH", 40)
+        monkeypatch.setattr(settings, "PGVECTOR_ITERATIVE_SCAN", "relaxed_order")
+        statements = search_settings_sql()
+
+        assert supported_search_settings(statements, "0.8.0") == statements
+        assert supported_search_settings(statements, "0.10.1") == statements
+        for old in ("0.7.4", None):
+            assert not any("iterative_scan" in s for s in supported_search_settings(statements, old))
+        assert "SET hnsw.ef_search = 40" in supported_search_settings(statements, "0.7.4")
+
+    def test_invalid_iterative_scan(self, monkeypatch):
+        monkeypatch.setattr(settings, "PGVECTOR_ITERATIVE_SCAN", "sometimes")
+        with pytest.raises(RuntimeError, match="PGVECTOR_ITERATIVE_SCAN"):
+            search_settings_sql()
+
+
+# ═════════════════════════════════════════════════════════
+# Benchmark maths
+# ═════════════════════════════════════════════════════════
+
+
+class TestRecallAtK:
+    def test_partial_overlap(self):
+        assert recall_at_k(["a", "b", "c", "d"], ["a", "c", "x", "y"]) == 0.5
+
+    def test_order_does_not_matter(self):
+        assert recall_at_k(["a", "b"], ["b", "a"]) == 1.0
+
+    def test_empty_truth(self):
+        assert recall_at_k([], ["a"]) == 1.0
+
+
+class TestPercentile:
+    def test_median_and_tail(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 100) == 100.0
+
+    def test_empty(self):
+        assert percentile([], 95) == 0.0
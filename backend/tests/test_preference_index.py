@@ -0,0 +1,191 @@
+"""Tests for vectorised preference scoring."""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.services.preference_index import (
+    PreferenceFeatureIndex,
+    get_preference_index,
+    reset_preference_index,
+)
+from app.services.rag import (
+    _compute_preference_score,
+    _get_genre_affinity_map,
+    _get_theme_affinity_map,
+    rerank_by_preferences,
+)
+
+GENRES = ["Action", "Drama", "Comedy", "Romance", "Sci-Fi", "Horror", "Mystery"]
+THEMES = ["Mecha", "Time Travel", "School", "Military", "Psychological"]
+FORMATS = ["TV", "Movie", "OVA", "ONA"]
+
+
+def _scalar(metadata: dict, profile: dict) -> float:
+    return _compute_preference_score(
+        metadata=metadata,
+        genre_affinities=_get_genre_affinity_map(profile),
+        theme_affinities=_get_theme_affinity_map(profile),
+        preferred_formats=profile.get("preferred_formats", {}),
+        era_prefs=profile.get("watch_era_preference", {}),
+    )
+
+
+def _random_metadata(rng: random.Random) -> dict:
+    metadata = {}
+    if rng.random() < 0.85:
+        metadata["genres"] = ", ".join(rng.sample(GENRES, rng.randint(1, 4)))
+    if rng.random() < 0.6:
+        metadata["themes"] = ",".join(rng.sample(THEMES, rng.randint(1, 3)))
+    if rng.random() < 0.9:
+        metadata["anime_type"] = rng.choice(FORMATS)
+    if rng.random() < 0.9:
+        metadata["year"] = rng.randint(1975, 2024)
+    return metadata
+
+
+def _random_profile(rng: random.Random) -> dict:
+    profile = {}
+    if rng.random() < 0.9:
+        profile["genre_affinity"] = [
+            {"genre": g, "affinity": round(rng.random(), 3)}
+            for g in rng.sample(GENRES, rng.randint(1, len(GENRES)))
+        ]
+    if rng.random() < 0.7:
+        profile["theme_affinity"] = [
+            {"genre": t, "affinity": round(rng.random(), 3)}
+            for t in rng.sample(THEMES, rng.randint(1, len(THEMES)))
+        ]
+    if rng.random() < 0.8:
+        profile["preferred_formats"] = {f: rng.randint(0, 40) for f in rng.sample(FORMATS, 2)}
+    if rng.random() < 0.8:
+        profile["watch_era_preference"] = {
+            f"{d}s": rng.randint(0, 30) for d in rng.sample([1980, 1990, 2000, 2010, 2020], 3)
+        }
+    return profile
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index():
+    reset_preference_index()
+    yield
+    reset_preference_index()
+
+
+# ═════════════════════════════════════════════════════════
+# Equivalence with the scalar reference
+# ═════════════════════════════════════════════════════════
+
+
+class TestMatchesScalarScore:
+    """The vectorised scores must equal _compute_preference_score."""
+
+    def test_random_catalog_and_profiles(self):
+        rng = random.Random(13)
+        catalog = {mal_id: _random_metadata(rng) for mal_id in range(1, 301)}
+        index = PreferenceFeatureIndex()
+        rows = index.rows_for(catalog.items())
+
+        for _ in range(25):
+            profile = _random_profile(rng)
+            scores = index.score(profile, rows)
+            expected = [_scalar(m, profile) for m in catalog.values()]
+            np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+            assert [round(s, 4) for s in scores.tolist()] == [round(e, 4) for e in expected]
+
+    def test_empty_profile_is_neutral(self):
+        index = PreferenceFeatureIndex()
+        rows = index.rows_for([(1, {"genres": "Action", "anime_type": "TV", "year": 2010})])
+
+        assert index.score({}, rows).tolist() == [pytest.approx(0.5)]
+
+    def test_duplicate_tokens_average_like_strings(self):
+        metadata = {"genres": "Action, Action, Drama"}
+        profile = {"genre_affinity": [{"genre": "Action", "affinity": 0.9}]}
+        index = PreferenceFeatureIndex()
+
+        score = index.score(profile, index.rows_for([(1, metadata)]))[0]
+
+        assert score == pytest.approx(_scalar(metadata, profile), abs=1e-12)
+
+
+# ═════════════════════════════════════════════════════════
+# Index maintenance
+# ═════════════════════════════════════════════════════════
+
+
+class TestRows:
+    def test_same_id_reuses_row(self):
+        index = PreferenceFeatureIndex()
+        first = index.rows_for([(5, {"genres": "Drama"})])
+        second = index.rows_for([(5, {"genres": "Drama"})])
+
+        assert first.tolist() == second.tolist()
+        assert len(index) == 1
+
+    def test_changed_metadata_is_reparsed(self):
+        index = PreferenceFeatureIndex()
+        profile = {"genre_affinity": [{"genre": "Drama", "affinity": 1.0}]}
+        index.rows_for([(5, {"genres": "Drama"})])
+
+        rows = index.rows_for([(5, {"genres": "Comedy"})])
+
+        assert len(index) == 1
+        assert index.score(profile, rows)[0] == pytest.approx(_scalar({"genres": "Comedy"}, profile))
+
+    def test_grows_past_initial_capacity(self):
+        rng = random.Random(7)
+        index = PreferenceFeatureIndex()
+        items = [(i, {"genres": f"Genre{i}", "year": 2000 + i % 20}) for i in range(500)]
+        rows = index.rows_for(items)
+        profile = {"genre_affinity": [{"genre": "Genre499", "affinity": 0.8}], **_random_profile(rng)}
+
+        scores = index.score(profile, rows)
+
+        assert len(index) == 500
+        np.testing.assert_allclose(scores, [_scalar(m, profile) for _, m in items], atol=1e-12)
+
+
+# ═════════════════════════════════════════════════════════
+# Batch scoring
+# ═════════════════════════════════════════════════════════
+
+
+class TestScoreProfiles:
+    def test_matches_one_at_a_time(self):
+        rng = random.Random(21)
+        index = PreferenceFeatureIndex()
+        rows = index.rows_for((i, _random_metadata(rng)) for i in range(100))
+        profiles = [_random_profile(rng) for _ in range(8)]
+
+        batch = index.score_profiles(profiles, rows)
+
+        assert batch.shape == (8, 100)
+        for p, profile in enumerate(profiles):
+            np.testing.assert_allclose(batch[p], index.score(profile, rows), atol=1e-12)
+
+
+# ═════════════════════════════════════════════════════════
+# rerank_by_preferences integration
+# ═════════════════════════════════════════════════════════
+
+
+class TestRerankIntegration:
+    def test_keyed_and_unkeyed_candidates_score_alike(self):
+        metadata = {"genres": "Action, Sci-Fi", "anime_type": "TV", "year": 2015}
+        profile = {
+            "genre_affinity": [{"genre": "Action", "affinity": 0.9}],
+            "preferred_formats": {"TV": 10, "Movie": 5},
+            "watch_era_preference": {"2010s": 12},
+        }
+        candidates = [
+            {"mal_id": 1, "similarity_score": 0.7, "metadata": dict(metadata)},
+            {"similarity_score": 0.7, "metadata": dict(metadata)},
+        ]
+
+        rerank_by_preferences(candidates, profile)
+
+        assert candidates[0]["preference_score"] == candidates[1]["preference_score"]
+        assert candidates[0]["combined_score"] == candidates[1]["combined_score"]
+        assert len(get_preference_index()) == 1
@@ -5,6 +5,11 @@ These tests cover the pure functions in rag.py:
 • rerank_by_preferences — computes preference scores for candidates
 • _compute_preference_score — the core scoring function
 • Helper functions for query building
+• retrieve_candidates — merging, with the vector search monkeypatched
+• aretrieve_candidates — query embeddings awaited before the search
+• fuse_results — max / reciprocal-rank / weighted fusion of query results
+• plan_fetch_k / deepening — fetch sizing from the user's exclusions
+• diversify_candidates / mmr_order — MMR ordering of the ranked pool
 
 All tests use mock data — no vector store, no OpenAI, no network.
 They test the "intelligence" layer that sits between the vector store
@@ -18,10 +23,20 @@ rank results.  If scoring is wrong, good recommendations get buried.
 These are the highest-leverage tests for recommendation quality.
 """
 
+import numpy as np
 import pytest
 
+from app.core.config import settings
+from app.services import rag
+from app.services.catalog_stats import CatalogScores, reset_catalog_scores, set_catalog_scores
 from app.services.rag import (
     build_search_queries,
+    diversify_candidates,
+    mmr_order,
+    fuse_results,
+    plan_fetch_k,
+    aretrieve_candidates,
+    retrieve_candidates,
     rerank_by_preferences,
     _build_genre_query,
     _build_top_shows_query,
@@ -421,3 +436,420 @@ class TestAffinityMaps:
         """Empty profile should produce empty maps."""
         assert _get_genre_affinity_map(MOCK_EMPTY_PROFILE) == {}
         assert _get_theme_affinity_map(MOCK_EMPTY_PROFILE) == {}
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: retrieve_candidates (vector search stubbed)
+# ═════════════════════════════════════════════════════════
+
+
+def _hit(mal_id: int, similarity: float) -> dict:
+    return {
+        "mal_id": mal_id,
+        "title": f"Anime {mal_id}",
+        "embedding_text": "",
+        "metadata": {"genres": "Action"},
+        "similarity_score": similarity,
+    }
+
+
+class TestRetrieveCandidates:
+    """Test query fan-out and merging with a fake batched search."""
+
+    def test_all_queries_searched_in_one_call(self, monkeypatch):
+        calls = []
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            calls.append(list(queries))
+            return [[_hit(1, 0.5)] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        retrieve_candidates(MOCK_RICH_PROFILE)
+
+        assert len(calls) == 1
+        assert calls[0] == build_search_queries(MOCK_RICH_PROFILE)
+
+    def test_merges_by_best_similarity_and_skips_watched(self, monkeypatch):
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            return [
+                [_hit(1, 0.4), _hit(2, 0.9)],
+                [_hit(1, 0.7), _hit(3, 0.6)],
+            ]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        result = retrieve_candidates(
+            MOCK_RICH_PROFILE, watched_mal_ids={2}, custom_query="x",
+        )
+
+        by_id = {c["mal_id"]: c for c in result}
+        assert set(by_id) == {1, 3}
+        assert by_id[1]["similarity_score"] == 0.7
+
+    def test_watched_ids_pushed_into_search(self, monkeypatch):
+        seen = {}
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            seen["exclude_ids"] = exclude_ids
+            seen["filter_dict"] = filter_dict
+            return [[] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        retrieve_candidates(MOCK_RICH_PROFILE, watched_mal_ids={1, 19, 9253})
+
+        assert seen["exclude_ids"] == {1, 19, 9253}
+        assert seen["filter_dict"] == {"mal_score_gte": 7.0}
+
+    def test_fusion_and_fetch_k_passed_through(self, monkeypatch):
+        seen = {}
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            seen["k"] = k
+            return [[_hit(1, 0.9), _hit(2, 0.8)], [_hit(2, 0.7)]]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        result = retrieve_candidates(MOCK_RICH_PROFILE, k=5, fusion="rrf", fetch_k=8)
+
+        assert seen["k"] == 8
+        assert all("retrieval_score" in c for c in result)
+
+    def test_default_fetch_k_is_capped(self, monkeypatch):
+        seen = {}
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            seen["k"] = k
+            return [[] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        retrieve_candidates(MOCK_RICH_PROFILE, k=60)
+
+        assert seen["k"] == 50
+
+    @pytest.mark.asyncio
+    async def test_async_warms_query_embeddings_first(self, monkeypatch):
+        events = []
+
+        async def fake_warm(queries):
+            events.append(("warm", list(queries)))
+            return True
+
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            events.append(("search", list(queries)))
+            return [[_hit(1, 0.9)] for _ in queries]
+
+        monkeypatch.setattr(rag, "awarm_query_embeddings", fake_warm)
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+
+        result = await aretrieve_candidates(MOCK_RICH_PROFILE, custom_query="space westerns", k=5)
+
+        assert [c["mal_id"] for c in result] == [1]
+        assert [kind for kind, _ in events] == ["warm", "search"]
+        assert events[0][1] == events[1][1] == ["space westerns"]
+
+    @pytest.mark.asyncio
+    async def test_async_warm_failure_falls_through(self, monkeypatch):
+        async def broken_warm(queries):
+            raise RuntimeError("embedding API down")
+
+        monkeypatch.setattr(rag, "awarm_query_embeddings", broken_warm)
+        monkeypatch.setattr(
+            rag, "search_anime_many",
+            lambda queries, k, filter_dict=None, exclude_ids=None: [[_hit(2, 0.8)] for _ in queries],
+        )
+        monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+
+        result = await aretrieve_candidates(MOCK_RICH_PROFILE, k=5)
+
+        assert [c["mal_id"] for c in result] == [2]
+
+    @pytest.mark.asyncio
+    async def test_async_cache_hit_warms_nothing(self, monkeypatch):
+        warmed = []
+
+        async def fake_warm(queries):
+            warmed.append(list(queries))
+            return True
+
+        monkeypatch.setattr(rag, "awarm_query_embeddings", fake_warm)
+        monkeypatch.setattr(
+            rag, "search_anime_many",
+            lambda queries, k, filter_dict=None, exclude_ids=None: [[_hit(3, 0.8)] for _ in queries],
+        )
+        monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", True)
+
+        first = await aretrieve_candidates(MOCK_RICH_PROFILE, custom_query="space westerns", k=5)
+        warmed.clear()
+        stats = {}
+        second = await aretrieve_candidates(
+            MOCK_RICH_PROFILE, custom_query="space westerns", k=5, stats=stats,
+        )
+
+        assert second == first
+        assert stats["cached"] is True
+        assert warmed == []
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: adaptive fetch_k and deepening
+# ═════════════════════════════════════════════════════════
+
+
+def _approximate_search(calls: list[int], catalog: int = 100):
+    """Fake ANN search: walks the top ``k`` of the catalog, then drops
+    excluded anime — so heavy excluders get short lists back."""
+
+    def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+        calls.append(k)
+        walked = range(1, min(k, catalog) + 1)
+        return [
+            [_hit(m, 0.9 - m / 1000) for m in walked if m not in (exclude_ids or ())]
+            for _ in queries
+        ]
+
+    return fake_search_many
+
+
+class TestAdaptiveFetch:
+    """Test fetch sizing from exclusion density, and deepening rounds."""
+
+    WATCHED = set(range(1, 41))  # 40% of the fake catalog
+
+    def test_plan_scales_with_excluded_fraction(self, monkeypatch):
+        monkeypatch.setattr(settings, "RETRIEVAL_FETCH_MULTIPLIER", 1.0)
+
+        assert plan_fetch_k(30) == 30
+        assert plan_fetch_k(30, 0.6) == 75
+        assert plan_fetch_k(30, 0.99) == settings.RETRIEVAL_MAX_FETCH_K
+
+        monkeypatch.setattr(settings, "RETRIEVAL_ADAPTIVE_FETCH", False)
+        assert plan_fetch_k(30, 0.6) == 30
+
+    def test_deepens_until_k_unseen(self, monkeypatch):
+        calls, stats = [], {}
+        monkeypatch.setattr(rag, "search_anime_many", _approximate_search(calls))
+
+        result = retrieve_candidates(
+            MOCK_RICH_PROFILE, watched_mal_ids=self.WATCHED, k=10, fetch_k=10,
+            custom_query="x", stats=stats,
+        )
+
+        assert calls == [10, 20, 40, 80]
+        assert len(result) == 10
+        assert stats["fetch_k"] == 80
+        assert stats["rounds"] == 4
+
+    def test_density_sizes_first_page(self, monkeypatch):
+        calls, stats = [], {}
+        monkeypatch.setattr(rag, "search_anime_many", _approximate_search(calls))
+        monkeypatch.setattr(settings, "RETRIEVAL_FETCH_MULTIPLIER", 1.0)
+        set_catalog_scores(CatalogScores(range(1, 101), [8.0] * 100))
+        try:
+            retrieve_candidates(
+                MOCK_RICH_PROFILE, watched_mal_ids=self.WATCHED, k=10,
+                custom_query="x", stats=stats,
+            )
+        finally:
+            reset_catalog_scores()
+
+        assert calls == [17, 34, 68]
+        assert stats["excluded_fraction"] == 0.4
+        assert stats["rounds"] == 3
+
+    def test_budget_and_switch_stop_deepening(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(rag, "search_anime_many", _approximate_search(calls))
+        monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "RETRIEVAL_DEEPEN_BUDGET_MS", 0)
+
+        retrieve_candidates(MOCK_RICH_PROFILE, watched_mal_ids=self.WATCHED, k=10, custom_query="x")
+        assert len(calls) == 1
+
+        monkeypatch.setattr(settings, "RETRIEVAL_DEEPEN_BUDGET_MS", 1000)
+        monkeypatch.setattr(settings, "RETRIEVAL_ADAPTIVE_FETCH", False)
+        retrieve_candidates(MOCK_RICH_PROFILE, watched_mal_ids=self.WATCHED, k=10, custom_query="x")
+        assert len(calls) == 2
+
+    def test_dry_backend_without_exclusions_stops(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(rag, "search_anime_many", _approximate_search(calls, catalog=5))
+
+        result = retrieve_candidates(MOCK_RICH_PROFILE, k=10, custom_query="x")
+
+        assert len(calls) == 1
+        assert len(result) == 5
+
+    def test_short_exact_results_stop_despite_exclusions(self, monkeypatch):
+        calls = []
+
+        def exact_search(queries, k, filter_dict=None, exclude_ids=None):
+            # Exclusions applied before the top-k: 3 unseen anime in all
+            calls.append(k)
+            return [[_hit(m, 0.9 - m / 1000) for m in (101, 102, 103)][:k] for _ in queries]
+
+        monkeypatch.setattr(rag, "search_anime_many", exact_search)
+        monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", "numpy")
+
+        result = retrieve_candidates(
+            MOCK_RICH_PROFILE, watched_mal_ids=self.WATCHED, k=10, fetch_k=10, custom_query="x",
+        )
+
+        assert calls == [10]
+        assert len(result) == 3
+
+    def test_round_adding_nothing_stops(self, monkeypatch):
+        calls = []
+        # An ANN capped at 25 rows (hnsw.ef_search), 5 of them unseen
+        approximate = _approximate_search(calls, catalog=25)
+        monkeypatch.setattr(
+            rag, "search_anime_many",
+            lambda queries, k, **kwargs: approximate(queries, min(k, 25), **kwargs),
+        )
+
+        retrieve_candidates(
+            MOCK_RICH_PROFILE, watched_mal_ids=set(range(1, 21)), k=10, fetch_k=10, custom_query="x",
+        )
+
+        # fetch_k 10, 20, 40, 80: the fourth walk adds nothing, so no 160 / 200
+        assert calls == [10, 20, 25, 25]
+
+    def test_deepening_capped(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(rag, "search_anime_many", _approximate_search(calls))
+        monkeypatch.setattr(settings, "RETRIEVAL_MAX_FETCH_K", 50)
+
+        retrieve_candidates(
+            MOCK_RICH_PROFILE, watched_mal_ids=set(range(1, 100)), k=10, fetch_k=10, custom_query="x",
+        )
+
+        assert calls == [10, 20, 40, 50]
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: fuse_results
+# ═════════════════════════════════════════════════════════
+
+
+class TestFuseResults:
+    """Test merging per-query result lists."""
+
+    LISTS = [
+        [_hit(1, 0.90), _hit(2, 0.85), _hit(3, 0.80)],
+        [_hit(4, 0.88), _hit(2, 0.84), _hit(5, 0.70)],
+        [_hit(6, 0.87), _hit(2, 0.83), _hit(1, 0.60)],
+    ]
+
+    def test_max_keeps_best_similarity(self):
+        by_id = {c["mal_id"]: c for c in fuse_results(self.LISTS, method="max")}
+
+        assert by_id[1]["similarity_score"] == 0.90
+        assert "retrieval_score" not in by_id[1]
+
+    def test_rrf_rewards_agreement(self):
+        fused = fuse_results(self.LISTS, method="rrf", rrf_k=60)
+        best = max(fused, key=lambda c: c["retrieval_score"])
+
+        assert best["mal_id"] == 2  # rank 2 in all three queries
+        assert best["query_hits"] == 3
+        assert best["retrieval_score"] == pytest.approx(round((3 / 62) / (3 / 61), 4))
+
+    def test_rrf_top_everywhere_scores_one(self):
+        fused = fuse_results([[_hit(1, 0.5)], [_hit(1, 0.4)]], method="rrf")
+
+        assert fused[0]["retrieval_score"] == 1.0
+
+    def test_weighted_sum(self):
+        by_id = {c["mal_id"]: c for c in fuse_results(self.LISTS, method="weighted")}
+
+        assert by_id[2]["retrieval_score"] == pytest.approx(round((0.85 + 0.84 + 0.83) / 3, 4))
+        assert by_id[4]["retrieval_score"] == pytest.approx(round(0.88 / 3, 4))
+
+    def test_query_weights(self):
+        lists = [[_hit(1, 0.8)], [_hit(2, 0.8)]]
+        by_id = {c["mal_id"]: c for c in fuse_results(lists, method="rrf", weights=[3.0, 1.0])}
+
+        assert by_id[1]["retrieval_score"] > by_id[2]["retrieval_score"]
+
+    def test_retrieval_score_drives_combined_score(self):
+        fused = fuse_results(self.LISTS, method="rrf")
+        ranked = rerank_by_preferences(fused, MOCK_EMPTY_PROFILE)
+        top = max(ranked, key=lambda c: c["combined_score"])
+
+        assert top["mal_id"] == 2
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError, match="Unknown fusion method"):
+            fuse_results(self.LISTS, method="borda")
+
+    def test_weights_length_checked(self):
+        with pytest.raises(ValueError, match="one entry per result list"):
+            fuse_results(self.LISTS, method="rrf", weights=[1.0])
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: diversification (MMR)
+# ═════════════════════════════════════════════════════════
+
+
+def _ranked(mal_id: int, score: float, genres: str) -> dict:
+    return {
+        "mal_id": mal_id,
+        "title": f"Anime {mal_id}",
+        "metadata": {"genres": genres},
+        "combined_score": score,
+    }
+
+
+class TestDiversify:
+    """Test MMR re-ordering of the ranked candidate pool."""
+
+    POOL = [
+        _ranked(101, 0.90, "Action, Shounen"),
+        _ranked(102, 0.89, "Action, Shounen"),
+        _ranked(103, 0.88, "Action, Shounen"),
+        _ranked(104, 0.80, "Romance, Slice of Life"),
+    ]
+
+    def test_lambda_one_keeps_relevance_order(self):
+        ordered = diversify_candidates(self.POOL, lambda_=1.0)
+
+        assert [c["mal_id"] for c in ordered] == [101, 102, 103, 104]
+
+    def test_near_duplicates_pushed_down(self):
+        ordered = diversify_candidates(self.POOL, lambda_=0.5)
+
+        assert [c["mal_id"] for c in ordered][:2] == [101, 104]
+        assert len(ordered) == 4
+
+    def test_k_limits_picks(self):
+        assert len(diversify_candidates(self.POOL, lambda_=0.5, k=2)) == 2
+
+    def test_candidates_without_ids_are_never_redundant(self):
+        pool = [_ranked(101, 0.9, "Action"), dict(_ranked(0, 0.85, "Action"), mal_id=None),
+                _ranked(102, 0.88, "Action")]
+
+        ordered = diversify_candidates(pool, lambda_=0.5)
+
+        assert ordered[1]["mal_id"] is None
+
+    def test_mmr_order_matches_definition(self):
+        relevance = np.array([1.0, 0.9, 0.5])
+        similarity = np.array([[1.0, 1.0, 0.0], [1.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+        # After 0: item 1 scores 0.5·0.9 − 0.5·1 < item 2 at 0.5·0.5 − 0
+        assert mmr_order(relevance, similarity, lambda_=0.5) == [0, 2, 1]
+
+    def test_retrieve_candidates_applies_mmr(self, monkeypatch):
+        def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+            return [[
+                dict(_hit(201, 0.95), metadata={"genres": "Action, Shounen"}),
+                dict(_hit(202, 0.94), metadata={"genres": "Action, Shounen"}),
+                dict(_hit(203, 0.85), metadata={"genres": "Romance"}),
+            ]]
+
+        monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+        monkeypatch.setattr(settings, "RETRIEVAL_MMR_ENABLED", True)
+        monkeypatch.setattr(settings, "RETRIEVAL_MMR_LAMBDA", 0.3)
+
+        result = retrieve_candidates(MOCK_EMPTY_PROFILE, k=2, custom_query="x")
+
+        assert [c["mal_id"] for c in result] == [201, 203]
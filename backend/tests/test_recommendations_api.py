@@ -279,3 +279,105 @@ class TestRequestValidation:
         assert resp.status_code == 422
         payload = resp.json()
         assert payload["error"]["code"] == "VALIDATION_ERROR"
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: GET /api/recommendations/stream
+# ═════════════════════════════════════════════════════════
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    """Parse a text/event-stream body into (event, data) pairs."""
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture()
+def stream_db(monkeypatch, mock_user):
+    """Point the stream's own session at the test DB, with a profile."""
+    from app.models.anime import UserPreferenceProfile
+
+    monkeypatch.setattr("app.api.recommendations.SessionLocal", TestSessionLocal)
+    db = TestSessionLocal()
+    db.add(UserPreferenceProfile(user_id=mock_user.id, profile_data={"genre_affinity": []}))
+    db.commit()
+    db.close()
+
+
+class TestRecommendationStream:
+    """Test the SSE generation endpoint with the recommender mocked."""
+
+    def test_streams_recommendations_then_saves_session(self, authed_client: TestClient, stream_db, monkeypatch):
+        async def fake_stream(**kwargs):
+            for mal_id in (1, 5):
+                yield {"mal_id": mal_id, "title": f"Anime {mal_id}", "reasoning": "Fits.", "confidence": "high"}
+
+        monkeypatch.setattr("app.api.recommendations.astream_recommendations", fake_stream)
+
+        resp = authed_client.get("/api/recommendations/stream", params={"custom_query": "space", "num_recommendations": 2})
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _events(resp.text)
+        assert [e for e, _ in events if e != "status"] == ["recommendation", "recommendation", "done"]
+        assert [d["mal_id"] for e, d in events if e == "recommendation"] == [1, 5]
+        done = events[-1][1]
+        assert done["total"] == 2
+        assert done["used_fallback"] is False
+
+        saved = authed_client.get(f"/api/recommendations/{done['session_id']}")
+        assert [r["mal_id"] for r in saved.json()["recommendations"]] == [1, 5]
+
+    def test_failure_is_an_error_event(self, authed_client: TestClient, stream_db, monkeypatch):
+        from app.services.recommender import GuardrailError
+
+        async def timed_out(**kwargs):
+            raise GuardrailError(code="UPSTREAM_TIMEOUT", message="LLM invocation exceeded timeout budget.")
+            yield  # pragma: no cover
+
+        monkeypatch.setattr("app.api.recommendations.astream_recommendations", timed_out)
+
+        resp = authed_client.get("/api/recommendations/stream")
+
+        assert _events(resp.text)[-1] == (
+            "error", {"code": "UPSTREAM_TIMEOUT", "message": "LLM invocation exceeded timeout budget."},
+        )
+
+    def test_no_profile_fails_before_streaming(self, authed_client: TestClient):
+        resp = authed_client.get("/api/recommendations/stream")
+
+        assert resp.status_code == 404
+        assert resp.json()["error"]["code"] == "NOT_FOUND"
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: session persistence
+# ═════════════════════════════════════════════════════════
+
+
+class TestPersistSession:
+    """Both generation jobs save entries through ``persist_session``."""
+
+    def test_cauldron_session_saved_with_entries(self):
+        from app.api.cauldron import _persist_cauldron_session
+        from app.models.recommendation import RecommendationEntry, RecommendationSession
+
+        db = TestSessionLocal()
+        try:
+            session_id = _persist_cauldron_session(
+                db, "test-user-123", [1, 5], [{"mal_id": 9, "title": "Anime 9"}], used_fallback=False,
+            )
+
+            saved = db.get(RecommendationSession, session_id)
+            entries = db.query(RecommendationEntry).filter_by(session_id=session_id).all()
+        finally:
+            db.close()
+
+        assert saved.mode == "cauldron"
+        assert saved.cauldron_seed_ids == [1, 5]
+        assert [(e.mal_id, e.reasoning) for e in entries] == [(9, "No reasoning provided.")]
@@ -18,7 +18,11 @@ The recommender has two types of code:
 
 2. **Orchestration functions** (call LLM, call vector store):
    - ``generate_recommendations()`` — the main entry point
-   - ``_call_llm_with_retry()`` — retry logic
+   - ``call_llm_with_retry()`` — retry logic
+   - ``agenerate_recommendations()`` / ``acall_llm_with_retry()`` —
+     the async versions the API's background jobs await
+   - ``astream_llm_recommendations()`` — streamed attempt 1, validated
+     element by element
 
    These are tested with mocks (mock the LLM and retriever).
    We verify the *flow* (retry on failure, fallback on double
@@ -39,13 +43,22 @@ mal_ids, missing fields.  Each test case represents a real failure
 mode we want to handle gracefully.
 """
 
+import asyncio
 import json
+import time
 
 import pytest
 
+from app.core.config import settings
+from app.services import recommender
 from app.services.recommender import (
     GuardrailError,
+    acall_llm_with_retry,
+    agenerate_recommendations,
+    astream_llm_recommendations,
     build_system_prompt,
+    candidate_pool_size,
+    generate_recommendations,
     build_user_prompt,
     parse_recommendations,
     _clean_json_response,
@@ -648,6 +661,18 @@ class TestGuardrailError:
         assert "expensive" in err.message
 
 
+class TestCandidatePoolSize:
+    def test_default_is_three_per_recommendation(self):
+        assert candidate_pool_size(10) == 30
+
+    def test_multiplier_rounds_up_and_never_below_requested(self, monkeypatch):
+        monkeypatch.setattr(settings, "RECOMMEND_CANDIDATE_MULTIPLIER", 1.5)
+        assert candidate_pool_size(5) == 8
+
+        monkeypatch.setattr(settings, "RECOMMEND_CANDIDATE_MULTIPLIER", 0.5)
+        assert candidate_pool_size(5) == 5
+
+
 # ═════════════════════════════════════════════════════════
 # Tests: _truncate
 # ═════════════════════════════════════════════════════════
@@ -733,3 +758,214 @@ class TestBuildFallbackRecommendations:
         """Empty candidates should return empty list."""
         result = _build_fallback_recommendations([], 5)
         assert result == []
+
+
+# ═════════════════════════════════════════════════════════
+# Async pipeline
+# ═════════════════════════════════════════════════════════
+
+
+VALID_RESPONSE = json.dumps([
+    {"mal_id": 1, "title": "Cowboy Bebop", "reasoning": "Space noir.", "confidence": "high", "similar_to": []},
+])
+
+
+class FakeResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeAsyncLLM:
+    """Stand-in for ChatOpenAI that serves canned ``ainvoke`` responses."""
+
+    def __init__(self, responses: list[str], delay: float = 0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls: list[list] = []
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        await asyncio.sleep(self.delay)
+        return FakeResponse(self.responses.pop(0))
+
+    async def astream(self, messages):
+        self.calls.append(messages)
+        for chunk in self.responses.pop(0):
+            await asyncio.sleep(self.delay)
+            yield FakeResponse(chunk)
+
+    def invoke(self, messages):
+        raise AssertionError("the async pipeline must not block on invoke")
+
+
+@pytest.fixture()
+def fake_llm(monkeypatch):
+    def install(responses: list[str], delay: float = 0.0) -> FakeAsyncLLM:
+        llm = FakeAsyncLLM(responses, delay)
+        monkeypatch.setattr(recommender, "get_llm", lambda: llm)
+        return llm
+    return install
+
+
+class TestAcallLLMWithRetry:
+    @pytest.mark.asyncio
+    async def test_parses_first_attempt(self, fake_llm):
+        llm = fake_llm([VALID_RESPONSE])
+
+        result = await acall_llm_with_retry("sys", "user", MOCK_CANDIDATES, 1, timeout_budget_seconds=5)
+
+        assert [r["mal_id"] for r in result] == [1]
+        assert len(llm.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_with_failed_output(self, fake_llm):
+        llm = fake_llm(["not json at all", VALID_RESPONSE])
+
+        result = await acall_llm_with_retry("sys", "user", MOCK_CANDIDATES, 1, timeout_budget_seconds=5)
+
+        assert result[0]["mal_id"] == 1
+        assert "not json at all" in llm.calls[1][-1].content
+
+    @pytest.mark.asyncio
+    async def test_falls_back_after_two_failures(self, fake_llm):
+        fake_llm(["nope", "still nope"])
+
+        result = await acall_llm_with_retry("sys", "user", MOCK_CANDIDATES, 2, timeout_budget_seconds=5)
+
+        assert len(result) == 2
+        assert all(r["is_fallback"] for r in result)
+
+    @pytest.mark.asyncio
+    async def test_slow_attempt_cut_off_at_budget(self, fake_llm):
+        fake_llm([VALID_RESPONSE, VALID_RESPONSE], delay=5)
+
+        with pytest.raises(GuardrailError) as exc:
+            await asyncio.wait_for(
+                acall_llm_with_retry("sys", "user", MOCK_CANDIDATES, 1, timeout_budget_seconds=0.05),
+                timeout=2,
+            )
+
+        assert exc.value.code == "UPSTREAM_TIMEOUT"
+
+
+class TestAgenerateRecommendations:
+    @pytest.mark.asyncio
+    async def test_awaits_retrieval_and_llm(self, fake_llm, monkeypatch):
+        seen = {}
+
+        async def fake_retrieve(profile, **kwargs):
+            seen.update(kwargs)
+            return MOCK_CANDIDATES
+
+        monkeypatch.setattr(recommender, "aretrieve_candidates", fake_retrieve)
+        fake_llm([VALID_RESPONSE])
+
+        result = await agenerate_recommendations(MOCK_PROFILE, watched_mal_ids={99}, num_recommendations=1)
+
+        assert [r["mal_id"] for r in result] == [1]
+        assert seen["watched_mal_ids"] == {99}
+        assert seen["deadline"] is not None
+
+    @pytest.mark.asyncio
+    async def test_no_candidates(self, fake_llm, monkeypatch):
+        async def no_candidates(profile, **kwargs):
+            return []
+
+        monkeypatch.setattr(recommender, "aretrieve_candidates", no_candidates)
+
+        with pytest.raises(ValueError, match="No anime candidates"):
+            await agenerate_recommendations(MOCK_PROFILE, num_recommendations=1)
+
+
+    def test_sync_llm_call_gets_remaining_budget(self, monkeypatch):
+        seen = {}
+
+        def slow_retrieve(profile, **kwargs):
+            time.sleep(0.05)
+            return MOCK_CANDIDATES
+
+        def fake_call(**kwargs):
+            seen.update(kwargs)
+            return []
+
+        monkeypatch.setattr(recommender, "retrieve_candidates", slow_retrieve)
+        monkeypatch.setattr(recommender, "call_llm_with_retry", fake_call)
+
+        generate_recommendations(MOCK_PROFILE, num_recommendations=1, timeout_budget_seconds=5)
+
+        assert 4 < seen["timeout_budget_seconds"] <= 4.95
+
+
+def _chunks(text: str, size: int = 5) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+STREAMED_RESPONSE = json.dumps([
+    {"mal_id": 1, "title": "Cowboy Bebop", "reasoning": "Space noir.", "confidence": "high", "similar_to": []},
+    {"mal_id": 999, "title": "Not a candidate", "reasoning": "x", "confidence": "high", "similar_to": []},
+    {"mal_id": 1, "title": "Cowboy Bebop", "reasoning": "Again.", "confidence": "high", "similar_to": []},
+    {"mal_id": 11061, "title": "Hunter x Hunter (2011)", "reasoning": "Nen.", "confidence": "high", "similar_to": []},
+])
+
+
+async def _collect(stream) -> list[dict]:
+    return [rec async for rec in stream]
+
+
+class TestAstreamLLMRecommendations:
+    @pytest.mark.asyncio
+    async def test_yields_each_valid_element_once(self, fake_llm):
+        fake_llm([_chunks(STREAMED_RESPONSE)])
+
+        result = await _collect(astream_llm_recommendations(
+            "sys", "user", MOCK_CANDIDATES, 3, timeout_budget_seconds=5,
+        ))
+
+        assert [r["mal_id"] for r in result] == [1, 11061]
+
+    @pytest.mark.asyncio
+    async def test_first_recommendation_before_stream_ends(self, fake_llm):
+        llm = fake_llm([_chunks(STREAMED_RESPONSE)])
+        stream = astream_llm_recommendations("sys", "user", MOCK_CANDIDATES, 3, timeout_budget_seconds=5)
+
+        first = await anext(stream)
+
+        assert first["mal_id"] == 1
+        assert llm.responses == []  # popped, not yet drained
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stops_at_requested_count(self, fake_llm):
+        fake_llm([_chunks(STREAMED_RESPONSE)])
+
+        result = await _collect(astream_llm_recommendations(
+            "sys", "user", MOCK_CANDIDATES, 1, timeout_budget_seconds=5,
+        ))
+
+        assert [r["mal_id"] for r in result] == [1]
+
+    @pytest.mark.asyncio
+    async def test_unparseable_stream_retries_with_correction(self, fake_llm):
+        llm = fake_llm([_chunks("Sorry, no JSON today."), VALID_RESPONSE])
+
+        result = await _collect(astream_llm_recommendations(
+            "sys", "user", MOCK_CANDIDATES, 1, timeout_budget_seconds=5,
+        ))
+
+        assert [r["mal_id"] for r in result] == [1]
+        assert len(llm.calls) == 2
+        assert "Sorry, no JSON today." in llm.calls[1][-1].content
+
+    @pytest.mark.asyncio
+    async def test_timeout_before_first_element(self, fake_llm):
+        fake_llm([_chunks(STREAMED_RESPONSE)], delay=5)
+
+        with pytest.raises(GuardrailError) as exc:
+            await asyncio.wait_for(
+                _collect(astream_llm_recommendations(
+                    "sys", "user", MOCK_CANDIDATES, 3, timeout_budget_seconds=0.05,
+                )),
+                timeout=2,
+            )
+
+        assert exc.value.code == "UPSTREAM_TIMEOUT"
@@ -0,0 +1,182 @@
+"""Tests for the retrieval result cache."""
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import get_metrics_summary
+from app.services import rag, retrieval_cache
+from app.services.rag import retrieve_candidates
+from app.services.retrieval_cache import (
+    RetrievalCache,
+    bump_index_version,
+    profile_fingerprint,
+    retrieval_cache_key,
+)
+
+PROFILE = {
+    "genre_affinity": [{"genre": "Action", "affinity": 0.9}],
+    "top_10": [{"title": "Monster"}],
+    "preferred_formats": {"TV": 10},
+}
+VERSION = ("numpy", "anime_catalog", 0)
+
+
+def _candidates(*mal_ids: int) -> list[dict]:
+    return [{"mal_id": i, "combined_score": 1 - i / 100} for i in mal_ids]
+
+
+# ═════════════════════════════════════════════════════════
+# RetrievalCache
+# ═════════════════════════════════════════════════════════
+
+
+class TestRetrievalCache:
+    def test_hit_returns_copies(self):
+        cache = RetrievalCache()
+        cache.put("k", VERSION, set(), _candidates(1, 2, 3))
+
+        first = cache.get("k", VERSION, set(), k=2)
+        first[0]["mutated"] = True
+
+        assert [c["mal_id"] for c in first] == [1, 2]
+        assert "mutated" not in cache.get("k", VERSION, set(), k=2)[0]
+
+    def test_expired_entry_misses(self):
+        cache = RetrievalCache(ttl_seconds=0)
+        cache.put("k", VERSION, set(), _candidates(1))
+
+        assert cache.get("k", VERSION, set(), k=1) is None
+        assert len(cache) == 0
+
+    def test_version_change_misses(self):
+        cache = RetrievalCache()
+        cache.put("k", VERSION, set(), _candidates(1))
+
+        assert cache.get("k", ("numpy", "anime_catalog_v2", 0), set(), k=1) is None
+
+    def test_extra_exclusions_filtered_after_lookup(self):
+        cache = RetrievalCache()
+        cache.put("k", VERSION, {50}, _candidates(1, 2, 3, 4))
+
+        result = cache.get("k", VERSION, {50, 2}, k=3)
+
+        assert [c["mal_id"] for c in result] == [1, 3, 4]
+
+    def test_fewer_exclusions_than_cached_pool_misses(self):
+        cache = RetrievalCache()
+        cache.put("k", VERSION, {50, 60}, _candidates(1, 2))
+
+        # The cached pool is missing 60, which this caller hasn't seen
+        assert cache.get("k", VERSION, {50}, k=2) is None
+
+    def test_too_few_survivors_misses(self):
+        cache = RetrievalCache()
+        cache.put("k", VERSION, set(), _candidates(1, 2, 3))
+
+        assert cache.get("k", VERSION, {1, 2}, k=2) is None
+
+    def test_short_pool_still_hits_when_nothing_filtered(self):
+        cache = RetrievalCache()
+        cache.put("k", VERSION, set(), _candidates(1))
+
+        assert [c["mal_id"] for c in cache.get("k", VERSION, set(), k=5)] == [1]
+
+    def test_lru_eviction(self):
+        cache = RetrievalCache(max_entries=2)
+        cache.put("a", VERSION, set(), _candidates(1))
+        cache.put("b", VERSION, set(), _candidates(2))
+        cache.get("a", VERSION, set(), k=1)
+        cache.put("c", VERSION, set(), _candidates(3))
+
+        assert cache.get("b", VERSION, set(), k=1) is None
+        assert cache.get("a", VERSION, set(), k=1) is not None
+
+
+class TestKeys:
+    def test_fingerprint_ignores_unrelated_fields(self):
+        noisy = dict(PROFILE, total_watched=412, computed_at="2026-10-17")
+
+        assert profile_fingerprint(noisy) == profile_fingerprint(PROFILE)
+
+    def test_fingerprint_tracks_affinities(self):
+        changed = dict(PROFILE, genre_affinity=[{"genre": "Action", "affinity": 0.8}])
+
+        assert profile_fingerprint(changed) != profile_fingerprint(PROFILE)
+
+    def test_key_covers_query_and_k(self):
+        base = retrieval_cache_key(PROFILE, None, 7.0, 30, "max", 50)
+
+        assert retrieval_cache_key(PROFILE, "darker", 7.0, 30, "max", 50) != base
+        assert retrieval_cache_key(PROFILE, None, 7.0, 10, "max", 50) != base
+        assert retrieval_cache_key(PROFILE, None, 7.0, 30, "max", 50) == base
+
+
+# ═════════════════════════════════════════════════════════
+# retrieve_candidates integration
+# ═════════════════════════════════════════════════════════
+
+
+@pytest.fixture()
+def counted_search(monkeypatch):
+    """Fake batched search that records each call."""
+    calls = []
+
+    def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+        calls.append(set(exclude_ids or ()))
+        return [
+            [
+                {"mal_id": i, "title": f"Anime {i}", "embedding_text": "",
+                 "metadata": {"genres": "Action"}, "similarity_score": 0.9 - i / 100}
+                for i in range(1, 21) if i not in (exclude_ids or ())
+            ]
+            for _ in queries
+        ]
+
+    monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+    monkeypatch.setattr(
+        rag, "current_index_version", lambda: ("numpy", "anime_catalog", retrieval_cache._generation),
+    )
+    return calls
+
+
+class TestRetrieveCandidatesCaching:
+    def test_repeat_call_is_served_from_cache(self, counted_search):
+        first = retrieve_candidates(PROFILE, k=5)
+        second = retrieve_candidates(PROFILE, k=5)
+
+        assert len(counted_search) == 1
+        assert [c["mal_id"] for c in second] == [c["mal_id"] for c in first]
+
+    def test_newly_watched_anime_filtered_from_cached_pool(self, counted_search):
+        first = retrieve_candidates(PROFILE, k=5, watched_mal_ids={20})
+        top_id = first[0]["mal_id"]
+
+        second = retrieve_candidates(PROFILE, k=5, watched_mal_ids={20, top_id})
+
+        assert len(counted_search) == 1
+        assert top_id not in {c["mal_id"] for c in second}
+        assert len(second) == 5
+
+    def test_vector_write_invalidates(self, counted_search):
+        retrieve_candidates(PROFILE, k=5)
+        bump_index_version()
+        retrieve_candidates(PROFILE, k=5)
+
+        assert len(counted_search) == 2
+
+    def test_disabled(self, counted_search, monkeypatch):
+        monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+        retrieve_candidates(PROFILE, k=5)
+        retrieve_candidates(PROFILE, k=5)
+
+        assert len(counted_search) == 2
+
+    def test_hit_rate_in_metrics(self, counted_search):
+        before = get_metrics_summary()["counters"]
+        retrieve_candidates(PROFILE, k=5)
+        retrieve_candidates(PROFILE, k=5)
+        after = get_metrics_summary()
+
+        assert after["counters"]["retrieval_cache_hit"] - before["retrieval_cache_hit"] == 1
+        assert after["counters"]["retrieval_cache_miss"] - before["retrieval_cache_miss"] == 1
+        assert 0.0 < after["retrieval_cache_hit_rate"] <= 1.0
@@ -0,0 +1,115 @@
+"""Tests for concurrent retrieval searches with per-search deadlines."""
+
+import threading
+from time import perf_counter
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import get_metrics_summary
+from app.services import rag
+from app.services.rag import retrieve_candidates
+from app.services.retrieval_cache import get_retrieval_cache
+from app.services.search_pool import fan_out, map_queries, reset_search_pool, search_timeout
+
+
+@pytest.fixture()
+def release():
+    """An event slow tasks block on; set on teardown so no worker leaks."""
+    event = threading.Event()
+    yield event
+    event.set()
+    reset_search_pool()
+
+
+# ═════════════════════════════════════════════════════════
+# fan_out / map_queries
+# ═════════════════════════════════════════════════════════
+
+
+class TestFanOut:
+    def test_runs_concurrently_in_task_order(self, release):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def task(n):
+            barrier.wait()  # only passes if all three run at once
+            return n
+
+        results = fan_out([(str(n), lambda n=n: task(n)) for n in range(3)], timeout=2)
+
+        assert results == [0, 1, 2]
+
+    def test_slow_task_dropped(self, release):
+        before = get_metrics_summary()["counters"].get("retrieval_search_timeout", 0)
+        started = perf_counter()
+
+        results = fan_out(
+            [("fast", lambda: "ok"), ("slow", lambda: release.wait(5))],
+            timeout=0.05,
+        )
+
+        assert results == ["ok", None]
+        assert perf_counter() - started < 1
+        assert get_metrics_summary()["counters"]["retrieval_search_timeout"] == before + 1
+
+    def test_errors_propagate(self, release):
+        def boom():
+            raise RuntimeError("embedding API down")
+
+        with pytest.raises(RuntimeError, match="embedding API down"):
+            fan_out([("boom", boom)], timeout=1)
+
+    def test_map_queries_keeps_order(self, release):
+        assert map_queries(lambda x: x * 2, [3, 1, 2]) == [6, 2, 4]
+        assert map_queries(lambda x: x, []) == []
+
+
+class TestSearchTimeout:
+    def test_share_of_job_budget(self, monkeypatch):
+        monkeypatch.setattr(settings, "RECOMMEND_JOB_TIMEOUT_SECONDS", 40)
+        monkeypatch.setattr(settings, "RETRIEVAL_SEARCH_BUDGET_SHARE", 0.25)
+
+        assert search_timeout() == 10
+        assert search_timeout(perf_counter() + 2) == pytest.approx(2, abs=0.1)
+        assert search_timeout(perf_counter() - 1) == 0
+
+
+# ═════════════════════════════════════════════════════════
+# retrieve_candidates integration
+# ═════════════════════════════════════════════════════════
+
+
+PROFILE = {"genre_affinity": [{"genre": "Action", "affinity": 0.9}]}
+
+
+def _hit(mal_id: int) -> dict:
+    return {
+        "mal_id": mal_id, "title": str(mal_id), "embedding_text": "",
+        "metadata": {"genres": "Action"}, "similarity_score": 0.8,
+    }
+
+
+class TestRetrieveWithDeadlines:
+    def test_slow_source_dropped_and_pool_not_cached(self, release, monkeypatch):
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "top_shows")
+        monkeypatch.setattr(settings, "RETRIEVAL_ADAPTIVE_FETCH", False)
+        monkeypatch.setattr(
+            rag, "search_anime_many",
+            lambda queries, k, filter_dict=None, exclude_ids=None: [[_hit(1), _hit(2)] for _ in queries],
+        )
+
+        def slow_vector_search(vectors, k, filter_dict=None, exclude_ids=None):
+            release.wait(5)
+            return [[_hit(3)]]
+
+        monkeypatch.setattr(rag, "search_anime_by_vectors", slow_vector_search)
+        stats = {}
+
+        result = retrieve_candidates(
+            PROFILE, k=5, min_score=None, taste_vector=[1.0, 0.0],
+            stats=stats, deadline=perf_counter() + 0.05,
+        )
+
+        assert sorted(c["mal_id"] for c in result) == [1, 2]
+        assert stats["dropped_searches"] == 1
+        assert len(get_retrieval_cache()) == 0
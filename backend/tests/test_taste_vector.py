@@ -0,0 +1,219 @@
+"""Tests for user taste vectors.
+
+The cache tests point a session at a throwaway SQLite file; searches
+are faked at the ``rag`` module boundary, so nothing is embedded.
+"""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.anime import AnimeCatalogEntry, AnimeEntry, AnimeList, UserPreferenceProfile
+from app.models.user import User
+from app.services import rag
+from app.services.embedding_storage import pack_vector
+from app.services.rag import FALLBACK_QUERY, retrieve_candidates
+from app.services.taste_vector import (
+    clear_taste_vector,
+    compute_taste_vector,
+    get_taste_vector,
+)
+
+PROFILE = {
+    "genre_affinity": [{"genre": "Action", "affinity": 0.9}],
+    "theme_affinity": [{"genre": "Space", "affinity": 0.8}],
+    "top_10": [{"title": "Cowboy Bebop"}, {"title": "Monster"}],
+}
+
+
+# ═════════════════════════════════════════════════════════
+# Centroid
+# ═════════════════════════════════════════════════════════
+
+
+class TestComputeTasteVector:
+    def test_score_weighted_unit_centroid(self):
+        vectors = {1: np.array([2.0, 0.0]), 2: np.array([0.0, 5.0])}
+
+        taste = compute_taste_vector([(1, 9.0), (2, 3.0)], vectors)
+
+        # Inputs are normalised first, so only the scores weigh in
+        expected = np.array([9.0, 3.0]) / np.linalg.norm([9.0, 3.0])
+        assert np.allclose(taste, expected, atol=1e-6)
+        assert taste.dtype == np.float32
+
+    def test_skips_missing_and_unscored(self):
+        vectors = {1: np.array([1.0, 0.0]), 2: np.array([0.0, 1.0])}
+
+        taste = compute_taste_vector([(1, 8.0), (2, 0.0), (3, 10.0)], vectors)
+
+        assert np.allclose(taste, [1.0, 0.0])
+
+    def test_none_without_vectors(self):
+        assert compute_taste_vector([(1, 8.0)], {}) is None
+
+
+# ═════════════════════════════════════════════════════════
+# Profile cache
+# ═════════════════════════════════════════════════════════
+
+
+@pytest.fixture()
+def taste_db(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'taste.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "top_shows")
+    monkeypatch.setattr(
+        "app.services.vector_store.get_embedding_model_name", lambda: "hashing-4",
+    )
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="taste@example.com", provider="email")
+    db.add(user)
+    db.flush()
+    anime_list = AnimeList(user_id=user.id, source="mal")
+    db.add(anime_list)
+    db.flush()
+    for mal_id, score in [(1, 10), (2, 6), (3, 9)]:
+        db.add(AnimeEntry(
+            anime_list_id=anime_list.id, mal_anime_id=mal_id, title=f"Anime {mal_id}",
+            watch_status="completed", user_score=score,
+        ))
+    for mal_id, vector in [(1, [1.0, 0, 0, 0]), (2, [0, 1.0, 0, 0])]:
+        db.add(AnimeCatalogEntry(
+            mal_id=mal_id, title=f"Anime {mal_id}",
+            embedding_vector=pack_vector(np.array(vector), "float32"),
+            embedding_dim=4, embedding_model="hashing-4",
+        ))
+    profile = UserPreferenceProfile(user_id=user.id, profile_data=PROFILE)
+    db.add(profile)
+    db.commit()
+
+    yield db, profile
+    db.close()
+    engine.dispose()
+
+
+class TestGetTasteVector:
+    def test_builds_and_caches_on_profile(self, taste_db):
+        db, profile = taste_db
+
+        taste = get_taste_vector(db, profile)
+
+        # Anime 3 has no stored vector; 1 (score 10) and 2 (score 6) remain
+        expected = np.array([10.0, 6.0]) / np.linalg.norm([10.0, 6.0])
+        assert np.allclose(taste[:2], expected, atol=1e-3)
+        assert profile.taste_vector_dim == 4
+        assert profile.taste_vector_model == "hashing-4"
+
+    def test_cached_vector_skips_the_catalog(self, taste_db, monkeypatch):
+        db, profile = taste_db
+        first = get_taste_vector(db, profile)
+        monkeypatch.setattr(
+            "app.services.taste_vector.build_taste_vector",
+            lambda *a: pytest.fail("rebuilt a cached taste vector"),
+        )
+
+        assert get_taste_vector(db, profile) == first
+
+    def test_model_change_rebuilds(self, taste_db, monkeypatch):
+        db, profile = taste_db
+        get_taste_vector(db, profile)
+        monkeypatch.setattr(
+            "app.services.vector_store.get_embedding_model_name", lambda: "other-model",
+        )
+
+        # No catalog vectors for the new model yet
+        assert get_taste_vector(db, profile) is None
+
+    def test_clear(self, taste_db):
+        db, profile = taste_db
+        get_taste_vector(db, profile)
+
+        clear_taste_vector(profile)
+
+        assert profile.taste_vector is None
+        assert profile.taste_vector_model is None
+
+    def test_off_mode(self, taste_db, monkeypatch):
+        db, profile = taste_db
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "off")
+
+        assert get_taste_vector(db, profile) is None
+        assert profile.taste_vector is None
+
+
+# ═════════════════════════════════════════════════════════
+# retrieve_candidates integration
+# ═════════════════════════════════════════════════════════
+
+
+def _hits(*mal_ids: int) -> list[dict]:
+    return [
+        {"mal_id": i, "title": f"Anime {i}", "embedding_text": "",
+         "metadata": {"genres": "Action"}, "similarity_score": 0.9 - i / 100}
+        for i in mal_ids
+    ]
+
+
+@pytest.fixture()
+def searches(monkeypatch):
+    """Record embedded queries and vector searches."""
+    calls = {"queries": [], "vectors": []}
+
+    def fake_search_many(queries, k, filter_dict=None, exclude_ids=None):
+        calls["queries"].extend(queries)
+        return [_hits(1, 2, 3) for _ in queries]
+
+    def fake_search_by_vectors(vectors, k, filter_dict=None, exclude_ids=None):
+        calls["vectors"].extend(vectors)
+        return [_hits(4, 5) for _ in vectors]
+
+    monkeypatch.setattr(rag, "search_anime_many", fake_search_many)
+    monkeypatch.setattr(rag, "search_anime_by_vectors", fake_search_by_vectors)
+    monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+    return calls
+
+
+class TestRetrieveWithTasteVector:
+    def test_replaces_top_shows_query(self, searches, monkeypatch):
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "top_shows")
+
+        result = retrieve_candidates(PROFILE, k=10, taste_vector=[1.0, 0.0])
+
+        assert len(searches["queries"]) == 2
+        assert not any("similar to" in q for q in searches["queries"])
+        assert searches["vectors"] == [[1.0, 0.0]]
+        assert {c["mal_id"] for c in result} == {1, 2, 3, 4, 5}
+
+    def test_only_mode_embeds_nothing(self, searches, monkeypatch):
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "only")
+
+        result = retrieve_candidates(PROFILE, k=10, taste_vector=[1.0, 0.0])
+
+        assert searches["queries"] == []
+        assert [c["mal_id"] for c in result] == [4, 5]
+
+    def test_replaces_fallback_query(self, searches, monkeypatch):
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "top_shows")
+
+        retrieve_candidates({}, k=10, taste_vector=[1.0, 0.0])
+
+        assert FALLBACK_QUERY not in searches["queries"]
+        assert len(searches["vectors"]) == 1
+
+    def test_ignored_for_custom_query_and_off_mode(self, searches, monkeypatch):
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "only")
+        retrieve_candidates(PROFILE, k=10, custom_query="space westerns", taste_vector=[1.0])
+        monkeypatch.setattr(settings, "TASTE_VECTOR_MODE", "off")
+        retrieve_candidates(PROFILE, k=10, taste_vector=[1.0])
+
+        assert searches["vectors"] == []
+        assert searches["queries"][0] == "space westerns"
+        assert len(searches["queries"]) == 4
@@ -0,0 +1,261 @@
+"""Tests for versioned (blue/green) vector collections.
+
+The pointer lives in the ``vector_collections`` table, so these tests
+point ``SessionLocal`` at a throwaway SQLite file.  ``gc_collections``
+(which drops real collections) is only exercised through the pure
+``select_for_gc`` policy; the ``reindex`` test writes a real NumPy
+index in a temporary directory from vectors stored on the catalog.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.cli import cmd_reindex
+from app.core.config import settings
+from app.db.session import Base
+from app.models.anime import AnimeCatalogEntry
+from app.services import vector_collections, vector_store
+from app.services.embedding_storage import embedding_text_hash, pack_vector
+from app.services.numpy_index import NumpyVectorIndex
+from app.services.vector_collections import (
+    activate_collection,
+    get_active_collection,
+    list_collections,
+    numpy_index_dir,
+    select_for_gc,
+    start_build,
+    versioned_name,
+)
+
+
+@pytest.fixture()
+def collections_db(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'collections.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(
+        "app.db.session.SessionLocal",
+        sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    )
+    vector_collections.reset_collection_cache()
+    yield engine
+    vector_collections.reset_collection_cache()
+    engine.dispose()
+
+
+# ═════════════════════════════════════════════════════════
+# Naming
+# ═════════════════════════════════════════════════════════
+
+
+class TestNaming:
+    def test_versioned_name(self):
+        assert versioned_name("pgvector", 7) == f"{settings.VECTOR_COLLECTION_NAME}_v7"
+        assert versioned_name("pgvector", 0) == settings.VECTOR_COLLECTION_NAME
+
+    def test_chroma_uses_its_own_base_name(self, monkeypatch):
+        monkeypatch.setattr(settings, "CHROMA_COLLECTION_NAME", "dev_catalog")
+        assert versioned_name("chroma", 2) == "dev_catalog_v2"
+
+    def test_numpy_versions_are_subdirectories(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "NUMPY_INDEX_DIR", str(tmp_path))
+        assert numpy_index_dir(versioned_name("numpy", 0)) == tmp_path
+        assert numpy_index_dir(versioned_name("numpy", 3)) == tmp_path / versioned_name("numpy", 3)
+
+
+# ═════════════════════════════════════════════════════════
+# Pointer
+# ═════════════════════════════════════════════════════════
+
+
+class TestActivePointer:
+    def test_falls_back_to_original_before_first_switch(self, collections_db):
+        assert get_active_collection("pgvector") == settings.VECTOR_COLLECTION_NAME
+
+    def test_build_does_not_switch(self, collections_db):
+        build = start_build("pgvector")
+
+        assert build.version == 1
+        assert build.status == "building"
+        assert get_active_collection("pgvector") == settings.VECTOR_COLLECTION_NAME
+
+    def test_activate_switches_and_records_original(self, collections_db):
+        build = start_build("pgvector")
+        activate_collection("pgvector", build.name, document_count=42)
+
+        assert get_active_collection("pgvector") == build.name
+        rows = {r.name: r for r in list_collections("pgvector")}
+        assert rows[build.name].status == "active"
+        assert rows[build.name].document_count == 42
+        assert rows[settings.VECTOR_COLLECTION_NAME].status == "retired"
+        assert rows[settings.VECTOR_COLLECTION_NAME].version == 0
+
+    def test_second_switch_retires_previous(self, collections_db):
+        first = start_build("pgvector")
+        activate_collection("pgvector", first.name)
+        second = start_build("pgvector")
+        activate_collection("pgvector", second.name)
+
+        statuses = {r.name: r.status for r in list_collections("pgvector")}
+        assert statuses[first.name] == "retired"
+        assert statuses[second.name] == "active"
+        assert list(statuses.values()).count("active") == 1
+
+    def test_rollback_reactivates_retired(self, collections_db):
+        first = start_build("pgvector")
+        activate_collection("pgvector", first.name)
+        second = start_build("pgvector")
+        activate_collection("pgvector", second.name)
+
+        activate_collection("pgvector", first.name)
+
+        assert get_active_collection("pgvector") == first.name
+
+    def test_backends_are_independent(self, collections_db):
+        build = start_build("numpy")
+        activate_collection("numpy", build.name)
+
+        assert start_build("pgvector").version == 1
+        assert get_active_collection("pgvector") == settings.VECTOR_COLLECTION_NAME
+
+    def test_unknown_collection(self, collections_db):
+        with pytest.raises(ValueError, match="Unknown"):
+            activate_collection("pgvector", "nope_v9")
+
+    def test_pointer_is_cached(self, collections_db, monkeypatch):
+        monkeypatch.setattr(settings, "VECTOR_COLLECTION_REFRESH_SECONDS", 3600)
+        build = start_build("pgvector")
+        get_active_collection("pgvector")
+
+        # Switch from "another process": only the DB changes
+        from app.db.session import SessionLocal
+        from app.models.vector_collection import VectorCollection
+
+        db = SessionLocal()
+        db.query(VectorCollection).filter_by(name=build.name).update({"status": "active"})
+        db.commit()
+        db.close()
+
+        assert get_active_collection("pgvector") == settings.VECTOR_COLLECTION_NAME
+        vector_collections.reset_collection_cache()
+        assert get_active_collection("pgvector") == build.name
+
+
+# ═════════════════════════════════════════════════════════
+# Garbage-collection policy
+# ═════════════════════════════════════════════════════════
+
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _row(version, status, retired_hours_ago=None, created_hours_ago=48):
+    return SimpleNamespace(
+        name=f"anime_catalog_v{version}",
+        version=version,
+        status=status,
+        retired_at=None if retired_hours_ago is None else NOW - timedelta(hours=retired_hours_ago),
+        created_at=NOW - timedelta(hours=created_hours_ago),
+    )
+
+
+class TestSelectForGc:
+    def test_keeps_newest_retired_for_rollback(self):
+        rows = [
+            _row(4, "active"),
+            _row(3, "retired", retired_hours_ago=5),
+            _row(2, "retired", retired_hours_ago=10),
+            _row(1, "retired", retired_hours_ago=20),
+        ]
+        doomed = select_for_gc(rows, keep=1, now=NOW, grace=timedelta(hours=1))
+
+        assert [r.version for r in doomed] == [2, 1]
+
+    def test_grace_period_protects_recently_retired(self):
+        rows = [_row(3, "active"), _row(2, "retired", retired_hours_ago=0.1)]
+
+        assert select_for_gc(rows, keep=0, now=NOW, grace=timedelta(hours=1)) == []
+
+    def test_never_drops_active(self):
+        rows = [_row(1, "active")]
+        assert select_for_gc(rows, keep=0, now=NOW, grace=timedelta(0)) == []
+
+    def test_abandoned_builds(self):
+        rows = [
+            _row(3, "building", created_hours_ago=0.5),
+            _row(2, "building", created_hours_ago=30),
+            _row(1, "active"),
+        ]
+        doomed = select_for_gc(rows, keep=1, now=NOW, grace=timedelta(hours=1))
+
+        assert [r.version for r in doomed] == [2]
+
+    def test_naive_datetimes_from_sqlite(self):
+        row = _row(1, "retired")
+        row.retired_at = (NOW - timedelta(hours=5)).replace(tzinfo=None)
+
+        assert select_for_gc([row], keep=0, now=NOW, grace=timedelta(hours=1)) == [row]
+
+
+# ═════════════════════════════════════════════════════════
+# reindex — rebuild from stored vectors
+# ═════════════════════════════════════════════════════════
+
+
+class NoEmbeddings:
+    """Fails the test if anything tries to embed."""
+
+    def embed_documents(self, texts):
+        raise AssertionError("reindex must not embed")
+
+    def embed_query(self, text):
+        raise AssertionError("reindex must not embed")
+
+
+@pytest.fixture()
+def numpy_backend(collections_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", "numpy")
+    monkeypatch.setattr(settings, "NUMPY_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "hashing")
+    vector_store.reset_vector_store()
+    monkeypatch.setattr(vector_store, "get_embeddings", lambda: NoEmbeddings())
+    yield
+    vector_store.reset_vector_store()
+
+
+def _catalog_entry(mal_id: int, vector: list[float], text: str, stored_text: str | None = None) -> AnimeCatalogEntry:
+    return AnimeCatalogEntry(
+        mal_id=mal_id, title=f"Anime {mal_id}", genres="Action", mal_score=8.0,
+        embedding_text=text,
+        embedding_text_hash=embedding_text_hash(stored_text or text),
+        embedding_vector=pack_vector(vector, "float32"),
+        embedding_dim=len(vector),
+        embedding_model=vector_store.get_embedding_model_name(),
+    )
+
+
+class TestReindex:
+    def test_rebuilds_new_collection_from_stored_vectors(self, collections_db, numpy_backend):
+        db = sessionmaker(bind=collections_db)()
+        db.add(_catalog_entry(1, [1.0, 0.0, 0.0], "Title: A"))
+        db.add(_catalog_entry(2, [0.0, 1.0, 0.0], "Title: B"))
+        # Text changed since it was embedded: skipped, left for `embed`
+        db.add(_catalog_entry(3, [0.0, 0.0, 1.0], "Title: C v2", stored_text="Title: C"))
+        db.commit()
+        db.close()
+
+        cmd_reindex(SimpleNamespace(backend=None, no_switch=False, force=False))
+
+        active = get_active_collection("numpy")
+        assert active == versioned_name("numpy", 1)
+        index = NumpyVectorIndex(numpy_index_dir(active))
+        assert index.count() == 2
+        top = index.search([0.0, 1.0, 0.0], k=1)[0]
+        assert top[1]["mal_id"] == 2
+        assert top[2] == pytest.approx(1.0)
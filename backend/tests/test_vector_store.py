@@ -2,7 +2,10 @@
 
 These tests cover the pure helper functions in vector_store.py:
 • _build_metadata — converts anime dicts to ChromaDB metadata format
+• catalog_entry_metadata — the same, straight from a catalog row
 • _build_chroma_filter — translates user-friendly filters to ChromaDB syntax
+• get_vector_backend — resolves VECTOR_STORE_BACKEND to a concrete backend
+• _with_exclusions — folds watched IDs into the search filter
 
 These are pure functions — no ChromaDB, no OpenAI, no network.
 They test the data transformation logic that sits between our
@@ -19,9 +22,16 @@ without explicit tests.
 
 import pytest
 
+from app.models.anime import AnimeCatalogEntry
 from app.services.vector_store import (
+    catalog_entry_metadata,
+    get_embedding_model_name,
+    get_embeddings,
+    get_vector_backend,
+    reset_vector_store,
     _build_metadata,
     _build_chroma_filter,
+    _with_exclusions,
 )
 
 
@@ -124,6 +134,19 @@ class TestBuildMetadata:
         assert "mal_score" not in metadata
         assert "year" not in metadata
 
+    def test_catalog_row_matches_dict_path(self):
+        """A catalog row maps to the metadata its dict form would get."""
+        row = AnimeCatalogEntry(
+            mal_id=1, title="Cowboy Bebop", genres="Action, Sci-Fi", year=1998,
+            mal_score=8.75, mal_members=1_900_000, embedding_text="Title: Cowboy Bebop",
+        )
+
+        assert catalog_entry_metadata(row) == _build_metadata({
+            "mal_id": 1, "title": "Cowboy Bebop", "genres": "Action, Sci-Fi",
+            "year": 1998, "mal_score": 8.75, "mal_members": 1_900_000,
+        })
+        assert "embedding_text" not in catalog_entry_metadata(row)
+
 
 # ═════════════════════════════════════════════════════════
 # Tests: _build_chroma_filter
@@ -217,3 +240,101 @@ class TestBuildChromaFilter:
         conditions = result["$and"]
         assert {"year": {"$gte": 2010}} in conditions
         assert {"year": {"$lte": 2020}} in conditions
+
+    def test_nin_filter(self):
+        """_nin suffix should produce a $nin condition."""
+        result = _build_chroma_filter({"mal_id_nin": [1, 5]})
+        assert result == {"mal_id": {"$nin": [1, 5]}}
+
+    def test_empty_nin_is_dropped(self):
+        """An empty exclusion list should not produce a condition."""
+        assert _build_chroma_filter({"mal_id_nin": []}) is None
+
+
+class TestWithExclusions:
+    """Test folding exclude_ids into the filter dict."""
+
+    def test_no_exclusions_returns_filter_unchanged(self):
+        base = {"mal_score_gte": 7.0}
+        assert _with_exclusions(base, None) is base
+        assert _with_exclusions(None, set()) is None
+
+    def test_merges_sorted_ids_without_mutating(self):
+        base = {"mal_score_gte": 7.0}
+        merged = _with_exclusions(base, {19, 1, 5})
+
+        assert merged == {"mal_score_gte": 7.0, "mal_id_nin": [1, 5, 19]}
+        assert base == {"mal_score_gte": 7.0}
+
+    def test_combined_chroma_filter(self):
+        where = _build_chroma_filter(_with_exclusions({"mal_score_gte": 7.0}, [1]))
+        assert where == {"$and": [{"mal_score": {"$gte": 7.0}}, {"mal_id": {"$nin": [1]}}]}
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: get_vector_backend
+# ═════════════════════════════════════════════════════════
+
+
+class TestGetVectorBackend:
+    """Test backend selection from settings."""
+
+    def test_auto_uses_chroma_for_sqlite(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.VECTOR_STORE_BACKEND", "auto")
+        monkeypatch.setattr("app.services.vector_store.settings.DATABASE_URL", "sqlite:///./x.db")
+        assert get_vector_backend() == "chroma"
+
+    def test_auto_uses_pgvector_for_postgres(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.VECTOR_STORE_BACKEND", "auto")
+        monkeypatch.setattr("app.services.vector_store.settings.DATABASE_URL", "postgresql://u@h/db")
+        assert get_vector_backend() == "pgvector"
+
+    def test_explicit_numpy(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.VECTOR_STORE_BACKEND", "NumPy")
+        assert get_vector_backend() == "numpy"
+
+    def test_unknown_backend_raises(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.VECTOR_STORE_BACKEND", "faiss")
+        with pytest.raises(RuntimeError, match="VECTOR_STORE_BACKEND"):
+            get_vector_backend()
+
+
+# ═════════════════════════════════════════════════════════
+# Tests: get_embeddings — provider selection
+# ═════════════════════════════════════════════════════════
+
+
+class TestGetEmbeddings:
+    """Test EMBEDDING_PROVIDER selection (no network)."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_singleton(self):
+        reset_vector_store()
+        yield
+        reset_vector_store()
+
+    def test_hashing_needs_no_api_key(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.EMBEDDING_PROVIDER", "hashing")
+        monkeypatch.setattr("app.services.vector_store.settings.OPENAI_API_KEY", "")
+        monkeypatch.setattr("app.services.vector_store.settings.LOCAL_EMBEDDING_DIMENSIONS", 32)
+
+        embeddings = get_embeddings()
+
+        assert len(embeddings.embed_query("mecha")) == 32
+        assert get_embedding_model_name() == embeddings.model
+
+    def test_openai_without_key_raises(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.EMBEDDING_PROVIDER", "openai")
+        monkeypatch.setattr("app.services.vector_store.settings.OPENAI_API_KEY", "")
+        with pytest.raises(RuntimeError, match="OPENAI_API_KEY"):
+            get_embeddings()
+
+    def test_openai_model_name(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.EMBEDDING_PROVIDER", "OpenAI")
+        monkeypatch.setattr("app.services.vector_store.settings.OPENAI_EMBEDDING_MODEL", "m-1")
+        assert get_embedding_model_name() == "m-1"
+
+    def test_unknown_provider_raises(self, monkeypatch):
+        monkeypatch.setattr("app.services.vector_store.settings.EMBEDDING_PROVIDER", "cohere")
+        with pytest.raises(RuntimeError, match="EMBEDDING_PROVIDER"):
+            get_embedding_model_name()